@@ -0,0 +1,65 @@
+"""
+Compare `pyfsense_client.cidr.aggregate_addresses` with the standard library's `ipaddress.collapse_addresses`.
+
+The input mimics a generated blocklist: mostly IPv4 hosts, some /24 networks that cover several of them, and a
+share of IPv6 /64s. The standard library is only timed up to `--stdlib-max` entries.
+
+Usage:
+    python benchmarks/bench_cidr_aggregation.py [--sizes 10000 100000 1000000] [--repeat 3] [--stdlib-max 100000]
+"""
+
+import argparse
+import ipaddress
+import random
+import timeit
+
+from pyfsense_client.cidr import aggregate_addresses
+
+
+def blocklist(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        roll = rng.random()
+        value = rng.getrandbits(24) | 0x0A000000
+        if roll < 0.7:
+            entries.append(str(ipaddress.IPv4Address(value)))
+        elif roll < 0.95:
+            entries.append(f"{ipaddress.IPv4Address(value & ~0xFF)}/24")
+        else:
+            entries.append(f"2001:db8:{rng.getrandbits(16):x}:{rng.getrandbits(16):x}::/64")
+    return entries
+
+
+def stdlib_collapse(entries: list[str]) -> list[str]:
+    networks = [ipaddress.ip_network(entry, strict=False) for entry in entries]
+    collapsed = [
+        *ipaddress.collapse_addresses(n for n in networks if n.version == 4),
+        *ipaddress.collapse_addresses(n for n in networks if n.version == 6),
+    ]
+    return [str(n.network_address) if n.prefixlen == n.max_prefixlen else str(n) for n in collapsed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stdlib-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'aggregated':>12}{'stdlib (ms)':>14}{'cidr (ms)':>12}{'speedup':>10}")
+    for size in args.sizes:
+        entries = blocklist(size)
+        details = [f"entry {i}" for i in range(size)]
+        result, _ = aggregate_addresses(entries)
+        fast = min(timeit.repeat(lambda: aggregate_addresses(entries, details), number=1, repeat=args.repeat))
+        if size <= args.stdlib_max:
+            assert stdlib_collapse(entries) == result
+            slow = min(timeit.repeat(lambda: stdlib_collapse(entries), number=1, repeat=args.repeat))
+            print(f"{size:>10}{len(result):>12}{slow * 1000:>14.1f}{fast * 1000:>12.1f}{slow / fast:>9.2f}x")
+        else:
+            print(f"{size:>10}{len(result):>12}{'-':>14}{fast * 1000:>12.1f}{'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
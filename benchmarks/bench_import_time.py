@@ -0,0 +1,71 @@
+"""
+Measure cold-start import time, and optionally fail if it exceeds a budget.
+
+Each statement runs in a fresh interpreter `--runs` times; the median wall time of the statement itself (not
+interpreter startup) is reported. Budgets are milliseconds on a typical developer machine; scale them with
+`--budget-scale` on slower CI runners.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 15] [--check] [--budget-scale 1.0]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Statement -> budget in milliseconds
+BUDGETS = {
+    "import pyfsense_client.v2": 5,
+    "from pyfsense_client.v2 import ClientConfig": 20,
+    "from pyfsense_client.v2 import DHCPLease, FirewallAlias": 200,
+    "from pyfsense_client.v2 import AsyncPfSenseV2Client": 400,
+    "from pyfsense_client.v2 import PfSenseV2Client": 400,
+    "from pyfsense_client.agent import AgentClient": 80,
+    "from pyfsense_client.v1.client import ClientConfig": 150,
+    "from pyfsense_client.v1.client import PfSenseV1Client": 450,
+}
+
+PROBE = """
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+
+def measure(statement: str, runs: int) -> float:
+    """Median milliseconds `statement` takes in a fresh interpreter."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)], check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(float(output) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any statement is over budget")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget by this factor")
+    args = parser.parse_args()
+
+    over = []
+    print(f"{'statement':<58}{'ms':>8}{'budget':>8}")
+    for statement, budget in BUDGETS.items():
+        budget *= args.budget_scale
+        elapsed = measure(statement, args.runs)
+        flag = "  OVER" if elapsed > budget else ""
+        if flag:
+            over.append(statement)
+        print(f"{statement:<58}{elapsed:>8.1f}{budget:>8.0f}{flag}")
+    if args.check and over:
+        print(f"\n{len(over)} import(s) over budget.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
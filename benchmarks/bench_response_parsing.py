@@ -0,0 +1,88 @@
+"""
+Compare the legacy two-stage response parsing with the single-pass typed pipeline.
+
+Legacy:  response.json() -> APIResponse.model_validate() -> Model.model_validate(item) for every item
+Typed:   TypedAPIResponse[Model].model_validate_json(response.content)
+
+Usage:
+    python benchmarks/bench_response_parsing.py [--sizes 1000 10000 40000] [--repeat 5]
+"""
+
+import argparse
+import json
+import timeit
+
+import requests
+
+from pyfsense_client.v2 import PfSenseV2Client, ClientConfig, APIResponse, DHCPLease, FirewallAlias
+
+
+def lease_payload(count: int) -> bytes:
+    data = [
+        {
+            "ip": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            "mac": f"00:1a:2b:{i // 65536 % 256:02x}:{i // 256 % 256:02x}:{i % 256:02x}",
+            "hostname": f"host-{i}",
+            "if": "lan",
+            "start": "2025-01-01T12:00:00Z",
+            "end": "2025-01-02T12:00:00Z",
+            "active_status": "active",
+            "online_status": "active/online",
+            "descr": f"lease {i}",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"code": 200, "status": "ok", "message": "", "data": data}).encode()
+
+
+def alias_payload(count: int) -> bytes:
+    data = [
+        {
+            "id": i,
+            "name": f"alias_{i}",
+            "type": "host",
+            "descr": f"alias {i}",
+            "address": [f"10.0.{i // 256 % 256}.{i % 256}", f"10.1.{i // 256 % 256}.{i % 256}"],
+            "detail": ["primary", "secondary"],
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"code": 200, "status": "ok", "message": "", "data": data}).encode()
+
+
+def make_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+def legacy_parse(response: requests.Response, model):
+    resp = APIResponse.model_validate(response.json())
+    return [model.model_validate(item) for item in resp.data]
+
+
+def typed_parse(client: PfSenseV2Client, response: requests.Response, model):
+    return client._handle_response(response, model).data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 40_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = PfSenseV2Client(ClientConfig(host="bench.invalid"))
+    print(f"{'payload':<16}{'records':>10}{'legacy (ms)':>14}{'typed (ms)':>14}{'speedup':>10}")
+    for name, model, build in (("DHCPLease", DHCPLease, lease_payload), ("FirewallAlias", FirewallAlias, alias_payload)):
+        for size in args.sizes:
+            response = make_response(build(size))
+            assert legacy_parse(response, model) == typed_parse(client, response, model)
+            legacy = min(timeit.repeat(lambda: legacy_parse(response, model), number=1, repeat=args.repeat))
+            typed = min(timeit.repeat(lambda: typed_parse(client, response, model), number=1, repeat=args.repeat))
+            print(f"{name:<16}{size:>10}{legacy * 1000:>14.1f}{typed * 1000:>14.1f}{legacy / typed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure the per-request cost of tracing in PfSenseV2Client.
+
+The session is served by an in-process adapter returning a canned response, so the numbers are the
+client's own overhead per `_request` call:
+
+Core:          `_authorized()`, i.e. the request path below the tracing wrapper in `_request`
+Disabled:      tracing=False (the default); every tracing hook is a single `is None` check
+No-op API:     tracing=True with opentelemetry-api installed but no SDK configured
+SDK:           tracing=True with the OpenTelemetry SDK recording spans to a no-op exporter
+
+Usage:
+    python benchmarks/bench_tracing_overhead.py [--calls 5000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from pyfsense_client.tracing import Tracer, make_tracer
+from pyfsense_client.v2 import ClientConfig, PfSenseV2Client
+
+BODY = b'{"code": 200, "status": "ok", "message": "", "data": {"applied": true}}'
+
+
+class CannedAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = BODY
+        response.headers["Content-Type"] = "application/json"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(tracing: bool) -> PfSenseV2Client:
+    client = PfSenseV2Client(ClientConfig(host="bench.invalid", api_key="key", tracing=tracing, coalesce_requests=False))
+    client._session.mount("https://", CannedAdapter())
+    return client
+
+
+def sdk_tracer() -> Tracer | None:
+    try:
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+    except ImportError:
+        return None
+
+    class DiscardExporter(SpanExporter):
+        def export(self, spans):
+            return SpanExportResult.SUCCESS
+
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(DiscardExporter()))
+    return Tracer(provider)
+
+
+def per_call(call, calls: int, repeat: int) -> float:
+    return min(timeit.repeat(call, number=calls, repeat=repeat)) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    endpoint = "/api/v2/firewall/apply"
+    disabled = make_client(False)
+    variants = [
+        ("core", lambda: disabled._authorized("GET", endpoint)),
+        ("disabled", lambda: disabled._request("GET", endpoint)),
+    ]
+    if make_tracer(True) is not None:
+        noop = make_client(True)
+        variants.append(("no-op API", lambda: noop._request("GET", endpoint)))
+        tracer = sdk_tracer()
+        if tracer is not None:
+            sdk = make_client(True)
+            sdk.tracer = tracer
+            variants.append(("SDK", lambda: sdk._request("GET", endpoint)))
+    else:
+        print("opentelemetry-api is not installed; only the disabled path is measured.")
+
+    baseline = None
+    print(f"{'tracing':<12}{'per call (us)':>16}{'vs core':>14}")
+    for name, call in variants:
+        seconds = per_call(call, args.calls, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<12}{seconds * 1e6:>16.1f}{(seconds - baseline) * 1e6:>+13.1f}us")
+
+
+if __name__ == "__main__":
+    main()
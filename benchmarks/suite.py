@@ -0,0 +1,357 @@
+"""
+Benchmark suite for the V2 client, with a regression check between two git revisions.
+
+overhead              per-call cost of get_firewall_apply_status() over an in-process adapter (no network)
+loopback              latency of one get_firewall_apply_status() against FakePfSense over loopback
+rps/sync/N            requests per second from N threads sharing one PfSenseV2Client
+rps/async/N           requests per second from N concurrent AsyncPfSenseV2Client requests
+parse/MODEL/N         records per second decoded and validated by get_dhcp_leases()/get_firewall_aliases()
+memory/MODEL/N        peak Python heap allocated by the same call, measured with tracemalloc
+
+Parse and memory benchmarks replay payloads recorded from FakePfSense (cached in --payload-dir), so every revision
+parses the same bytes. In compare mode the fake server runs in this process and each revision's client runs in a
+child process, from a temporary `git worktree` of that revision; the server stays the same for both runs.
+
+Usage:
+    python benchmarks/suite.py run [--quick] [--json results.json]
+    python benchmarks/suite.py compare BASE [HEAD] [--threshold 0.10]
+
+HEAD defaults to the working tree. `compare` exits with status 1 if any benchmark got worse by more than
+`--threshold`, or if a benchmark that base produced is missing from head because it failed there; timings are noisy
+on shared machines, so re-run before trusting a small regression.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import requests
+from requests.adapters import BaseAdapter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_KEY = "bench-key"
+SIZES = [1_000, 10_000, 100_000]
+QUICK_SIZES = [1_000, 10_000]
+CONCURRENCY = [1, 4, 16]
+APPLY_BODY = b'{"code": 200, "status": "ok", "message": "", "data": {"applied": true}}'
+PAYLOADS = {
+    "DHCPLease": "/api/v2/status/dhcp_server/leases",
+    "FirewallAlias": "/api/v2/firewall/aliases",
+}
+
+
+class CannedAdapter(BaseAdapter):
+    def __init__(self, body: bytes):
+        super().__init__()
+        self.body = body
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.headers["Content-Type"] = "application/json"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def client_config(**settings: Any):
+    """A V2 ClientConfig, dropping settings the revision under test does not have."""
+    from pyfsense_client.v2 import ClientConfig
+
+    known = {field.name for field in dataclasses.fields(ClientConfig)}
+    return ClientConfig(**{key: value for key, value in settings.items() if key in known})
+
+
+def canned_client(body: bytes):
+    from pyfsense_client.v2 import PfSenseV2Client
+
+    client = PfSenseV2Client(client_config(host="https://bench.invalid", api_key=API_KEY, coalesce_requests=False))
+    client._session.mount("https://", CannedAdapter(body))
+    return client
+
+
+#
+# Payloads
+#
+
+
+def record_payloads(directory: str, sizes: list[int]) -> dict[str, str]:
+    """Record list responses of each size from FakePfSense into `directory`, unless already there."""
+    paths = {f"{model}/{size}": os.path.join(directory, f"{model}-{size}.json") for model in PAYLOADS for size in sizes}
+    missing = [key for key, path in paths.items() if not os.path.exists(path)]
+    if missing:
+        from pyfsense_client.testing import FakePfSense
+
+        os.makedirs(directory, exist_ok=True)
+        with FakePfSense(aliases=max(sizes), leases=max(sizes), api_key=API_KEY, tls=False) as fake:
+            for key in missing:
+                model, size = key.split("/")
+                response = requests.get(
+                    f"{fake.url}{PAYLOADS[model]}", params={"limit": size}, headers={"X-API-Key": API_KEY}
+                )
+                response.raise_for_status()
+                with open(paths[key], "wb") as f:
+                    f.write(response.content)
+    return paths
+
+
+#
+# Benchmarks
+#
+
+
+def best_of(call: Callable[[], Any], number: int, repeat: int) -> float:
+    """Seconds per call, taking the fastest of `repeat` runs of `number` calls."""
+    return min(timeit.repeat(call, number=number, repeat=repeat)) / number
+
+
+def bench_overhead(results: dict, quick: bool) -> None:
+    client = canned_client(APPLY_BODY)
+    seconds = best_of(client.get_firewall_apply_status, 500 if quick else 3_000, 5)
+    results["overhead"] = {"value": seconds * 1e6, "unit": "us/call", "higher_is_better": False}
+
+
+def bench_loopback(results: dict, url: str, quick: bool) -> None:
+    from pyfsense_client.v2 import PfSenseV2Client
+
+    client = PfSenseV2Client(client_config(host=url, api_key=API_KEY, coalesce_requests=False))
+    seconds = best_of(client.get_firewall_apply_status, 200 if quick else 1_000, 5)
+    results["loopback"] = {"value": seconds * 1e6, "unit": "us/call", "higher_is_better": False}
+
+
+def bench_rps_sync(results: dict, url: str, concurrency: int, calls: int) -> None:
+    from pyfsense_client.v2 import PfSenseV2Client
+
+    client = PfSenseV2Client(
+        client_config(host=url, api_key=API_KEY, coalesce_requests=False, pool_maxsize=concurrency)
+    )
+    client.get_firewall_apply_status()
+    per_thread = calls // concurrency
+
+    def worker():
+        for _ in range(per_thread):
+            client.get_firewall_apply_status()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    results[f"rps/sync/{concurrency}"] = {
+        "value": per_thread * concurrency / elapsed,
+        "unit": "req/s",
+        "higher_is_better": True,
+    }
+
+
+def bench_rps_async(results: dict, url: str, concurrency: int, calls: int) -> None:
+    try:
+        from pyfsense_client.v2 import AsyncPfSenseV2Client
+    except ImportError:
+        return
+    per_task = calls // concurrency
+
+    async def run() -> float:
+        config = client_config(host=url, api_key=API_KEY, coalesce_requests=False, pool_maxsize=concurrency)
+        async with AsyncPfSenseV2Client(config) as client:
+            await client.get_firewall_apply_status()
+
+            async def task():
+                for _ in range(per_task):
+                    await client.get_firewall_apply_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(task() for _ in range(concurrency)))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    results[f"rps/async/{concurrency}"] = {
+        "value": per_task * concurrency / elapsed,
+        "unit": "req/s",
+        "higher_is_better": True,
+    }
+
+
+def bench_parse(results: dict, model: str, size: int, path: str) -> None:
+    with open(path, "rb") as f:
+        client = canned_client(f.read())
+    fetch = client.get_dhcp_leases if model == "DHCPLease" else client.get_firewall_aliases
+    assert len(fetch()) == size
+
+    seconds = best_of(fetch, 1, 3 if size >= 100_000 else 5)
+    results[f"parse/{model}/{size}"] = {"value": size / seconds, "unit": "records/s", "higher_is_better": True}
+
+    tracemalloc.start()
+    try:
+        fetch()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    results[f"memory/{model}/{size}"] = {"value": peak / 2**20, "unit": "MiB", "higher_is_better": False}
+
+
+def run_suite(url: str, payloads: dict[str, str], quick: bool) -> dict[str, Any]:
+    import pyfsense_client
+
+    results: dict[str, dict[str, Any]] = {}
+    calls = 400 if quick else 2_000
+    steps: list[tuple[str, Callable[[], None]]] = [
+        ("overhead", lambda: bench_overhead(results, quick)),
+        ("loopback", lambda: bench_loopback(results, url, quick)),
+    ]
+    for n in CONCURRENCY:
+        steps.append((f"rps/sync/{n}", lambda n=n: bench_rps_sync(results, url, n, calls)))
+        steps.append((f"rps/async/{n}", lambda n=n: bench_rps_async(results, url, n, calls)))
+    for key, path in payloads.items():
+        model, size = key.split("/")
+        steps.append((f"parse/{key}", lambda m=model, s=int(size), p=path: bench_parse(results, m, s, p)))
+
+    for name, step in steps:
+        print(f"  {name}", file=sys.stderr, flush=True)
+        try:
+            step()
+        except Exception as exc:  # a revision may lack an endpoint or fail outright; keep measuring the rest
+            print(f"  {name} failed: {exc!r}", file=sys.stderr)
+    return {
+        "source": os.path.dirname(pyfsense_client.__file__),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+#
+# Reporting
+#
+
+
+def print_results(report: dict[str, Any]) -> None:
+    print(f"{'benchmark':<32}{'value':>14}  unit")
+    for name, result in report["results"].items():
+        print(f"{name:<32}{result['value']:>14.1f}  {result['unit']}")
+
+
+def regressions(base: dict[str, Any], head: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Print a side-by-side table and return the names of benchmarks that regressed beyond `threshold`, or that base
+    produced and head did not.
+    """
+    flagged = []
+    print(f"{'benchmark':<32}{'base':>14}{'head':>14}{'change':>10}")
+    for name in sorted(set(base["results"]) | set(head["results"])):
+        old, new = base["results"].get(name), head["results"].get(name)
+        if old is None or new is None:
+            # A benchmark that fails in head leaves no result; that is a regression, not a new benchmark
+            mark = "  REGRESSION (missing in head)" if new is None else ""
+            if mark:
+                flagged.append(name)
+            print(f"{name:<32}{_fmt(old):>14}{_fmt(new):>14}{'':>10}  ({(old or new)['unit']}){mark}")
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if new["higher_is_better"] else change
+        mark = "  REGRESSION" if worse > threshold else ""
+        if mark:
+            flagged.append(name)
+        print(f"{name:<32}{old['value']:>14.1f}{new['value']:>14.1f}{change:>+10.1%}  ({new['unit']}){mark}")
+    return flagged
+
+
+def _fmt(result: dict[str, Any] | None) -> str:
+    return "n/a" if result is None else f"{result['value']:.1f}"
+
+
+#
+# Revisions
+#
+
+
+def run_revision(revision: str | None, url: str, payload_dir: str, quick: bool, workdir: str) -> dict[str, Any]:
+    """Run the suite in a child process against the client source of `revision` (None: the working tree)."""
+    label = revision or "working-tree"
+    source = os.path.join(ROOT, "src")
+    worktree = None
+    if revision is not None:
+        worktree = os.path.join(workdir, f"rev-{abs(hash(revision))}")
+        subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, revision], check=True)
+        source = os.path.join(worktree, "src")
+    output = os.path.join(workdir, f"{abs(hash(label))}.json")
+    command = [sys.executable, os.path.abspath(__file__), "run", "--server-url", url, "--payload-dir", payload_dir]
+    command += ["--json", output] + (["--quick"] if quick else [])
+    print(f"Running {label} from {source}", file=sys.stderr)
+    try:
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))}
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        if worktree is not None:
+            subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree], check=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the suite against the importable pyfsense_client")
+    run.add_argument("--json", help="also write the results to this file")
+    run.add_argument("--server-url", help="use this FakePfSense instead of starting one")
+    compare = commands.add_parser("compare", help="run the suite for two revisions and flag regressions")
+    compare.add_argument("base", help="git revision to compare against, e.g. main or HEAD~1")
+    compare.add_argument("head", nargs="?", help="git revision to test (default: the working tree)")
+    compare.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as a regression")
+    for sub in (run, compare):
+        sub.add_argument("--quick", action="store_true", help=f"fewer calls, payload sizes {QUICK_SIZES} only")
+        sub.add_argument(
+            "--payload-dir",
+            default=os.path.join(tempfile.gettempdir(), "pyfsense-bench-payloads"),
+            help="where recorded payloads are cached",
+        )
+    args = parser.parse_args()
+    sizes = QUICK_SIZES if args.quick else SIZES
+
+    if args.command == "run":
+        payloads = record_payloads(args.payload_dir, sizes)
+        if args.server_url:
+            report = run_suite(args.server_url, payloads, args.quick)
+        else:
+            from pyfsense_client.testing import FakePfSense
+
+            with FakePfSense(api_key=API_KEY, tls=False) as fake:
+                report = run_suite(fake.url, payloads, args.quick)
+        print_results(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    from pyfsense_client.testing import FakePfSense
+
+    record_payloads(args.payload_dir, sizes)
+    with tempfile.TemporaryDirectory() as workdir, FakePfSense(api_key=API_KEY, tls=False) as fake:
+        base = run_revision(args.base, fake.url, args.payload_dir, args.quick, workdir)
+        head = run_revision(args.head, fake.url, args.payload_dir, args.quick, workdir)
+    flagged = regressions(base, head, args.threshold)
+    if flagged:
+        print(f"\n{len(flagged)} regression(s) beyond {args.threshold:.0%} or missing in head: {', '.join(flagged)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+`requests`/urllib3 classes that report connection phases to the `PhaseClock` tracked on the calling thread.
+See `pyfsense_client.timing`.
+"""
+
+from typing import Any
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .timing import _clock
+
+
+class _TimedConnectionMixin:
+    def connect(self) -> None:
+        clock = _clock()
+        if clock is None:
+            return super().connect()  # type: ignore[misc]
+        clock.connect_started()
+        try:
+            super().connect()  # type: ignore[misc]
+        finally:
+            clock.connect_finished()
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        clock = _clock()
+        if clock is not None:
+            clock.sending()
+        super().request(*args, **kwargs)  # type: ignore[misc]
+        if clock is not None:
+            clock.sent()
+
+    def getresponse(self) -> Any:
+        response = super().getresponse()  # type: ignore[misc]
+        clock = _clock()
+        if clock is not None:
+            clock.headers_received()
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` whose connections report their phases to the `PhaseClock` tracked on the calling thread."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
@@ -0,0 +1,559 @@
+"""
+pyfsense-agent: a local daemon that keeps warm, authenticated V2 clients and serves them over a Unix socket.
+
+A short script that builds a `PfSenseV2Client` pays for importing the client, a TLS handshake and, with
+username/password auth, a JWT login before its first real request. `AgentClient` forwards calls to a long-running
+agent instead. The agent keeps one `PfSenseV2Client` per distinct `ClientConfig`, with its connection pool, JWT and
+cache, alive between scripts. Importing `AgentClient` does not import requests or the client; pydantic models are
+imported only when a result has to be rebuilt.
+
+The protocol is newline-delimited JSON. Each request is {"config": {...}, "method": "...", "args": [...],
+"kwargs": {...}} and each reply is {"result": ..., "type": "..."} or {"error": {"type": "...", "message": "..."}}.
+Model arguments are sent as their JSON dump and validated by the agent against the method's annotations. Model
+results are dumped by alias and tagged with the model name, so the proxy returns the same types as the client.
+Iterators are drained by the agent and come back as iterators over a list. Errors are re-raised as the nearest
+`pyfsense_client.v2.exceptions` or built-in exception class, without the HTTP response.
+
+Requests carry the credentials from the caller's `ClientConfig`, so the socket is created with mode 0600 and both
+ends refuse a peer running as another user.
+
+Usage:
+    pyfsense-agent [--socket PATH] [--client-idle SECONDS] [--log-level LEVEL]
+"""
+
+import argparse
+import builtins
+import dataclasses
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import typing
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from .codec import get_codec
+from .v2.types import ClientConfig
+
+if TYPE_CHECKING:
+    from pydantic import TypeAdapter
+
+    from .v2.client import PfSenseV2Client
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV = "PYFSENSE_AGENT_SOCKET"
+
+# Client methods that cannot work across a process boundary, or would close the client other callers share
+_NOT_FORWARDED = frozenset({"batch", "close", "span"})
+
+
+class AgentError(Exception):
+    """Raised when the agent cannot be reached or started, or fails a call with an error that has no local class."""
+
+
+def default_socket_path() -> str:
+    """
+    The socket path used when none is given: $PYFSENSE_AGENT_SOCKET, else pyfsense-agent.sock in
+    $XDG_RUNTIME_DIR, else a per-user name in the temp directory.
+    """
+    if path := os.environ.get(SOCKET_ENV):
+        return path
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(runtime_dir, "pyfsense-agent.sock")
+    return os.path.join(tempfile.gettempdir(), f"pyfsense-agent-{os.getuid()}.sock")
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """The uid of the process at the other end of a Unix socket, or None where the platform cannot tell."""
+    option = getattr(socket, "SO_PEERCRED", None)
+    if option is None:
+        return None
+    _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, option, struct.calcsize("3i")))
+    return uid
+
+
+def _config_key(config: dict[str, Any]) -> str:
+    return json.dumps(config, sort_keys=True, separators=(",", ":"))
+
+
+#
+# Agent side
+#
+
+
+@lru_cache(maxsize=None)
+def _method_adapters(method: str) -> tuple[inspect.Signature, dict[str, "TypeAdapter"]]:
+    """The signature of a client method and a validator for each annotated argument."""
+    from pydantic import TypeAdapter
+
+    from .v2.client import PfSenseV2Client
+
+    function = getattr(PfSenseV2Client, method)
+    hints = typing.get_type_hints(function)
+    hints.pop("return", None)
+    return inspect.signature(function), {name: TypeAdapter(hint) for name, hint in hints.items()}
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> "TypeAdapter":
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def _model_name(model: type) -> str:
+    """The name under which `pyfsense_client.v2.models` exports `model` or its nearest base class."""
+    from .v2 import models
+
+    for cls in model.__mro__:
+        if cls.__name__ in models.__all__:
+            return cls.__name__
+    raise TypeError(f"{model.__name__} is not a pyfsense_client.v2 model.")
+
+
+def _encode_result(result: Any) -> dict[str, Any]:
+    from pydantic import BaseModel
+
+    kind = None
+    if isinstance(result, Iterator):
+        result, kind = list(result), "iter"
+    elif isinstance(result, list):
+        kind = "list"
+    if kind and result and isinstance(result[0], BaseModel):
+        model = type(result[0])
+        dumped = _list_adapter(model).dump_python(result, mode="json", by_alias=True)
+        return {"result": dumped, "type": f"{kind}[{_model_name(model)}]"}
+    if isinstance(result, BaseModel):
+        return {"result": result.model_dump(mode="json", by_alias=True), "type": _model_name(type(result))}
+    if kind == "iter":
+        return {"result": result, "type": "iter"}
+    return {"result": result}
+
+
+def _encode_error(exc: BaseException) -> dict[str, str]:
+    """Describe `exc` by its nearest class the proxy can re-raise."""
+    from .v2 import exceptions
+
+    for cls in type(exc).__mro__:
+        if cls.__module__ in ("builtins", exceptions.__name__):
+            break
+    return {"type": cls.__name__, "message": str(exc)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self) -> None:
+        uid = _peer_uid(self.connection)
+        if uid is not None and uid != os.getuid():
+            logger.warning("Refusing agent connection from uid %d", uid)
+            return
+        for line in self.rfile:
+            self.wfile.write(self.server.agent.handle(line) + b"\n")
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    agent: "Agent"
+
+    def service_actions(self) -> None:
+        self.agent.evict_idle()
+
+
+class Agent:
+    """
+    The daemon: a threaded Unix socket server holding one warm `PfSenseV2Client` per `ClientConfig`.
+
+    Use `serve_forever()` to run in the foreground, as the `pyfsense-agent` command does, or `start()` and
+    `stop()` (or a `with` block) to run in a background thread.
+
+    Args:
+        socket_path (str | None): Where to listen. Defaults to `default_socket_path()`.
+        client_idle (float): Seconds an unused client is kept before its connections are closed, counted from
+            the end of its last call; a client with a call in progress is never closed. 0 keeps clients until the
+            agent stops.
+    """
+
+    def __init__(self, socket_path: str | None = None, client_idle: float = 900.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.client_idle = client_idle
+        self._codec = get_codec()
+        self._lock = threading.Lock()
+        self._clients: dict[str, "PfSenseV2Client"] = {}
+        self._last_used: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "Agent":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Listen and serve until interrupted."""
+        server = self._bind()
+        try:
+            server.serve_forever()
+        finally:
+            self._close()
+
+    def start(self) -> None:
+        """Listen and serve from a background thread."""
+        server = self._bind()
+        self._thread = threading.Thread(target=server.serve_forever, name="pyfsense-agent", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None and self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._close()
+
+    @property
+    def clients(self) -> list["PfSenseV2Client"]:
+        """The warm clients, one per distinct config."""
+        with self._lock:
+            return list(self._clients.values())
+
+    def handle(self, line: bytes) -> bytes:
+        """Answer one request line."""
+        try:
+            message = self._codec.loads(line)
+            if message.get("op") == "status":
+                reply: dict[str, Any] = {"result": self.status()}
+            else:
+                with self._checked_out(message["config"]) as client:
+                    reply = self._call(client, message["method"], message.get("args", []), message.get("kwargs", {}))
+            return self._codec.dumps(reply)
+        except Exception as exc:
+            logger.debug("Agent call failed", exc_info=True)
+            return self._codec.dumps({"error": _encode_error(exc)})
+
+    def status(self) -> dict[str, Any]:
+        return {"pid": os.getpid(), "clients": [client.config.host for client in self.clients]}
+
+    def client_for(self, config: dict[str, Any]) -> "PfSenseV2Client":
+        """The warm client for `config`, created on first use."""
+        from .v2.client import PfSenseV2Client
+
+        key = _config_key(config)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = PfSenseV2Client(ClientConfig(**config))
+                logger.info("New client for %s", client.config.host)
+            self._last_used[key] = time.monotonic()
+        return client
+
+    @contextmanager
+    def _checked_out(self, config: dict[str, Any]) -> Iterator["PfSenseV2Client"]:
+        """The warm client for `config`, protected from eviction until the block ends."""
+        key = _config_key(config)
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            yield self.client_for(config)
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+                if not self._in_flight[key]:
+                    del self._in_flight[key]
+                self._last_used[key] = time.monotonic()
+
+    def evict_idle(self) -> None:
+        """Close the clients that have no call in progress and finished their last one `client_idle` seconds ago."""
+        if not self.client_idle:
+            return
+        cutoff = time.monotonic() - self.client_idle
+        with self._lock:
+            idle = [
+                key
+                for key, last_used in self._last_used.items()
+                if last_used < cutoff and key not in self._in_flight and key in self._clients
+            ]
+            evicted = [self._clients.pop(key) for key in idle]
+            for key in idle:
+                del self._last_used[key]
+        for client in evicted:
+            logger.info("Closing idle client for %s", client.config.host)
+            client.close()
+
+    def _call(self, client: "PfSenseV2Client", method: str, args: list[Any], kwargs: dict[str, Any]) -> dict:
+        if method.startswith("_") or method in _NOT_FORWARDED or not callable(getattr(type(client), method, None)):
+            raise AttributeError(f"'PfSenseV2Client' object has no method '{method}'")
+        signature, adapters = _method_adapters(method)
+        bound = signature.bind(client, *args, **kwargs)
+        for name, value in bound.arguments.items():
+            if name in adapters:
+                bound.arguments[name] = adapters[name].validate_python(value)
+        return _encode_result(getattr(client, method)(*bound.args[1:], **bound.kwargs))
+
+    def _bind(self) -> _Server:
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)  # left behind by an agent that did not shut down cleanly
+            else:
+                raise AgentError(f"An agent is already listening on {self.socket_path}.")
+            finally:
+                probe.close()
+        umask = os.umask(0o177)
+        try:
+            server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        server.agent = self
+        self._server = server
+        return server
+
+    def _close(self) -> None:
+        if self._server is None:
+            return
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._last_used.clear()
+        for client in clients:
+            client.close()
+
+
+#
+# Proxy side
+#
+
+
+def _encode_argument(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, list | tuple):
+        return [_encode_argument(item) for item in value]
+    return value
+
+
+def _model(name: str) -> type:
+    from .v2 import models
+
+    if name not in models.__all__:
+        raise AgentError(f"The agent returned an unknown model {name!r}.")
+    return getattr(models, name)
+
+
+def _decode_result(reply: dict[str, Any]) -> Any:
+    result, tag = reply.get("result"), reply.get("type")
+    if tag is None:
+        return result
+    if tag == "iter":
+        return iter(result)
+    kind, _, name = tag.partition("[")
+    if not name:
+        return _model(kind).model_validate(result)
+    items = _list_adapter(_model(name.rstrip("]"))).validate_python(result)
+    return iter(items) if kind == "iter" else items
+
+
+def _decode_error(error: dict[str, str]) -> Exception:
+    from .v2 import exceptions
+
+    cls = getattr(exceptions, error["type"], None) or getattr(builtins, error["type"], None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        return cls(error["message"])
+    return AgentError(f"{error['type']}: {error['message']}")
+
+
+def _connect(path: str, timeout: float | None) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    uid = _peer_uid(sock)
+    if uid is not None and uid != os.getuid():
+        sock.close()
+        raise AgentError(f"The agent on {path} runs as uid {uid}, not as this user.")
+    return sock
+
+
+def _start_agent(path: str, timeout: float | None, wait: float = 10.0) -> socket.socket:
+    """Start an agent on `path` in a new session and connect once it listens."""
+    subprocess.Popen(
+        [sys.executable, "-m", "pyfsense_client.agent", "--socket", path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return _connect(path, timeout)
+        except (FileNotFoundError, ConnectionRefusedError) as exc:
+            if time.monotonic() > deadline:
+                raise AgentError(f"Started an agent on {path}, but it did not begin listening within {wait}s.") from exc
+            time.sleep(0.02)
+
+
+class AgentClient:
+    """
+    Stand-in for `PfSenseV2Client` that forwards every call to a running agent.
+
+    It has the same public methods with the same arguments and return types, except `span()`. A script holding
+    one `AgentClient` makes all its calls over one socket connection; scripts with equal configs share the agent's
+    warm client.
+
+    Example:
+        client = AgentClient(ClientConfig(host="192.168.1.1", username="admin", password="..."), autostart=True)
+        client.apply_firewall_changes()
+
+    Args:
+        config (ClientConfig): Configuration of the client the agent should use.
+        socket_path (str | None): Agent socket. Defaults to `default_socket_path()`.
+        autostart (bool): Start an agent in the background if none is listening.
+        timeout (float | None): Seconds to wait for each reply. None waits as long as the call takes.
+    """
+
+    def __init__(
+        self,
+        config: ClientConfig,
+        socket_path: str | None = None,
+        autostart: bool = False,
+        timeout: float | None = None,
+    ):
+        self.config = config
+        self.socket_path = socket_path or default_socket_path()
+        self.autostart = autostart
+        self.timeout = timeout
+        self._config = dataclasses.asdict(config)
+        self._codec = get_codec()
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._reader: Any = None
+
+    def __enter__(self) -> "AgentClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name in _NOT_FORWARDED:
+            raise AttributeError(f"'AgentClient' object has no attribute '{name}'")
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._call(name, args, kwargs)
+
+        call.__name__ = call.__qualname__ = name
+        return call
+
+    def agent_status(self) -> dict[str, Any]:
+        """The agent's pid and the hosts it holds warm clients for."""
+        return self._roundtrip({"op": "status"})["result"]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None:
+                self._reader.close()
+                self._sock.close()
+                self._sock = self._reader = None
+
+    def _call(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        reply = self._roundtrip(
+            {
+                "config": self._config,
+                "method": method,
+                "args": [_encode_argument(value) for value in args],
+                "kwargs": {name: _encode_argument(value) for name, value in kwargs.items()},
+            }
+        )
+        if "error" in reply:
+            raise _decode_error(reply["error"])
+        return _decode_result(reply)
+
+    def _roundtrip(self, message: dict[str, Any]) -> dict[str, Any]:
+        data = self._codec.dumps(message) + b"\n"
+        with self._lock:
+            if self._sock is None:
+                self._open()
+            try:
+                self._sock.sendall(data)  # type: ignore[union-attr]
+                line = self._reader.readline()
+            except OSError as exc:
+                self._discard()
+                raise AgentError(f"Lost the connection to the agent on {self.socket_path}: {exc}") from exc
+            if not line:
+                self._discard()
+                raise AgentError(f"The agent on {self.socket_path} closed the connection.")
+        return self._codec.loads(line)
+
+    def _open(self) -> None:
+        try:
+            sock = _connect(self.socket_path, self.timeout)
+        except (FileNotFoundError, ConnectionRefusedError) as exc:
+            if not self.autostart:
+                raise AgentError(f"No agent is listening on {self.socket_path}. Start one with 'pyfsense-agent'.") from exc
+            sock = _start_agent(self.socket_path, self.timeout)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def _discard(self) -> None:
+        self._reader.close()
+        self._sock.close()  # type: ignore[union-attr]
+        self._sock = self._reader = None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pyfsense-agent", description="Keep warm pfSense API clients for short-lived scripts."
+    )
+    parser.add_argument("--socket", help=f"socket path (default: {default_socket_path()})")
+    parser.add_argument(
+        "--client-idle",
+        type=float,
+        default=900.0,
+        help="seconds an unused client is kept before its connections are closed; 0 keeps them (default: 900)",
+    )
+    parser.add_argument("--log-level", default="WARNING", help="logging level (default: WARNING)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def terminate(signum: int, frame: Any) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        Agent(args.socket, args.client_idle).serve_forever()
+    except AgentError as exc:
+        print(f"pyfsense-agent: {exc}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Set-based delta updates for large host and network aliases, shared by the v1 and v2 clients.
+
+A blocklist alias may hold hundreds of thousands of entries. Sending all of them to add a handful is wasteful,
+and so is making one call per entry. `compute_alias_delta` works out the exact set difference between an alias's
+current entries and the requested additions and removals, keeping `detail` aligned with `address`.
+`choose_strategy` then compares the cost of the two ways to send it:
+
+    "entries"   the v1 alias entry endpoints, one request per chunk of additions or removals
+    "replace"   one request that sends the alias's complete `address` and `detail` lists
+
+A request is costed as `REQUEST_COST` bytes plus its body. The fixed part covers the round trip and pfSense
+rewriting its configuration, which it does on every write however small. The V2 API has no entry endpoints, so V2
+clients always replace.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+STRATEGIES = ("auto", "entries", "replace")
+
+# Cost of one request on top of its body, in bytes
+REQUEST_COST = 64 * 1024
+
+# JSON quoting and separators around each string in a list
+_ITEM_OVERHEAD = 3
+
+
+@dataclass
+class AliasDelta:
+    """
+    The change to one alias.
+
+    Attributes:
+        added (dict[str, str]): Addresses to add that the alias does not hold yet, with their detail, in order.
+        removed (list[str]): Addresses to remove that the alias holds, in alias order.
+        address (list[str]): The alias's complete address list afterwards.
+        detail (list[str]): The alias's complete detail list afterwards, aligned with `address`.
+    """
+
+    added: dict[str, str] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+    address: list[str] = field(default_factory=list)
+    detail: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+@dataclass
+class AliasDeltaResult:
+    """
+    What `apply_alias_delta` did.
+
+    Attributes:
+        strategy (str): "entries", "replace", or "none" if the alias already matched.
+        added (int): Addresses added.
+        removed (int): Addresses removed.
+        writes (int): Write requests sent, including the apply the entries strategy makes.
+        entries (int): Number of entries in the alias afterwards.
+    """
+
+    strategy: str
+    added: int
+    removed: int
+    writes: int
+    entries: int
+
+
+def compute_alias_delta(
+    address: Sequence[str],
+    detail: Sequence[str],
+    add: Iterable[str] | Mapping[str, str] = (),
+    remove: Iterable[str] = (),
+) -> AliasDelta:
+    """
+    Apply `remove` and `add` to an alias's entries.
+
+    Args:
+        address (Sequence[str]): The alias's current addresses.
+        detail (Sequence[str]): The alias's current details; missing trailing details count as empty.
+        add (Iterable[str] | Mapping[str, str]): Addresses to add, or a mapping of address -> detail. Addresses
+            the alias already holds are skipped, and keep their detail.
+        remove (Iterable[str]): Addresses to remove. Addresses the alias does not hold are skipped.
+
+    Raises:
+        ValueError: If an address is both added and removed.
+    """
+    wanted = dict(add) if isinstance(add, Mapping) else dict.fromkeys(add, "")
+    removing = set(remove)
+    conflict = removing.intersection(wanted)
+    if conflict:
+        raise ValueError(f"Addresses both added and removed: {', '.join(sorted(conflict)[:5])}")
+
+    delta = AliasDelta()
+    present = set()
+    for index, entry in enumerate(address):
+        if entry in removing:
+            if entry not in present:
+                delta.removed.append(entry)
+                present.add(entry)
+            continue
+        present.add(entry)
+        delta.address.append(entry)
+        delta.detail.append(detail[index] if index < len(detail) else "")
+    delta.added = {entry: text for entry, text in wanted.items() if entry not in present}
+    delta.address.extend(delta.added)
+    delta.detail.extend(delta.added.values())
+    return delta
+
+
+def _list_bytes(items: Iterable[str]) -> int:
+    return sum(len(item) + _ITEM_OVERHEAD for item in items)
+
+
+def choose_strategy(delta: AliasDelta, chunk_size: int, extra_requests: int = 0) -> str:
+    """
+    The cheaper way to send `delta`: "entries" or "replace".
+
+    Args:
+        delta (AliasDelta): The change to send.
+        chunk_size (int): Maximum number of addresses per entry request.
+        extra_requests (int): Requests the entries strategy needs besides the entry requests, e.g. an apply.
+    """
+    requests = math.ceil(len(delta.added) / chunk_size) + math.ceil(len(delta.removed) / chunk_size)
+    entries_cost = (requests + extra_requests) * REQUEST_COST
+    entries_cost += _list_bytes(delta.added) + _list_bytes(delta.added.values()) + _list_bytes(delta.removed)
+    replace_cost = REQUEST_COST + _list_bytes(delta.address) + _list_bytes(delta.detail)
+    return "entries" if entries_cost < replace_cost else "replace"
+
+
+def chunks(items: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class AliasSnapshots:
+    """
+    Thread-safe cache of the last-seen contents of aliases, by name.
+
+    Args:
+        ttl (float): Seconds a snapshot is trusted after it was stored.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshots: dict[str, tuple[Any, float]] = {}
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            entry = self._snapshots.get(name)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def set(self, name: str, snapshot: Any) -> None:
+        with self._lock:
+            self._snapshots[name] = (snapshot, time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
@@ -0,0 +1,236 @@
+"""
+Deferred-apply batches for bulk writes, shared by the v1 and v2 clients.
+
+Every v1 alias write applies its change by default, so a script that adds 500 entries reloads the pf ruleset 500
+times. Inside `with client.batch() as batch:` writes made from the block, or queued on `batch`, have their `apply`
+flag turned off and each subsystem they touch is marked dirty. Calls queued on `batch` run concurrently over the
+client's pooled connections. When the block exits, the batch waits for every queued call, then calls the apply
+method of each dirty subsystem exactly once.
+
+Some calls cannot run concurrently. V2 alias ids are list positions and every delete renumbers the aliases after
+it, so a V2 batch holds `delete_firewall_alias` calls back until the concurrent calls have finished, then makes them
+one at a time from the highest id down, before the applies.
+
+Failures do not stop the rest of the batch. Each queued call's outcome is kept on its `BatchItem`, and `BatchError`
+is raised on exit, after the applies, if any of them failed. If the block itself raises, queued calls are still
+waited for but held-back calls are not made and nothing is applied; the written changes stay pending on the firewall
+until the next apply.
+"""
+
+import threading
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any
+
+# Path prefix of a write -> client method that applies the subsystem it changes
+V1_SUBSYSTEMS = {
+    "/api/v1/firewall/": "apply_firewall_changes",
+    "/api/v1/services/dnsmasq/": "apply_pending_dnsmasq_changes",
+    "/api/v1/services/unbound/": "apply_pending_unbound_changes",
+    "/api/v1/interface": "apply_interfaces",
+    "/api/v1/routing/": "apply_routing",
+}
+V2_SUBSYSTEMS = {
+    "/api/v2/firewall/": "apply_firewall_changes",
+}
+
+# Client method -> sort key of its (args, kwargs); these calls run one at a time, in key order, after the others
+V2_ORDERED: dict[str, Callable[[tuple, dict[str, Any]], Any]] = {
+    # Highest id first, so that every queued id still names the alias it named when it was queued
+    "delete_firewall_alias": lambda args, kwargs: -int(kwargs["alias_id"] if "alias_id" in kwargs else args[0]),
+}
+
+_local = threading.local()
+
+
+def active_batch(client: Any) -> "Batch | None":
+    """The batch `client` is running in on this thread, if any."""
+    batches = getattr(_local, "batches", None)
+    return batches.get(id(client)) if batches else None
+
+
+def defer_apply(client: Any, payload: Any) -> Any:
+    """`payload` with its `apply` flag turned off when `client` is batching on this thread."""
+    if isinstance(payload, dict) and payload.get("apply") and active_batch(client) is not None:
+        return {**payload, "apply": False}
+    return payload
+
+
+def note_write(client: Any, path: str) -> None:
+    """Record a successful write to `path`, marking its subsystem dirty if `client` is batching on this thread."""
+    batch = active_batch(client)
+    if batch is not None:
+        batch.mark_dirty(path)
+
+
+class BatchError(Exception):
+    """Raised when a batch exits with failed calls, after the dirty subsystems were applied."""
+
+    def __init__(self, failed: list["BatchItem"]):
+        super().__init__(f"{len(failed)} batched call(s) failed; first: {failed[0].method}: {failed[0].error}")
+        self.failed = failed
+
+
+class BatchItem:
+    """
+    One call queued on a batch.
+
+    Attributes:
+        method (str): Name of the client method.
+        args (tuple): Positional arguments it was called with.
+        kwargs (dict): Keyword arguments it was called with.
+    """
+
+    def __init__(self, method: str, args: tuple, kwargs: dict[str, Any], future: "Future[Any]"):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+
+    def __repr__(self) -> str:
+        state = "pending" if not self.future.done() else "failed" if self.error is not None else "ok"
+        return f"<BatchItem {self.method} {state}>"
+
+    @property
+    def ok(self) -> bool:
+        return self.future.done() and self.future.exception() is None
+
+    @property
+    def error(self) -> BaseException | None:
+        """The exception the call raised, or None. Waits for the call to finish."""
+        return self.future.exception()
+
+    def result(self) -> Any:
+        """The call's return value. Waits for the call to finish and raises its exception if it failed."""
+        return self.future.result()
+
+
+class Batch:
+    """
+    Deferred-apply batch for one client. Created by `client.batch()`; use it as a context manager.
+
+    Any client method can be called on the batch: it is queued and returns a `BatchItem` at once. Calling an apply
+    method on the batch only marks its subsystem dirty.
+
+    Args:
+        client: The v1 or v2 client.
+        subsystems (Mapping[str, str]): Write path prefix -> name of the client method that applies it.
+        parallelism (int): Maximum number of queued calls in flight. Keep it at or below `pool_maxsize`.
+        ordered (Mapping[str, Callable] | None): Client method -> sort key of its (args, kwargs). These calls are
+            held back and made one at a time, in key order, after every concurrent call has finished.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        subsystems: Mapping[str, str],
+        parallelism: int = 4,
+        ordered: Mapping[str, Callable[[tuple, dict[str, Any]], Any]] | None = None,
+    ):
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1.")
+        self.client = client
+        self.subsystems = subsystems
+        self.parallelism = parallelism
+        self.ordered = ordered or {}
+        self.items: list[BatchItem] = []
+        self._held: list[tuple[Any, BatchItem]] = []
+        self.dirty: set[str] = set()
+        self.applied: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "Batch":
+        if active_batch(self.client) is not None:
+            raise RuntimeError("This client is already batching on this thread.")
+        self._activate()
+        self._executor = ThreadPoolExecutor(
+            self.parallelism, thread_name_prefix="pyfsense-batch", initializer=self._activate
+        )
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        try:
+            self._executor.shutdown(wait=True)  # type: ignore[union-attr]
+            held = {id(item) for _, item in self._held}
+            wait([item.future for item in self.items if id(item) not in held])
+            self._run_held(run=exc_type is None)
+            if exc_type is None:
+                self._apply()
+        finally:
+            del _local.batches[id(self.client)]
+            self._executor = None
+        if exc_type is None and self.failed:
+            raise BatchError(self.failed)
+
+    def __getattr__(self, name: str) -> Callable[..., BatchItem]:
+        if name.startswith("_") or not callable(getattr(self.client, name, None)):
+            raise AttributeError(f"'Batch' object has no attribute '{name}'")
+
+        def queue(*args: Any, **kwargs: Any) -> BatchItem:
+            return self.submit(name, *args, **kwargs)
+
+        return queue
+
+    @property
+    def failed(self) -> list[BatchItem]:
+        """Queued calls that raised. Only complete once the batch has exited."""
+        return [item for item in self.items if item.future.done() and item.future.exception() is not None]
+
+    def submit(self, method: str, *args: Any, **kwargs: Any) -> BatchItem:
+        """Queue `client.<method>(*args, **kwargs)`."""
+        if self._executor is None:
+            raise RuntimeError("Batch calls must be made inside the 'with' block.")
+        if method in self.subsystems.values():
+            future: Future[Any] = Future()
+            future.set_result(None)
+            with self._lock:
+                self.dirty.add(method)
+        elif method in self.ordered:
+            # The key is computed now, so that bad arguments fail here rather than on exit
+            key = self.ordered[method](args, kwargs)
+            future = Future()
+        else:
+            future = self._executor.submit(getattr(self.client, method), *args, **kwargs)
+        item = BatchItem(method, args, kwargs, future)
+        self.items.append(item)
+        if method in self.ordered:
+            self._held.append((key, item))
+        return item
+
+    def mark_dirty(self, path: str) -> None:
+        """Mark the subsystem a write to `path` belongs to as needing an apply."""
+        if path.rstrip("/").endswith("/apply"):
+            return
+        for prefix, apply in self.subsystems.items():
+            if path.startswith(prefix):
+                with self._lock:
+                    self.dirty.add(apply)
+                return
+
+    def _activate(self) -> None:
+        if not hasattr(_local, "batches"):
+            _local.batches = {}
+        _local.batches[id(self.client)] = self
+
+    def _run_held(self, run: bool) -> None:
+        """Make the held-back calls one at a time in key order, or fail them unsent if `run` is False."""
+        for _, item in sorted(self._held, key=lambda held: held[0]):
+            if not run:
+                item.future.set_exception(RuntimeError("Not sent: the batch block raised."))
+                continue
+            try:
+                item.future.set_result(getattr(self.client, item.method)(*item.args, **item.kwargs))
+            except Exception as exc:
+                item.future.set_exception(exc)
+
+    def _apply(self) -> None:
+        """Apply every dirty subsystem once, recording the response or the exception."""
+        for apply in sorted(self.dirty):
+            try:
+                self.applied[apply] = getattr(self.client, apply)()
+            except Exception as exc:
+                self.applied[apply] = exc
+                future: Future[Any] = Future()
+                future.set_exception(exc)
+                self.items.append(BatchItem(apply, (), {}, future))
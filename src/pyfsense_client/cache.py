@@ -0,0 +1,190 @@
+"""
+Read-through cache for GET responses, shared by the v1 and v2 clients.
+
+Entries are keyed on method, endpoint path and query parameters, expire after a per-endpoint TTL and
+are evicted least-recently-used once `maxsize` is reached. A write (POST/PATCH/PUT/DELETE) invalidates
+every cached entry for the same resource. Resources are compared segment by segment with trailing
+plurals ignored, so a write to `/api/v2/firewall/alias` also drops `/api/v2/firewall/aliases`, and a
+write to `/api/v1/firewall/alias/entry` drops `/api/v1/firewall/alias`.
+
+A GET that was already in flight when a write invalidated the cache may carry the old contents, so
+callers read `generation()` before fetching and pass it to `set()`, which drops the value if any
+invalidation happened in between.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+CacheKey = tuple[str, str, tuple]
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _freeze(value: Any) -> Any:
+    """Turn query parameter values into a hashable, order-independent form."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def request_key(method: str, path: str, params: dict[str, Any] | None = None) -> CacheKey:
+    """Hashable identity of a request: method, normalized endpoint path and query parameters."""
+    return method.upper(), f"/{path.lstrip('/')}", _freeze(params or {})
+
+
+def _stems(segment: str) -> frozenset[str]:
+    """Possible singular forms of a path segment ("aliases" -> {"aliases", "aliase", "alias"})."""
+    stems = {segment}
+    if segment.endswith("s"):
+        stems.add(segment[:-1])
+    if segment.endswith("es"):
+        stems.add(segment[:-2])
+    return frozenset(stems)
+
+
+def _resource(path: str) -> tuple[frozenset[str], ...]:
+    return tuple(_stems(segment) for segment in path.strip("/").split("/") if segment)
+
+
+def _related(a: tuple[frozenset[str], ...], b: tuple[frozenset[str], ...]) -> bool:
+    """True if one resource path is the other or a sub-resource of it."""
+    return all(x & y for x, y in zip(a, b))
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-endpoint TTLs.
+
+    Args:
+        ttl (float): Default time-to-live in seconds. 0 disables caching for endpoints without an entry in `ttls`.
+        maxsize (int): Maximum number of cached responses.
+        ttls (dict[str, float] | None): TTL overrides keyed on endpoint path prefix; the longest matching prefix
+            wins, e.g. `{"/api/v2/status": 2, "/api/v2/firewall/aliases": 30}`. A TTL of 0 disables caching.
+        clock (Callable[[], float]): Monotonic time source, for tests.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 0.0,
+        maxsize: int = 256,
+        ttls: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Longest prefix first so the first match is the most specific one
+        self._ttls = sorted(((f"/{k.lstrip('/')}", v) for k, v in (ttls or {}).items()), key=lambda kv: -len(kv[0]))
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    make_key = staticmethod(request_key)
+
+    def ttl_for(self, path: str) -> float:
+        """Return the TTL that applies to an endpoint path."""
+        path = f"/{path.lstrip('/')}"
+        for prefix, ttl in self._ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self.ttl
+
+    def get(self, key: CacheKey) -> Any | None:
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def generation(self) -> int:
+        """Return a counter that changes whenever entries are invalidated or cleared."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: CacheKey, value: Any, generation: int | None = None) -> None:
+        """
+        Store a value, unless caching is disabled for its endpoint.
+
+        If `generation` is given and the cache was invalidated since it was read, the value is dropped:
+        it was fetched before a write and may be stale.
+        """
+        ttl = self.ttl_for(key[1])
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, path: str) -> int:
+        """Drop every entry for the resource at `path` (and its sub-resources). Returns the number dropped."""
+        resource = _resource(path)
+        with self._lock:
+            stale = [key for key in self._entries if _related(resource, _resource(key[1]))]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+            self._generation += 1
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, self._invalidations, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def make_cache(ttl: float, maxsize: int, ttls: dict[str, float] | None) -> ResponseCache | None:
+    """Build the cache described by client config fields, or None if caching is off."""
+    if ttl <= 0 and not ttls:
+        return None
+    return ResponseCache(ttl=ttl, maxsize=maxsize, ttls=ttls)
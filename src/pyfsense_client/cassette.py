@@ -0,0 +1,244 @@
+"""
+Record/replay transports: capture real traffic to an on-disk cassette and serve it back without a firewall.
+
+A cassette is a gzip file of JSON lines, one per request/response pair, holding the method, the path and query,
+a digest of the request body, the response status, headers and body, and how long the response took. Each
+interaction is appended as its own gzip member as soon as it completes, so a recording interrupted half-way is
+still readable. Request headers are never stored, so API keys and tokens stay out of the cassette; response
+bodies are stored as-is, including the token returned by the JWT endpoint. The body of a login request carries
+the username and password, and an unkeyed digest of it could be brute-forced offline, so login requests are
+recorded with an empty digest.
+
+On replay, requests are matched on method, path and query, and body digest; the host is ignored, so a cassette
+recorded against production replays against any configured host, with any credentials. Repeated requests get the
+recorded responses in order, and the last one again once they run out. `latency` scales the recorded response
+times: 1.0 replays the original timing, 0 replays as fast as possible.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+
+    _AsyncTransport: type = httpx.AsyncBaseTransport
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+    _AsyncTransport = object
+
+MODES = ("record", "replay")
+
+# Describe the bytes on the wire, not the decoded body the cassette stores
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Endpoints whose request body holds credentials
+_LOGIN_PATHS = {"/api/v2/auth/jwt", "/api/v1/access_token"}
+
+
+class CassetteMiss(LookupError):
+    """Raised on replay when the cassette holds no response for a request."""
+
+
+@dataclass
+class Interaction:
+    """One recorded request/response pair."""
+
+    method: str
+    path: str
+    body_digest: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    elapsed: float
+
+    def to_line(self) -> bytes:
+        data = asdict(self)
+        try:
+            data["body"] = self.body.decode("utf-8")
+        except UnicodeDecodeError:
+            data["body_b64"] = base64.b64encode(data.pop("body")).decode("ascii")
+        return json.dumps(data, separators=(",", ":")).encode() + b"\n"
+
+    @classmethod
+    def from_line(cls, line: bytes) -> "Interaction":
+        data = json.loads(line)
+        body = base64.b64decode(data.pop("body_b64")) if "body_b64" in data else data.pop("body").encode("utf-8")
+        return cls(body=body, **data)
+
+
+def body_digest(body: bytes | str | None) -> str:
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def request_digest(path: str, body: bytes | str | None) -> str:
+    """The body digest stored for a request to `path`; empty for login requests."""
+    if path.partition("?")[0] in _LOGIN_PATHS:
+        return ""
+    return body_digest(body)
+
+
+def _response_headers(headers: Any) -> dict[str, str]:
+    return {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+
+
+class Cassette:
+    """
+    The interactions stored in one cassette file.
+
+    Args:
+        path (str): Cassette file. Recording appends to it; replaying reads all of it.
+        mode (str): "record" or "replay".
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {', '.join(MODES)}, not {mode!r}.")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._queues: dict[tuple[str, str, str], deque[Interaction]] = {}
+        self._last: dict[tuple[str, str, str], Interaction] = {}
+        if mode == "replay":
+            for interaction in self.load(path):
+                key = (interaction.method, interaction.path, interaction.body_digest)
+                self._queues.setdefault(key, deque()).append(interaction)
+
+    @staticmethod
+    def load(path: str) -> list[Interaction]:
+        """Read every interaction from a cassette file."""
+        with gzip.open(path, "rb") as f:
+            return [Interaction.from_line(line) for line in f if line.strip()]
+
+    def record(self, interaction: Interaction) -> None:
+        data = gzip.compress(interaction.to_line())
+        with self._lock, open(self.path, "ab") as f:
+            f.write(data)
+
+    def play(self, method: str, path: str, digest: str) -> Interaction:
+        """The next recorded response for this request."""
+        key = (method, path, digest)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise CassetteMiss(f"No recorded response for {method} {path} in {self.path}.")
+            return self._last[key]
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    `requests` transport adapter that records through `upstream`, or replays from the cassette.
+
+    Args:
+        cassette (Cassette): Where interactions are recorded to or replayed from.
+        upstream (BaseAdapter | None): Adapter that performs real requests; required for recording.
+        latency (float): Multiplier for recorded response times on replay.
+    """
+
+    def __init__(self, cassette: Cassette, upstream: BaseAdapter | None = None, latency: float = 1.0):
+        super().__init__()
+        if cassette.mode == "record" and upstream is None:
+            raise ValueError("Recording needs an upstream adapter.")
+        self.cassette = cassette
+        self.upstream = upstream
+        self.latency = latency
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        digest = request_digest(request.path_url, request.body)  # type: ignore[arg-type]
+        if self.cassette.mode == "record":
+            started = time.perf_counter()
+            response = self.upstream.send(request, **kwargs)  # type: ignore[union-attr]
+            body = response.content
+            self.cassette.record(
+                Interaction(
+                    request.method or "GET",
+                    request.path_url,
+                    digest,
+                    response.status_code,
+                    _response_headers(response.headers),
+                    body,
+                    time.perf_counter() - started,
+                )
+            )
+            return response
+
+        interaction = self.cassette.play(request.method or "GET", request.path_url, digest)
+        if interaction.elapsed and self.latency:
+            time.sleep(interaction.elapsed * self.latency)
+        response = requests.Response()
+        response.status_code = interaction.status
+        response.headers = CaseInsensitiveDict(interaction.headers)
+        response._content = interaction.body
+        response._content_consumed = True
+        response.url = request.url or ""
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        if self.upstream is not None:
+            self.upstream.close()
+
+
+class AsyncCassetteTransport(_AsyncTransport):  # type: ignore[misc, valid-type]
+    """
+    httpx transport that records through `upstream`, or replays from the cassette.
+
+    Args:
+        cassette (Cassette): Where interactions are recorded to or replayed from.
+        upstream (httpx.AsyncBaseTransport | None): Transport that performs real requests; required for recording.
+        latency (float): Multiplier for recorded response times on replay.
+    """
+
+    def __init__(self, cassette: Cassette, upstream: Any = None, latency: float = 1.0):
+        if httpx is None:
+            raise ImportError("AsyncCassetteTransport requires httpx. Install it with 'pip install pyfsense-client[async]'.")
+        if cassette.mode == "record" and upstream is None:
+            raise ValueError("Recording needs an upstream transport.")
+        self.cassette = cassette
+        self.upstream = upstream
+        self.latency = latency
+
+    async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+        path = request.url.raw_path.decode("ascii")
+        digest = request_digest(path, await request.aread())
+        if self.cassette.mode == "record":
+            started = time.perf_counter()
+            response = await self.upstream.handle_async_request(request)
+            try:
+                body = await response.aread()
+            finally:
+                await response.aclose()
+            headers = _response_headers(response.headers)
+            self.cassette.record(
+                Interaction(
+                    request.method, path, digest, response.status_code, headers, body, time.perf_counter() - started
+                )
+            )
+            return httpx.Response(response.status_code, headers=headers, content=body, extensions=response.extensions)
+
+        interaction = self.cassette.play(request.method, path, digest)
+        if interaction.elapsed and self.latency:
+            await asyncio.sleep(interaction.elapsed * self.latency)
+        return httpx.Response(interaction.status, headers=interaction.headers, content=interaction.body)
+
+    async def aclose(self) -> None:
+        if self.upstream is not None:
+            await self.upstream.aclose()
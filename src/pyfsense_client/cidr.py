@@ -0,0 +1,254 @@
+"""
+Normalize, deduplicate and aggregate alias address lists.
+
+Generated network aliases often hold overlapping and adjacent prefixes: 10.0.0.0/24 and 10.0.1.0/24 are one /23,
+and 10.0.0.7 is already covered by both. Every entry costs payload bytes on the way to the firewall and a slot in
+the pf table. `aggregate_addresses` collapses IPv4 and IPv6 entries into the minimal set of prefixes covering the
+same addresses, and keeps `detail` aligned by merging the details of the entries each prefix replaces.
+
+Addresses are parsed to integers with `socket.inet_pton`, sorted once, merged into ranges in a single pass and
+split back into aligned prefixes, so a million entries take a few seconds rather than the minutes
+`ipaddress.collapse_addresses` needs. Host bits set in a network entry are cleared, as pf does. Entries that are
+not IP addresses or networks, such as hostnames and ranges, are kept as they are, once each.
+"""
+
+import socket
+from collections.abc import Callable, Iterable, Sequence
+from typing import TypeVar
+
+# Alias types whose entries are addresses; only network aliases may hold prefixes
+AGGREGATABLE_TYPES = ("host", "network")
+
+MERGE_DETAIL = ("first", "join", "drop")
+
+_Alias = TypeVar("_Alias")
+
+
+def _merge_detail(mode: str | Callable[[list[str]], str]) -> Callable[[list[str]], str]:
+    if callable(mode):
+        return mode
+    if mode == "first":
+        return lambda details: details[0]
+    if mode == "join":
+        return lambda details: "; ".join(dict.fromkeys(text for text in details if text))
+    if mode == "drop":
+        return lambda details: details[0] if len(details) == 1 else ""
+    raise ValueError(f"merge_detail must be one of {', '.join(MERGE_DETAIL)}, or a callable.")
+
+
+def _parse(address: Sequence[str], index_bits: int) -> tuple[list[int], list[int], list[int]]:
+    """
+    Split `address` into packed IPv4 keys, packed IPv6 keys and the indexes of other entries.
+
+    A key packs the network address, the prefix length and the entry's index so that sorting the keys orders the
+    networks by address, larger networks first, then by position in `address`.
+    """
+    v4: list[int] = []
+    v6: list[int] = []
+    other: list[int] = []
+    pton = socket.inet_pton
+    from_bytes = int.from_bytes
+    for index, entry in enumerate(address):
+        host, slash, length = entry.strip().partition("/")
+        try:
+            if ":" in host:
+                value, bits, keys = from_bytes(pton(socket.AF_INET6, host), "big"), 128, v6
+            else:
+                value, bits, keys = from_bytes(pton(socket.AF_INET, host), "big"), 32, v4
+        except OSError:
+            other.append(index)
+            continue
+        if slash:
+            if not length.isdigit() or int(length) > bits:
+                other.append(index)
+                continue
+            prefix = int(length)
+        else:
+            prefix = bits
+        host_bits = bits - prefix
+        keys.append((((value >> host_bits << host_bits) << 8 | prefix) << index_bits) | index)
+    return v4, v6, other
+
+
+def _blocks(start: int, end: int, bits: int) -> Iterable[tuple[int, int]]:
+    """The largest aligned prefixes covering the addresses [start, end), as (network, prefix length)."""
+    while start < end:
+        size = 1 << ((end - start).bit_length() - 1)
+        if start:
+            size = min(size, start & -start)
+        yield start, bits - size.bit_length() + 1
+        start += size
+
+
+def _format(bits: int) -> Callable[[int, int], str]:
+    """Formatter of (network, prefix length) pairs for one address family; hosts are written without a length."""
+    if bits == 32:
+        ntoa = socket.inet_ntoa
+
+        def fmt(network: int, prefix: int) -> str:
+            text = ntoa(network.to_bytes(4, "big"))
+            return text if prefix == 32 else f"{text}/{prefix}"
+
+    else:
+
+        def fmt(network: int, prefix: int) -> str:
+            text = socket.inet_ntop(socket.AF_INET6, network.to_bytes(16, "big"))
+            return text if prefix == 128 else f"{text}/{prefix}"
+
+    return fmt
+
+
+def _aggregate_family(keys: list[int], bits: int, index_bits: int) -> tuple[list[str], list[int], list[int]]:
+    """
+    Aggregate the packed keys of one address family.
+
+    Returns the new entries, the indexes of the original entries ordered so that each new entry replaces a
+    contiguous slice of them, and the end of each entry's slice.
+    """
+    keys.sort()
+    index_shift = index_bits + 8
+    fmt = _format(bits)
+    entries: list[str] = []
+    ends: list[int] = []
+    # The current run of overlapping or adjacent networks: its range and the position of its first key
+    run_start = run_end = -1
+    first = 0
+    for position, key in enumerate(keys):
+        start = key >> index_shift
+        if start <= run_end:
+            end = start + (1 << (bits - (key >> index_bits & 255)))
+            if end > run_end:
+                run_end = end
+            continue
+        if position:
+            _close_run(entries, ends, keys, run_start, run_end, first, position, bits, index_shift, fmt)
+        run_start, run_end, first = start, start + (1 << (bits - (key >> index_bits & 255))), position
+    if keys:
+        _close_run(entries, ends, keys, run_start, run_end, first, len(keys), bits, index_shift, fmt)
+    index_mask = (1 << index_bits) - 1
+    return entries, [key & index_mask for key in keys], ends
+
+
+def _close_run(
+    entries: list[str],
+    ends: list[int],
+    keys: list[int],
+    start: int,
+    end: int,
+    first: int,
+    last: int,
+    bits: int,
+    index_shift: int,
+    fmt: Callable[[int, int], str],
+) -> None:
+    """Append the prefixes covering the run of networks keys[first:last], which spans [start, end)."""
+    if last - first == 1:
+        entries.append(fmt(start, bits + 1 - (end - start).bit_length()))
+        ends.append(last)
+        return
+    position = first
+    for network, prefix in _blocks(start, end, bits):
+        # Keys are sorted by network, and each network lies inside exactly one block
+        block_end = network + (1 << (bits - prefix))
+        while position < last and keys[position] >> index_shift < block_end:
+            position += 1
+        entries.append(fmt(network, prefix))
+        ends.append(position)
+
+
+def _dedupe_family(keys: list[int], bits: int, index_bits: int) -> tuple[list[str], list[int], list[int]]:
+    """Like `_aggregate_family`, but only merges identical networks."""
+    keys.sort()
+    fmt = _format(bits)
+    entries: list[str] = []
+    ends: list[int] = []
+    previous = None
+    for position, key in enumerate(keys):
+        network = key >> index_bits
+        if network != previous:
+            if position:
+                ends.append(position)
+            entries.append(fmt(network >> 8, network & 255))
+            previous = network
+    if keys:
+        ends.append(len(keys))
+    index_mask = (1 << index_bits) - 1
+    return entries, [key & index_mask for key in keys], ends
+
+
+def aggregate_addresses(
+    address: Sequence[str],
+    detail: Sequence[str] | None = None,
+    merge_detail: str | Callable[[list[str]], str] = "first",
+    collapse: bool = True,
+) -> tuple[list[str], list[str]]:
+    """
+    Collapse `address` into the minimal list of entries covering the same addresses.
+
+    IPv4 entries come first, then IPv6, each sorted by address, then every other entry in its original order.
+    Hosts are written without a prefix length.
+
+    Args:
+        address (Sequence[str]): Addresses, networks in CIDR notation, and any other alias entries.
+        detail (Sequence[str] | None): Details aligned with `address`; missing trailing details count as empty.
+        merge_detail (str | Callable[[list[str]], str]): How to build the detail of an entry that replaces
+            several: 'first' keeps the detail of the earliest of them, 'join' joins their distinct details with
+            "; ", 'drop' leaves it empty. A callable gets their details in original order and returns the new one.
+        collapse (bool): Merge overlapping and adjacent networks. If False, only exact duplicates are dropped,
+            which is what host aliases, which cannot hold networks, need.
+
+    Returns:
+        tuple[list[str], list[str]]: The new address list, and the new detail list aligned with it (empty if
+            `detail` was None).
+    """
+    merge = _merge_detail(merge_detail)
+    index_bits = max(len(address).bit_length(), 1)
+    v4, v6, other = _parse(address, index_bits)
+    family = _aggregate_family if collapse else _dedupe_family
+    entries: list[str] = []
+    order: list[int] = []
+    ends: list[int] = []
+    for keys, bits in ((v4, 32), (v6, 128)):
+        family_entries, family_order, family_ends = family(keys, bits, index_bits)
+        entries += family_entries
+        ends += [end + len(order) for end in family_ends]
+        order += family_order
+    seen: dict[str, list[int]] = {}
+    for index in other:
+        seen.setdefault(address[index].strip(), []).append(index)
+    for entry, indexes in seen.items():
+        entries.append(entry)
+        order += indexes
+        ends.append(len(order))
+
+    if detail is None:
+        return entries, []
+    details = list(detail[: len(address)]) + [""] * (len(address) - len(detail))
+    merged = []
+    first = 0
+    for end in ends:
+        if end - first == 1:
+            merged.append(details[order[first]])
+        else:
+            merged.append(merge([details[index] for index in sorted(order[first:end])]))
+        first = end
+    return entries, merged
+
+
+def aggregate_alias(alias: _Alias, merge_detail: str | Callable[[list[str]], str] = "first") -> _Alias:
+    """
+    A copy of a v1 or v2 alias model with its entries aggregated by `aggregate_addresses`.
+
+    Network aliases are collapsed; host aliases only lose duplicate entries. Other alias types are returned as is.
+    """
+    alias_type = str(getattr(alias, "type", ""))
+    if alias_type not in AGGREGATABLE_TYPES:
+        return alias
+    address, detail = aggregate_addresses(
+        alias.address,  # type: ignore[attr-defined]
+        alias.detail or [],  # type: ignore[attr-defined]
+        merge_detail,
+        collapse=alias_type == "network",
+    )
+    update = {"address": address, "detail": detail if any(detail) else []}
+    return alias.model_copy(update=update)  # type: ignore[attr-defined]
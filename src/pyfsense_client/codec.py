@@ -0,0 +1,116 @@
+"""
+Pluggable JSON codecs shared by the v1 and v2 clients.
+
+`get_codec("auto")` picks the fastest installed backend (orjson, then msgspec) and falls back to the
+standard library `json` module. Every codec encodes to compact UTF-8 bytes and raises a `ValueError`
+subclass when decoding fails, so callers can handle all backends the same way.
+"""
+
+import json
+from enum import Enum
+from typing import Any, Protocol
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment]
+
+
+class JSONCodec(Protocol):
+    """Interface every JSON codec implements."""
+
+    name: str
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+    def loads(self, data: bytes | str) -> Any: ...
+
+
+class StdlibJSONCodec:
+    """Codec backed by the standard library `json` module."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec backed by `orjson`."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The 'orjson' codec requires the orjson package.")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec:
+    """Codec backed by `msgspec.json`."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("The 'msgspec' codec requires the msgspec package.")
+        self._encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+
+def _enc_hook(obj: Any) -> Any:
+    if isinstance(obj, Enum):
+        return obj.value
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not JSON serializable")
+
+
+_CODECS: dict[str, type] = {
+    "json": StdlibJSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """
+    Return a codec instance by name.
+
+    Args:
+        name (str): One of "auto", "orjson", "msgspec" or "json". "auto" prefers orjson, then msgspec,
+            then the standard library.
+
+    Raises:
+        ValueError: If the name is unknown.
+        ImportError: If the requested backend is not installed.
+    """
+    if name == "auto":
+        if orjson is not None:
+            return OrjsonCodec()
+        if msgspec is not None:
+            return MsgspecCodec()
+        return StdlibJSONCodec()
+    if name not in _CODECS:
+        raise ValueError(f"Unknown JSON codec '{name}'. Expected one of: auto, {', '.join(_CODECS)}.")
+    return _CODECS[name]()
@@ -0,0 +1,201 @@
+"""
+Hedged requests for idempotent GETs.
+
+If a request has not answered within a percentile of recently observed latency, a duplicate is sent on
+another pooled connection and whichever answers first wins. This trades a few percent of extra requests
+for a much shorter tail when the firewall occasionally stalls a single request.
+
+The async variant cancels the losing task, which aborts its connection. A blocking `requests` call cannot
+be interrupted, so on the sync client the losing request runs to completion in the background and its
+result is discarded.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HedgeStats:
+    """Snapshot of hedging counters."""
+
+    requests: int = 0
+    hedges_sent: int = 0
+    hedges_won: int = 0
+
+    @property
+    def hedge_ratio(self) -> float:
+        return self.hedges_sent / self.requests if self.requests else 0.0
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies, in seconds."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float | None:
+        """Return the `p`-th percentile (nearest rank) of the window, or None if it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))
+        return samples[rank]
+
+
+class Hedger:
+    """
+    Runs a call and, if it is slow, a duplicate of it, returning the first successful result.
+
+    Args:
+        percentile (float): Latency percentile after which the hedge is sent.
+        min_delay (float): Lower bound for the hedge delay in seconds, so fast endpoints are not hedged on noise.
+        min_samples (int): Number of latency samples needed before hedging starts.
+        window (int): Number of recent latencies the percentile is computed over.
+        max_workers (int): Threads available to the sync `call` for primary and hedged requests.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 20,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedges_sent = 0
+        self._hedges_won = 0
+
+    def delay(self) -> float | None:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile) or 0.0)
+
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return HedgeStats(self._requests, self._hedges_sent, self._hedges_won)
+
+    def _count(self, requests: int = 0, hedges_sent: int = 0, hedges_won: int = 0) -> None:
+        with self._lock:
+            self._requests += requests
+            self._hedges_sent += hedges_sent
+            self._hedges_won += hedges_won
+
+    def _timed(self, fn: Callable[[], T]) -> T:
+        start = time.perf_counter()
+        result = fn()
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    def _started(self, fn: Callable[[], T], started: threading.Event) -> T:
+        started.set()
+        return self._timed(fn)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="pyfsense-hedge")
+        return self._executor
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run `fn` with hedging from a thread."""
+        self._count(requests=1)
+        delay = self.delay()
+        if delay is None:
+            return self._timed(fn)
+
+        # Each attempt gets a copy of the caller's context variables, e.g. the active trace span
+        started = threading.Event()
+        primary = self._pool().submit(contextvars.copy_context().run, self._started, fn, started)
+        # Time spent queued for a worker thread is not request latency, so the delay runs from the primary's start
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count(hedges_sent=1)
+        hedge = self._pool().submit(contextvars.copy_context().run, self._timed, fn)
+        pending: set[Future] = {primary, hedge}
+        first_error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        self._count(hedges_won=1)
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error  # type: ignore[misc]
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of `call`: the losing task is cancelled."""
+
+        async def timed() -> T:
+            start = time.perf_counter()
+            result = await fn()
+            self.latency.record(time.perf_counter() - start)
+            return result
+
+        self._count(requests=1)
+        delay = self.delay()
+        if delay is None:
+            return await timed()
+
+        primary = asyncio.ensure_future(timed())
+        hedge: asyncio.Future | None = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._count(hedges_sent=1)
+            hedge = asyncio.ensure_future(timed())
+            pending = {primary, hedge}
+            first_error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count(hedges_won=1)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error  # type: ignore[misc]
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def close(self) -> None:
+        """Shut down the sync worker threads, without waiting for losing requests."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
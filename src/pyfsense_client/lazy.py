@@ -0,0 +1,41 @@
+"""
+Lazy module exports.
+
+Package `__init__` modules declare which submodule each public name lives in and only import it when the
+name is first accessed. `import pyfsense_client.v2` therefore costs next to nothing, and a script that only
+needs the async client never loads `requests`.
+"""
+
+import sys
+from collections.abc import Callable
+from importlib import import_module
+from typing import Any
+
+
+def lazy_exports(module_name: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Build the module-level `__getattr__` and `__dir__` for `module_name`.
+
+    Args:
+        module_name (str): The importing module's `__name__`.
+        exports (dict[str, str]): Public name -> module defining it, relative to the importing module's
+            package, e.g. {"DHCPLease": ".dhcp"}.
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"PfSenseV2Client": ".client"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        source = exports.get(name)
+        if source is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        module = sys.modules[module_name]
+        value = getattr(import_module(source, module.__package__), name)
+        # Cache on the module so later lookups skip __getattr__
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(exports))
+
+    return __getattr__, __dir__
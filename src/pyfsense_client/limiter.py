@@ -0,0 +1,267 @@
+"""
+Adaptive client-side concurrency limiting (AIMD).
+
+The limiter allows `limit` requests in flight to one host. Every successful response raises the limit by
+about one per round trip (additive increase). A 5xx/429 response, a transport error or a latency well
+above the endpoint's baseline cuts it by `backoff` (multiplicative decrease), at most once per round
+trip. A `Retry-After` header pauses new requests until the given time. The result: clients push as hard
+as the firewall allows and back off before PHP-FPM saturates.
+
+All clients, sync and async, share one limiter per host in the process (`limiter_for_host`), so their combined
+concurrency adapts together. Threads wait for a slot on a condition variable; coroutines wait on a future that a
+release from any thread resolves through its event loop.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Snapshot of limiter state and counters."""
+
+    limit: int
+    in_flight: int
+    overloads: int = 0
+    decreases: int = 0
+    retry_after_pauses: int = 0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds from a `Retry-After` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class _Slot:
+    """One admitted request. Call `observe()` with the response before the slot is released."""
+
+    __slots__ = ("_limiter", "_key", "start", "status", "retry_after")
+
+    def __init__(self, limiter: "AdaptiveLimiter", key: str):
+        self._limiter = limiter
+        self._key = key
+        self.start = 0.0
+        self.status: int | None = None
+        self.retry_after: str | None = None
+
+    def observe(self, status: int, retry_after: str | None = None) -> None:
+        self.status = status
+        self.retry_after = retry_after
+
+    def _finish(self, failed: bool) -> None:
+        self._limiter._release(self, failed)
+
+    def __enter__(self) -> "_Slot":
+        self._limiter.acquire()
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._finish(exc_type is not None)
+
+    async def __aenter__(self) -> "_Slot":
+        await self._limiter.acquire_async()
+        self.start = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._finish(exc_type is not None)
+
+
+class AdaptiveLimiter:
+    """
+    Thread-safe AIMD concurrency limiter, usable from threads (`with limiter.slot()`) and from coroutines on any
+    event loop (`async with limiter.slot()`) at the same time.
+
+    Args:
+        initial (int): Starting limit.
+        min_limit (int): The limit never drops below this.
+        max_limit (int): The limit never grows above this.
+        backoff (float): Factor applied to the limit on overload.
+        latency_tolerance (float): A response slower than this multiple of its endpoint's baseline latency
+            counts as overload (the firewall is queueing).
+        latency_floor (float): Baselines below this many seconds are rounded up to it, so jitter on very fast
+            responses is not mistaken for queueing.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+        latency_floor: float = 0.005,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor = latency_floor
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._baselines: dict[str, float] = {}
+        self._last_decrease = float("-inf")
+        self._resume_at = 0.0
+        self._overloads = 0
+        self._decreases = 0
+        self._pauses = 0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self.min_limit, int(self._limit))
+
+    def slot(self, key: str = "") -> _Slot:
+        """
+        Return a context manager (sync or async) that holds one unit of concurrency.
+
+        Args:
+            key (str): Endpoint the request is for; latency baselines are kept per key.
+        """
+        return _Slot(self, key)
+
+    def stats(self) -> LimiterStats:
+        with self._lock:
+            return LimiterStats(self.limit, self._in_flight, self._overloads, self._decreases, self._pauses)
+
+    def _try_acquire(self) -> float | None:
+        """Take a slot and return None, or return how long to wait (0 means until a slot is released)."""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            return delay
+        if self._in_flight < self.limit:
+            self._in_flight += 1
+            return None
+        return 0.0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while (delay := self._try_acquire()) is not None:
+                self._cond.wait(delay or None)
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                delay = self._try_acquire()
+                if delay is None:
+                    return
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, delay or None)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def _release(self, slot: _Slot, failed: bool) -> None:
+        now = time.monotonic()
+        latency = now - slot.start
+        status = slot.status
+        retry_after = parse_retry_after(slot.retry_after)
+        overloaded = failed or (status is not None and (status >= 500 or status == 429))
+
+        with self._lock:
+            self._in_flight -= 1
+            if retry_after:
+                self._resume_at = max(self._resume_at, now + retry_after)
+                self._pauses += 1
+            if not overloaded:
+                baseline = self._baselines.get(slot._key)
+                if baseline is None or latency < baseline:
+                    self._baselines[slot._key] = latency
+                else:
+                    # Drift upwards slowly, so a permanently slower endpoint stops looking overloaded
+                    self._baselines[slot._key] = baseline + (latency - baseline) * 0.05
+                    overloaded = latency > max(baseline, self.latency_floor) * self.latency_tolerance
+
+            if overloaded:
+                self._overloads += 1
+                # Decrease once per round trip: ignore requests sent before the previous decrease
+                if slot.start >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+                    self._decreases += 1
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._notify()
+
+    def _notify(self) -> None:
+        """Wake every waiter to retry; called with `_lock` held."""
+        self._cond.notify_all()
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # its event loop is closed
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AsyncAdaptiveLimiter(AdaptiveLimiter):
+    """An `AdaptiveLimiter` for asyncio code only: blocking `acquire()` is refused, as it would stall the loop."""
+
+    def acquire(self) -> None:
+        raise TypeError("Use 'async with limiter.slot()' with AsyncAdaptiveLimiter.")
+
+
+_host_limiters: dict[str, AdaptiveLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+
+def limiter_for_host(host: str, **settings: Any) -> AdaptiveLimiter:
+    """
+    Return the process-wide limiter for `host`, creating it with `settings` on first use.
+
+    Every client talking to the same host shares it, so their combined concurrency adapts together. A later
+    client's `initial` is ignored, as the limit has already adapted. If it asks for another `max_limit`, the
+    shared limiter takes the larger of the two and logs a warning, since the smaller bound no longer holds.
+    """
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = _host_limiters[host] = AdaptiveLimiter(**settings)
+            return limiter
+    max_limit = settings.get("max_limit", limiter.max_limit)
+    if max_limit != limiter.max_limit:
+        with limiter._lock:
+            previous = limiter.max_limit
+            limiter.max_limit = max(previous, max_limit)
+        logger.warning(
+            "Clients of %s asked for max_limit %d and %d; the shared limiter now allows up to %d.",
+            host,
+            previous,
+            max_limit,
+            limiter.max_limit,
+        )
+    return limiter
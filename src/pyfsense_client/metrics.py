@@ -0,0 +1,279 @@
+"""
+Per-request timing breakdown and a metrics registry shared by the v1 and v2 clients.
+
+Every request a client sends is described by a `RequestTiming`: where the time went (waiting for a
+connection, connecting, sending, waiting for the first byte, reading the body, decoding JSON and
+validating models) and how many body bytes went each way. A `MetricsRegistry` aggregates them into
+per-endpoint histograms and counters, renders them in the Prometheus text exposition format and hands
+each timing to subscribed callbacks.
+
+Phases a transport cannot observe (e.g. connection setup behind a mocked transport) are left as None and
+are not counted in the phase histograms.
+"""
+
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("acquire", "connect", "send", "ttfb", "read", "decode", "validate")
+
+# Prometheus' default latency buckets, extended downwards for decode/validate of small payloads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestTiming:
+    """
+    Timing breakdown of one HTTP request, in seconds.
+
+    Attributes:
+        method (str): HTTP method.
+        endpoint (str): Endpoint path, without query parameters.
+        host (str): Base URL of the firewall.
+        status (int | None): HTTP status, or None if no response was received.
+        error (str | None): Class name of the exception the request raised, if any.
+        request_bytes (int): Size of the request body.
+        response_bytes (int): Size of the response body.
+        acquire (float | None): Waiting for a concurrency slot and a pooled connection.
+        connect (float | None): TCP and TLS setup, if a new connection was opened.
+        send (float | None): Writing the request line, headers and body.
+        ttfb (float | None): From the end of the request to the response headers.
+        read (float | None): Reading the response body.
+        decode (float | None): Parsing the JSON body.
+        validate (float | None): Building pydantic models from the body.
+        total (float): Wall time of the whole request, including phases not listed above.
+    """
+
+    method: str
+    endpoint: str
+    host: str = ""
+    status: int | None = None
+    error: str | None = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    acquire: float | None = None
+    connect: float | None = None
+    send: float | None = None
+    ttfb: float | None = None
+    read: float | None = None
+    decode: float | None = None
+    validate: float | None = None
+    total: float = 0.0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def phases(self) -> dict[str, float]:
+        """Return the observed phases, in request order."""
+        return {name: value for name in PHASES if (value := getattr(self, name)) is not None}
+
+    def stop(self) -> None:
+        """Set `total` to the time elapsed since the timing was created."""
+        self.total = time.perf_counter() - self.started
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus model. Not thread-safe on its own."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        """Yield `(upper bound, observations <= bound)` pairs, ending with +Inf."""
+        running = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            running += count
+            yield bound, running
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Thread-safe aggregate of request timings.
+
+    Args:
+        buckets (tuple[float, ...]): Histogram bucket upper bounds in seconds.
+
+    Example:
+        registry = MetricsRegistry()
+        client.metrics = registry
+        registry.subscribe(lambda timing: print(timing.endpoint, timing.phases()))
+        print(registry.to_prometheus())
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._durations: dict[tuple[str, str, str], Histogram] = {}
+        self._phases: dict[tuple[str, str, str, str], Histogram] = {}
+        self._requests: dict[tuple[str, str, str, str], int] = {}
+        self._request_bytes: dict[tuple[str, str, str], int] = {}
+        self._response_bytes: dict[tuple[str, str, str], int] = {}
+        self._callbacks: list[Callable[[RequestTiming], None]] = []
+
+    def subscribe(self, callback: Callable[[RequestTiming], None]) -> Callable[[RequestTiming], None]:
+        """
+        Call `callback` with every recorded `RequestTiming`, on the thread that made the request.
+
+        Exceptions raised by the callback are logged and otherwise ignored. Returns `callback`, so this can
+        be used as a decorator.
+        """
+        with self._lock:
+            self._callbacks = [*self._callbacks, callback]
+        return callback
+
+    def unsubscribe(self, callback: Callable[[RequestTiming], None]) -> None:
+        with self._lock:
+            self._callbacks = [cb for cb in self._callbacks if cb != callback]
+
+    @contextmanager
+    def measure(self, method: str, endpoint: str, host: str = "", request_bytes: int = 0) -> Iterator[RequestTiming]:
+        """Time the enclosed request and record it on exit, including the exception type if it raised."""
+        timing = RequestTiming(method.upper(), endpoint, host, request_bytes=request_bytes)
+        try:
+            yield timing
+        except BaseException as exc:
+            timing.error = type(exc).__name__
+            raise
+        finally:
+            timing.stop()
+            self.record(timing)
+
+    def _histogram(self, store: dict, key: tuple) -> Histogram:
+        histogram = store.get(key)
+        if histogram is None:
+            histogram = store[key] = Histogram(self.buckets)
+        return histogram
+
+    def record(self, timing: RequestTiming) -> None:
+        """Add a finished request to the aggregates and pass it to subscribers."""
+        key = (timing.host, timing.method, timing.endpoint)
+        status = str(timing.status) if timing.status is not None else "error"
+        with self._lock:
+            self._histogram(self._durations, key).observe(timing.total)
+            for phase, seconds in timing.phases().items():
+                self._histogram(self._phases, (*key, phase)).observe(seconds)
+            self._requests[(*key, status)] = self._requests.get((*key, status), 0) + 1
+            self._request_bytes[key] = self._request_bytes.get(key, 0) + timing.request_bytes
+            self._response_bytes[key] = self._response_bytes.get(key, 0) + timing.response_bytes
+            callbacks = self._callbacks
+
+        for callback in callbacks:
+            try:
+                callback(timing)
+            except Exception:
+                logger.exception("Metrics callback %r failed", callback)
+
+    def observe(self, method: str, endpoint: str, phase: str, seconds: float, host: str = "") -> None:
+        """Add one phase measurement taken outside a request, e.g. validating a response already received."""
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase {phase!r}; expected one of {', '.join(PHASES)}.")
+        with self._lock:
+            self._histogram(self._phases, (host, method.upper(), endpoint, phase)).observe(seconds)
+
+    def phase_histogram(self, method: str, endpoint: str, phase: str, host: str = "") -> Histogram | None:
+        """Return the histogram for one phase of one endpoint, or None if nothing was observed."""
+        return self._phases.get((host, method.upper(), endpoint, phase))
+
+    def duration_histogram(self, method: str, endpoint: str, host: str = "") -> Histogram | None:
+        """Return the total-duration histogram of one endpoint, or None if nothing was recorded."""
+        return self._durations.get((host, method.upper(), endpoint))
+
+    def reset(self) -> None:
+        """Drop every aggregate. Subscribers are kept."""
+        with self._lock:
+            self._durations.clear()
+            self._phases.clear()
+            self._requests.clear()
+            self._request_bytes.clear()
+            self._response_bytes.clear()
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines: list[str] = []
+
+        def histogram(name: str, help_text: str, store: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(store.items()):
+                labels = _labels(**dict(zip(label_names, key)))
+                for bound, count in hist.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {_number(hist.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        def counter(name: str, help_text: str, store: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(store.items()):
+                lines.append(f"{name}{{{_labels(**dict(zip(label_names, key)))}}} {value}")
+
+        endpoint_labels = ("host", "method", "endpoint")
+        with self._lock:
+            histogram(
+                "pyfsense_request_duration_seconds",
+                "Total time of pfSense API requests.",
+                self._durations,
+                endpoint_labels,
+            )
+            histogram(
+                "pyfsense_request_phase_seconds",
+                "Time spent in each phase of pfSense API requests.",
+                self._phases,
+                (*endpoint_labels, "phase"),
+            )
+            counter(
+                "pyfsense_requests_total",
+                "pfSense API requests by response status.",
+                self._requests,
+                (*endpoint_labels, "status"),
+            )
+            counter(
+                "pyfsense_request_bytes_total",
+                "Request body bytes sent.",
+                self._request_bytes,
+                endpoint_labels,
+            )
+            counter(
+                "pyfsense_response_bytes_total",
+                "Response body bytes received.",
+                self._response_bytes,
+                endpoint_labels,
+            )
+        return "\n".join(lines) + "\n"
+
+
+_default_registry = MetricsRegistry()
+
+
+def default_registry() -> MetricsRegistry:
+    """The process-wide registry used by clients created with `collect_metrics=True`."""
+    return _default_registry
@@ -0,0 +1,222 @@
+"""
+Helpers for limit/offset paginated endpoints.
+
+`iter_pages` iterates lazily: while the caller consumes page N, page N+1 is already being fetched in the
+background, so the latency of every page after the first is hidden behind processing.
+
+`fetch_all_pages` reads a whole collection as several offset windows fetched concurrently, which is much
+faster than one `limit=0` request that the firewall has to serialize in a single PHP process.
+"""
+
+import asyncio
+import contextvars
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def _identity(item: Any) -> Any:
+    return item
+
+
+def _submit(executor: ThreadPoolExecutor, fn: Callable[..., T], *args: Any) -> "Future[T]":
+    """Run `fn` on the executor with a copy of the caller's context variables, such as the active trace span."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def iter_pages(fetch_page: Callable[[int, int], list[T]], page_size: int, offset: int = 0) -> Iterator[T]:
+    """
+    Yield every item of a paginated collection, prefetching the next page in a background thread.
+
+    Args:
+        fetch_page (Callable[[int, int], list[T]]): Called as `fetch_page(limit, offset)`; returns one page.
+        page_size (int): Number of items requested per page. Must be positive.
+        offset (int): Offset of the first item to return.
+
+    Iteration stops after the first page shorter than `page_size`.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be a positive integer.")
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyfsense-prefetch")
+    future = _submit(executor, fetch_page, page_size, offset)
+    try:
+        while True:
+            page = future.result()
+            if len(page) < page_size:
+                yield from page
+                return
+            offset += page_size
+            future = _submit(executor, fetch_page, page_size, offset)
+            yield from page
+    finally:
+        # Don't block a caller that stopped early on a prefetch it no longer needs
+        future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_pages(
+    fetch_page: Callable[[int, int], Awaitable[list[T]]],
+    page_size: int,
+    offset: int = 0,
+) -> AsyncIterator[T]:
+    """
+    Async variant of `iter_pages`: the next page is fetched in a separate task while the current one is consumed.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be a positive integer.")
+
+    task = asyncio.ensure_future(fetch_page(page_size, offset))
+    try:
+        while True:
+            page = await task
+            if len(page) < page_size:
+                for item in page:
+                    yield item
+                return
+            offset += page_size
+            task = asyncio.ensure_future(fetch_page(page_size, offset))
+            for item in page:
+                yield item
+    finally:
+        task.cancel()
+
+
+class PageShiftError(Exception):
+    """Raised when records moved between pages while a collection was being fetched."""
+
+
+def _window(page_size: int, index: int) -> tuple[int, int]:
+    """
+    Return `(limit, offset)` for window `index`.
+
+    Every window after the first also re-reads the last record of the window before it. If that
+    record does not match, records were inserted or removed ahead of it while the fetch was running.
+    """
+    if index == 0:
+        return page_size, 0
+    return page_size + 1, index * page_size - 1
+
+
+def _check_overlap(page: list[T], previous: Any, key: Callable[[T], Any], index: int) -> list[T]:
+    if index == 0:
+        return page
+    if not page or key(page[0]) != previous:
+        raise PageShiftError(f"Records shifted before window {index} was read.")
+    return page[1:]
+
+
+def fetch_all_pages(
+    fetch_page: Callable[[int, int], list[T]],
+    page_size: int,
+    parallelism: int = 4,
+    key: Callable[[T], Any] = _identity,
+    retries: int = 2,
+) -> list[T]:
+    """
+    Fetch a whole paginated collection with up to `parallelism` windows in flight at once.
+
+    The API does not report the collection size, so windows are requested ahead of the one being
+    merged until the first short window marks the end. Windows are merged in offset order, which keeps
+    the server-side sort order. A snapshot in which records shifted between windows is re-fetched up to
+    `retries` times.
+
+    Args:
+        fetch_page (Callable[[int, int], list[T]]): Called as `fetch_page(limit, offset)` from worker threads.
+        page_size (int): Number of records per window. Must be positive.
+        parallelism (int): Maximum number of windows fetched concurrently. Must be positive.
+        key (Callable[[T], Any]): Identifies a record when checking window overlaps.
+        retries (int): Number of times to start over after a shift is detected.
+
+    Raises:
+        PageShiftError: If records kept shifting on every attempt.
+    """
+    if page_size <= 0 or parallelism <= 0:
+        raise ValueError("page_size and parallelism must be positive integers.")
+
+    for attempt in range(retries + 1):
+        try:
+            return _fetch_all_once(fetch_page, page_size, parallelism, key)
+        except PageShiftError:
+            if attempt == retries:
+                raise
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _fetch_all_once(fetch_page, page_size, parallelism, key):
+    executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="pyfsense-fetch")
+    pending: deque[Future] = deque()
+    next_index = 0
+
+    def submit():
+        nonlocal next_index
+        pending.append(_submit(executor, fetch_page, *_window(page_size, next_index)))
+        next_index += 1
+
+    items: list = []
+    previous = None
+    index = 0
+    try:
+        for _ in range(parallelism):
+            submit()
+        while True:
+            page = _check_overlap(pending.popleft().result(), previous, key, index)
+            items.extend(page)
+            if len(page) < page_size:
+                return items
+            previous = key(page[-1])
+            index += 1
+            submit()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def afetch_all_pages(
+    fetch_page: Callable[[int, int], Awaitable[list[T]]],
+    page_size: int,
+    parallelism: int = 4,
+    key: Callable[[T], Any] = _identity,
+    retries: int = 2,
+) -> list[T]:
+    """Async variant of `fetch_all_pages`: windows are fetched by concurrent tasks."""
+    if page_size <= 0 or parallelism <= 0:
+        raise ValueError("page_size and parallelism must be positive integers.")
+
+    for attempt in range(retries + 1):
+        try:
+            return await _afetch_all_once(fetch_page, page_size, parallelism, key)
+        except PageShiftError:
+            if attempt == retries:
+                raise
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+async def _afetch_all_once(fetch_page, page_size, parallelism, key):
+    pending: deque[asyncio.Future] = deque(
+        asyncio.ensure_future(fetch_page(*_window(page_size, index))) for index in range(parallelism)
+    )
+    next_index = parallelism
+
+    items: list = []
+    previous = None
+    index = 0
+    try:
+        while True:
+            page = _check_overlap(await pending.popleft(), previous, key, index)
+            items.extend(page)
+            if len(page) < page_size:
+                return items
+            previous = key(page[-1])
+            index += 1
+            pending.append(asyncio.ensure_future(fetch_page(*_window(page_size, next_index))))
+            next_index += 1
+    finally:
+        for task in pending:
+            if not task.cancel() and not task.cancelled():
+                # Finished tasks that are no longer needed; retrieve errors so they aren't logged as unhandled
+                task.exception()
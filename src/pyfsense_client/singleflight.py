@@ -0,0 +1,106 @@
+"""
+Request coalescing ("single-flight") for identical concurrent calls.
+
+The first caller for a key runs the call; every caller that arrives with the same key while it is still
+in flight waits for it and receives the same result or exception. Nothing is remembered once the call
+finishes, so later callers always trigger a fresh request.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Snapshot of coalescing counters."""
+
+    calls: int = 0
+    shared: int = 0
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Thread-based single-flight group."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._count = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn()`, or wait for the in-flight call with the same key and return its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._count += 1
+                leader = True
+            else:
+                self._shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(self._count, self._shared)
+
+
+class AsyncSingleFlight:
+    """Asyncio single-flight group. The shared call runs as its own task, so one waiter being cancelled
+    does not cancel it for the others."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._count = 0
+        self._shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._count += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every waiter was cancelled
+            task.exception()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(self._count, self._shared)
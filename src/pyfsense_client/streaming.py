@@ -0,0 +1,185 @@
+"""
+Incremental JSON parsing for large list responses.
+
+pfSense wraps every list in an envelope such as `{"code": 200, ..., "data": [...]}`. `JSONArrayStream`
+is fed raw body chunks as they arrive and returns the items of the `data` array as soon as each one is
+complete, so only one chunk plus one partially received item is held in memory at a time. Every other
+top-level key is collected into `envelope`.
+"""
+
+import codecs
+import json
+import re
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from typing import Any
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_AFTER_VALUE = "after_value"
+_ITEM = "item"
+_AFTER_ITEM = "after_item"
+_DONE = "done"
+
+
+class JSONArrayStream:
+    """
+    Push parser that yields the items of one top-level array of a JSON object.
+
+    Example:
+        parser = JSONArrayStream("data")
+        for chunk in response.iter_content(65536):
+            for item in parser.feed(chunk):
+                handle(item)
+        for item in parser.close():
+            handle(item)
+    """
+
+    def __init__(self, key: str = "data"):
+        self.key = key
+        self.envelope: dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key: str | None = None
+        self._eof = False
+
+    @property
+    def in_array(self) -> bool:
+        """True once the target array has been opened and until it is closed."""
+        return self._state in (_ITEM, _AFTER_ITEM)
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk of the body and return the array items it completed."""
+        self._buf = self._buf[self._pos :] + self._utf8.decode(chunk)
+        self._pos = 0
+        return self._parse()
+
+    def close(self) -> list[Any]:
+        """
+        Signal the end of the body and return any remaining items.
+
+        Raises:
+            ValueError: If the body was not a complete JSON object.
+        """
+        self._buf = self._buf[self._pos :] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        items = self._parse()
+        if self._state != _DONE:
+            raise ValueError("Truncated JSON response body.")
+        return items
+
+    def _char(self) -> str | None:
+        """Skip whitespace and return the next character, or None if more data is needed."""
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+        if self._pos >= len(self._buf):
+            if self._eof and self._state != _DONE:
+                raise ValueError("Truncated JSON response body.")
+            return None
+        return self._buf[self._pos]
+
+    def _decode(self) -> tuple[bool, Any]:
+        """Decode one complete value at the current position, or report that more data is needed."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return False, None
+        if not self._eof and isinstance(value, (int, float)) and not isinstance(value, bool):
+            # A number that runs to the end of the buffer may continue in the next chunk
+            if _NUMBER_TAIL.match(self._buf, end).end() >= len(self._buf):  # type: ignore[union-attr]
+                return False, None
+        self._pos = end
+        return True, value
+
+    def _expect(self, char: str | None, expected: str) -> None:
+        if char != expected:
+            raise ValueError(f"Expected '{expected}' at position {self._pos} of JSON response body, got {char!r}.")
+        self._pos += 1
+
+    def _parse(self) -> list[Any]:
+        items: list[Any] = []
+        while True:
+            char = self._char()
+            if char is None:
+                return items
+
+            if self._state == _START:
+                self._expect(char, "{")
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if char != '"':
+                    self._expect(char, '"')
+                complete, self._current_key = self._decode()
+                if not complete:
+                    return items
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(char, ":")
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._current_key == self.key and char == "[":
+                    self._pos += 1
+                    self._state = _ITEM
+                    continue
+                complete, value = self._decode()
+                if not complete:
+                    return items
+                self.envelope[self._current_key] = value  # type: ignore[index]
+                self._state = _AFTER_VALUE
+            elif self._state == _AFTER_VALUE:
+                if char == ",":
+                    self._pos += 1
+                    self._state = _KEY
+                else:
+                    self._expect(char, "}")
+                    self._state = _DONE
+            elif self._state == _ITEM:
+                if char == "]":
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                complete, value = self._decode()
+                if not complete:
+                    return items
+                items.append(value)
+                self._state = _AFTER_ITEM
+            elif self._state == _AFTER_ITEM:
+                if char == ",":
+                    self._pos += 1
+                    self._state = _ITEM
+                else:
+                    self._expect(char, "]")
+                    self._state = _AFTER_VALUE
+            else:
+                raise ValueError(f"Unexpected data after the end of the JSON response body at position {self._pos}.")
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "data") -> Iterator[Any]:
+    """Yield the items of the `key` array from an iterable of body chunks."""
+    parser = JSONArrayStream(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[bytes], key: str = "data") -> AsyncIterator[Any]:
+    """Async variant of `iter_json_array`."""
+    parser = JSONArrayStream(key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
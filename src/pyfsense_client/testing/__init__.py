@@ -0,0 +1,29 @@
+"""
+Test helpers: an in-process fake pfSense server for integration and load tests.
+
+Example:
+    from pyfsense_client.testing import FakePfSense, lognormal
+
+    with FakePfSense(leases=100_000, latency=lognormal(0.02)) as fw:
+        client = PfSenseV2Client(fw.v2_config())
+        client.fetch_all_dhcp_leases(page_size=5_000)
+"""
+
+from .faults import Fault, FaultPlan, Latency, constant, empirical, lognormal, uniform
+from .server import FakePfSense
+from .state import FirewallState, StateError, make_aliases, make_leases
+
+__all__ = [
+    "FakePfSense",
+    "Fault",
+    "FaultPlan",
+    "FirewallState",
+    "Latency",
+    "StateError",
+    "constant",
+    "empirical",
+    "lognormal",
+    "make_aliases",
+    "make_leases",
+    "uniform",
+]
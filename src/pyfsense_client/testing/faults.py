@@ -0,0 +1,110 @@
+"""
+Latency distributions and error injection for `FakePfSense`.
+
+A latency is any callable returning seconds. The helpers below build the usual shapes; `lognormal` is the
+closest to a real firewall, where most requests are fast and a few stall behind PHP workers.
+"""
+
+import math
+import random
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+Latency = Callable[[], float]
+
+
+def constant(seconds: float) -> Latency:
+    """Always `seconds`."""
+    return lambda: seconds
+
+
+def uniform(low: float, high: float, seed: int | None = None) -> Latency:
+    """Uniformly distributed between `low` and `high` seconds."""
+    rng = random.Random(seed)
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5, cap: float | None = None, seed: int | None = None) -> Latency:
+    """
+    Log-normally distributed around `median` seconds.
+
+    Args:
+        median (float): Median latency.
+        sigma (float): Spread; 0.5 puts p99 at about 3.2x the median, 1.0 at about 10x.
+        cap (float | None): Upper bound, if any.
+        seed (int | None): Seed for reproducible runs.
+    """
+    rng = random.Random(seed)
+    mu = math.log(median)
+
+    def sample() -> float:
+        value = rng.lognormvariate(mu, sigma)
+        return min(value, cap) if cap is not None else value
+
+    return sample
+
+
+def empirical(samples: Sequence[float], seed: int | None = None) -> Latency:
+    """Draw from recorded latencies, e.g. timings exported from production metrics."""
+    if not samples:
+        raise ValueError("samples must not be empty.")
+    rng = random.Random(seed)
+    values = list(samples)
+    return lambda: rng.choice(values)
+
+
+@dataclass
+class Fault:
+    """
+    One error injection rule. See `FakePfSense.inject`.
+
+    Attributes:
+        status (int | None): HTTP status to answer with. None drops the connection without a response.
+        path (str): Only requests whose path starts with this prefix are affected.
+        method (str | None): Only requests with this method are affected; None matches every method.
+        probability (float): Chance that a matching request fails.
+        times (int | None): Number of failures to inject before the rule expires; None never expires.
+        retry_after (float | None): Value of the `Retry-After` header sent with the error.
+        delay (float): Extra seconds to wait before failing, e.g. to simulate a timeout.
+    """
+
+    status: int | None = 503
+    path: str = "/"
+    method: str | None = None
+    probability: float = 1.0
+    times: int | None = None
+    retry_after: float | None = None
+    delay: float = 0.0
+
+
+class FaultPlan:
+    """Thread-safe, ordered set of `Fault` rules; the first rule that fires wins."""
+
+    def __init__(self, seed: int | None = None):
+        self._faults: list[Fault] = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def add(self, fault: Fault) -> Fault:
+        with self._lock:
+            self._faults.append(fault)
+        return fault
+
+    def clear(self) -> None:
+        with self._lock:
+            self._faults.clear()
+
+    def match(self, method: str, path: str) -> Fault | None:
+        with self._lock:
+            for fault in self._faults:
+                if not path.startswith(fault.path) or (fault.method and fault.method.upper() != method):
+                    continue
+                if fault.probability < 1.0 and self._rng.random() >= fault.probability:
+                    continue
+                if fault.times is not None:
+                    fault.times -= 1
+                    if fault.times <= 0:
+                        self._faults.remove(fault)
+                return fault
+        return None
@@ -0,0 +1,577 @@
+"""
+`FakePfSense`: an in-process HTTP(S) server that stands in for a pfSense firewall.
+
+It implements the V2 alias, DHCP lease, apply and JWT endpoints and the core V1 alias, alias entry,
+apply, DHCP lease, system status and access token endpoints on top of one shared `FirewallState`.
+Responses use the real API envelopes, so both clients work against it unchanged.
+
+The TLS certificate is a self-signed one for localhost/127.0.0.1 shipped with the package. It protects
+nothing; point clients at `ca_file` or disable verification.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import ssl
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from ..codec import get_codec
+from .faults import Fault, FaultPlan, Latency, constant
+from .state import FirewallState, StateError, make_aliases, make_leases
+
+CA_FILE = os.path.join(os.path.dirname(__file__), "localhost.pem")
+
+_LIST_PARAMS = {"limit", "offset", "sort_by", "sort_order", "sort_flags", "reverse"}
+
+# Endpoints that check credentials themselves
+_LOGIN_PATHS = {"/api/v2/auth/jwt", "/api/v1/access_token"}
+
+
+class _Request:
+    """The parts of an HTTP request a route needs."""
+
+    __slots__ = ("method", "path", "query", "body", "headers")
+
+    def __init__(self, method: str, path: str, query: dict[str, list[str]], body: Any, headers: Any):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.headers = headers
+
+    def param(self, name: str, default: Any = None) -> Any:
+        """A query parameter, falling back to the JSON body (V1 sends most arguments in the body)."""
+        if name in self.query:
+            return self.query[name][-1]
+        if isinstance(self.body, dict):
+            return self.body.get(name, default)
+        return default
+
+    def int_param(self, name: str, default: int = 0) -> int:
+        try:
+            return int(self.param(name, default))
+        except (TypeError, ValueError):
+            raise StateError(400, f"Field '{name}' must be an integer.", "FIELD_INVALID_TYPE")
+
+    def filters(self) -> dict[str, list[str]]:
+        return {key: values for key, values in self.query.items() if key not in _LIST_PARAMS}
+
+
+Route = Callable[[_Request], Any]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle the body waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def setup(self) -> None:
+        super().setup()
+        if isinstance(self.connection, ssl.SSLSocket):
+            # Handshake here, on the connection's own thread, rather than in the accept loop
+            self.connection.do_handshake()
+
+    def do_GET(self) -> None:
+        self.server.fake._handle(self)
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    fake: "FakePfSense"
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients disconnecting mid-request (timeouts, cancelled hedges) are expected under load
+        pass
+
+
+class FakePfSense:
+    """
+    In-process stand-in for a pfSense firewall serving the V1 and V2 REST APIs.
+
+    Args:
+        aliases (int | list[dict]): Number of aliases to generate, or the aliases themselves (V2 shape, no `id`).
+        leases (int | list[dict]): Number of DHCP leases to generate, or the leases themselves.
+        api_key (str): Key accepted in the V2 `X-API-Key` header.
+        username (str): User accepted by basic auth, `/api/v2/auth/jwt` and `/api/v1/access_token`.
+        password (str): Password for `username`.
+        client_id (str): V1 API token client ID.
+        client_token (str): V1 API token secret.
+        require_auth (bool): Reject requests without valid credentials with 401.
+        jwt_ttl (float): Lifetime of issued JWTs in seconds.
+        latency (Latency | float | None): Server processing time added to every request.
+        latencies (dict[str, Latency | float] | None): Latency overrides keyed on path prefix; the longest
+            matching prefix wins, e.g. `{"/api/v2/firewall/apply": lognormal(1.5)}`.
+        latency_per_record (float): Extra seconds per object in a list response, like PHP serializing the
+            config; makes large unpaginated reads proportionally slow.
+        workers (int | None): Requests processed at once, like PHP-FPM workers; the rest queue. None is unlimited.
+        tls (bool): Serve HTTPS with the bundled localhost certificate. The V1 client always uses HTTPS.
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free one.
+        seed (int): Seed for generated data and probabilistic faults.
+
+    Example:
+        with FakePfSense(aliases=1_000, leases=100_000, latency=lognormal(0.02)) as fw:
+            client = PfSenseV2Client(fw.v2_config())
+            leases = client.fetch_all_dhcp_leases(page_size=5_000)
+    """
+
+    def __init__(
+        self,
+        aliases: int | list[dict[str, Any]] = 0,
+        leases: int | list[dict[str, Any]] = 0,
+        api_key: str = "test-api-key",
+        username: str = "admin",
+        password: str = "pfsense",
+        client_id: str = "test-client-id",
+        client_token: str = "test-client-token",
+        require_auth: bool = True,
+        jwt_ttl: float = 3600.0,
+        latency: Latency | float | None = None,
+        latencies: dict[str, Latency | float] | None = None,
+        latency_per_record: float = 0.0,
+        workers: int | None = None,
+        tls: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.state = FirewallState(
+            make_aliases(aliases, seed=seed) if isinstance(aliases, int) else aliases,
+            make_leases(leases, seed=seed) if isinstance(leases, int) else leases,
+        )
+        self.api_key = api_key
+        self.username = username
+        self.password = password
+        self.client_id = client_id
+        self.client_token = client_token
+        self.require_auth = require_auth
+        self.jwt_ttl = jwt_ttl
+        self.latency = _as_latency(latency)
+        self._latencies = sorted(
+            ((prefix, _as_latency(value)) for prefix, value in (latencies or {}).items()), key=lambda kv: -len(kv[0])
+        )
+        self.latency_per_record = latency_per_record
+        self.tls = tls
+        self.faults = FaultPlan(seed)
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._workers = threading.BoundedSemaphore(workers) if workers else None
+        self._counter_lock = threading.Lock()
+        self._secret = secrets.token_bytes(32)
+        self._codec = get_codec("auto")
+        self._routes = self._build_routes()
+
+        self._server = _Server((host, port), _Handler)
+        self._server.fake = self
+        if tls:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(CA_FILE)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True, do_handshake_on_connect=False
+            )
+        self._thread: threading.Thread | None = None
+
+    #
+    # Lifecycle
+    #
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"{'https' if self.tls else 'http'}://{self.host}:{self.port}"
+
+    ca_file = CA_FILE
+
+    def start(self) -> "FakePfSense":
+        """Serve requests from a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake-pfsense", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "FakePfSense":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def v2_config(self, **overrides: Any):
+        """A V2 `ClientConfig` for this server, authenticating with the API key."""
+        from ..v2 import ClientConfig
+
+        settings: dict[str, Any] = {"host": self.url, "verify_ssl": False, "api_key": self.api_key}
+        return ClientConfig(**{**settings, **overrides})
+
+    def v1_config(self, **overrides: Any):
+        """A V1 `ClientConfig` for this server, authenticating with the API token."""
+        from ..v1.client import ClientConfig
+
+        settings: dict[str, Any] = {
+            "hostname": self.host,
+            "port": self.port,
+            "verify_ssl": False,
+            "mode": "api_token",
+            "client_id": self.client_id,
+            "client_token": self.client_token,
+        }
+        return ClientConfig(**{**settings, **overrides})
+
+    #
+    # Fault injection and counters
+    #
+
+    def inject(self, status: int | None = 503, path: str = "/", **kwargs: Any) -> Fault:
+        """
+        Make matching requests fail. See `Fault` for the arguments.
+
+        Example:
+            fw.inject(503, path="/api/v2/firewall/apply", probability=0.2, retry_after=1)
+            fw.inject(None, path="/api/v2/firewall/aliases", times=1)  # drop the connection once
+        """
+        return self.faults.add(Fault(status, path, **kwargs))
+
+    def clear_faults(self) -> None:
+        self.faults.clear()
+
+    def reset_calls(self) -> None:
+        with self._counter_lock:
+            self.calls.clear()
+            self.max_in_flight = self.in_flight
+
+    def total_calls(self, path_prefix: str = "/", method: str | None = None) -> int:
+        """Number of requests received for paths under `path_prefix`, optionally for one method only."""
+        with self._counter_lock:
+            return sum(
+                count
+                for (m, path), count in self.calls.items()
+                if path.startswith(path_prefix) and (method is None or m == method.upper())
+            )
+
+    #
+    # JWT
+    #
+
+    def issue_jwt(self, subject: str) -> str:
+        def encode(data: dict[str, Any]) -> str:
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+        claims = {"sub": subject, "exp": int(time.time() + self.jwt_ttl), "jti": secrets.token_hex(8)}
+        unsigned = f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(claims)}"
+        signature = hmac.new(self._secret, unsigned.encode(), hashlib.sha256).digest()
+        return f"{unsigned}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+    def _jwt_valid(self, token: str) -> bool:
+        try:
+            unsigned, _, signature = token.rpartition(".")
+            expected = hmac.new(self._secret, unsigned.encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)), expected):
+                return False
+            payload = unsigned.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return claims["exp"] > time.time()
+        except (ValueError, KeyError, IndexError):
+            return False
+
+    def _basic_ok(self, value: str) -> bool:
+        try:
+            username, _, password = base64.b64decode(value).decode().partition(":")
+        except ValueError:
+            return False
+        return username == self.username and password == self.password
+
+    def _authorized(self, request: _Request) -> bool:
+        if not self.require_auth:
+            return True
+        if self.api_key and request.headers.get("X-API-Key") == self.api_key:
+            return True
+        scheme, _, value = (request.headers.get("Authorization") or "").partition(" ")
+        if scheme == "Bearer":
+            return self._jwt_valid(value)
+        if scheme == "Basic":
+            return self._basic_ok(value)
+        return scheme == self.client_id and value == self.client_token
+
+    #
+    # Request handling
+    #
+
+    def _latency_for(self, path: str) -> Latency | None:
+        for prefix, latency in self._latencies:
+            if path.startswith(prefix):
+                return latency
+        return self.latency
+
+    def _handle(self, handler: _Handler) -> None:
+        url = urlsplit(handler.path)
+        method = handler.command
+        path = url.path.rstrip("/") or "/"
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        v1 = path.startswith("/api/v1/")
+
+        with self._counter_lock:
+            self.calls[(method, path)] += 1
+        if self._workers is not None:
+            self._workers.acquire()
+        with self._counter_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            started = time.perf_counter()
+            fault = self.faults.match(method, path)
+            if fault is not None:
+                if fault.delay:
+                    time.sleep(fault.delay)
+                if fault.status is None:
+                    handler.close_connection = True
+                    return
+                headers = {"Retry-After": f"{fault.retry_after:g}"} if fault.retry_after is not None else {}
+                self._respond(handler, v1, fault.status, "Injected fault.", None, headers, "INJECTED_FAULT")
+                return
+
+            try:
+                body = self._codec.loads(raw) if raw else None
+            except ValueError:
+                body = None
+            request = _Request(method, path, parse_qs(url.query), body, handler.headers)
+
+            route = self._routes.get((method, path))
+            try:
+                if route is None:
+                    known = any(p == path for _, p in self._routes)
+                    raise StateError(405 if known else 404, "Endpoint not found.", "ENDPOINT_NOT_FOUND")
+                if path not in _LOGIN_PATHS and not self._authorized(request):
+                    raise StateError(401, "Authentication failed.", "AUTHENTICATION_FAILED")
+                data = route(request)
+                status, message, response_id = 200, "", "SUCCESS"
+            except StateError as exc:
+                data, status, message, response_id = [], exc.status, exc.message, exc.response_id
+
+            delay = 0.0
+            latency = self._latency_for(path)
+            if latency is not None:
+                delay += latency()
+            if self.latency_per_record and isinstance(data, list):
+                delay += self.latency_per_record * len(data)
+            remaining = delay - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+            self._respond(handler, v1, status, message, data, {}, response_id)
+        finally:
+            with self._counter_lock:
+                self.in_flight -= 1
+            if self._workers is not None:
+                self._workers.release()
+
+    def _respond(
+        self,
+        handler: _Handler,
+        v1: bool,
+        status: int,
+        message: str,
+        data: Any,
+        headers: dict[str, str],
+        response_id: str,
+    ) -> None:
+        ok = status < 400
+        if v1:
+            envelope = {
+                "status": "ok" if ok else "bad request",
+                "code": status,
+                "return": 0 if ok else status,
+                "message": message or ("Success" if ok else "Error"),
+                "data": [] if data is None else data,
+            }
+        else:
+            envelope = {
+                "code": status,
+                "status": "ok" if ok else "error",
+                "response_id": response_id,
+                "message": message,
+                "data": [] if data is None else data,
+            }
+        payload = self._codec.dumps(envelope)
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _build_routes(self) -> dict[tuple[str, str], Route]:
+        return {
+            # V2
+            ("POST", "/api/v2/auth/jwt"): self._jwt,
+            ("GET", "/api/v2/firewall/aliases"): self._v2_list_aliases,
+            ("PUT", "/api/v2/firewall/aliases"): lambda r: self.state.replace_aliases(_require_list(r.body)),
+            ("DELETE", "/api/v2/firewall/aliases"): self._v2_delete_aliases,
+            ("GET", "/api/v2/firewall/alias"): lambda r: self.state.get_alias(r.param("id")),
+            ("POST", "/api/v2/firewall/alias"): lambda r: self.state.create_alias(_require_dict(r.body)),
+            ("PATCH", "/api/v2/firewall/alias"): lambda r: self.state.patch_alias(_require_dict(r.body)),
+            ("DELETE", "/api/v2/firewall/alias"): lambda r: self.state.delete_alias(r.param("id")),
+            ("GET", "/api/v2/firewall/apply"): lambda r: self.state.apply_status(),
+            ("POST", "/api/v2/firewall/apply"): lambda r: self.state.apply(),
+            ("GET", "/api/v2/status/dhcp_server/leases"): self._v2_list_leases,
+            # V1
+            ("POST", "/api/v1/access_token"): self._v1_access_token,
+            ("GET", "/api/v1/firewall/alias"): lambda r: [_v1_alias(a) for a in self.state.query_aliases({})],
+            ("POST", "/api/v1/firewall/alias"): self._v1_create_alias,
+            ("PUT", "/api/v1/firewall/alias"): self._v1_update_alias,
+            ("DELETE", "/api/v1/firewall/alias"): self._v1_delete_alias,
+            ("POST", "/api/v1/firewall/alias/entry"): self._v1_add_entries,
+            ("DELETE", "/api/v1/firewall/alias/entry"): self._v1_remove_entries,
+            ("POST", "/api/v1/firewall/apply"): lambda r: self.state.apply(),
+            ("GET", "/api/v1/services/dhcpd/lease"): lambda r: self.state.query_leases({}),
+            ("GET", "/api/v1/status/system"): self._v1_system_status,
+        }
+
+    #
+    # V2 routes
+    #
+
+    def _jwt(self, request: _Request) -> dict[str, Any]:
+        body = request.body if isinstance(request.body, dict) else {}
+        username, password = body.get("username"), body.get("password")
+        scheme, _, value = (request.headers.get("Authorization") or "").partition(" ")
+        if scheme == "Basic" and self._basic_ok(value):
+            username, password = self.username, self.password
+        if username != self.username or password != self.password:
+            raise StateError(401, "Authentication failed.", "AUTHENTICATION_FAILED")
+        return {"token": self.issue_jwt(username)}
+
+    def _v2_list_aliases(self, request: _Request) -> list[dict[str, Any]]:
+        return self.state.query_aliases(request.filters(), request.int_param("limit"), request.int_param("offset"))
+
+    def _v2_delete_aliases(self, request: _Request) -> list[dict[str, Any]]:
+        return self.state.delete_aliases(request.filters(), request.int_param("limit"), request.int_param("offset"))
+
+    def _v2_list_leases(self, request: _Request) -> list[dict[str, Any]]:
+        return self.state.query_leases(
+            request.filters(),
+            request.int_param("limit"),
+            request.int_param("offset"),
+            sort_by=request.query.get("sort_by") or request.query.get("sort_by[]"),
+            descending=request.param("sort_order") == "SORT_DESC",
+        )
+
+    #
+    # V1 routes
+    #
+
+    def _v1_access_token(self, request: _Request) -> dict[str, Any]:
+        scheme, _, value = (request.headers.get("Authorization") or "").partition(" ")
+        if not (scheme == "Basic" and self._basic_ok(value)) and not self._authorized(request):
+            raise StateError(401, "Authentication failed.", "AUTHENTICATION_FAILED")
+        return {"token": self.issue_jwt(self.username)}
+
+    def _v1_apply(self, request: _Request) -> None:
+        if request.param("apply", True) not in (False, "false", "0", 0):
+            self.state.apply()
+
+    def _v1_create_alias(self, request: _Request) -> dict[str, Any]:
+        alias = self.state.create_alias(_require_dict(request.body))
+        self._v1_apply(request)
+        return _v1_alias(alias)
+
+    def _v1_update_alias(self, request: _Request) -> dict[str, Any]:
+        body = _require_dict(request.body)
+        with self.state.lock:
+            index = self.state.index_by_name(body.get("id"))
+            alias = self.state.update_alias(index, {k: v for k, v in body.items() if k != "id"})
+        self._v1_apply(request)
+        return _v1_alias(alias)
+
+    def _v1_delete_alias(self, request: _Request) -> dict[str, Any]:
+        with self.state.lock:
+            alias = self.state.delete_alias(self.state.index_by_name(request.param("id")))
+        self._v1_apply(request)
+        return _v1_alias(alias)
+
+    def _v1_add_entries(self, request: _Request) -> dict[str, Any]:
+        alias = self.state.add_alias_entries(request.param("name"), request.param("address"), request.param("detail"))
+        self._v1_apply(request)
+        return _v1_alias(alias)
+
+    def _v1_remove_entries(self, request: _Request) -> dict[str, Any]:
+        alias = self.state.remove_alias_entries(request.param("name"), request.param("address"))
+        self._v1_apply(request)
+        return _v1_alias(alias)
+
+    def _v1_system_status(self, request: _Request) -> dict[str, Any]:
+        return {
+            "system_platform": "FakePfSense",
+            "system_serial": "0123456789",
+            "system_netgate_id": "fake",
+            "bios_vendor": "pyfsense",
+            "cpu_model": "Fake CPU",
+            "kernel_pti": False,
+            "mds_mitigation": "inactive",
+            "temp_c": 40.0,
+            "cpu_count": 4,
+            "cpu_usage": 5.0,
+            "mem_usage": 20.0,
+            "swap_usage": 0.0,
+            "disk_usage": 10.0,
+        }
+
+
+def _as_latency(value: Latency | float | None) -> Latency | None:
+    if value is None or callable(value):
+        return value
+    return constant(float(value))
+
+
+def _require_dict(body: Any) -> dict[str, Any]:
+    if not isinstance(body, dict):
+        raise StateError(400, "Request body must be a JSON object.", "INVALID_REQUEST_BODY")
+    return body
+
+
+def _require_list(body: Any) -> list[dict[str, Any]]:
+    if not isinstance(body, list) or not all(isinstance(item, dict) for item in body):
+        raise StateError(400, "Request body must be a JSON array of objects.", "INVALID_REQUEST_BODY")
+    return body
+
+
+def _v1_alias(alias: dict[str, Any]) -> dict[str, Any]:
+    """Render an alias the way the V1 API does: space-separated addresses, "||"-separated details."""
+    return {
+        "name": alias["name"],
+        "type": alias["type"],
+        "address": " ".join(alias["address"]),
+        "descr": alias["descr"],
+        "detail": "||".join(alias["detail"]),
+    }
@@ -0,0 +1,307 @@
+"""
+In-memory firewall state served by `FakePfSense`: aliases, DHCP leases and pending changes.
+
+Aliases are stored in the V2 shape. As on a real firewall, a V2 alias `id` is its position in the alias
+list, so deleting an alias renumbers every alias after it. The V1 endpoints read and write the same
+list, using the alias name as its identifier.
+"""
+
+import ipaddress
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+ALIAS_TYPES = ("host", "network", "port", "url")
+
+
+class StateError(Exception):
+    """A request the firewall would reject; becomes a 4xx response."""
+
+    def __init__(self, status: int, message: str, response_id: str = "INVALID_REQUEST"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.response_id = response_id
+
+
+def make_aliases(count: int, addresses: int = 4, seed: int = 0) -> list[dict[str, Any]]:
+    """Generate `count` host aliases with `addresses` entries each, deterministically."""
+    rng = random.Random(seed)
+    aliases = []
+    for i in range(count):
+        address = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(addresses)]
+        aliases.append(
+            {
+                "name": f"alias_{i}",
+                "type": "host",
+                "descr": f"Generated alias {i}",
+                "address": address,
+                "detail": [f"entry {j}" for j in range(addresses)],
+            }
+        )
+    return aliases
+
+
+def make_leases(count: int, seed: int = 0, start: datetime | None = None) -> list[dict[str, Any]]:
+    """Generate `count` DHCP leases on 10.0.0.0/8 with unique addresses and MACs, deterministically."""
+    rng = random.Random(seed)
+    start = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    leases = []
+    for i in range(count):
+        begins = start + timedelta(seconds=rng.randrange(86400 * 30))
+        online = rng.random() < 0.7
+        leases.append(
+            {
+                "ip": str(ipaddress.IPv4Address(0x0A000000 + i + 1)),
+                "mac": ":".join(f"{b:02x}" for b in (0x00, 0x1A, 0x2B, (i >> 16) & 0xFF, (i >> 8) & 0xFF, i & 0xFF)),
+                "hostname": f"host-{i}",
+                "if": "lan",
+                "start": begins.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "end": (begins + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "active_status": "active",
+                "online_status": "active/online" if online else "idle/offline",
+                "descr": "",
+            }
+        )
+    return leases
+
+
+def _listify(value: Any, separator: str) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part for part in value.split(separator) if part] if value else []
+    return [str(part) for part in value]
+
+
+class FirewallState:
+    """
+    Thread-safe alias, lease and pending-change store.
+
+    Args:
+        aliases (list[dict] | None): Initial aliases in the V2 shape, without `id`.
+        leases (list[dict] | None): Initial DHCP leases.
+    """
+
+    def __init__(self, aliases: list[dict[str, Any]] | None = None, leases: list[dict[str, Any]] | None = None):
+        self.lock = threading.RLock()
+        self.aliases: list[dict[str, Any]] = [self._clean_alias(alias) for alias in aliases or []]
+        self.leases: list[dict[str, Any]] = list(leases or [])
+        self.pending: set[str] = set()
+        self.applies = 0
+
+    #
+    # Aliases
+    #
+
+    @staticmethod
+    def _clean_alias(alias: dict[str, Any], partial: bool = False) -> dict[str, Any]:
+        fields = {"name", "type", "descr", "address", "detail"}
+        clean = {key: value for key, value in alias.items() if key in fields}
+        if not partial:
+            for key in ("name", "type"):
+                if not clean.get(key):
+                    raise StateError(400, f"Field '{key}' is required.", "FIELD_REQUIRED")
+            clean.setdefault("descr", "")
+            clean.setdefault("address", [])
+            clean.setdefault("detail", [])
+        if "type" in clean and clean["type"] not in ALIAS_TYPES:
+            raise StateError(400, f"Field 'type' must be one of {', '.join(ALIAS_TYPES)}.", "FIELD_INVALID_CHOICE")
+        if "address" in clean:
+            clean["address"] = _listify(clean["address"], " ")
+        if "detail" in clean:
+            clean["detail"] = _listify(clean["detail"], "||")
+        if clean.get("descr") is None and "descr" in clean:
+            clean["descr"] = ""
+        return clean
+
+    def alias_view(self, index: int) -> dict[str, Any]:
+        return {"id": index, **self.aliases[index]}
+
+    def _index(self, alias_id: Any) -> int:
+        try:
+            index = int(alias_id)
+        except (TypeError, ValueError):
+            raise StateError(400, "Field 'id' must be an integer.", "FIELD_INVALID_TYPE")
+        if not 0 <= index < len(self.aliases):
+            raise StateError(404, f"Object with ID '{alias_id}' does not exist.", "MODEL_OBJECT_NOT_FOUND")
+        return index
+
+    def index_by_name(self, name: Any) -> int:
+        for index, alias in enumerate(self.aliases):
+            if alias["name"] == name:
+                return index
+        raise StateError(404, f"Alias '{name}' does not exist.", "MODEL_OBJECT_NOT_FOUND")
+
+    def _check_unique(self, name: str, index: int | None = None) -> None:
+        for i, alias in enumerate(self.aliases):
+            if alias["name"] == name and i != index:
+                raise StateError(400, f"Alias name '{name}' is already in use.", "FIREWALL_ALIAS_NAME_EXISTS")
+
+    def get_alias(self, alias_id: Any) -> dict[str, Any]:
+        with self.lock:
+            return self.alias_view(self._index(alias_id))
+
+    def create_alias(self, alias: dict[str, Any]) -> dict[str, Any]:
+        clean = self._clean_alias(alias)
+        with self.lock:
+            self._check_unique(clean["name"])
+            self.aliases.append(clean)
+            self.pending.add("firewall")
+            return self.alias_view(len(self.aliases) - 1)
+
+    def update_alias(self, index: int, changes: dict[str, Any]) -> dict[str, Any]:
+        clean = self._clean_alias(changes, partial=True)
+        with self.lock:
+            if "name" in clean:
+                self._check_unique(clean["name"], index)
+            self.aliases[index] = {**self.aliases[index], **clean}
+            self.pending.add("firewall")
+            return self.alias_view(index)
+
+    def patch_alias(self, changes: dict[str, Any]) -> dict[str, Any]:
+        with self.lock:
+            return self.update_alias(self._index(changes.get("id")), changes)
+
+    def delete_alias(self, alias_id: Any) -> dict[str, Any]:
+        with self.lock:
+            index = self._index(alias_id)
+            deleted = self.alias_view(index)
+            del self.aliases[index]
+            self.pending.add("firewall")
+            return deleted
+
+    def replace_aliases(self, aliases: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        clean = [self._clean_alias(alias) for alias in aliases]
+        names = [alias["name"] for alias in clean]
+        if len(set(names)) != len(names):
+            raise StateError(400, "Alias names must be unique.", "FIREWALL_ALIAS_NAME_EXISTS")
+        with self.lock:
+            self.aliases = clean
+            self.pending.add("firewall")
+            return [self.alias_view(i) for i in range(len(clean))]
+
+    def query_aliases(self, query: dict[str, list[str]], limit: int = 0, offset: int = 0) -> list[dict[str, Any]]:
+        with self.lock:
+            matches = [self.alias_view(i) for i in range(len(self.aliases))]
+        return paginate(filter_objects(matches, query), limit, offset)
+
+    def delete_aliases(self, query: dict[str, list[str]], limit: int = 0, offset: int = 0) -> list[dict[str, Any]]:
+        with self.lock:
+            doomed = self.query_aliases(query, limit, offset)
+            ids = {alias["id"] for alias in doomed}
+            self.aliases = [alias for i, alias in enumerate(self.aliases) if i not in ids]
+            if doomed:
+                self.pending.add("firewall")
+            return doomed
+
+    def add_alias_entries(self, name: Any, address: Any, detail: Any = None) -> dict[str, Any]:
+        with self.lock:
+            index = self.index_by_name(name)
+            alias = self.aliases[index]
+            added = _listify(address, " ")
+            details = _listify(detail, "||")
+            details += [""] * (len(added) - len(details))
+            self.aliases[index] = {
+                **alias,
+                "address": alias["address"] + added,
+                "detail": alias["detail"] + details[: len(added)],
+            }
+            self.pending.add("firewall")
+            return self.alias_view(index)
+
+    def remove_alias_entries(self, name: Any, address: Any) -> dict[str, Any]:
+        with self.lock:
+            index = self.index_by_name(name)
+            alias = self.aliases[index]
+            removed = set(_listify(address, " "))
+            details = alias["detail"] + [""] * (len(alias["address"]) - len(alias["detail"]))
+            kept = [(a, d) for a, d in zip(alias["address"], details) if a not in removed]
+            self.aliases[index] = {**alias, "address": [a for a, _ in kept], "detail": [d for _, d in kept]}
+            self.pending.add("firewall")
+            return self.alias_view(index)
+
+    #
+    # Apply
+    #
+
+    def apply_status(self) -> dict[str, Any]:
+        with self.lock:
+            return {"applied": not self.pending, "pending_subsystems": sorted(self.pending)}
+
+    def apply(self) -> dict[str, Any]:
+        with self.lock:
+            self.pending.clear()
+            self.applies += 1
+            return self.apply_status()
+
+    #
+    # DHCP leases
+    #
+
+    def query_leases(
+        self,
+        query: dict[str, list[str]],
+        limit: int = 0,
+        offset: int = 0,
+        sort_by: list[str] | None = None,
+        descending: bool = False,
+    ) -> list[dict[str, Any]]:
+        with self.lock:
+            leases = self.leases
+        leases = filter_objects(leases, query)
+        if sort_by:
+            leases = sorted(leases, key=lambda lease: tuple(str(lease.get(field, "")) for field in sort_by))
+        if descending:
+            leases = list(reversed(leases))
+        return paginate(leases, limit, offset)
+
+
+def paginate(objects: list[Any], limit: int = 0, offset: int = 0) -> list[Any]:
+    """Apply V2 `limit`/`offset` semantics; a limit of 0 means no limit."""
+    if offset:
+        objects = objects[offset:]
+    if limit:
+        objects = objects[:limit]
+    return objects
+
+
+def filter_objects(objects: list[dict[str, Any]], query: dict[str, list[str]]) -> list[dict[str, Any]]:
+    """
+    Apply V2 query filters: `field=value` for equality, and `field__contains`, `field__startswith` and
+    `field__endswith`. List fields match if any element matches.
+    """
+    if not query:
+        return objects
+
+    tests = []
+    for key, values in query.items():
+        field, _, op = key.partition("__")
+        expected = values[-1]
+        if op in ("", "exact"):
+            tests.append((field, lambda actual, e=expected: actual == e))
+        elif op == "contains":
+            tests.append((field, lambda actual, e=expected: e in actual))
+        elif op == "startswith":
+            tests.append((field, lambda actual, e=expected: actual.startswith(e)))
+        elif op == "endswith":
+            tests.append((field, lambda actual, e=expected: actual.endswith(e)))
+        else:
+            raise StateError(400, f"Unsupported query filter '{op}'.", "INVALID_QUERY_FILTER")
+
+    def matches(obj: dict[str, Any]) -> bool:
+        for field, test in tests:
+            value = obj.get(field)
+            candidates = value if isinstance(value, list) else [value]
+            if not any(test(_text(candidate)) for candidate in candidates):
+                return False
+        return True
+
+    return [obj for obj in objects if matches(obj)]
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
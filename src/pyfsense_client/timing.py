@@ -0,0 +1,118 @@
+"""
+Transport hooks that split a request into connection, send, time-to-first-byte and read phases.
+
+`requests` does not expose these, so sessions of clients with metrics enabled mount a `TimedHTTPAdapter`
+whose urllib3 connections stamp the `PhaseClock` of the request running on the current thread. httpx
+reports the same events through its "trace" request extension, which `PhaseClock.httpx_trace` consumes.
+Without an active clock the hooks do nothing.
+
+The urllib3-based classes live in `pyfsense_client.adapters` and are re-exported here on first access, so
+the async clients can use `PhaseClock` without importing `requests`.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .lazy import lazy_exports
+from .metrics import RequestTiming
+
+_local = threading.local()
+
+
+class PhaseClock:
+    """Timestamps of one request's transport events, turned into phase durations by `apply()`."""
+
+    __slots__ = ("start", "_connect_start", "connect_before", "connect_during", "send_start", "send_end", "headers")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._connect_start: float | None = None
+        self.connect_before = 0.0
+        self.connect_during = 0.0
+        self.send_start: float | None = None
+        self.send_end: float | None = None
+        self.headers: float | None = None
+
+    def connect_started(self) -> None:
+        self._connect_start = time.perf_counter()
+
+    def connect_finished(self) -> None:
+        if self._connect_start is None:
+            return
+        elapsed = time.perf_counter() - self._connect_start
+        self._connect_start = None
+        # urllib3 connects plain HTTP lazily from inside `request()`, which must not count as sending
+        if self.send_start is None:
+            self.connect_before += elapsed
+        else:
+            self.connect_during += elapsed
+
+    def sending(self) -> None:
+        self.send_start = time.perf_counter()
+
+    def sent(self) -> None:
+        self.send_end = time.perf_counter()
+
+    def headers_received(self) -> None:
+        self.headers = time.perf_counter()
+
+    def apply(self, timing: RequestTiming, end: float | None = None) -> None:
+        """Fill the transport phases of `timing`; those without the events they need are left unset."""
+        end = time.perf_counter() if end is None else end
+        connect = self.connect_before + self.connect_during
+        if connect:
+            timing.connect = connect
+        if self.send_start is None or self.send_end is None or self.headers is None:
+            return
+        timing.acquire = max(0.0, self.send_start - self.start - self.connect_before)
+        timing.send = max(0.0, self.send_end - self.send_start - self.connect_during)
+        timing.ttfb = max(0.0, self.headers - self.send_end)
+        timing.read = max(0.0, end - self.headers)
+
+    async def httpx_trace(self, event: str, info: dict[str, Any]) -> None:
+        """httpx/httpcore "trace" extension callback."""
+        _, _, name = event.partition(".")
+        if name == "connect_tcp.started":
+            self.connect_started()
+        elif name in ("connect_tcp.complete", "start_tls.started"):
+            self.connect_finished()
+            if name == "start_tls.started":
+                self.connect_started()
+        elif name == "start_tls.complete":
+            self.connect_finished()
+        elif name == "send_request_headers.started":
+            self.sending()
+        elif name == "send_request_body.complete":
+            self.sent()
+        elif name == "receive_response_headers.complete":
+            self.headers_received()
+
+
+@contextmanager
+def tracking(clock: PhaseClock) -> Iterator[PhaseClock]:
+    """Make `clock` receive the events of connections used by the current thread."""
+    previous = getattr(_local, "clock", None)
+    _local.clock = clock
+    try:
+        yield clock
+    finally:
+        _local.clock = previous
+
+
+def _clock() -> PhaseClock | None:
+    return getattr(_local, "clock", None)
+
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "TimedHTTPConnection": ".adapters",
+        "TimedHTTPSConnection": ".adapters",
+        "TimedHTTPConnectionPool": ".adapters",
+        "TimedHTTPSConnectionPool": ".adapters",
+        "TimedHTTPAdapter": ".adapters",
+    },
+)
@@ -0,0 +1,99 @@
+"""
+Optional OpenTelemetry spans for API requests and multi-step operations.
+
+Clients created with `tracing=True` open a CLIENT span around every request (named "<METHOD> <endpoint>")
+and inject the current trace context into the request headers with the globally configured propagator
+(W3C `traceparent` by default), so firewall-side logs can be joined to the caller's trace. Operations
+made of several requests, such as fetching every page of a list or a write followed by
+`apply_firewall_changes`, can be grouped under a parent span with `client.span(name)`.
+
+Only the `opentelemetry-api` package is used. Without it, or with `tracing=False`, `make_tracer` returns
+None and the clients skip every tracing call.
+"""
+
+from collections.abc import Iterator, MutableMapping
+from contextlib import contextmanager
+from typing import Any
+
+from . import __version__
+
+# Imported by `_load_opentelemetry()` when the first tracer is created, so clients without tracing skip it
+propagate: Any = None
+trace: Any = None
+
+
+def _load_opentelemetry() -> bool:
+    """Import opentelemetry-api on first use; False if it is not installed."""
+    global propagate, trace
+    if trace is None:
+        try:
+            from opentelemetry import propagate as otel_propagate, trace as otel_trace
+        except ImportError:  # pragma: no cover - optional dependency
+            return False
+        propagate, trace = otel_propagate, otel_trace
+    return True
+
+
+class Tracer:
+    """
+    Creates pyfsense spans on an OpenTelemetry tracer.
+
+    Args:
+        tracer_provider (Any): Provider to get the tracer from. Defaults to the global provider.
+    """
+
+    def __init__(self, tracer_provider: Any = None):
+        if not _load_opentelemetry():
+            raise ImportError("Tracing requires the opentelemetry-api package.")
+        self._tracer = trace.get_tracer("pyfsense_client", __version__, tracer_provider=tracer_provider)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Run the enclosed block in an INTERNAL span; exceptions are recorded on it."""
+        with self._tracer.start_as_current_span(name, attributes=_attributes(attributes)) as span:
+            yield span
+
+    @contextmanager
+    def request(self, method: str, endpoint: str, host: str) -> Iterator[Any]:
+        """Run the enclosed request in a CLIENT span with the HTTP method, endpoint and host."""
+        attributes = {"http.request.method": method.upper(), "url.path": endpoint, "server.address": host}
+        with self._tracer.start_as_current_span(
+            f"{method.upper()} {endpoint}", kind=trace.SpanKind.CLIENT, attributes=attributes
+        ) as span:
+            yield span
+
+    def inject(self, headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+        """Add the current trace context to `headers` and return them."""
+        propagate.inject(headers)
+        return headers
+
+    def annotate(
+        self,
+        status: int | None = None,
+        request_bytes: int | None = None,
+        response_bytes: int | None = None,
+    ) -> None:
+        """Record the outcome of the HTTP exchange on the current request span."""
+        span = trace.get_current_span()
+        if status is not None:
+            span.set_attribute("http.response.status_code", status)
+        if request_bytes is not None:
+            span.set_attribute("http.request.body.size", request_bytes)
+        if response_bytes is not None:
+            span.set_attribute("http.response.body.size", response_bytes)
+
+
+def _attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    """Namespace span attributes and drop values OpenTelemetry cannot store."""
+    return {
+        name if "." in name else f"pyfsense.{name}": value
+        for name, value in attributes.items()
+        if isinstance(value, (str, bool, int, float))
+    }
+
+
+def make_tracer(enabled: bool, tracer_provider: Any = None) -> Tracer | None:
+    """Build the tracer described by client config fields, or None if tracing is off or unavailable."""
+    if not enabled or not _load_opentelemetry():
+        return None
+    return Tracer(tracer_provider)
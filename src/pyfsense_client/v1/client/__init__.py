@@ -1,6 +1,12 @@
-from .abc import ClientABC
-from .types import ClientConfig, APIResponse, load_client_config
-from .client import PfSenseV1Client, ClientBase
+from typing import TYPE_CHECKING
+
+from ...lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .abc import ClientABC
+    from .types import ClientConfig, APIResponse, load_client_config
+    from .client import PfSenseV1Client, ClientBase
+    from .async_client import AsyncPfSenseV1Client, AsyncClientBase
 
 __all__ = [
     "ClientABC",
@@ -9,4 +15,20 @@ __all__ = [
     "load_client_config",
     "PfSenseV1Client",
     "ClientBase",
+    "AsyncPfSenseV1Client",
+    "AsyncClientBase",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "ClientABC": ".abc",
+        "ClientConfig": ".types",
+        "APIResponse": ".types",
+        "load_client_config": ".types",
+        "PfSenseV1Client": ".client",
+        "ClientBase": ".client",
+        "AsyncPfSenseV1Client": ".async_client",
+        "AsyncClientBase": ".async_client",
+    },
+)
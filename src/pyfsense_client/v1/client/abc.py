@@ -1,4 +1,6 @@
 from __future__ import annotations
+from collections.abc import Iterator
+from typing import Any
 from requests import Response
 from abc import ABC, abstractmethod
 from .types import APIResponse
@@ -9,6 +11,10 @@ class ClientABC(ABC):
     def _request(self, url, method="GET", payload=None, params=None, **kwargs) -> Response:
         pass
 
+    @abstractmethod
+    def _stream(self, url, method="GET", payload=None, params=None, chunk_size=65536) -> Iterator[Any]:
+        pass
+
     @abstractmethod
     def call(self, url, method="GET", payload=None) -> APIResponse:
         pass
@@ -0,0 +1,399 @@
+from __future__ import annotations
+import logging
+import time
+from contextlib import AbstractContextManager, asynccontextmanager, contextmanager, nullcontext
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, ConnectTimeout, HTTPError, ReadTimeout
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from ...cache import make_cache, request_key
+from ...codec import get_codec
+from ...hedging import Hedger
+from ...limiter import limiter_for_host
+from ...metrics import RequestTiming, default_registry
+from ...singleflight import AsyncSingleFlight
+from ...streaming import JSONArrayStream
+from ...tracing import make_tracer
+from ...timing import PhaseClock
+from .abc import ClientABC
+from .client import _check_api_envelope
+from .types import ClientConfig, APIResponse
+from ..mixins import (
+    DNSMixin,
+    FirewallMixin,
+    FirewallAliasMixin,
+    InterfaceMixin,
+    RoutingMixin,
+    ServiceMixin,
+    StatusMixin,
+    SystemMixin,
+    UserMixin,
+)
+
+
+@contextmanager
+def _requests_errors() -> Iterator[None]:
+    """Re-raise httpx transport errors as the `requests` exceptions the sync client raises for them."""
+    try:
+        yield
+    except httpx.ConnectTimeout as exc:
+        raise ConnectTimeout(str(exc)) from exc
+    except httpx.TimeoutException as exc:
+        raise ReadTimeout(str(exc)) from exc
+    except httpx.TransportError as exc:
+        raise RequestsConnectionError(str(exc)) from exc
+
+
+class AsyncClientBase(ClientABC):
+    """
+    Asyncio counterpart of `ClientBase`.
+
+    `_request` and `call` are coroutines, so every mixin method (which returns `self.call(...)`) becomes awaitable.
+    All calls made through one client share a single pooled `httpx.AsyncClient` for the configured host.
+    Transport errors are raised as the same `requests` exceptions the sync client raises.
+    """
+
+    def __init__(self, config: ClientConfig):
+        if httpx is None:
+            raise ImportError("AsyncPfSenseV1Client requires httpx. Install it with 'pip install pyfsense-client[async]'.")
+
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.codec = get_codec(self.config.json_codec)
+        self.cache = make_cache(self.config.cache_ttl, self.config.cache_maxsize, self.config.cache_ttls)
+        self.metrics = default_registry() if self.config.collect_metrics else None
+        self.tracer = make_tracer(self.config.tracing)
+        self.singleflight = AsyncSingleFlight() if self.config.coalesce_requests else None
+        self.hedger = (
+            Hedger(self.config.hedge_percentile, self.config.hedge_min_delay, max_workers=2 * self.config.pool_maxsize)
+            if self.config.hedge_requests
+            else None
+        )
+        max_limit = self.config.max_concurrency or self.config.pool_maxsize
+        self.limiter = (
+            limiter_for_host(self.baseurl, initial=min(self.config.concurrency_limit, max_limit), max_limit=max_limit)
+            if self.config.adaptive_concurrency
+            else None
+        )
+
+        if self.config.mode == "local" and not (self.config.username and self.config.password):
+            raise ValueError("Authentication Mode is set to local but username or password are missing.")
+
+        limits = httpx.Limits(
+            max_connections=self.config.pool_maxsize if self.config.pool_block else None,
+            max_keepalive_connections=self.config.pool_maxsize if self.config.keep_alive else 0,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        transport = None
+        if self.config.cassette_path:
+            # Imported here: the cassette module also loads `requests` for the sync adapter
+            from ...cassette import AsyncCassetteTransport, Cassette
+
+            transport = AsyncCassetteTransport(
+                Cassette(self.config.cassette_path, self.config.cassette_mode),
+                httpx.AsyncHTTPTransport(verify=self.config.verify_ssl, limits=limits),
+                self.config.cassette_latency,
+            )
+        self.session = httpx.AsyncClient(
+            auth=(self.config.username, self.config.password) if self.config.mode == "local" else None,
+            verify=self.config.verify_ssl,
+            follow_redirects=False,
+            headers=None if self.config.keep_alive else {"Connection": "close"},
+            limits=limits,
+            transport=transport,
+            timeout=self.config.timeout,
+        )
+
+    async def __aenter__(self) -> AsyncClientBase:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.session.aclose()
+
+    @property
+    def baseurl(self) -> str:
+        # Check if the port is set and is not the default HTTPS port (443)
+        if self.config.port and self.config.port != 443:
+            return f"https://{self.config.hostname}:{self.config.port}"
+        else:
+            return f"https://{self.config.hostname}"
+
+    def get_url(self, url: str) -> str:
+        assert url.startswith("/")
+        return f"{self.baseurl}{url}"
+
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager:
+        """
+        Group the requests made inside the block under one parent span. Does nothing unless tracing is enabled.
+
+        Example:
+            with client.span("block-host", address=ip):
+                await client.create_firewall_alias_entry("blocklist", ip, apply=False)
+                await client.apply_firewall_changes()
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    def _decode_json(self, response: httpx.Response) -> Any:
+        """Decode a response body with the configured codec, caching the result on the response."""
+        try:
+            return response._pyfsense_json  # type: ignore[attr-defined]
+        except AttributeError:
+            response._pyfsense_json = self.codec.loads(response.content)  # type: ignore[attr-defined]
+            return response._pyfsense_json  # type: ignore[attr-defined]
+
+    def _prepare_request(self, url, method="GET", payload=None, params=None, **kwargs) -> dict[str, Any]:
+        """Build the keyword arguments for `AsyncClient.request`, including the body and auth headers."""
+        url = self.get_url(url)
+        kwargs.setdefault("params", params)
+        body = kwargs.pop("json", payload if method != "GET" else None)
+        if body is not None:
+            kwargs.setdefault("content", self.codec.dumps(body))
+        headers = kwargs.setdefault("headers", {})
+        headers.setdefault("Content-Type", "application/json")
+
+        if self.config.mode == "jwt":
+            headers["Authorization"] = f"Bearer {self.config.jwt}"
+        elif self.config.mode == "api_token":
+            headers["Authorization"] = f"{self.config.client_id} {self.config.client_token}"
+        if self.tracer is not None:
+            self.tracer.inject(headers)
+
+        return dict(url=url, method=method, **kwargs)
+
+    async def _request(self, url, method="GET", payload=None, params=None, **kwargs) -> httpx.Response:
+        """Send a request and return the checked response, in its own span when tracing is enabled."""
+        if self.tracer is None:
+            return await self._dispatch(url, method, payload, params, **kwargs)
+        with self.tracer.request(method, url, self.baseurl):
+            return await self._dispatch(url, method, payload, params, **kwargs)
+
+    async def _dispatch(self, url, method="GET", payload=None, params=None, **kwargs) -> httpx.Response:
+        """
+        Send a request and return the checked response.
+
+        Plain GETs are served from `self.cache` when it is enabled, and identical GETs already in flight
+        share one round trip through `self.singleflight`. Any other method invalidates the cached entries
+        for the same resource.
+        """
+        if method.upper() != "GET":
+            try:
+                return await self._send(url, method, payload, params, **kwargs)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(url)
+        if kwargs:
+            # Requests with custom transport options are never cached, shared or hedged
+            return await self._send(url, method, payload, params, **kwargs)
+        if self.cache is None and self.singleflight is None:
+            return await self._fetch(url, method, params)
+
+        key = request_key(method, url, params)
+        generation = None
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+            # A write landing while this GET is in flight bumps the generation and keeps the reply out
+            generation = self.cache.generation()
+        if self.singleflight is not None:
+            response = await self.singleflight.do(key, lambda: self._fetch(url, method, params))
+        else:
+            response = await self._fetch(url, method, params)
+        if self.cache is not None:
+            self.cache.set(key, response, generation)
+        return response
+
+    async def _fetch(self, url, method="GET", params=None) -> httpx.Response:
+        """Send a GET, hedged through `self.hedger` when it is enabled. GETs carry no body."""
+        if self.hedger is None:
+            return await self._send(url, method, None, params)
+        return await self.hedger.acall(lambda: self._send(url, method, None, params))
+
+    async def _send(self, url, method="GET", payload=None, params=None, **kwargs) -> httpx.Response:
+        request_kwargs = self._prepare_request(url, method, payload, params, **kwargs)
+        body = request_kwargs.get("content") or b""
+        measured = (
+            self.metrics.measure(method, url, self.baseurl, len(body)) if self.metrics is not None else nullcontext()
+        )
+        with measured as timing:
+            response = await self._http(url, timing, **request_kwargs)
+            if self.tracer is not None:
+                self.tracer.annotate(response.status_code, len(body), len(response.content))
+            return self._check_response(response, timing)
+
+    async def _http(self, endpoint: str, timing: RequestTiming | None = None, **kwargs: Any) -> httpx.Response:
+        """
+        Perform one HTTP exchange, admitted by `self.limiter` when adaptive concurrency is enabled.
+
+        If `timing` is given, the transport phases, status and response size are recorded on it.
+        """
+        if timing is None:
+            return await self._exchange(endpoint, **kwargs)
+        clock = PhaseClock()
+        response = await self._exchange(endpoint, extensions={"trace": clock.httpx_trace}, **kwargs)
+        clock.apply(timing)
+        timing.status = response.status_code
+        timing.response_bytes = len(response.content)
+        return response
+
+    async def _exchange(self, endpoint: str, **kwargs: Any) -> httpx.Response:
+        """Send the request through the session, holding a limiter slot if there is one."""
+        with _requests_errors():
+            if self.limiter is None:
+                return await self.session.request(**kwargs)
+            async with self.limiter.slot(endpoint) as slot:
+                response = await self.session.request(**kwargs)
+                slot.observe(response.status_code, response.headers.get("Retry-After"))
+            return response
+
+    def _check_response(self, response: httpx.Response, timing: RequestTiming | None = None) -> httpx.Response:
+        """
+        Raise CustomHTTPError/HTTPError for API or HTTP errors, otherwise return the response.
+
+        If `timing` is given, the time spent decoding the JSON body is recorded on it.
+        """
+        # Attempt to parse the JSON response, regardless of status code
+        try:
+            start = time.perf_counter()
+            response_data = self._decode_json(response)
+            if timing is not None:
+                timing.decode = time.perf_counter() - start
+            self.logger.debug("API response: %s", response_data)
+        except ValueError:
+            self.logger.debug("Non-JSON response: %s", response.text)
+            if not response.is_success:
+                # If status code is not 2xx, raise HTTPError
+                raise HTTPError(f"{response.status_code} Error for url: {response.url}", response=response)
+            else:
+                # If status code is 2xx but response isn't JSON, return the raw response
+                return response
+
+        # Check for API-specific error information in the response
+        _check_api_envelope(response, response_data)
+
+        # If the HTTP status code is not 2xx, raise HTTPError
+        if not response.is_success:
+            raise HTTPError(f"{response.status_code} Error for url: {response.url}", response=response)
+
+        return response
+
+    async def _stream(self, url, method="GET", payload=None, params=None, chunk_size=65536) -> AsyncIterator[Any]:
+        """
+        Send a request and yield the items of the response `data` list as they are decoded.
+
+        The body is read incrementally, so memory stays flat regardless of the response size. Like `_request`,
+        the request is traced, measured and admitted by the limiter; it holds its limiter slot until the body
+        has been read. Errors raise the same exceptions as `_request`.
+        """
+        traced = self.tracer.request(method, url, self.baseurl) if self.tracer is not None else nullcontext()
+        with traced, _requests_errors():
+            async with self._streaming(url, method, payload, params, chunk_size) as (response, chunks):
+                parser = JSONArrayStream("data")
+                async for chunk in chunks:
+                    items = parser.feed(chunk)
+                    if items:
+                        _check_api_envelope(response, parser.envelope)
+                    for item in items:
+                        yield item
+                for item in parser.close():
+                    yield item
+                _check_api_envelope(response, parser.envelope)
+
+    @asynccontextmanager
+    async def _streaming(
+        self, url, method, payload, params, chunk_size
+    ) -> AsyncIterator[tuple[httpx.Response, AsyncIterator[bytes]]]:
+        """
+        Send one streamed request and check its status; the block reads the body from the yielded chunks.
+
+        The limiter slot and the metrics timing span the whole block.
+        """
+        request_kwargs = self._prepare_request(url, method, payload, params)
+        body = request_kwargs.get("content") or b""
+        measured = (
+            self.metrics.measure(method, url, self.baseurl, len(body)) if self.metrics is not None else nullcontext()
+        )
+        admitted = self.limiter.slot(url) if self.limiter is not None else nullcontext()
+        received = 0
+
+        async def counted(response: httpx.Response) -> AsyncIterator[bytes]:
+            nonlocal received
+            async for chunk in response.aiter_bytes(chunk_size):
+                received += len(chunk)
+                yield chunk
+
+        with measured as timing:
+            async with admitted as slot:
+                clock = PhaseClock() if timing is not None else None
+                if clock is not None:
+                    request_kwargs["extensions"] = {"trace": clock.httpx_trace}
+                async with self.session.stream(**request_kwargs) as response:
+                    if slot is not None:
+                        slot.observe(response.status_code, response.headers.get("Retry-After"))
+                    if clock is not None:
+                        clock.apply(timing)
+                        timing.status = response.status_code
+                    try:
+                        if not response.is_success:
+                            received = len(await response.aread())
+                            self._check_response(response)
+                        yield response, counted(response)
+                    finally:
+                        if timing is not None:
+                            timing.response_bytes = received
+                        if self.tracer is not None:
+                            self.tracer.annotate(response.status_code, len(body), received)
+
+    async def call(self, url, method="GET", payload=None) -> APIResponse:
+        response = await self._request(url=url, method=method, payload=payload)
+        # If the response content is not JSON, return as is
+        if not response.headers.get("Content-Type", "").startswith("application/json"):
+            return response
+        if self.metrics is None:
+            return APIResponse.model_validate(self._decode_json(response))
+        start = time.perf_counter()
+        result = APIResponse.model_validate(self._decode_json(response))
+        self.metrics.observe(method, url, "validate", time.perf_counter() - start, self.baseurl)
+        return result
+
+
+class AsyncPfSenseV1Client(
+    AsyncClientBase,
+    DNSMixin,
+    FirewallMixin,
+    FirewallAliasMixin,
+    InterfaceMixin,
+    RoutingMixin,
+    ServiceMixin,
+    StatusMixin,
+    SystemMixin,
+    UserMixin,
+):
+    """Asyncio pfSense API Client. Every endpoint method returns an awaitable."""
+
+    async def request_access_token(self) -> APIResponse:
+        """gets a temporary access token
+        https://github.com/jaredhendrickson13/pfsense-api/blob/master/README.md#1-request-access-token
+        """
+        url = "/api/v1/access_token"
+        return await self.call(url=url, method="POST")
+
+    async def execute_shell_command(self, shell_cmd: str) -> APIResponse:
+        """execute a shell command on the firewall
+        https://github.com/jaredhendrickson13/pfsense-api/blob/master/README.md#1-execute-shell-command
+        """
+        url = "/api/v1/diagnostics/command_prompt"
+        method = "POST"
+        return await self.call(url=url, method=method, payload={"shell_cmd": shell_cmd})
@@ -1,11 +1,34 @@
 from __future__ import annotations
 import logging
-from json import JSONDecodeError
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
 from requests import Response, Session
 from requests.exceptions import HTTPError
 
+from ...alias_delta import (
+    STRATEGIES,
+    AliasDeltaResult,
+    AliasSnapshots,
+    choose_strategy,
+    chunks,
+    compute_alias_delta,
+)
+from ...batch import V1_SUBSYSTEMS, Batch, active_batch, defer_apply, note_write
+from ...cache import make_cache, request_key
+from ...cassette import Cassette, CassetteAdapter
+from ...codec import get_codec
+from ...hedging import Hedger
+from ...limiter import limiter_for_host
+from ...metrics import RequestTiming, default_registry
+from ...singleflight import SingleFlight
+from ...streaming import JSONArrayStream
+from ...tracing import make_tracer
+from ...timing import PhaseClock, TimedHTTPAdapter, tracking
 from .abc import ClientABC
 from .types import ClientConfig, APIResponse
+from ..models import FirewallAliasUpdate
 from ..mixins import (
     DNSMixin,
     FirewallMixin,
@@ -32,10 +55,57 @@ class CustomHTTPError(HTTPError):
         return f"{base_str} (API Code: {self.api_code}, Return Code: {self.return_code}, Message: {self.api_message})"
 
 
+def _check_api_envelope(response, envelope: dict[str, Any]) -> None:
+    """Raise CustomHTTPError if the API envelope reports a non-200 code."""
+    if "code" in envelope and envelope["code"] != 200:
+        raise CustomHTTPError(
+            response=response,
+            api_code=envelope.get("code"),
+            return_code=envelope.get("return_code"),
+            api_message=envelope.get("message"),
+            api_data=envelope.get("data"),
+        )
+
+
 class ClientBase(ClientABC):
+    """
+    Synchronous transport for the v1 mixins.
+
+    A single instance is safe to share between threads; connections are pooled per host
+    according to the `pool_*` settings of `ClientConfig`.
+    """
+
     def __init__(self, config: ClientConfig):
         self.config = config
         self.session = Session()
+        self.codec = get_codec(self.config.json_codec)
+        self.cache = make_cache(self.config.cache_ttl, self.config.cache_maxsize, self.config.cache_ttls)
+        self.metrics = default_registry() if self.config.collect_metrics else None
+        self.tracer = make_tracer(self.config.tracing)
+        self.singleflight = SingleFlight() if self.config.coalesce_requests else None
+        self.alias_snapshots = AliasSnapshots(self.config.alias_cache_ttl) if self.config.alias_cache_ttl else None
+        self.hedger = (
+            Hedger(self.config.hedge_percentile, self.config.hedge_min_delay, max_workers=2 * self.config.pool_maxsize)
+            if self.config.hedge_requests
+            else None
+        )
+        max_limit = self.config.max_concurrency or self.config.pool_maxsize
+        self.limiter = (
+            limiter_for_host(self.baseurl, initial=min(self.config.concurrency_limit, max_limit), max_limit=max_limit)
+            if self.config.adaptive_concurrency
+            else None
+        )
+        adapter = TimedHTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block,
+        )
+        if self.config.cassette_path:
+            cassette = Cassette(self.config.cassette_path, self.config.cassette_mode)
+            adapter = CassetteAdapter(cassette, adapter, self.config.cassette_latency)
+        self.session.mount("https://", adapter)
+        if not self.config.keep_alive:
+            self.session.headers["Connection"] = "close"
         self.logger = logging.getLogger(__name__)
 
         if self.config.mode == "local" and not (self.config.username and self.config.password):
@@ -56,10 +126,48 @@ class ClientBase(ClientABC):
         assert url.startswith("/")
         return f"{self.baseurl}{url}"
 
-    def _request(self, url, method="GET", payload=None, params=None, **kwargs) -> Response:
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager:
+        """
+        Group the requests made inside the block under one parent span. Does nothing unless tracing is enabled.
+
+        Example:
+            with client.span("block-host", address=ip):
+                client.create_firewall_alias_entry("blocklist", ip, apply=False)
+                client.apply_firewall_changes()
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    def batch(self, parallelism: int = 4) -> Batch:
+        """
+        Defer applies while making many writes: inside the block, writes are sent with `apply` off, and each
+        subsystem they changed is applied once on exit. Calls made on the batch itself run concurrently.
+        See `pyfsense_client.batch`.
+
+        Example:
+            with client.batch() as batch:
+                for name, addresses in blocklists.items():
+                    batch.create_firewall_alias_entry(name, addresses)
+        """
+        return Batch(self, V1_SUBSYSTEMS, parallelism)
+
+    def _decode_json(self, response: Response) -> Any:
+        """Decode a response body with the configured codec, caching the result on the response."""
+        try:
+            return response._pyfsense_json  # type: ignore[attr-defined]
+        except AttributeError:
+            response._pyfsense_json = self.codec.loads(response.content)  # type: ignore[attr-defined]
+            return response._pyfsense_json  # type: ignore[attr-defined]
+
+    def _prepare_request(self, url, method="GET", payload=None, params=None, **kwargs) -> dict[str, Any]:
+        """Build the keyword arguments for `Session.request`, including the body and auth headers."""
         url = self.get_url(url)
         kwargs.setdefault("params", params)
-        kwargs.setdefault("json", payload if method != "GET" else None)
+        kwargs.setdefault("timeout", self.config.timeout)
+        body = kwargs.pop("json", payload if method != "GET" else None)
+        if body is not None:
+            kwargs.setdefault("data", self.codec.dumps(body))
         headers = kwargs.setdefault("headers", {})
         headers.setdefault("Content-Type", "application/json")
 
@@ -67,21 +175,116 @@ class ClientBase(ClientABC):
             headers["Authorization"] = f"Bearer {self.config.jwt}"
         elif self.config.mode == "api_token":
             headers["Authorization"] = f"{self.config.client_id} {self.config.client_token}"
+        if self.tracer is not None:
+            self.tracer.inject(headers)
+
+        return dict(url=url, method=method, allow_redirects=False, verify=self.config.verify_ssl, **kwargs)
+
+    def _request(self, url, method="GET", payload=None, params=None, **kwargs) -> Response:
+        """Send a request and return the checked response, in its own span when tracing is enabled."""
+        if self.tracer is None:
+            return self._dispatch(url, method, payload, params, **kwargs)
+        with self.tracer.request(method, url, self.baseurl):
+            return self._dispatch(url, method, payload, params, **kwargs)
+
+    def _dispatch(self, url, method="GET", payload=None, params=None, **kwargs) -> Response:
+        """
+        Send a request and return the checked response.
+
+        Plain GETs are served from `self.cache` when it is enabled, and identical GETs already in flight
+        share one round trip through `self.singleflight`. Any other method invalidates the cached entries
+        for the same resource, and a write to an alias discards the alias snapshots.
+        """
+        if method.upper() != "GET":
+            payload = defer_apply(self, payload)
+            try:
+                response = self._send(url, method, payload, params, **kwargs)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(url)
+                if self.alias_snapshots is not None and url.startswith("/api/v1/firewall/alias"):
+                    self.alias_snapshots.clear()
+            note_write(self, url)
+            return response
+        if kwargs:
+            # Requests with custom transport options are never cached, shared or hedged
+            return self._send(url, method, payload, params, **kwargs)
+        if self.cache is None and self.singleflight is None:
+            return self._fetch(url, method, params)
+
+        key = request_key(method, url, params)
+        generation = None
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+            # A write landing while this GET is in flight bumps the generation and keeps the reply out
+            generation = self.cache.generation()
+        if self.singleflight is not None:
+            response = self.singleflight.do(key, lambda: self._fetch(url, method, params))
+        else:
+            response = self._fetch(url, method, params)
+        if self.cache is not None:
+            self.cache.set(key, response, generation)
+        return response
+
+    def _fetch(self, url, method="GET", params=None) -> Response:
+        """Send a GET, hedged through `self.hedger` when it is enabled. GETs carry no body."""
+        if self.hedger is None:
+            return self._send(url, method, None, params)
+        return self.hedger.call(lambda: self._send(url, method, None, params))
 
-        response = self.session.request(
-            url=url,
-            method=method,
-            allow_redirects=False,
-            verify=self.config.verify_ssl,
-            **kwargs,
+    def _send(self, url, method="GET", payload=None, params=None, **kwargs) -> Response:
+        request_kwargs = self._prepare_request(url, method, payload, params, **kwargs)
+        body = request_kwargs.get("data") or b""
+        measured = (
+            self.metrics.measure(method, url, self.baseurl, len(body)) if self.metrics is not None else nullcontext()
         )
+        with measured as timing:
+            response = self._http(url, timing, **request_kwargs)
+            if self.tracer is not None:
+                self.tracer.annotate(response.status_code, len(body), len(response.content))
+            return self._check_response(response, timing)
 
+    def _http(self, endpoint: str, timing: RequestTiming | None = None, **kwargs: Any) -> Response:
+        """
+        Perform one HTTP exchange, admitted by `self.limiter` when adaptive concurrency is enabled.
+
+        If `timing` is given, the transport phases, status and response size are recorded on it.
+        """
+        if timing is None:
+            return self._exchange(endpoint, **kwargs)
+        with tracking(PhaseClock()) as clock:
+            response = self._exchange(endpoint, **kwargs)
+        clock.apply(timing)
+        timing.status = response.status_code
+        timing.response_bytes = len(response.content)
+        return response
+
+    def _exchange(self, endpoint: str, **kwargs: Any) -> Response:
+        """Send the request through the session, holding a limiter slot if there is one."""
+        if self.limiter is None:
+            return self.session.request(**kwargs)
+        with self.limiter.slot(endpoint) as slot:
+            response = self.session.request(**kwargs)
+            slot.observe(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    def _check_response(self, response: Response, timing: RequestTiming | None = None) -> Response:
+        """
+        Raise CustomHTTPError/HTTPError for API or HTTP errors, otherwise return the response.
+
+        If `timing` is given, the time spent decoding the JSON body is recorded on it.
+        """
         # Attempt to parse the JSON response, regardless of status code
         try:
-            response_data = response.json()
-            self.logger.debug(f"API response: {response_data}")
-        except JSONDecodeError:
-            self.logger.debug(f"Non-JSON response: {response.text}")
+            start = time.perf_counter()
+            response_data = self._decode_json(response)
+            if timing is not None:
+                timing.decode = time.perf_counter() - start
+            self.logger.debug("API response: %s", response_data)
+        except ValueError:
+            self.logger.debug("Non-JSON response: %s", response.text)
             if not response.ok:
                 # If status code is not 2xx, raise HTTPError
                 response.raise_for_status()
@@ -90,14 +293,7 @@ class ClientBase(ClientABC):
                 return response
 
         # Check for API-specific error information in the response
-        if "code" in response_data and response_data["code"] != 200:
-            raise CustomHTTPError(
-                response=response,
-                api_code=response_data.get("code"),
-                return_code=response_data.get("return_code"),
-                api_message=response_data.get("message"),
-                api_data=response_data.get("data"),
-            )
+        _check_api_envelope(response, response_data)
 
         # If the HTTP status code is not 2xx, raise HTTPError
         if not response.ok:
@@ -105,12 +301,77 @@ class ClientBase(ClientABC):
 
         return response
 
+    def _stream(self, url, method="GET", payload=None, params=None, chunk_size=65536) -> Iterator[Any]:
+        """
+        Send a request and yield the items of the response `data` list as they are decoded.
+
+        The body is read incrementally, so memory stays flat regardless of the response size. Like `_request`,
+        the request is traced, measured and admitted by the limiter; it holds its limiter slot until the body
+        has been read. Errors raise the same exceptions as `_request`.
+        """
+        traced = self.tracer.request(method, url, self.baseurl) if self.tracer is not None else nullcontext()
+        with traced, self._streaming(url, method, payload, params, chunk_size) as (response, chunks):
+            parser = JSONArrayStream("data")
+            for chunk in chunks:
+                items = parser.feed(chunk)
+                if items:
+                    _check_api_envelope(response, parser.envelope)
+                yield from items
+            yield from parser.close()
+            _check_api_envelope(response, parser.envelope)
+
+    @contextmanager
+    def _streaming(self, url, method, payload, params, chunk_size) -> Iterator[tuple[Response, Iterator[bytes]]]:
+        """
+        Send one streamed request and check its status; the block reads the body from the yielded chunks.
+
+        The limiter slot and the metrics timing span the whole block.
+        """
+        request_kwargs = self._prepare_request(url, method, payload, params, stream=True)
+        body = request_kwargs.get("data") or b""
+        measured = (
+            self.metrics.measure(method, url, self.baseurl, len(body)) if self.metrics is not None else nullcontext()
+        )
+        admitted = self.limiter.slot(url) if self.limiter is not None else nullcontext()
+        received = 0
+
+        def counted(response: Response) -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size):
+                received += len(chunk)
+                yield chunk
+
+        with measured as timing, admitted as slot:
+            with tracking(PhaseClock()) if timing is not None else nullcontext() as clock:
+                response = self.session.request(**request_kwargs)
+            if slot is not None:
+                slot.observe(response.status_code, response.headers.get("Retry-After"))
+            if timing is not None:
+                clock.apply(timing)
+                timing.status = response.status_code
+            with response:
+                try:
+                    if not response.ok:
+                        received = len(response.content)
+                        self._check_response(response)
+                    yield response, counted(response)
+                finally:
+                    if timing is not None:
+                        timing.response_bytes = received
+                    if self.tracer is not None:
+                        self.tracer.annotate(response.status_code, len(body), received)
+
     def call(self, url, method="GET", payload=None) -> APIResponse:
         response = self._request(url=url, method=method, payload=payload)
         # If the response content is not JSON, return as is
         if not response.headers.get("Content-Type", "").startswith("application/json"):
             return response
-        return APIResponse.model_validate(response.json())
+        if self.metrics is None:
+            return APIResponse.model_validate(self._decode_json(response))
+        start = time.perf_counter()
+        result = APIResponse.model_validate(self._decode_json(response))
+        self.metrics.observe(method, url, "validate", time.perf_counter() - start, self.baseurl)
+        return result
 
 
 class PfSenseV1Client(
@@ -134,6 +395,100 @@ class PfSenseV1Client(
         url = "/api/v1/access_token"
         return self.call(url=url, method="POST")
 
+    def apply_alias_delta(
+        self,
+        name: str,
+        add: Iterable[str] | Mapping[str, str] = (),
+        remove: Iterable[str] = (),
+        apply: bool = True,
+        strategy: str = "auto",
+        chunk_size: int = 1000,
+        refresh: bool = False,
+    ) -> AliasDeltaResult:
+        """
+        Add and remove entries of the alias called `name`, keeping `detail` aligned with `address`.
+
+        The alias is read first and the change computed against its entries, so entries it already holds are
+        neither re-added nor re-sent. With `alias_cache_ttl` set, the contents this client last read or wrote are
+        reused for that many seconds instead of reading again. It is then sent the cheaper way: entry requests of up to `chunk_size` addresses followed by one apply, or one
+        PUT of the complete alias. See `pyfsense_client.alias_delta`. Inside a batch, the apply is left to the
+        batch.
+
+        Args:
+            name (str): Name of the alias.
+            add (Iterable[str] | Mapping[str, str]): Addresses to add, or a mapping of address -> detail.
+            remove (Iterable[str]): Addresses to remove.
+            apply (bool): Apply the firewall changes afterwards.
+            strategy (str): 'auto', 'entries' or 'replace'.
+            chunk_size (int): Maximum number of addresses per entry request.
+            refresh (bool): Read the alias from the firewall even if `alias_cache_ttl` keeps a recent copy. Use it
+                when other clients may have changed the alias, as a replace would overwrite their changes.
+
+        Returns:
+            AliasDeltaResult: The strategy used and what changed.
+
+        Raises:
+            ValueError: If no alias is called `name`, an address is both added and removed, or `strategy` is
+                unknown.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        current = None if refresh or self.alias_snapshots is None else self.alias_snapshots.get(name)
+        if current is None:
+            current = self._read_alias(name)
+        delta = compute_alias_delta(current["address"], current["detail"], add, remove)
+        if not delta:
+            return AliasDeltaResult("none", 0, 0, 0, len(current["address"]))
+
+        apply_now = apply and active_batch(self) is None
+        if strategy == "auto":
+            strategy = choose_strategy(delta, chunk_size, extra_requests=int(apply_now))
+        writes = 0
+        if strategy == "entries":
+            for chunk in chunks(delta.removed, chunk_size):
+                self.delete_firewall_alias_entry(name, list(chunk), apply=False)
+                writes += 1
+            added = list(delta.added.items())
+            for chunk in chunks(added, chunk_size):
+                details = [detail for _, detail in chunk]
+                self.create_firewall_alias_entry(
+                    name, [address for address, _ in chunk], apply=False, detail=details if any(details) else None
+                )
+                writes += 1
+            if apply_now:
+                self.apply_firewall_changes()
+                writes += 1
+        else:
+            self.update_firewall_alias(
+                FirewallAliasUpdate(
+                    id=name,
+                    name=name,
+                    type=current["type"],
+                    descr=current["descr"],
+                    address=delta.address,
+                    detail=delta.detail,
+                    apply=apply,
+                )
+            )
+            writes += 1
+        if self.alias_snapshots is not None:
+            self.alias_snapshots.set(name, {**current, "address": delta.address, "detail": delta.detail})
+        return AliasDeltaResult(strategy, len(delta.added), len(delta.removed), writes, len(delta.address))
+
+    def _read_alias(self, name: str) -> dict[str, Any]:
+        """Read the alias called `name` as a dict with `address` and `detail` split into lists."""
+        for alias in self.get_firewall_alias().data or []:
+            if alias.get("name") == name:
+                address = (alias.get("address") or "").split()
+                detail = (alias.get("detail") or "").split("||") if address else []
+                snapshot = {**alias, "address": address, "detail": detail, "descr": alias.get("descr") or ""}
+                if self.alias_snapshots is not None:
+                    self.alias_snapshots.set(name, snapshot)
+                return snapshot
+        raise ValueError(f"No firewall alias named '{name}'.")
+
     def execute_shell_command(self, shell_cmd: str) -> APIResponse:
         """execute a shell command on the firewall
         https://github.com/jaredhendrickson13/pfsense-api/blob/master/README.md#1-execute-shell-command
@@ -2,7 +2,7 @@ from __future__ import annotations
 import json
 from typing import Any
 from pathlib import Path
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class ClientConfig(BaseModel):
@@ -18,6 +18,44 @@ class ClientConfig(BaseModel):
         jwt (Optional[str]): JWT token for authentication. Required if mode is 'jwt'.
         client_id (Optional[str]): Client ID for authentication. Required if mode is 'api_token'.
         client_token (Optional[str]): Client token for authentication. Required if mode is 'api_token'.
+        pool_connections (int): Number of per-host connection pools to keep. Defaults to 10.
+        pool_maxsize (int): Maximum number of connections kept open to the host. Defaults to 10.
+        pool_block (bool): Block when all `pool_maxsize` connections are busy instead of opening throwaway ones.
+        keep_alive (bool): Reuse connections between requests. Defaults to True.
+        keepalive_expiry (float): Seconds an idle connection is kept before being closed (async client only).
+        timeout (Optional[float]): Seconds to wait for the firewall to connect and to send each part of a response,
+            on both the sync and async clients. Defaults to None (wait indefinitely, as applies can be slow).
+        json_codec (str): JSON backend for request and response bodies: 'auto', 'orjson', 'msgspec' or 'json'.
+            'auto' uses the fastest installed backend.
+        cache_ttl (float): Seconds a GET response is served from the client-side cache. Defaults to 0 (disabled
+            for endpoints not listed in `cache_ttls`).
+        cache_maxsize (int): Maximum number of cached GET responses. Defaults to 256.
+        cache_ttls (Optional[dict[str, float]]): Per-endpoint TTL overrides keyed on path prefix,
+            e.g. {"/api/v1/status": 2}.
+        coalesce_requests (bool): Let identical GETs issued concurrently share one round trip. Every caller gets
+            the same response object, so shared results must not be mutated. Defaults to False.
+        hedge_requests (bool): Send a duplicate of a GET that is slower than `hedge_percentile` of recent
+            latency and use whichever answers first. Defaults to False.
+        hedge_percentile (float): Latency percentile after which a GET is hedged. Defaults to 95.
+        hedge_min_delay (float): Minimum seconds to wait before hedging. Defaults to 0.05.
+        adaptive_concurrency (bool): Limit requests in flight to the host with an AIMD limiter that grows while
+            responses are fast and backs off on 5xx, timeouts, slow responses and `Retry-After`. Defaults to False.
+        concurrency_limit (int): Starting limit for adaptive concurrency. Defaults to 4.
+        max_concurrency (Optional[int]): Upper bound for adaptive concurrency. Defaults to `pool_maxsize`.
+        collect_metrics (bool): Record a per-phase timing breakdown of every request in the process-wide
+            `pyfsense_client.metrics.default_registry()`. Defaults to False.
+        tracing (bool): Wrap every request in an OpenTelemetry span and propagate the trace context in request
+            headers. Has no effect unless `opentelemetry-api` is installed. Defaults to False.
+        cassette_path (Optional[str]): Cassette file to record traffic to or replay it from (see
+            `pyfsense_client.cassette`). Defaults to None (talk to the host normally).
+        cassette_mode (str): 'record' to append every exchange to the cassette, or 'replay' to serve responses
+            from it without any network access. Defaults to 'replay'.
+        cassette_latency (float): On replay, multiplier for the recorded response times: 1.0 reproduces the
+            original latency, 0 replays instantly. Defaults to 1.0.
+        alias_cache_ttl (float): Seconds `apply_alias_delta` trusts the contents it last read or wrote for an
+            alias instead of reading it again; writes the client makes to aliases discard them. Only safe if nothing
+            else changes the alias, as a replace would drop entries added elsewhere. Defaults to 0 (read the alias
+            on every call).
 
     Example config file:
     ```json
@@ -30,6 +68,8 @@ class ClientConfig(BaseModel):
     ```
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     username: str | None = None
     password: str | None = None
     hostname: str
@@ -39,6 +79,29 @@ class ClientConfig(BaseModel):
     client_id: str | None = None
     client_token: str | None = None
     verify_ssl: bool = True
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    keep_alive: bool = True
+    keepalive_expiry: float = 5.0
+    timeout: float | None = None
+    json_codec: str = "auto"
+    cache_ttl: float = 0.0
+    cache_maxsize: int = 256
+    cache_ttls: dict[str, float] | None = None
+    coalesce_requests: bool = False
+    hedge_requests: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.05
+    adaptive_concurrency: bool = False
+    concurrency_limit: int = 4
+    max_concurrency: int | None = None
+    collect_metrics: bool = False
+    tracing: bool = False
+    cassette_path: str | None = None
+    cassette_mode: str = "replay"
+    cassette_latency: float = 1.0
+    alias_cache_ttl: float = 0.0
 
     @model_validator(mode="after")
     def validate_config(cls, values: ClientConfig) -> ClientConfig:
@@ -84,6 +147,8 @@ class APIResponse(BaseModel):
     Standard JSON API response from the pfSense API.
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     status: str
     code: int
     return_code: int = Field(
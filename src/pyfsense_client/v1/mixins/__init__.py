@@ -1,12 +1,17 @@
-from .dns import DNSMixin
-from .firewall import FirewallMixin
-from .firewall_alias import FirewallAliasMixin
-from .interface import InterfaceMixin
-from .routing import RoutingMixin
-from .service import ServiceMixin
-from .status import StatusMixin
-from .system import SystemMixin
-from .user import UserMixin
+from typing import TYPE_CHECKING
+
+from ...lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .dns import DNSMixin
+    from .firewall import FirewallMixin
+    from .firewall_alias import FirewallAliasMixin
+    from .interface import InterfaceMixin
+    from .routing import RoutingMixin
+    from .service import ServiceMixin
+    from .status import StatusMixin
+    from .system import SystemMixin
+    from .user import UserMixin
 
 __all__ = [
     "DNSMixin",
@@ -19,3 +24,18 @@ __all__ = [
     "SystemMixin",
     "UserMixin",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "DNSMixin": ".dns",
+        "FirewallMixin": ".firewall",
+        "FirewallAliasMixin": ".firewall_alias",
+        "InterfaceMixin": ".interface",
+        "RoutingMixin": ".routing",
+        "ServiceMixin": ".service",
+        "StatusMixin": ".status",
+        "SystemMixin": ".system",
+        "UserMixin": ".user",
+    },
+)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 from pydantic import validate_call
 
@@ -156,6 +157,12 @@ class FirewallMixin(ClientABC):
         url = "/api/v1/firewall/states"
         return self.call(url=url, payload=kwargs)
 
+    def stream_firewall_states(self, **kwargs: dict[str, Any]) -> Iterator[Any]:
+        """Iterate over the current firewall states as they are decoded, without loading the whole response.
+        https://github.com/jaredhendrickson13/pfsense-api#1-read-firewall-states"""
+        url = "/api/v1/firewall/states"
+        return self._stream(url=url, payload=kwargs)
+
     def get_firewall_states_size(self, **kwargs: dict[str, Any]) -> APIResponse:
         """Read the maximum firewall state size, the current firewall state size, and the default firewall state size.
         https://github.com/jaredhendrickson13/pfsense-api#1-read-firewall-state-size"""
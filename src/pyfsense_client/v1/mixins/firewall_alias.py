@@ -44,11 +44,15 @@ class FirewallAliasMixin(ClientABC):
         return self.call(url=url, method=method, payload=payload)
 
     @validate_call
-    def create_firewall_alias_entry(self, name: str, address: str | list[str], apply: bool = True) -> APIResponse:
-        """Add new entries to an existing firewall alias."""
+    def create_firewall_alias_entry(
+        self, name: str, address: str | list[str], apply: bool = True, detail: str | list[str] | None = None
+    ) -> APIResponse:
+        """Add new entries to an existing firewall alias, with optional per-entry details."""
         method = "POST"
         url = "/api/v1/firewall/alias/entry"
         payload = {"name": name, "address": address, "apply": apply}
+        if detail is not None:
+            payload["detail"] = detail
         return self.call(url=url, method=method, payload=payload)
 
     @validate_call
@@ -1,5 +1,6 @@
 """status-related endpoints"""
 
+from collections.abc import Iterator
 from typing import Any, Dict, Optional
 from pydantic import validate_call
 
@@ -54,6 +55,12 @@ class StatusMixin(ClientABC):
         url = "/api/v1/status/log/firewall"
         return self.call(url=url, method="GET", payload=filterargs)
 
+    def stream_firewall_status_log(self, **filterargs: Dict[str, Any]) -> Iterator[Any]:
+        """Iterate over firewall log entries as they are decoded, without loading the whole response.
+        https://github.com/jaredhendrickson13/pfsense-api/blob/master/README.md#3-read-firewall-status-log"""
+        url = "/api/v1/status/log/firewall"
+        return self._stream(url=url, payload=filterargs)
+
     def get_system_status_log(self, **filterargs: Dict[str, Any]) -> APIResponse:
         """https://github.com/jaredhendrickson13/pfsense-api/blob/master/README.md#4-read-system-status-log"""
         url = "/api/v1/status/log/system"
@@ -1,9 +1,14 @@
-from .firewall_alias import (
-    AliasType,
-    FirewallAlias,
-    FirewallAliasCreate,
-    FirewallAliasUpdate,
-)
+from typing import TYPE_CHECKING
+
+from ...lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .firewall_alias import (
+        AliasType,
+        FirewallAlias,
+        FirewallAliasCreate,
+        FirewallAliasUpdate,
+    )
 
 __all__ = [
     "AliasType",
@@ -11,3 +16,13 @@ __all__ = [
     "FirewallAliasCreate",
     "FirewallAliasUpdate",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AliasType": ".firewall_alias",
+        "FirewallAlias": ".firewall_alias",
+        "FirewallAliasCreate": ".firewall_alias",
+        "FirewallAliasUpdate": ".firewall_alias",
+    },
+)
@@ -1,5 +1,5 @@
 from enum import StrEnum
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class AliasType(StrEnum):
@@ -10,6 +10,8 @@ class AliasType(StrEnum):
 
 
 class FirewallAlias(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     name: str
     type: AliasType
     address: str | list[str]
@@ -1,30 +1,69 @@
 """
 V2 Client Module Initialization
+
+Exports are imported on first access (see `pyfsense_client.lazy`).
 """
 
-from .client import PfSenseV2Client, ClientConfig, SortOrder, SortFlags
-from .exceptions import APIError, AuthenticationError, ValidationError
-from .models import (
-    APIResponse,
-    JWTAuthResponse,
-    FirewallAlias,
-    FirewallAliasCreate,
-    FirewallAliasUpdate,
-    DHCPLease,
-)
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .client import PfSenseV2Client
+    from .async_client import AsyncPfSenseV2Client
+    from .types import ClientConfig, SortOrder, SortFlags
+    from .exceptions import APIError, AuthenticationError, ValidationError, PaginationConsistencyError
+    from .models import (
+        APIResponse,
+        JWTAuthResponse,
+        FirewallAlias,
+        FirewallAliasCreate,
+        FirewallAliasUpdate,
+        DHCPLease,
+    )
+    from .reconcile import AliasPlan, AliasReconciler, ReconcileStats
 
 __all__ = [
     "PfSenseV2Client",
+    "AsyncPfSenseV2Client",
     "ClientConfig",
     "SortOrder",
     "SortFlags",
     "APIError",
     "AuthenticationError",
     "ValidationError",
+    "PaginationConsistencyError",
     "APIResponse",
     "JWTAuthResponse",
     "FirewallAlias",
     "FirewallAliasCreate",
     "FirewallAliasUpdate",
     "DHCPLease",
+    "AliasReconciler",
+    "AliasPlan",
+    "ReconcileStats",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "PfSenseV2Client": ".client",
+        "AsyncPfSenseV2Client": ".async_client",
+        "ClientConfig": ".types",
+        "SortOrder": ".types",
+        "SortFlags": ".types",
+        "APIError": ".exceptions",
+        "AuthenticationError": ".exceptions",
+        "ValidationError": ".exceptions",
+        "PaginationConsistencyError": ".exceptions",
+        "APIResponse": ".models",
+        "JWTAuthResponse": ".models",
+        "FirewallAlias": ".models",
+        "FirewallAliasCreate": ".models",
+        "FirewallAliasUpdate": ".models",
+        "DHCPLease": ".models",
+        "AliasReconciler": ".reconcile",
+        "AliasPlan": ".reconcile",
+        "ReconcileStats": ".reconcile",
+    },
+)
@@ -0,0 +1,107 @@
+"""
+Client-side map of firewall alias names to V2 ids.
+
+V2 single-alias endpoints address aliases by id, and the id is the alias's position in the firewall's alias list.
+`AliasIndex` remembers the ids the client has seen: every listing, read, create and update the client makes
+records the aliases in its response. Since a delete shifts every later alias down by one, deleting an alias
+forgets it and every entry at or after its id. Entries are trusted for `ttl` seconds after they were last
+recorded, which bounds how long a change made by another client can go unnoticed.
+
+A full, unfiltered listing also proves which names do not exist, so a lookup for a missing name right after one
+needs no request. The index keeps the aliases themselves, so their last-seen contents are available too.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+
+from .models.firewall_alias import FirewallAlias
+
+
+class AliasIndex:
+    """
+    Thread-safe name -> alias map for the aliases of one firewall.
+
+    Args:
+        ttl (float): Seconds an entry is trusted after it was recorded.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._aliases: dict[str, tuple[FirewallAlias, float]] = {}
+        self._complete_at: float | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._aliases)
+
+    def get(self, name: str) -> FirewallAlias | None:
+        """The alias last recorded as `name`, or None if it is unknown or was recorded more than `ttl` seconds ago."""
+        with self._lock:
+            entry = self._aliases.get(name)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def lookup(self, name: str) -> int | None:
+        """The id recorded for `name`, or None if it is unknown or was recorded more than `ttl` seconds ago."""
+        alias = self.get(name)
+        return None if alias is None else alias.id
+
+    def known_missing(self, name: str) -> bool:
+        """True if a recent full listing did not contain `name` and nothing has recorded it since."""
+        with self._lock:
+            complete_at = self._complete_at
+            known = name in self._aliases
+        return not known and complete_at is not None and time.monotonic() - complete_at <= self.ttl
+
+    def record(self, aliases: Iterable[FirewallAlias], complete: bool = False) -> None:
+        """
+        Remember `aliases`, as just returned by the firewall. With `complete`, `aliases` is the whole alias list,
+        and replaces the index.
+        """
+        now = time.monotonic()
+        entries = {alias.name: (alias, now) for alias in aliases}
+        with self._lock:
+            if complete:
+                self._aliases = entries
+                self._complete_at = now
+                return
+            ids = {alias.id for alias, _ in entries.values()}
+            # An id now held by another name (after a rename or a shift) is stale
+            for name in [name for name, (alias, _) in self._aliases.items() if alias.id in ids and name not in entries]:
+                del self._aliases[name]
+            self._aliases.update(entries)
+
+    def deleted(self, alias_id: int) -> None:
+        """Forget the alias at `alias_id` and every alias after it, whose ids have shifted."""
+        with self._lock:
+            self._aliases = {name: entry for name, entry in self._aliases.items() if entry[0].id < alias_id}
+            self._complete_at = None
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._aliases.pop(name, None)
+            self._complete_at = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._aliases.clear()
+            self._complete_at = None
+
+
+def is_missing_id_error(exc: Exception) -> bool:
+    """True if `exc` is how the firewall rejects a request for an id past the end of the alias list: a 404."""
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code == 404
+
+
+def may_be_stale_id_error(exc: Exception) -> bool:
+    """
+    True if `exc` could come from an id that no longer holds the expected alias: 404 when the id is past the end of
+    the list, or 400 when a write would give the alias at that id a name already in use. A 400 is also how any
+    invalid write is rejected, so read the alias at the id to confirm before treating the id as stale.
+    """
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in (400, 404)
@@ -0,0 +1,992 @@
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import AbstractContextManager, AsyncExitStack, asynccontextmanager, nullcontext
+from typing import Any
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from pydantic import BaseModel
+
+from ..alias_delta import AliasDeltaResult, compute_alias_delta
+from ..cache import make_cache, request_key
+from ..cidr import aggregate_alias
+from ..codec import get_codec
+from ..hedging import Hedger
+from ..limiter import limiter_for_host
+from ..metrics import RequestTiming, default_registry
+from ..pagination import PageShiftError, afetch_all_pages, aiter_pages
+from ..singleflight import AsyncSingleFlight
+from ..streaming import aiter_json_array
+from ..timing import PhaseClock
+from ..tracing import make_tracer
+from .alias_index import AliasIndex, is_missing_id_error, may_be_stale_id_error
+from .auth import TokenCache, _FileLock, jwt_expiry, token_is_fresh
+from .exceptions import APIError, AuthenticationError, ValidationError, PaginationConsistencyError
+from .models import (
+    APIResponse,
+    TypedAPIResponse,
+    FirewallAlias,
+    FirewallAliasCreate,
+    FirewallAliasUpdate,
+    DHCPLease,
+)
+from .models.dhcp import _DHCP_LEASE_LIST
+from .models.firewall_alias import _FIREWALL_ALIAS_LIST
+from .types import (
+    ClientConfig,
+    SortOrder,
+    SortFlags,
+    _JWT_ENDPOINT,
+    _dhcp_lease_params,
+    _encode_json_body,
+)
+
+
+async def _acquire_in_thread(lock: _FileLock) -> None:
+    """
+    Acquire `lock` in a worker thread, so waiting for another process does not block the event loop.
+
+    If the waiting task is cancelled, the thread still gets the lock eventually; it then releases it at once
+    instead of holding it for a task that is gone.
+    """
+    guard = threading.Lock()
+    abandoned = held = False
+
+    def acquire() -> None:
+        nonlocal held
+        lock.acquire()
+        with guard:
+            if abandoned:
+                lock.release()
+            else:
+                held = True
+
+    try:
+        await asyncio.shield(asyncio.to_thread(acquire))
+    except asyncio.CancelledError:
+        with guard:
+            abandoned = True
+            if held:
+                lock.release()
+        raise
+
+
+class AsyncPfSenseV2Client:
+    """
+    Asyncio client for interacting with pfSense V2 REST API.
+
+    Mirrors the method surface of `PfSenseV2Client`, but every endpoint method is a coroutine.
+    All calls share a single pooled `httpx.AsyncClient`, so many requests can be in flight
+    from one event loop without a thread per call.
+
+    JWTs are renewed before they expire and a 401 is retried once after re-authenticating, as in
+    `PfSenseV2Client`.
+
+    Requires the optional `httpx` dependency (`pip install pyfsense-client[async]`).
+
+    Example:
+        async with AsyncPfSenseV2Client(config) as client:
+            aliases = await client.get_firewall_aliases()
+    """
+
+    def __init__(self, config: ClientConfig):
+        """
+        Initialize the asynchronous pfSense V2 API Client.
+
+        Args:
+            config (ClientConfig): The configuration object with host, credentials, etc.
+        """
+        if httpx is None:
+            raise ImportError("AsyncPfSenseV2Client requires httpx. Install it with 'pip install pyfsense-client[async]'.")
+
+        self.config = config
+        self._codec = get_codec(self.config.json_codec)
+        self.cache = make_cache(self.config.cache_ttl, self.config.cache_maxsize, self.config.cache_ttls)
+        self.singleflight = AsyncSingleFlight() if self.config.coalesce_requests else None
+        self.hedger = (
+            Hedger(self.config.hedge_percentile, self.config.hedge_min_delay, max_workers=2 * self.config.pool_maxsize)
+            if self.config.hedge_requests
+            else None
+        )
+        self.metrics = default_registry() if self.config.collect_metrics else None
+        self.tracer = make_tracer(self.config.tracing)
+        self.alias_index = AliasIndex(self.config.alias_index_ttl) if self.config.alias_index_ttl else None
+        self._token_cache = TokenCache(self.config.token_cache_path) if self.config.token_cache_path else None
+        self._auth_lock = asyncio.Lock()
+        self._jwt_expiry: float | None = None
+
+        # Normalize base URL
+        self.base_url = self.config.host.rstrip("/")
+        if not (self.base_url.startswith("http://") or self.base_url.startswith("https://")):
+            self.base_url = f"https://{self.base_url}"
+
+        self._default_timeout = self.config.timeout
+        max_limit = self.config.max_concurrency or self.config.pool_maxsize
+        self.limiter = (
+            limiter_for_host(self.base_url, initial=min(self.config.concurrency_limit, max_limit), max_limit=max_limit)
+            if self.config.adaptive_concurrency
+            else None
+        )
+
+        # Reuse a token another process left in the shared cache
+        if not self.config.api_key and not self.config.jwt_token and self._token_cache and self.config.username:
+            cached = self._token_cache.get(self._token_cache_key(self.config.username))
+            if token_is_fresh(cached, self.config.jwt_refresh_margin):
+                self.config.jwt_token = cached
+
+        headers = {}
+        if not self.config.keep_alive:
+            headers["Connection"] = "close"
+        if self.config.api_key:
+            headers["X-API-Key"] = f"{self.config.api_key}"
+        elif self.config.jwt_token:
+            headers["Authorization"] = f"Bearer {self.config.jwt_token}"
+            self._jwt_expiry = jwt_expiry(self.config.jwt_token)
+
+        limits = httpx.Limits(
+            max_connections=self.config.pool_maxsize if self.config.pool_block else None,
+            max_keepalive_connections=self.config.pool_maxsize if self.config.keep_alive else 0,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        transport = None
+        if self.config.cassette_path:
+            # Imported here: the cassette module also loads `requests` for the sync adapter
+            from ..cassette import AsyncCassetteTransport, Cassette
+
+            transport = AsyncCassetteTransport(
+                Cassette(self.config.cassette_path, self.config.cassette_mode),
+                httpx.AsyncHTTPTransport(verify=self.config.verify_ssl, limits=limits),
+                self.config.cassette_latency,
+            )
+        self._session = httpx.AsyncClient(
+            verify=self.config.verify_ssl,
+            timeout=self._default_timeout,
+            headers=headers,
+            limits=limits,
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncPfSenseV2Client":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool and the hedging worker threads."""
+        await self._session.aclose()
+        if self.hedger is not None:
+            self.hedger.close()
+
+    #
+    # JWT lifecycle
+    #
+
+    def _manages_jwt(self) -> bool:
+        """True if the client can obtain JWTs on its own (username/password set, no API key)."""
+        return not self.config.api_key and bool(self.config.username and self.config.password)
+
+    def _token_cache_key(self, username: str) -> str:
+        return f"{self.base_url}|{username}"
+
+    def _use_token(self, token: str) -> None:
+        self._session.headers["Authorization"] = f"Bearer {token}"
+        self.config.jwt_token = token
+        self._jwt_expiry = jwt_expiry(token)
+
+    async def _fetch_jwt(self, username: str, password: str) -> str:
+        raw_resp = await self._request("POST", _JWT_ENDPOINT, json={"username": username, "password": password})
+        if not raw_resp.data or "token" not in raw_resp.data:
+            raise AuthenticationError("No token returned in JWT auth response.", None)
+        return raw_resp.data["token"]
+
+    async def _obtain_jwt(self, username: str, password: str, rejected: str | None = None) -> str:
+        """
+        Get a token from the shared token cache, or from the API if the cache has no usable one.
+        Must be called with `_auth_lock` held.
+        """
+        if self._token_cache is None:
+            token = await self._fetch_jwt(username, password)
+        else:
+            key = self._token_cache_key(username)
+            lock = self._token_cache.lock()
+            await _acquire_in_thread(lock)
+            try:
+                token = self._token_cache.get(key)
+                if token == rejected or not token_is_fresh(token, self.config.jwt_refresh_margin):
+                    token = await self._fetch_jwt(username, password)
+                    self._token_cache.set(key, token)
+            finally:
+                lock.release()
+        self._use_token(token)
+        return token
+
+    async def _refresh_jwt(self, stale: str | None) -> None:
+        """Replace the `stale` token, unless another task already did."""
+        async with self._auth_lock:
+            current = self.config.jwt_token
+            if current != stale and token_is_fresh(current, self.config.jwt_refresh_margin):
+                return
+            await self._obtain_jwt(self.config.username, self.config.password, rejected=stale)  # type: ignore[arg-type]
+
+    #
+    # Internal request methods
+    #
+
+    def _handle_response(
+        self,
+        response: "httpx.Response",
+        data_type: type[BaseModel] | None = None,
+        timing: RequestTiming | None = None,
+    ) -> APIResponse:
+        """
+        Handle the raw response from httpx and convert to an APIResponse or raise an error.
+
+        If `data_type` is given, the envelope and every item of the `data` list are validated in a single
+        pass straight from the raw body, skipping the intermediate Python dict; `timing` then records that
+        pass as validation only.
+
+        Raises:
+            AuthenticationError: If the response is 401
+            ValidationError: If the response is 400
+            APIError: For other 4xx/5xx errors or JSON parse issues
+        """
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            if response.status_code == 401:
+                raise AuthenticationError("Authentication failed (401).", response)
+            elif response.status_code == 400:
+                raise ValidationError("Request validation failed (400).", response)
+            else:
+                raise APIError(f"API request failed: {str(exc)}", response)
+
+        # Attempt to parse JSON into the standard APIResponse
+        try:
+            start = time.perf_counter()
+            if data_type is not None:
+                result = TypedAPIResponse[data_type].model_validate_json(response.content)
+            else:
+                parsed = self._codec.loads(response.content)
+                decoded = time.perf_counter()
+                result = APIResponse.model_validate(parsed)
+                if timing is not None:
+                    timing.decode = decoded - start
+                    start = decoded
+            if timing is not None:
+                timing.validate = time.perf_counter() - start
+            return result
+        except Exception as exc:
+            raise APIError(f"Failed to parse JSON response: {str(exc)}", response)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """
+        Core request coroutine that returns an APIResponse (or raises an error).
+
+        Args:
+            method (str): One of GET, POST, PATCH, DELETE
+            endpoint (str): Path part of the URL, e.g. '/api/v2/firewall/alias'
+            params (Optional[dict[str, Any]]): Optional query params
+            json (list[dict] or dict): Optional JSON body
+            data_type (type[BaseModel] | None): Optional model to validate each item of a list `data` into
+
+        Returns:
+            APIResponse: The parsed API response
+
+        When tracing is enabled, the request runs in its own span.
+        """
+        if self.tracer is None:
+            return await self._authorized(method, endpoint, params, json, data_type)
+        with self.tracer.request(method, endpoint, self.base_url):
+            return await self._authorized(method, endpoint, params, json, data_type)
+
+    async def _authorized(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Dispatch a request, renewing the JWT before it expires and retrying once if it is rejected."""
+        if not self._manages_jwt() or endpoint == _JWT_ENDPOINT:
+            return await self._dispatch(method, endpoint, params, json, data_type)
+
+        token = await self._renewed_token()
+        try:
+            return await self._dispatch(method, endpoint, params, json, data_type)
+        except AuthenticationError:
+            # The token was revoked or expired early: authenticate once and retry
+            await self._refresh_jwt(token)
+            return await self._dispatch(method, endpoint, params, json, data_type)
+
+    async def _renewed_token(self) -> str | None:
+        """The JWT to send, renewed first if it expires within `jwt_refresh_margin`."""
+        token = self.config.jwt_token
+        if token and self._jwt_expiry is not None and time.time() >= self._jwt_expiry - self.config.jwt_refresh_margin:
+            await self._refresh_jwt(token)
+            token = self.config.jwt_token
+        return token
+
+    async def _dispatch(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """
+        Send a request through the response cache and single-flight group.
+
+        GET responses are served from `self.cache` when it is enabled, and identical GETs already in flight
+        share one round trip through `self.singleflight`. Any other method invalidates the cached entries for
+        the same resource.
+        """
+        if method.upper() != "GET":
+            try:
+                return await self._send(method, endpoint, params, json, data_type)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(endpoint)
+        if self.cache is None and self.singleflight is None:
+            return await self._fetch(method, endpoint, params, json, data_type)
+
+        key = request_key(method, endpoint, params)
+        generation = None
+        if self.cache is not None:
+            resp = self.cache.get(key)
+            if resp is not None:
+                return resp
+            # A write landing while this GET is in flight bumps the generation and keeps the reply out
+            generation = self.cache.generation()
+        if self.singleflight is not None:
+            resp = await self.singleflight.do(key, lambda: self._fetch(method, endpoint, params, json, data_type))
+        else:
+            resp = await self._fetch(method, endpoint, params, json, data_type)
+        if self.cache is not None:
+            self.cache.set(key, resp, generation)
+        return resp
+
+    async def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Send an idempotent request, hedged through `self.hedger` when it is enabled."""
+        if self.hedger is None:
+            return await self._send(method, endpoint, params, json, data_type)
+        return await self.hedger.acall(lambda: self._send(method, endpoint, params, json, data_type))
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Send one request over the session and parse the response, bypassing the cache."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        body, headers = _encode_json_body(self._codec, json)
+        if self.tracer is not None:
+            headers = self.tracer.inject(headers or {})
+
+        measured = (
+            self.metrics.measure(method, endpoint, self.base_url, len(body or b""))
+            if self.metrics is not None
+            else nullcontext()
+        )
+        with measured as timing:
+            response = await self._http(
+                endpoint,
+                timing,
+                method=method,
+                url=url,
+                params=params,
+                content=body,
+                headers=headers,
+                timeout=self._default_timeout,
+            )
+            if self.tracer is not None:
+                self.tracer.annotate(response.status_code, len(body or b""), len(response.content))
+            return self._handle_response(response, data_type, timing)
+
+    async def _http(self, endpoint: str, timing: RequestTiming | None = None, **kwargs: Any) -> "httpx.Response":
+        """
+        Perform one HTTP exchange, admitted by `self.limiter` when adaptive concurrency is enabled.
+
+        If `timing` is given, the transport phases, status and response size are recorded on it.
+        """
+        if timing is None:
+            return await self._exchange(endpoint, **kwargs)
+        clock = PhaseClock()
+        response = await self._exchange(endpoint, extensions={"trace": clock.httpx_trace}, **kwargs)
+        clock.apply(timing)
+        timing.status = response.status_code
+        timing.response_bytes = len(response.content)
+        return response
+
+    async def _exchange(self, endpoint: str, **kwargs: Any) -> "httpx.Response":
+        """Send the request through the session, holding a limiter slot if there is one."""
+        if self.limiter is None:
+            return await self._session.request(**kwargs)
+        async with self.limiter.slot(endpoint) as slot:
+            response = await self._session.request(**kwargs)
+            slot.observe(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    async def _stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[Any]:
+        """
+        Send a request and yield the raw items of the response `data` list as they are decoded.
+
+        The body is read in `chunk_size` pieces, so memory stays flat regardless of the response size. Like
+        `_request`, the JWT is renewed and a rejected one retried once, and the request is traced, measured and
+        admitted by the limiter; it holds its limiter slot until the body has been read.
+        """
+        traced = self.tracer.request(method, endpoint, self.base_url) if self.tracer is not None else nullcontext()
+        with traced:
+            async with AsyncExitStack() as stack:
+                request = (method, endpoint, params, chunk_size)
+                if not self._manages_jwt() or endpoint == _JWT_ENDPOINT:
+                    response, chunks = await stack.enter_async_context(self._streaming(*request))
+                else:
+                    token = await self._renewed_token()
+                    try:
+                        response, chunks = await stack.enter_async_context(self._streaming(*request))
+                    except AuthenticationError:
+                        await self._refresh_jwt(token)
+                        response, chunks = await stack.enter_async_context(self._streaming(*request))
+                try:
+                    async for item in aiter_json_array(chunks, "data"):
+                        yield item
+                except ValueError as exc:
+                    raise APIError(f"Failed to parse JSON response: {str(exc)}", response)
+
+    @asynccontextmanager
+    async def _streaming(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        chunk_size: int,
+    ) -> AsyncIterator[tuple["httpx.Response", AsyncIterator[bytes]]]:
+        """
+        Send one streamed request and check its status; the block reads the body from the yielded chunks.
+
+        The limiter slot and the metrics timing span the whole block.
+        """
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        headers = self.tracer.inject({}) if self.tracer is not None else None
+        measured = self.metrics.measure(method, endpoint, self.base_url) if self.metrics is not None else nullcontext()
+        admitted = self.limiter.slot(endpoint) if self.limiter is not None else nullcontext()
+        received = 0
+
+        async def counted(response: "httpx.Response") -> AsyncIterator[bytes]:
+            nonlocal received
+            async for chunk in response.aiter_bytes(chunk_size):
+                received += len(chunk)
+                yield chunk
+
+        with measured as timing:
+            async with admitted as slot:
+                clock = PhaseClock() if timing is not None else None
+                extensions = {"trace": clock.httpx_trace} if clock is not None else None
+                async with self._session.stream(
+                    method=method,
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    timeout=self._default_timeout,
+                    extensions=extensions,
+                ) as response:
+                    if slot is not None:
+                        slot.observe(response.status_code, response.headers.get("Retry-After"))
+                    if clock is not None:
+                        clock.apply(timing)
+                        timing.status = response.status_code
+                    try:
+                        if not response.is_success:
+                            received = len(await response.aread())
+                            self._handle_response(response)
+                        yield response, counted(response)
+                    finally:
+                        if timing is not None:
+                            timing.response_bytes = received
+                        if self.tracer is not None:
+                            self.tracer.annotate(response.status_code, 0, received)
+
+    #
+    # Tracing
+    #
+
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager:
+        """
+        Group the requests made inside the block under one parent span, e.g. a write and the
+        `apply_firewall_changes()` that follows it. Does nothing unless tracing is enabled.
+
+        Example:
+            with client.span("block-host", address=ip):
+                await client.update_firewall_alias(alias)
+                await client.apply_firewall_changes()
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    #
+    # Auth
+    #
+
+    async def authenticate_jwt(self, username: str | None = None, password: str | None = None) -> str:
+        """
+        Obtain a JWT token from the pfSense V2 API by calling POST /api/v2/auth/jwt.
+
+        Args:
+            username (str | None): If not provided, uses config.username
+            password (str | None): If not provided, uses config.password
+
+        Returns:
+            str: The JWT token
+
+        If `ClientConfig.token_cache_path` is set, a still-valid token issued to another process for the same
+        host and user is reused instead.
+        """
+        username = username or self.config.username
+        password = password or self.config.password
+        if not username or not password:
+            raise ValueError("No username/password provided for JWT auth.")
+
+        async with self._auth_lock:
+            return await self._obtain_jwt(username, password)
+
+    #
+    # Firewall Aliases (plural)
+    #
+
+    async def get_firewall_aliases(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> list[FirewallAlias]:
+        """
+        GET /api/v2/firewall/aliases
+        Returns a list of all firewall aliases.
+
+        Args:
+            limit (int): The maximum number of aliases to return. Set to 0 for no limit. Default is 0.
+            offset (int): The starting point in the dataset to begin fetching objects. Default is 0.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
+        """
+        endpoint = "/api/v2/firewall/aliases"
+        params: dict[str, Any] = {"limit": limit, "offset": offset}
+        if query:
+            params.update(query)
+        resp = await self._request("GET", endpoint, params=params, data_type=FirewallAlias)
+        if not resp.data or not isinstance(resp.data, list):
+            aliases = []
+        else:
+            aliases = _FIREWALL_ALIAS_LIST.validate_python(resp.data)
+        if self.alias_index is not None:
+            self.alias_index.record(aliases, complete=not (limit or offset or query))
+        return aliases
+
+    def iter_firewall_aliases(
+        self,
+        page_size: int = 500,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> AsyncIterator[FirewallAlias]:
+        """
+        GET /api/v2/firewall/aliases, one page at a time.
+        Lazily async-iterates over all aliases matching `query`, fetching the next page in the background
+        while the current one is being consumed.
+
+        Args:
+            page_size (int): Number of aliases requested per page.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
+        """
+        return aiter_pages(lambda limit, offset: self.get_firewall_aliases(limit, offset, query), page_size)
+
+    async def fetch_all_firewall_aliases(
+        self,
+        parallelism: int = 4,
+        page_size: int = 500,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> list[FirewallAlias]:
+        """
+        GET /api/v2/firewall/aliases as concurrent offset windows.
+        Returns every alias matching `query`, fetching up to `parallelism` pages at once from concurrent tasks
+        sharing the pooled connections.
+
+        Args:
+            parallelism (int): Maximum number of pages in flight. Keep it at or below `pool_maxsize`.
+            page_size (int): Number of aliases requested per page.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
+
+        Raises:
+            PaginationConsistencyError: If aliases were added or removed while the pages were read, on every retry.
+        """
+        with self.span("fetch_all_firewall_aliases", page_size=page_size, parallelism=parallelism):
+            try:
+                return await afetch_all_pages(
+                    lambda limit, offset: self.get_firewall_aliases(limit, offset, query),
+                    page_size,
+                    parallelism,
+                    key=lambda alias: (alias.id, alias.name),
+                )
+            except PageShiftError as exc:
+                raise PaginationConsistencyError(str(exc)) from exc
+
+    async def replace_all_firewall_aliases(
+        self, aliases: list[FirewallAliasCreate], aggregate: bool = False
+    ) -> list[FirewallAlias]:
+        """
+        PUT /api/v2/firewall/aliases
+        Returns a list of all firewall aliases.
+
+        Args:
+            aliases (list[FirewallAliasCreate]): The complete new set of aliases.
+            aggregate (bool): Collapse the entries of host and network aliases with
+                `pyfsense_client.cidr.aggregate_alias` first, shrinking the payload and the pf tables.
+        """
+        endpoint = "/api/v2/firewall/aliases"
+        if aggregate:
+            aliases = [aggregate_alias(alias) for alias in aliases]
+        try:
+            resp = await self._request(
+                "PUT", endpoint, json=[alias.model_dump() for alias in aliases], data_type=FirewallAlias
+            )
+        finally:
+            if self.alias_index is not None:
+                self.alias_index.clear()
+        if not resp.data or not isinstance(resp.data, list):
+            return []
+        replaced = _FIREWALL_ALIAS_LIST.validate_python(resp.data)
+        if self.alias_index is not None:
+            self.alias_index.record(replaced, complete=True)
+        return replaced
+
+    async def delete_all_firewall_alias(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> APIResponse:
+        """
+        DELETE /api/v2/firewall/aliases
+        Deletes multiple existing Firewall Aliases using a query.
+
+        WARNING: This will delete all objects that match the query, use with caution.
+
+        Args:
+            limit (int): The maximum number of objects to delete at once. Set to 0 for no limit. Default is 0.
+            offset (int): The starting point in the dataset to begin fetching objects. Default is 0.
+            query (dict[str, Any] | None): The arbitrary query parameters to include in the request. Default is None.
+        """
+        endpoint = "/api/v2/firewall/aliases"
+        params = {"limit": limit, "offset": offset}
+        if query:
+            params.update(query)
+        try:
+            return await self._request("DELETE", endpoint, params=params)
+        finally:
+            if self.alias_index is not None:
+                self.alias_index.clear()
+
+    #
+    # Firewall Alias (singular)
+    #
+
+    async def get_firewall_alias(self, alias_id: int) -> FirewallAlias:
+        """
+        GET /api/v2/firewall/alias?id=<alias_id>
+        Retrieve a single firewall alias by its integer ID.
+        """
+        endpoint = "/api/v2/firewall/alias"
+        params = {"id": alias_id}
+        resp = await self._request("GET", endpoint, params=params)
+        return self._indexed(FirewallAlias.model_validate(resp.data))
+
+    async def create_firewall_alias(self, alias: FirewallAliasCreate) -> FirewallAlias:
+        """
+        POST /api/v2/firewall/alias
+        Create a new firewall alias.
+        """
+        endpoint = "/api/v2/firewall/alias"
+        resp = await self._request("POST", endpoint, json=alias.model_dump())
+        return self._indexed(FirewallAlias.model_validate(resp.data))
+
+    async def update_firewall_alias(self, alias: FirewallAliasUpdate) -> FirewallAlias:
+        """
+        PATCH /api/v2/firewall/alias
+        Update an existing firewall alias.
+        """
+        endpoint = "/api/v2/firewall/alias"
+        resp = await self._request("PATCH", endpoint, json=alias.model_dump())
+        return self._indexed(FirewallAlias.model_validate(resp.data))
+
+    async def delete_firewall_alias(self, alias_id: int) -> APIResponse:
+        """
+        DELETE /api/v2/firewall/alias?id=<alias_id>
+        Delete an existing firewall alias by ID.
+        """
+        endpoint = "/api/v2/firewall/alias"
+        params = {"id": alias_id}
+        try:
+            return await self._request("DELETE", endpoint, params=params)
+        finally:
+            # Later aliases move down one id, also if the outcome is unknown
+            if self.alias_index is not None:
+                self.alias_index.deleted(alias_id)
+
+    #
+    # Firewall Alias by name
+    #
+
+    def _indexed(self, alias: FirewallAlias) -> FirewallAlias:
+        if self.alias_index is not None:
+            self.alias_index.record([alias])
+        return alias
+
+    async def _alias_id(self, name: str) -> tuple[int, bool]:
+        """
+        The id of the alias called `name`, and whether it came from the alias index without a request.
+
+        Raises:
+            APIError: If no alias is called `name`.
+        """
+        if self.alias_index is not None:
+            alias_id = self.alias_index.lookup(name)
+            if alias_id is not None:
+                return alias_id, True
+            if not self.alias_index.known_missing(name):
+                await self.get_firewall_aliases()
+                alias_id = self.alias_index.lookup(name)
+                if alias_id is not None:
+                    return alias_id, False
+        else:
+            for alias in await self.get_firewall_aliases(query={"name": name}):
+                if alias.name == name:
+                    return alias.id, False
+        raise APIError(f"No firewall alias named '{name}'.", None)
+
+    async def _id_moved(self, alias_id: int, name: str) -> bool:
+        """True if the alias at `alias_id` is missing or no longer called `name`, confirming a stale indexed id."""
+        try:
+            return (await self.get_firewall_alias(alias_id)).name != name
+        except APIError as exc:
+            if is_missing_id_error(exc):
+                return True
+            raise
+
+    async def get_firewall_alias_by_name(self, name: str) -> FirewallAlias:
+        """
+        GET /api/v2/firewall/alias?id=<id of name>
+        Retrieve a single firewall alias by its name. See `PfSenseV2Client.get_firewall_alias_by_name`.
+        """
+        alias_id, indexed = await self._alias_id(name)
+        if indexed:
+            try:
+                alias = await self.get_firewall_alias(alias_id)
+                if alias.name == name:
+                    return alias
+            except APIError as exc:
+                if not is_missing_id_error(exc):
+                    raise
+            self.alias_index.forget(name)  # type: ignore[union-attr]
+            alias_id, _ = await self._alias_id(name)
+        return await self.get_firewall_alias(alias_id)
+
+    async def update_firewall_alias_by_name(self, name: str, alias: FirewallAliasCreate) -> FirewallAlias:
+        """
+        PATCH /api/v2/firewall/alias
+        Replace the alias called `name` with `alias`. See `PfSenseV2Client.update_firewall_alias_by_name`.
+        """
+        return (await self._update_alias_by_name(name, alias))[0]
+
+    async def _update_alias_by_name(self, name: str, alias: FirewallAliasCreate) -> tuple[FirewallAlias, int]:
+        """`update_firewall_alias_by_name`, also returning the number of PATCH requests sent."""
+        alias_id, indexed = await self._alias_id(name)
+        if indexed:
+            try:
+                return await self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 1
+            except APIError as exc:
+                if not (may_be_stale_id_error(exc) and await self._id_moved(alias_id, name)):
+                    raise
+            self.alias_index.forget(name)  # type: ignore[union-attr]
+            alias_id, _ = await self._alias_id(name)
+            return await self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 2
+        return await self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 1
+
+    async def apply_alias_delta(
+        self,
+        name: str,
+        add: Iterable[str] | Mapping[str, str] = (),
+        remove: Iterable[str] = (),
+        use_index: bool = False,
+    ) -> AliasDeltaResult:
+        """
+        PATCH /api/v2/firewall/alias
+        Add and remove entries of the alias called `name`. See `PfSenseV2Client.apply_alias_delta`.
+        """
+        cached = self.alias_index.get(name) if use_index and self.alias_index is not None else None
+        current = cached or await self.get_firewall_alias_by_name(name)
+        delta = compute_alias_delta(current.address, current.detail, add, remove)
+        if not delta:
+            return AliasDeltaResult("none", 0, 0, 0, len(current.address))
+        alias = FirewallAliasCreate(
+            name=name, type=current.type, descr=current.descr, address=delta.address, detail=delta.detail
+        )
+        if cached is None:
+            # The id was just read along with the contents
+            await self.update_firewall_alias(FirewallAliasUpdate(id=current.id, **alias.model_dump()))
+            writes = 1
+        else:
+            _, writes = await self._update_alias_by_name(name, alias)
+        return AliasDeltaResult("replace", len(delta.added), len(delta.removed), writes, len(delta.address))
+
+    #
+    # Apply endpoints (pending changes)
+    #
+
+    async def get_firewall_apply_status(self) -> APIResponse:
+        """
+        GET /api/v2/firewall/apply
+        Check if there are pending changes to apply.
+        """
+        endpoint = "/api/v2/firewall/apply"
+        return await self._request("GET", endpoint)
+
+    async def apply_firewall_changes(self) -> APIResponse:
+        """
+        POST /api/v2/firewall/apply
+        Apply pending changes immediately.
+        """
+        endpoint = "/api/v2/firewall/apply"
+        return await self._request("POST", endpoint)
+
+    #
+    # DHCP Leases
+    #
+
+    async def get_dhcp_leases(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+    ) -> list[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases
+        Fetches active and static DHCP leases from the system.
+
+        Arguments:
+            limit (int): The maximum number of lease records to return. (0 = no limit).
+            offset (int): The starting point for the records to return in a paginated response.
+            sort_by (list[str]): Optional. A list of fields by which the results should be sorted.
+            sort_order (SortOrder): The direction of sorting, ascending or descending.
+            sort_flags (SortFlags): The manner in which sorting is applied.
+
+        Returns:
+            list[DHCPLease]: A list of parsed DHCP lease objects.
+        """
+        endpoint = "/api/v2/status/dhcp_server/leases"
+        params = _dhcp_lease_params(limit, offset, sort_by, sort_order, sort_flags)
+        resp = await self._request("GET", endpoint, params=params, data_type=DHCPLease)
+        if not resp.data or not isinstance(resp.data, list):
+            return []
+        return _DHCP_LEASE_LIST.validate_python(resp.data)
+
+    async def stream_dhcp_leases(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases
+        Like `get_dhcp_leases`, but yields each lease as soon as it is decoded from the response body.
+        """
+        endpoint = "/api/v2/status/dhcp_server/leases"
+        params = _dhcp_lease_params(limit, offset, sort_by, sort_order, sort_flags)
+        async for item in self._stream("GET", endpoint, params=params, chunk_size=chunk_size):
+            yield DHCPLease.model_validate(item)
+
+    def iter_dhcp_leases(
+        self,
+        page_size: int = 500,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+    ) -> AsyncIterator[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases, one page at a time.
+        Lazily async-iterates over all DHCP leases, fetching page N+1 in the background while page N is
+        being consumed.
+
+        Arguments:
+            page_size (int): Number of leases requested per page.
+            sort_by, sort_order, sort_flags: As for `get_dhcp_leases`. A stable sort keeps pages consistent.
+        """
+        return aiter_pages(
+            lambda limit, offset: self.get_dhcp_leases(limit, offset, sort_by, sort_order, sort_flags),
+            page_size,
+        )
+
+    async def fetch_all_dhcp_leases(
+        self,
+        parallelism: int = 4,
+        page_size: int = 500,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+    ) -> list[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases as concurrent offset windows.
+        A faster alternative to `get_dhcp_leases(limit=0)` for large lease tables: up to `parallelism` pages
+        are fetched at once and merged in offset order, so the result follows `sort_by`/`sort_order`.
+
+        Arguments:
+            parallelism (int): Maximum number of pages in flight. Keep it at or below `pool_maxsize`.
+            page_size (int): Number of leases requested per page.
+            sort_by, sort_order, sort_flags: As for `get_dhcp_leases`.
+
+        Raises:
+            PaginationConsistencyError: If leases shifted between pages while they were read, on every retry.
+        """
+        with self.span("fetch_all_dhcp_leases", page_size=page_size, parallelism=parallelism):
+            try:
+                return await afetch_all_pages(
+                    lambda limit, offset: self.get_dhcp_leases(limit, offset, sort_by, sort_order, sort_flags),
+                    page_size,
+                    parallelism,
+                    key=lambda lease: (lease.ip, lease.mac),
+                )
+            except PageShiftError as exc:
+                raise PaginationConsistencyError(str(exc)) from exc
@@ -0,0 +1,133 @@
+"""
+JWT helpers for the V2 clients: reading the `exp` claim and an on-disk token cache shared by processes.
+
+The cache is a small JSON file mapping "<base url>|<username>" to the last token issued for it. Reads and
+refreshes happen under an exclusive `flock` on a sibling ".lock" file, so when many worker processes
+start at once only the first one authenticates and the rest reuse its token. On platforms without
+`fcntl` the lock only serializes threads of the current process.
+"""
+
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+def jwt_expiry(token: str) -> float | None:
+    """
+    Return the `exp` claim of a JWT as a Unix timestamp, or None if it is missing or unreadable.
+
+    The signature is not verified; the value is only used to schedule a refresh.
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def token_is_fresh(token: str | None, margin: float) -> bool:
+    """True if `token` is set and does not expire within `margin` seconds. Tokens without `exp` never expire."""
+    if not token:
+        return False
+    expiry = jwt_expiry(token)
+    return expiry is None or expiry - margin > time.time()
+
+
+class _FileLock:
+    """Exclusive lock on a file, held between `acquire()` and `release()`."""
+
+    _local_locks: dict[str, threading.Lock] = {}
+    _local_guard = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._local_guard:
+            self._local = self._local_locks.setdefault(path, threading.Lock())
+        self._fd: int | None = None
+
+    def acquire(self) -> None:
+        if fcntl is None:
+            self._local.acquire()
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        if fcntl is None:
+            self._local.release()
+            return
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def __enter__(self) -> "_FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class TokenCache:
+    """
+    File-backed JWT cache shared by every process on the host that uses the same `path`.
+
+    Args:
+        path (str): Location of the cache file. It is created with mode 0600 since it holds credentials.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+
+    def lock(self) -> _FileLock:
+        """Return a new, unacquired lock that serializes access to the cache across processes."""
+        return _FileLock(f"{self.path}.lock")
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> str | None:
+        """Return the cached token for `key`, if any. Hold the lock if the result decides whether to write."""
+        entry = self._load().get(key)
+        return entry.get("token") if isinstance(entry, dict) else None
+
+    def set(self, key: str, token: str) -> None:
+        """Store a token for `key`, replacing the file atomically. Call with the lock held."""
+        data = self._load()
+        now = time.time()
+        # Drop tokens that have already expired so the file doesn't grow forever
+        data = {k: v for k, v in data.items() if isinstance(v, dict) and (v.get("exp") or now + 1) > now}
+        data[key] = {"token": token, "exp": jwt_expiry(token)}
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pyfsense-token-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
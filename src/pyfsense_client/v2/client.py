@@ -1,55 +1,47 @@
-from enum import StrEnum
-from dataclasses import dataclass
+import threading
+import time
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Any
 
 import requests
+from pydantic import BaseModel
 
-from .exceptions import APIError, AuthenticationError, ValidationError
+from ..alias_delta import AliasDeltaResult, compute_alias_delta
+from ..batch import V2_ORDERED, V2_SUBSYSTEMS, Batch, note_write
+from ..cache import make_cache, request_key
+from ..cassette import Cassette, CassetteAdapter
+from ..cidr import aggregate_alias
+from ..codec import get_codec
+from ..hedging import Hedger
+from ..limiter import limiter_for_host
+from ..metrics import RequestTiming, default_registry
+from ..pagination import PageShiftError, fetch_all_pages, iter_pages
+from ..singleflight import SingleFlight
+from ..streaming import iter_json_array
+from ..timing import PhaseClock, TimedHTTPAdapter, tracking
+from ..tracing import make_tracer
+from .alias_index import AliasIndex, is_missing_id_error, may_be_stale_id_error
+from .auth import TokenCache, jwt_expiry, token_is_fresh
+from .exceptions import APIError, AuthenticationError, ValidationError, PaginationConsistencyError
 from .models import (
     APIResponse,
+    TypedAPIResponse,
     FirewallAlias,
     FirewallAliasCreate,
     FirewallAliasUpdate,
     DHCPLease,
 )
-
-
-class SortOrder(StrEnum):
-    ASCENDING = "SORT_ASC"
-    DESCENDING = "SORT_DESC"
-
-
-class SortFlags(StrEnum):
-    SORT_REGULAR = "SORT_REGULAR"
-    SORT_NUMERIC = "SORT_NUMERIC"
-    SORT_STRING = "SORT_STRING"
-    SORT_LOCALE_STRING = "SORT_LOCALE_STRING"
-    SORT_NATURAL = "SORT_NATURAL"
-    SORT_FLAG_CASE = "SORT_FLAG_CASE"
-
-
-@dataclass
-class ClientConfig:
-    """
-    Configuration for the pfSense API client.
-
-    Attributes:
-        host (str): The base URL or IP of the pfSense instance, e.g. "https://192.168.1.1"
-        verify_ssl (bool): Whether to verify SSL certificates.
-        timeout (int): Request timeout in seconds.
-        username (str | None): For JWT-based auth calls.
-        password (str | None): For JWT-based auth calls.
-        api_key (str | None): If using API key-based authentication (the server expects "X-API-Key: <api_key>").
-        jwt_token (str | None): If you already have a JWT token or want to store it after calling `authenticate_jwt()`.
-    """
-
-    host: str
-    verify_ssl: bool = True
-    timeout: int = 30
-    username: str | None = None
-    password: str | None = None
-    api_key: str | None = None
-    jwt_token: str | None = None
+from .models.dhcp import _DHCP_LEASE_LIST
+from .models.firewall_alias import _FIREWALL_ALIAS_LIST
+from .types import (
+    ClientConfig,
+    SortOrder,
+    SortFlags,
+    _JWT_ENDPOINT,
+    _dhcp_lease_params,
+    _encode_json_body,
+)
 
 
 class PfSenseV2Client:
@@ -61,6 +53,12 @@ class PfSenseV2Client:
       - Endpoints for firewall aliases
       - Endpoints for DHCP leases
       - Apply/pending changes endpoints
+
+    A single client instance is safe to share between threads: the underlying connection pool
+    is sized by `ClientConfig.pool_maxsize` and auth headers are swapped atomically.
+
+    When a username and password are configured (and no API key), the JWT is renewed shortly before it
+    expires, and a request rejected with 401 is retried once after re-authenticating.
     """
 
     def __init__(self, config: ClientConfig):
@@ -72,30 +70,146 @@ class PfSenseV2Client:
         """
         self.config = config
         self._session = requests.Session()
+        self._codec = get_codec(self.config.json_codec)
+        self.cache = make_cache(self.config.cache_ttl, self.config.cache_maxsize, self.config.cache_ttls)
+        self.singleflight = SingleFlight() if self.config.coalesce_requests else None
+        self.hedger = (
+            Hedger(self.config.hedge_percentile, self.config.hedge_min_delay, max_workers=2 * self.config.pool_maxsize)
+            if self.config.hedge_requests
+            else None
+        )
+        self.metrics = default_registry() if self.config.collect_metrics else None
+        self.tracer = make_tracer(self.config.tracing)
+        self.alias_index = AliasIndex(self.config.alias_index_ttl) if self.config.alias_index_ttl else None
+        self._token_cache = TokenCache(self.config.token_cache_path) if self.config.token_cache_path else None
+        self._auth_lock = threading.Lock()
+        self._jwt_expiry: float | None = None
 
         # Normalize base URL
         self.base_url = self.config.host.rstrip("/")
         if not (self.base_url.startswith("http://") or self.base_url.startswith("https://")):
             self.base_url = f"https://{self.base_url}"
 
+        max_limit = self.config.max_concurrency or self.config.pool_maxsize
+        self.limiter = (
+            limiter_for_host(self.base_url, initial=min(self.config.concurrency_limit, max_limit), max_limit=max_limit)
+            if self.config.adaptive_concurrency
+            else None
+        )
+
         # Configure request session
         self._session.verify = self.config.verify_ssl
         self._default_timeout = self.config.timeout
+        adapter = TimedHTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block,
+        )
+        if self.config.cassette_path:
+            cassette = Cassette(self.config.cassette_path, self.config.cassette_mode)
+            adapter = CassetteAdapter(cassette, adapter, self.config.cassette_latency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if not self.config.keep_alive:
+            self._session.headers.update({"Connection": "close"})
+
+        # Reuse a token another process left in the shared cache
+        if not self.config.api_key and not self.config.jwt_token and self._token_cache and self.config.username:
+            cached = self._token_cache.get(self._token_cache_key(self.config.username))
+            if token_is_fresh(cached, self.config.jwt_refresh_margin):
+                self.config.jwt_token = cached
 
         # If we already have an API key or JWT token, attach it to the session headers
         if self.config.api_key:
             self._session.headers.update({"X-API-Key": f"{self.config.api_key}"})
         elif self.config.jwt_token:
             self._session.headers.update({"Authorization": f"Bearer {self.config.jwt_token}"})
+            self._jwt_expiry = jwt_expiry(self.config.jwt_token)
+
+    def __enter__(self) -> "PfSenseV2Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying connection pool and the hedging worker threads."""
+        self._session.close()
+        if self.hedger is not None:
+            self.hedger.close()
+
+    def _set_session_header(self, name: str, value: str) -> None:
+        """
+        Set a default session header without mutating the dict other threads may be iterating over.
+        """
+        headers = self._session.headers.copy()
+        headers[name] = value
+        self._session.headers = headers
+
+    #
+    # JWT lifecycle
+    #
+
+    def _manages_jwt(self) -> bool:
+        """True if the client can obtain JWTs on its own (username/password set, no API key)."""
+        return not self.config.api_key and bool(self.config.username and self.config.password)
+
+    def _token_cache_key(self, username: str) -> str:
+        return f"{self.base_url}|{username}"
+
+    def _use_token(self, token: str) -> None:
+        self._set_session_header("Authorization", f"Bearer {token}")
+        self.config.jwt_token = token
+        self._jwt_expiry = jwt_expiry(token)
+
+    def _fetch_jwt(self, username: str, password: str) -> str:
+        raw_resp = self._request("POST", _JWT_ENDPOINT, json={"username": username, "password": password})
+        if not raw_resp.data or "token" not in raw_resp.data:
+            raise AuthenticationError("No token returned in JWT auth response.", None)
+        return raw_resp.data["token"]
+
+    def _obtain_jwt(self, username: str, password: str, rejected: str | None = None) -> str:
+        """
+        Get a token from the shared token cache, or from the API if the cache has no usable one.
+        Must be called with `_auth_lock` held.
+        """
+        if self._token_cache is None:
+            token = self._fetch_jwt(username, password)
+        else:
+            key = self._token_cache_key(username)
+            with self._token_cache.lock():
+                token = self._token_cache.get(key)
+                if token == rejected or not token_is_fresh(token, self.config.jwt_refresh_margin):
+                    token = self._fetch_jwt(username, password)
+                    self._token_cache.set(key, token)
+        self._use_token(token)
+        return token
+
+    def _refresh_jwt(self, stale: str | None) -> None:
+        """Replace the `stale` token, unless another thread already did."""
+        with self._auth_lock:
+            current = self.config.jwt_token
+            if current != stale and token_is_fresh(current, self.config.jwt_refresh_margin):
+                return
+            self._obtain_jwt(self.config.username, self.config.password, rejected=stale)  # type: ignore[arg-type]
 
     #
     # Internal request methods
     #
 
-    def _handle_response(self, response: requests.Response) -> APIResponse:
+    def _handle_response(
+        self,
+        response: requests.Response,
+        data_type: type[BaseModel] | None = None,
+        timing: RequestTiming | None = None,
+    ) -> APIResponse:
         """
         Handle the raw response from requests and convert to an APIResponse or raise an error.
 
+        If `data_type` is given, the envelope and every item of the `data` list are validated in a single
+        pass straight from the raw body, skipping the intermediate Python dict; `timing` then records that
+        pass as validation only.
+
         Raises:
             AuthenticationError: If the response is 401
             ValidationError: If the response is 400
@@ -113,8 +227,19 @@ class PfSenseV2Client:
 
         # Attempt to parse JSON into the standard APIResponse
         try:
-            parsed = response.json()
-            return APIResponse.model_validate(parsed)
+            start = time.perf_counter()
+            if data_type is not None:
+                result = TypedAPIResponse[data_type].model_validate_json(response.content)
+            else:
+                parsed = self._codec.loads(response.content)
+                decoded = time.perf_counter()
+                result = APIResponse.model_validate(parsed)
+                if timing is not None:
+                    timing.decode = decoded - start
+                    start = decoded
+            if timing is not None:
+                timing.validate = time.perf_counter() - start
+            return result
         except Exception as exc:
             raise APIError(f"Failed to parse JSON response: {str(exc)}", response)
 
@@ -124,6 +249,7 @@ class PfSenseV2Client:
         endpoint: str,
         params: dict[str, Any] | None = None,
         json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
     ) -> APIResponse:
         """
         Core request method that returns an APIResponse (or raises an error).
@@ -133,20 +259,284 @@ class PfSenseV2Client:
             endpoint (str): Path part of the URL, e.g. '/api/v2/firewall/alias'
             params (Optional[dict[str, Any]]): Optional query params
             json (list[dict] or dict): Optional JSON body
+            data_type (type[BaseModel] | None): Optional model to validate each item of a list `data` into
 
         Returns:
             APIResponse: The parsed API response
+
+        When tracing is enabled, the request runs in its own span.
+        """
+        if self.tracer is None:
+            return self._authorized(method, endpoint, params, json, data_type)
+        with self.tracer.request(method, endpoint, self.base_url):
+            return self._authorized(method, endpoint, params, json, data_type)
+
+    def _authorized(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Dispatch a request, renewing the JWT before it expires and retrying once if it is rejected."""
+        if not self._manages_jwt() or endpoint == _JWT_ENDPOINT:
+            return self._dispatch(method, endpoint, params, json, data_type)
+
+        token = self._renewed_token()
+        try:
+            return self._dispatch(method, endpoint, params, json, data_type)
+        except AuthenticationError:
+            # The token was revoked or expired early: authenticate once and retry
+            self._refresh_jwt(token)
+            return self._dispatch(method, endpoint, params, json, data_type)
+
+    def _renewed_token(self) -> str | None:
+        """The JWT to send, renewed first if it expires within `jwt_refresh_margin`."""
+        token = self.config.jwt_token
+        if token and self._jwt_expiry is not None and time.time() >= self._jwt_expiry - self.config.jwt_refresh_margin:
+            self._refresh_jwt(token)
+            token = self.config.jwt_token
+        return token
+
+    def _dispatch(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """
+        Send a request through the response cache and single-flight group.
+
+        GET responses are served from `self.cache` when it is enabled, and identical GETs already in flight
+        share one round trip through `self.singleflight`. Any other method invalidates the cached entries for
+        the same resource.
         """
+        if method.upper() != "GET":
+            try:
+                resp = self._send(method, endpoint, params, json, data_type)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(endpoint)
+            note_write(self, endpoint)
+            return resp
+        if self.cache is None and self.singleflight is None:
+            return self._fetch(method, endpoint, params, json, data_type)
+
+        key = request_key(method, endpoint, params)
+        generation = None
+        if self.cache is not None:
+            resp = self.cache.get(key)
+            if resp is not None:
+                return resp
+            # A write landing while this GET is in flight bumps the generation and keeps the reply out
+            generation = self.cache.generation()
+        if self.singleflight is not None:
+            resp = self.singleflight.do(key, lambda: self._fetch(method, endpoint, params, json, data_type))
+        else:
+            resp = self._fetch(method, endpoint, params, json, data_type)
+        if self.cache is not None:
+            self.cache.set(key, resp, generation)
+        return resp
+
+    def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Send an idempotent request, hedged through `self.hedger` when it is enabled."""
+        if self.hedger is None:
+            return self._send(method, endpoint, params, json, data_type)
+        return self.hedger.call(lambda: self._send(method, endpoint, params, json, data_type))
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | list[dict] | None = None,
+        data_type: type[BaseModel] | None = None,
+    ) -> APIResponse:
+        """Send one request over the session and parse the response, bypassing the cache."""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        body, headers = _encode_json_body(self._codec, json)
+        if self.tracer is not None:
+            headers = self.tracer.inject(headers or {})
 
-        response = self._session.request(
-            method=method,
-            url=url,
-            params=params,
-            json=json,
-            timeout=self._default_timeout,
+        measured = (
+            self.metrics.measure(method, endpoint, self.base_url, len(body or b""))
+            if self.metrics is not None
+            else nullcontext()
         )
-        return self._handle_response(response)
+        with measured as timing:
+            response = self._http(
+                endpoint,
+                timing,
+                method=method,
+                url=url,
+                params=params,
+                data=body,
+                headers=headers,
+                timeout=self._default_timeout,
+                # Per request, like the V1 client: requests lets REQUESTS_CA_BUNDLE override `session.verify`
+                verify=self.config.verify_ssl,
+            )
+            if self.tracer is not None:
+                self.tracer.annotate(response.status_code, len(body or b""), len(response.content))
+            return self._handle_response(response, data_type, timing)
+
+    def _http(self, endpoint: str, timing: RequestTiming | None = None, **kwargs: Any) -> requests.Response:
+        """
+        Perform one HTTP exchange, admitted by `self.limiter` when adaptive concurrency is enabled.
+
+        If `timing` is given, the transport phases, status and response size are recorded on it.
+        """
+        if timing is None:
+            return self._exchange(endpoint, **kwargs)
+        with tracking(PhaseClock()) as clock:
+            response = self._exchange(endpoint, **kwargs)
+        clock.apply(timing)
+        timing.status = response.status_code
+        timing.response_bytes = len(response.content)
+        return response
+
+    def _exchange(self, endpoint: str, **kwargs: Any) -> requests.Response:
+        """Send the request through the session, holding a limiter slot if there is one."""
+        if self.limiter is None:
+            return self._session.request(**kwargs)
+        with self.limiter.slot(endpoint) as slot:
+            response = self._session.request(**kwargs)
+            slot.observe(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    def _stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[Any]:
+        """
+        Send a request and yield the raw items of the response `data` list as they are decoded.
+
+        The body is read in `chunk_size` pieces, so memory stays flat regardless of the response size. Like
+        `_request`, the JWT is renewed and a rejected one retried once, and the request is traced, measured and
+        admitted by the limiter; it holds its limiter slot until the body has been read.
+
+        Raises:
+            AuthenticationError, ValidationError, APIError: As `_handle_response`.
+        """
+        traced = self.tracer.request(method, endpoint, self.base_url) if self.tracer is not None else nullcontext()
+        request = (method, endpoint, params, chunk_size)
+        with traced, ExitStack() as stack:
+            if not self._manages_jwt() or endpoint == _JWT_ENDPOINT:
+                response, chunks = stack.enter_context(self._streaming(*request))
+            else:
+                token = self._renewed_token()
+                try:
+                    response, chunks = stack.enter_context(self._streaming(*request))
+                except AuthenticationError:
+                    self._refresh_jwt(token)
+                    response, chunks = stack.enter_context(self._streaming(*request))
+            try:
+                yield from iter_json_array(chunks, "data")
+            except ValueError as exc:
+                raise APIError(f"Failed to parse JSON response: {str(exc)}", response)
+
+    @contextmanager
+    def _streaming(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        chunk_size: int,
+    ) -> Iterator[tuple[requests.Response, Iterator[bytes]]]:
+        """
+        Send one streamed request and check its status; the block reads the body from the yielded chunks.
+
+        The limiter slot and the metrics timing span the whole block.
+        """
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        headers = self.tracer.inject({}) if self.tracer is not None else None
+        measured = self.metrics.measure(method, endpoint, self.base_url) if self.metrics is not None else nullcontext()
+        admitted = self.limiter.slot(endpoint) if self.limiter is not None else nullcontext()
+        received = 0
+
+        def counted(response: requests.Response) -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size):
+                received += len(chunk)
+                yield chunk
+
+        with measured as timing, admitted as slot:
+            with tracking(PhaseClock()) if timing is not None else nullcontext() as clock:
+                response = self._session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    stream=True,
+                    timeout=self._default_timeout,
+                    verify=self.config.verify_ssl,
+                )
+            if slot is not None:
+                slot.observe(response.status_code, response.headers.get("Retry-After"))
+            if timing is not None:
+                clock.apply(timing)
+                timing.status = response.status_code
+            with response:
+                try:
+                    if not response.ok:
+                        received = len(response.content)
+                        self._handle_response(response)
+                    yield response, counted(response)
+                finally:
+                    if timing is not None:
+                        timing.response_bytes = received
+                    if self.tracer is not None:
+                        self.tracer.annotate(response.status_code, 0, received)
+
+    #
+    # Tracing
+    #
+
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager:
+        """
+        Group the requests made inside the block under one parent span, e.g. a write and the
+        `apply_firewall_changes()` that follows it. Does nothing unless tracing is enabled.
+
+        Example:
+            with client.span("block-host", address=ip):
+                client.update_firewall_alias(alias)
+                client.apply_firewall_changes()
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    #
+    # Batches
+    #
+
+    def batch(self, parallelism: int = 4) -> Batch:
+        """
+        Pipeline many writes with a single apply: calls made on the batch run concurrently over the pooled
+        connections, and `apply_firewall_changes()` is called once on exit if any write changed the firewall.
+        Queued `delete_firewall_alias` calls are made last, one at a time from the highest id down, since each
+        delete renumbers the aliases after it. See `pyfsense_client.batch`.
+
+        Example:
+            with client.batch() as batch:
+                for alias in aliases:
+                    batch.create_firewall_alias(alias)
+            print(batch.applied)
+        """
+        return Batch(self, V2_SUBSYSTEMS, parallelism, ordered=V2_ORDERED)
 
     #
     # Auth
@@ -162,49 +552,124 @@ class PfSenseV2Client:
 
         Returns:
             str: The JWT token
+
+        If `ClientConfig.token_cache_path` is set, a still-valid token issued to another process for the same
+        host and user is reused instead.
         """
         username = username or self.config.username
         password = password or self.config.password
         if not username or not password:
             raise ValueError("No username/password provided for JWT auth.")
 
-        endpoint = "/api/v2/auth/jwt"
-        body = {"username": username, "password": password}
-        raw_resp = self._request("POST", endpoint, json=body)
-
-        if not raw_resp.data or "token" not in raw_resp.data:
-            raise AuthenticationError("No token returned in JWT auth response.", None)
-
-        token = raw_resp.data["token"]
-        self._session.headers.update({"Authorization": f"Bearer {token}"})
-        self.config.jwt_token = token
-        return token
+        with self._auth_lock:
+            return self._obtain_jwt(username, password)
 
     #
     # Firewall Aliases (plural)
     #
 
-    def get_firewall_aliases(self) -> list[FirewallAlias]:
+    def get_firewall_aliases(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> list[FirewallAlias]:
         """
         GET /api/v2/firewall/aliases
         Returns a list of all firewall aliases.
+
+        Args:
+            limit (int): The maximum number of aliases to return. Set to 0 for no limit. Default is 0.
+            offset (int): The starting point in the dataset to begin fetching objects. Default is 0.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
         """
         endpoint = "/api/v2/firewall/aliases"
-        resp = self._request("GET", endpoint)
+        params: dict[str, Any] = {"limit": limit, "offset": offset}
+        if query:
+            params.update(query)
+        resp = self._request("GET", endpoint, params=params, data_type=FirewallAlias)
         if not resp.data or not isinstance(resp.data, list):
-            return []
-        return [FirewallAlias.model_validate(item) for item in resp.data]
+            aliases = []
+        else:
+            aliases = _FIREWALL_ALIAS_LIST.validate_python(resp.data)
+        if self.alias_index is not None:
+            self.alias_index.record(aliases, complete=not (limit or offset or query))
+        return aliases
+
+    def iter_firewall_aliases(
+        self,
+        page_size: int = 500,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> Iterator[FirewallAlias]:
+        """
+        GET /api/v2/firewall/aliases, one page at a time.
+        Lazily iterates over all aliases matching `query`, fetching the next page in the background
+        while the current one is being consumed.
+
+        Args:
+            page_size (int): Number of aliases requested per page.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
+        """
+        return iter_pages(lambda limit, offset: self.get_firewall_aliases(limit, offset, query), page_size)
+
+    def fetch_all_firewall_aliases(
+        self,
+        parallelism: int = 4,
+        page_size: int = 500,
+        query: dict[str, str | int | bool] | None = None,
+    ) -> list[FirewallAlias]:
+        """
+        GET /api/v2/firewall/aliases as concurrent offset windows.
+        Returns every alias matching `query`, fetching up to `parallelism` pages at once from worker threads
+        sharing the pooled connections.
+
+        Args:
+            parallelism (int): Maximum number of pages in flight. Keep it at or below `pool_maxsize`.
+            page_size (int): Number of aliases requested per page.
+            query (dict[str, Any] | None): Optional query parameters to filter the aliases by. Default is None.
+
+        Raises:
+            PaginationConsistencyError: If aliases were added or removed while the pages were read, on every retry.
+        """
+        with self.span("fetch_all_firewall_aliases", page_size=page_size, parallelism=parallelism):
+            try:
+                return fetch_all_pages(
+                    lambda limit, offset: self.get_firewall_aliases(limit, offset, query),
+                    page_size,
+                    parallelism,
+                    key=lambda alias: (alias.id, alias.name),
+                )
+            except PageShiftError as exc:
+                raise PaginationConsistencyError(str(exc)) from exc
 
-    def replace_all_firewall_aliases(self, aliases: list[FirewallAliasCreate]) -> list[FirewallAlias]:
+    def replace_all_firewall_aliases(
+        self, aliases: list[FirewallAliasCreate], aggregate: bool = False
+    ) -> list[FirewallAlias]:
         """
         PUT /api/v2/firewall/aliases
         Returns a list of all firewall aliases.
+
+        Args:
+            aliases (list[FirewallAliasCreate]): The complete new set of aliases.
+            aggregate (bool): Collapse the entries of host and network aliases with
+                `pyfsense_client.cidr.aggregate_alias` first, shrinking the payload and the pf tables.
         """
         endpoint = "/api/v2/firewall/aliases"
-        resp = self._request("PUT", endpoint, json=[alias.model_dump() for alias in aliases])
+        if aggregate:
+            aliases = [aggregate_alias(alias) for alias in aliases]
+        try:
+            resp = self._request(
+                "PUT", endpoint, json=[alias.model_dump() for alias in aliases], data_type=FirewallAlias
+            )
+        finally:
+            if self.alias_index is not None:
+                self.alias_index.clear()
         if not resp.data or not isinstance(resp.data, list):
             return []
-        return [FirewallAlias.model_validate(item) for item in resp.data]
+        replaced = _FIREWALL_ALIAS_LIST.validate_python(resp.data)
+        if self.alias_index is not None:
+            self.alias_index.record(replaced, complete=True)
+        return replaced
 
     def delete_all_firewall_alias(
         self,
@@ -227,7 +692,11 @@ class PfSenseV2Client:
         params = {"limit": limit, "offset": offset}
         if query:
             params.update(query)
-        return self._request("DELETE", endpoint, params=params)
+        try:
+            return self._request("DELETE", endpoint, params=params)
+        finally:
+            if self.alias_index is not None:
+                self.alias_index.clear()
 
     #
     # Firewall Alias (singular)
@@ -241,7 +710,7 @@ class PfSenseV2Client:
         endpoint = "/api/v2/firewall/alias"
         params = {"id": alias_id}
         resp = self._request("GET", endpoint, params=params)
-        return FirewallAlias.model_validate(resp.data)
+        return self._indexed(FirewallAlias.model_validate(resp.data))
 
     def create_firewall_alias(self, alias: FirewallAliasCreate) -> FirewallAlias:
         """
@@ -256,7 +725,7 @@ class PfSenseV2Client:
         """
         endpoint = "/api/v2/firewall/alias"
         resp = self._request("POST", endpoint, json=alias.model_dump())
-        return FirewallAlias.model_validate(resp.data)
+        return self._indexed(FirewallAlias.model_validate(resp.data))
 
     def update_firewall_alias(self, alias: FirewallAliasUpdate) -> FirewallAlias:
         """
@@ -271,7 +740,7 @@ class PfSenseV2Client:
         """
         endpoint = "/api/v2/firewall/alias"
         resp = self._request("PATCH", endpoint, json=alias.model_dump())
-        return FirewallAlias.model_validate(resp.data)
+        return self._indexed(FirewallAlias.model_validate(resp.data))
 
     def delete_firewall_alias(self, alias_id: int) -> APIResponse:
         """
@@ -280,7 +749,162 @@ class PfSenseV2Client:
         """
         endpoint = "/api/v2/firewall/alias"
         params = {"id": alias_id}
-        return self._request("DELETE", endpoint, params=params)
+        try:
+            return self._request("DELETE", endpoint, params=params)
+        finally:
+            # Later aliases move down one id, also if the outcome is unknown
+            if self.alias_index is not None:
+                self.alias_index.deleted(alias_id)
+
+    #
+    # Firewall Alias by name
+    #
+
+    def _indexed(self, alias: FirewallAlias) -> FirewallAlias:
+        if self.alias_index is not None:
+            self.alias_index.record([alias])
+        return alias
+
+    def _alias_id(self, name: str) -> tuple[int, bool]:
+        """
+        The id of the alias called `name`, and whether it came from the alias index without a request.
+
+        With the index enabled, a miss lists every alias to refresh it; without it, the aliases are queried by name.
+
+        Raises:
+            APIError: If no alias is called `name`.
+        """
+        if self.alias_index is not None:
+            alias_id = self.alias_index.lookup(name)
+            if alias_id is not None:
+                return alias_id, True
+            if not self.alias_index.known_missing(name):
+                self.get_firewall_aliases()
+                alias_id = self.alias_index.lookup(name)
+                if alias_id is not None:
+                    return alias_id, False
+        else:
+            for alias in self.get_firewall_aliases(query={"name": name}):
+                if alias.name == name:
+                    return alias.id, False
+        raise APIError(f"No firewall alias named '{name}'.", None)
+
+    def _id_moved(self, alias_id: int, name: str) -> bool:
+        """True if the alias at `alias_id` is missing or no longer called `name`, confirming a stale indexed id."""
+        try:
+            return self.get_firewall_alias(alias_id).name != name
+        except APIError as exc:
+            if is_missing_id_error(exc):
+                return True
+            raise
+
+    def get_firewall_alias_by_name(self, name: str) -> FirewallAlias:
+        """
+        GET /api/v2/firewall/alias?id=<id of name>
+        Retrieve a single firewall alias by its name.
+
+        One request when the alias index knows the id; otherwise the aliases are listed first. If the indexed id
+        turns out to hold another alias, the index is refreshed and the read retried.
+
+        Raises:
+            APIError: If no alias is called `name`.
+        """
+        alias_id, indexed = self._alias_id(name)
+        if indexed:
+            try:
+                alias = self.get_firewall_alias(alias_id)
+                if alias.name == name:
+                    return alias
+            except APIError as exc:
+                if not is_missing_id_error(exc):
+                    raise
+            self.alias_index.forget(name)  # type: ignore[union-attr]
+            alias_id, _ = self._alias_id(name)
+        return self.get_firewall_alias(alias_id)
+
+    def update_firewall_alias_by_name(self, name: str, alias: FirewallAliasCreate) -> FirewallAlias:
+        """
+        PATCH /api/v2/firewall/alias
+        Replace the alias called `name` with `alias`, which may rename it.
+
+        One request when the alias index knows the id; otherwise the aliases are listed first. An out-of-date id
+        is usually rejected by the firewall, as the alias it now points at cannot take a name that is still in use.
+        The client then reads the alias at that id, and only if it is gone or renamed refreshes the index and
+        retries; any other error is raised as is. The index cannot notice an alias that was deleted by another
+        client within `alias_index_ttl`: the update then lands on whichever alias moved into its id. That is why
+        the index is off by default; enable it only if no other tool deletes aliases.
+
+        Args:
+            name (str): Current name of the alias.
+            alias (FirewallAliasCreate): The alias's new contents.
+
+        Returns:
+            FirewallAlias: The updated firewall alias.
+
+        Raises:
+            APIError: If no alias is called `name`.
+        """
+        return self._update_alias_by_name(name, alias)[0]
+
+    def _update_alias_by_name(self, name: str, alias: FirewallAliasCreate) -> tuple[FirewallAlias, int]:
+        """`update_firewall_alias_by_name`, also returning the number of PATCH requests sent."""
+        alias_id, indexed = self._alias_id(name)
+        if indexed:
+            try:
+                return self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 1
+            except APIError as exc:
+                if not (may_be_stale_id_error(exc) and self._id_moved(alias_id, name)):
+                    raise
+            self.alias_index.forget(name)  # type: ignore[union-attr]
+            alias_id, _ = self._alias_id(name)
+            return self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 2
+        return self.update_firewall_alias(FirewallAliasUpdate(id=alias_id, **alias.model_dump())), 1
+
+    def apply_alias_delta(
+        self,
+        name: str,
+        add: Iterable[str] | Mapping[str, str] = (),
+        remove: Iterable[str] = (),
+        use_index: bool = False,
+    ) -> AliasDeltaResult:
+        """
+        PATCH /api/v2/firewall/alias
+        Add and remove entries of the alias called `name`, keeping `detail` aligned with `address`.
+
+        The alias is read first and the change computed against what the firewall holds, so an unchanged alias
+        costs no write. The V2 API has no entry endpoints, so the complete lists are sent in one PATCH, which
+        replaces the alias. See `pyfsense_client.alias_delta`.
+
+        Args:
+            name (str): Name of the alias.
+            add (Iterable[str] | Mapping[str, str]): Addresses to add, or a mapping of address -> detail.
+            remove (Iterable[str]): Addresses to remove.
+            use_index (bool): Compute the change against the alias index's copy of the alias, if it holds one,
+                instead of reading it, saving a request. Entries another client added or removed since the copy
+                was recorded are then overwritten, so use it only if nothing else writes to the alias.
+
+        Returns:
+            AliasDeltaResult: The strategy used and what changed.
+
+        Raises:
+            APIError: If no alias is called `name`.
+            ValueError: If an address is both added and removed.
+        """
+        cached = self.alias_index.get(name) if use_index and self.alias_index is not None else None
+        current = cached or self.get_firewall_alias_by_name(name)
+        delta = compute_alias_delta(current.address, current.detail, add, remove)
+        if not delta:
+            return AliasDeltaResult("none", 0, 0, 0, len(current.address))
+        alias = FirewallAliasCreate(
+            name=name, type=current.type, descr=current.descr, address=delta.address, detail=delta.detail
+        )
+        if cached is None:
+            # The id was just read along with the contents
+            self.update_firewall_alias(FirewallAliasUpdate(id=current.id, **alias.model_dump()))
+            writes = 1
+        else:
+            _, writes = self._update_alias_by_name(name, alias)
+        return AliasDeltaResult("replace", len(delta.added), len(delta.removed), writes, len(delta.address))
 
     #
     # Apply endpoints (pending changes)
@@ -329,17 +953,87 @@ class PfSenseV2Client:
             list[DHCPLease]: A list of parsed DHCP lease objects.
         """
         endpoint = "/api/v2/status/dhcp_server/leases"
-        params: dict[str, Any] = {
-            "limit": limit,
-            "offset": offset,
-            "sort_order": sort_order,
-        }
-        if sort_by:
-            params["sort_by"] = sort_by
-        if sort_flags:
-            params["sort_flags"] = sort_flags
-
-        resp = self._request("GET", endpoint, params=params)
+        params = _dhcp_lease_params(limit, offset, sort_by, sort_order, sort_flags)
+        resp = self._request("GET", endpoint, params=params, data_type=DHCPLease)
         if not resp.data or not isinstance(resp.data, list):
             return []
-        return [DHCPLease.model_validate(item) for item in resp.data]
+        return _DHCP_LEASE_LIST.validate_python(resp.data)
+
+    def stream_dhcp_leases(
+        self,
+        limit: int = 0,
+        offset: int = 0,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+        chunk_size: int = 65536,
+    ) -> Iterator[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases
+        Like `get_dhcp_leases`, but yields each lease as soon as it is decoded from the response body.
+        Peak memory stays flat no matter how many leases the firewall returns.
+
+        Arguments:
+            chunk_size (int): Number of bytes read from the connection at a time.
+            Other arguments are the same as `get_dhcp_leases`.
+
+        Yields:
+            DHCPLease: Parsed DHCP lease objects, in response order.
+        """
+        endpoint = "/api/v2/status/dhcp_server/leases"
+        params = _dhcp_lease_params(limit, offset, sort_by, sort_order, sort_flags)
+        for item in self._stream("GET", endpoint, params=params, chunk_size=chunk_size):
+            yield DHCPLease.model_validate(item)
+
+    def iter_dhcp_leases(
+        self,
+        page_size: int = 500,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+    ) -> Iterator[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases, one page at a time.
+        Lazily iterates over all DHCP leases, fetching page N+1 in the background while page N is
+        being consumed.
+
+        Arguments:
+            page_size (int): Number of leases requested per page.
+            sort_by, sort_order, sort_flags: As for `get_dhcp_leases`. A stable sort keeps pages consistent.
+        """
+        return iter_pages(
+            lambda limit, offset: self.get_dhcp_leases(limit, offset, sort_by, sort_order, sort_flags),
+            page_size,
+        )
+
+    def fetch_all_dhcp_leases(
+        self,
+        parallelism: int = 4,
+        page_size: int = 500,
+        sort_by: list[str] | None = None,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+        sort_flags: SortFlags = SortFlags.SORT_REGULAR,
+    ) -> list[DHCPLease]:
+        """
+        GET /api/v2/status/dhcp_server/leases as concurrent offset windows.
+        A faster alternative to `get_dhcp_leases(limit=0)` for large lease tables: up to `parallelism` pages
+        are fetched at once and merged in offset order, so the result follows `sort_by`/`sort_order`.
+
+        Arguments:
+            parallelism (int): Maximum number of pages in flight. Keep it at or below `pool_maxsize`.
+            page_size (int): Number of leases requested per page.
+            sort_by, sort_order, sort_flags: As for `get_dhcp_leases`.
+
+        Raises:
+            PaginationConsistencyError: If leases shifted between pages while they were read, on every retry.
+        """
+        with self.span("fetch_all_dhcp_leases", page_size=page_size, parallelism=parallelism):
+            try:
+                return fetch_all_pages(
+                    lambda limit, offset: self.get_dhcp_leases(limit, offset, sort_by, sort_order, sort_flags),
+                    page_size,
+                    parallelism,
+                    key=lambda lease: (lease.ip, lease.mac),
+                )
+            except PageShiftError as exc:
+                raise PaginationConsistencyError(str(exc)) from exc
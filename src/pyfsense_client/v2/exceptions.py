@@ -1,10 +1,14 @@
-import requests
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
 
 
 class APIError(Exception):
     """Base exception for general API errors."""
 
-    def __init__(self, message: str, response: requests.Response | None = None):
+    def __init__(self, message: str, response: "requests.Response | httpx.Response | None" = None):
         super().__init__(message)
         self.response = response
 
@@ -19,3 +23,9 @@ class ValidationError(APIError):
     """Raised when request validation fails (HTTP 400)."""
 
     pass
+
+
+class PaginationConsistencyError(APIError):
+    """Raised when records kept shifting between pages while a full collection was being fetched."""
+
+    pass
@@ -1,14 +1,20 @@
-from .client import APIResponse, JWTAuthResponse
-from .firewall_alias import (
-    AliasType,
-    FirewallAlias,
-    FirewallAliasCreate,
-    FirewallAliasUpdate,
-)
-from .dhcp import DHCPLease
+from typing import TYPE_CHECKING
+
+from ...lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .client import APIResponse, TypedAPIResponse, JWTAuthResponse
+    from .firewall_alias import (
+        AliasType,
+        FirewallAlias,
+        FirewallAliasCreate,
+        FirewallAliasUpdate,
+    )
+    from .dhcp import DHCPLease
 
 __all__ = [
     "APIResponse",
+    "TypedAPIResponse",
     "JWTAuthResponse",
     "AliasType",
     "FirewallAlias",
@@ -16,3 +22,17 @@ __all__ = [
     "FirewallAliasUpdate",
     "DHCPLease",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "APIResponse": ".client",
+        "TypedAPIResponse": ".client",
+        "JWTAuthResponse": ".client",
+        "AliasType": ".firewall_alias",
+        "FirewallAlias": ".firewall_alias",
+        "FirewallAliasCreate": ".firewall_alias",
+        "FirewallAliasUpdate": ".firewall_alias",
+        "DHCPLease": ".dhcp",
+    },
+)
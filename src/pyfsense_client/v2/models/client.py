@@ -1,5 +1,7 @@
-from typing import Any
-from pydantic import BaseModel, Field
+from typing import Any, Generic, TypeVar
+from pydantic import BaseModel, ConfigDict, Field
+
+DataT = TypeVar("DataT")
 
 
 class APIResponse(BaseModel):
@@ -7,6 +9,8 @@ class APIResponse(BaseModel):
     Generic V2 API response model.
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     code: int
     status: str
     response_id: str | None = Field(default=None)
@@ -15,6 +19,18 @@ class APIResponse(BaseModel):
     _links: dict[str, Any] | None = None
 
 
+class TypedAPIResponse(APIResponse, Generic[DataT]):
+    """
+    V2 API response whose `data` list is validated into `DataT` items in the same pass as the envelope.
+
+    Parametrized classes (e.g. `TypedAPIResponse[DHCPLease]`) are cached by pydantic, so the
+    validator for each item type is only built once.
+    """
+
+    # Try the typed list first; smart-mode unions cost ~30% extra on large lists
+    data: list[DataT] | dict[str, Any] | None = Field(default=None, union_mode="left_to_right")
+
+
 class JWTAuthResponse(APIResponse):
     """
     Specialized response for /api/v2/auth/jwt endpoint.
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from datetime import datetime
 
 
@@ -18,6 +18,8 @@ class DHCPLease(BaseModel):
     }
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     ip: str
     mac: str
     hostname: str | None
@@ -27,3 +29,7 @@ class DHCPLease(BaseModel):
     active_status: str
     online_status: str
     descr: str | None = None
+
+
+# Cached list validator, built on first use instead of at import or per call
+_DHCP_LEASE_LIST = TypeAdapter(list[DHCPLease], config=ConfigDict(defer_build=True))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from enum import StrEnum
 
 
@@ -23,6 +23,8 @@ class FirewallAlias(BaseModel):
       }
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     name: str
     type: AliasType
@@ -43,6 +45,8 @@ class FirewallAliasCreate(BaseModel):
     }
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     name: str
     type: AliasType
     descr: str | None = None
@@ -63,9 +67,15 @@ class FirewallAliasUpdate(BaseModel):
     }
     """
 
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     name: str
     type: AliasType
     descr: str | None = None
     address: list[str] = Field(default_factory=list)
     detail: list[str] = Field(default_factory=list)
+
+
+# Cached list validator, built on first use instead of at import or per call
+_FIREWALL_ALIAS_LIST = TypeAdapter(list[FirewallAlias], config=ConfigDict(defer_build=True))
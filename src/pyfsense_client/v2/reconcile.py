@@ -0,0 +1,259 @@
+"""
+Declarative firewall alias management: diff a desired set of aliases against the firewall and send only the changes.
+
+`replace_all_firewall_aliases()` PUTs every alias, so pfSense rewrites and reloads all of them even when a single
+address changed. `AliasReconciler` reads the current aliases once, works out which aliases to create, update and
+delete, sends those requests concurrently and finishes with one `apply_firewall_changes()`.
+
+Aliases are matched by name. The order of entries does not matter: two aliases holding the same (address, detail)
+pairs in a different order are equal, and so are a missing `descr` and an empty one.
+
+V2 alias ids are list positions, so a delete renumbers every alias after it. Updates and creates are sent first,
+concurrently; creates only ever append. Deletes follow one at a time, from the highest id down, so that every id
+in the plan stays valid.
+"""
+
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from typing import TYPE_CHECKING
+
+from ..cidr import aggregate_alias
+from .models.firewall_alias import FirewallAlias, FirewallAliasCreate, FirewallAliasUpdate
+
+if TYPE_CHECKING:
+    from .client import PfSenseV2Client
+
+# Key of a failed apply in `ReconcileStats.failed`; alias names cannot contain parentheses
+APPLY_FAILED = "(apply)"
+
+
+def _entries(alias: FirewallAlias | FirewallAliasCreate) -> list[tuple[str, str]]:
+    """The alias entries as sorted (address, detail) pairs; a missing detail is an empty one."""
+    return sorted(zip_longest(alias.address, alias.detail[: len(alias.address)], fillvalue=""))
+
+
+def _changed_fields(current: FirewallAlias, desired: FirewallAliasCreate) -> list[str]:
+    """Human-readable differences between an alias on the firewall and its desired state."""
+    changes = []
+    if current.type != desired.type:
+        changes.append(f"type {current.type.value} -> {desired.type.value}")
+    if current.descr != (desired.descr or ""):
+        changes.append("descr")
+    have, want = _entries(current), _entries(desired)
+    if have != want:
+        have_addresses, want_addresses = {address for address, _ in have}, {address for address, _ in want}
+        added, removed = len(want_addresses - have_addresses), len(have_addresses - want_addresses)
+        changes.append(f"address +{added} -{removed}" if added or removed else "detail")
+    return changes
+
+
+@dataclass
+class AliasPlan:
+    """
+    The changes that bring the firewall's aliases to the desired state.
+
+    Attributes:
+        creates (list[FirewallAliasCreate]): Desired aliases missing from the firewall.
+        updates (list[tuple[FirewallAlias, FirewallAliasCreate]]): Existing aliases paired with their desired state.
+        deletes (list[FirewallAlias]): Aliases on the firewall that are not desired. Empty unless pruning.
+        unchanged (list[str]): Names of aliases that already match.
+        requests (int): Requests made to build the plan.
+    """
+
+    creates: list[FirewallAliasCreate] = field(default_factory=list)
+    updates: list[tuple[FirewallAlias, FirewallAliasCreate]] = field(default_factory=list)
+    deletes: list[FirewallAlias] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    requests: int = 0
+
+    def __len__(self) -> int:
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    def __str__(self) -> str:
+        return self.format()
+
+    def format(self) -> str:
+        """A dry-run listing of the plan, one change per line, followed by a summary line."""
+        lines = [f"+ create {alias.name} ({alias.type.value}, {len(alias.address)} entries)" for alias in self.creates]
+        lines += [
+            f"~ update {current.name} ({', '.join(_changed_fields(current, desired))})"
+            for current, desired in self.updates
+        ]
+        lines += [f"- delete {alias.name}" for alias in self.deletes]
+        lines.append(
+            f"Plan: {len(self.creates)} to create, {len(self.updates)} to update, {len(self.deletes)} to delete, "
+            f"{len(self.unchanged)} unchanged."
+        )
+        return "\n".join(lines)
+
+
+@dataclass
+class ReconcileStats:
+    """
+    What a reconciliation did.
+
+    Attributes:
+        plan (AliasPlan): The plan that was carried out.
+        created (int): Aliases created.
+        updated (int): Aliases updated.
+        deleted (int): Aliases deleted.
+        unchanged (int): Aliases that already matched.
+        requests (int): Client calls made, including reading the current aliases and the apply.
+        applied (bool): Whether `apply_firewall_changes()` succeeded.
+        elapsed (float): Seconds from the start of the first write to the end of the apply.
+        failed (dict[str, Exception]): Aliases whose change failed, by name, with the error raised. A failed apply
+            is recorded under `APPLY_FAILED`.
+    """
+
+    plan: AliasPlan
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    requests: int = 0
+    applied: bool = False
+    elapsed: float = 0.0
+    failed: dict[str, Exception] = field(default_factory=dict)
+
+
+def diff_aliases(
+    current: Iterable[FirewallAlias],
+    desired: Iterable[FirewallAliasCreate],
+    prune: bool = False,
+) -> AliasPlan:
+    """
+    Compare the aliases on the firewall with the desired ones.
+
+    Args:
+        current (Iterable[FirewallAlias]): Aliases as returned by `get_firewall_aliases()`.
+        desired (Iterable[FirewallAliasCreate]): The aliases that should exist afterwards.
+        prune (bool): Delete current aliases that are not desired. If False they are left alone.
+
+    Raises:
+        ValueError: If two desired aliases have the same name.
+    """
+    wanted: dict[str, FirewallAliasCreate] = {}
+    for alias in desired:
+        if alias.name in wanted:
+            raise ValueError(f"Alias {alias.name!r} is listed more than once.")
+        wanted[alias.name] = alias
+
+    plan = AliasPlan()
+    for alias in current:
+        target = wanted.pop(alias.name, None)
+        if target is None:
+            if prune:
+                plan.deletes.append(alias)
+        elif _changed_fields(alias, target):
+            plan.updates.append((alias, target))
+        else:
+            plan.unchanged.append(alias.name)
+    plan.creates = list(wanted.values())
+    return plan
+
+
+class AliasReconciler:
+    """
+    Bring the firewall's aliases to a desired state with the fewest writes and a single apply.
+
+    Example:
+        reconciler = AliasReconciler(client, prune=True)
+        plan = reconciler.plan(desired)
+        print(plan)  # dry run
+        stats = reconciler.apply(plan)
+
+    Args:
+        client (PfSenseV2Client): Client used for every request.
+        parallelism (int): Maximum number of creates and updates in flight. Keep it at or below `pool_maxsize`.
+        prune (bool): Delete aliases that are not in the desired set. Off by default, so aliases managed elsewhere
+            are left alone.
+        aggregate (bool): Collapse the entries of desired host and network aliases with
+            `pyfsense_client.cidr.aggregate_alias` before comparing them.
+    """
+
+    def __init__(
+        self, client: "PfSenseV2Client", parallelism: int = 4, prune: bool = False, aggregate: bool = False
+    ):
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1.")
+        self.client = client
+        self.parallelism = parallelism
+        self.prune = prune
+        self.aggregate = aggregate
+
+    def plan(self, desired: Iterable[FirewallAliasCreate]) -> AliasPlan:
+        """Read the current aliases and work out the changes, without making any."""
+        if self.aggregate:
+            desired = [aggregate_alias(alias) for alias in desired]
+        plan = diff_aliases(self.client.get_firewall_aliases(), desired, self.prune)
+        plan.requests = 1
+        return plan
+
+    def apply(self, plan: AliasPlan) -> ReconcileStats:
+        """
+        Carry out `plan` and apply the changes once, if any write succeeded.
+
+        A failed write does not stop the others; it is recorded in `ReconcileStats.failed`, and so is a failed
+        apply, as the writes were made either way.
+        """
+        stats = ReconcileStats(plan=plan, unchanged=len(plan.unchanged), requests=plan.requests)
+        if not plan:
+            return stats
+
+        started = time.perf_counter()
+        with self.client.span("reconcile_firewall_aliases", changes=len(plan)):
+            with ThreadPoolExecutor(self.parallelism, thread_name_prefix="pyfsense-reconcile") as executor:
+                futures = {
+                    executor.submit(self._update, current, desired): (desired.name, False)
+                    for current, desired in plan.updates
+                }
+                futures.update(
+                    {executor.submit(self.client.create_firewall_alias, alias): (alias.name, True) for alias in plan.creates}
+                )
+                for future in as_completed(futures):
+                    stats.requests += 1
+                    name, created = futures[future]
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        stats.failed[name] = exc
+                    else:
+                        if created:
+                            stats.created += 1
+                        else:
+                            stats.updated += 1
+
+            for alias in sorted(plan.deletes, key=lambda alias: alias.id, reverse=True):
+                stats.requests += 1
+                try:
+                    self.client.delete_firewall_alias(alias.id)
+                except Exception as exc:
+                    stats.failed[alias.name] = exc
+                else:
+                    stats.deleted += 1
+
+            if stats.created or stats.updated or stats.deleted:
+                stats.requests += 1
+                try:
+                    self.client.apply_firewall_changes()
+                except Exception as exc:
+                    stats.failed[APPLY_FAILED] = exc
+                else:
+                    stats.applied = True
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def reconcile(self, desired: Iterable[FirewallAliasCreate], dry_run: bool = False) -> ReconcileStats:
+        """Plan and, unless `dry_run`, apply. The plan is available as `ReconcileStats.plan` either way."""
+        plan = self.plan(desired)
+        if dry_run:
+            return ReconcileStats(plan=plan, unchanged=len(plan.unchanged), requests=plan.requests)
+        return self.apply(plan)
+
+    def _update(self, current: FirewallAlias, desired: FirewallAliasCreate) -> FirewallAlias:
+        return self.client.update_firewall_alias(
+            FirewallAliasUpdate(id=current.id, **desired.model_dump(exclude={"descr"}), descr=desired.descr or "")
+        )
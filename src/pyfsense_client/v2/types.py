@@ -0,0 +1,146 @@
+"""
+Configuration and request helpers shared by the sync and async V2 clients.
+
+Nothing here imports an HTTP library or pydantic, so `ClientConfig` is cheap to import.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ..codec import JSONCodec
+
+_JWT_ENDPOINT = "/api/v2/auth/jwt"
+
+
+def _encode_json_body(codec: "JSONCodec", json: Any) -> tuple[bytes | None, dict[str, str] | None]:
+    """
+    Encode a JSON request body with `codec`, returning the body and the headers to send with it.
+    """
+    if json is None:
+        return None, None
+    return codec.dumps(json), {"Content-Type": "application/json"}
+
+
+def _dhcp_lease_params(
+    limit: int,
+    offset: int,
+    sort_by: list[str] | None,
+    sort_order: "SortOrder",
+    sort_flags: "SortFlags",
+) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "limit": limit,
+        "offset": offset,
+        "sort_order": sort_order,
+    }
+    if sort_by:
+        params["sort_by"] = sort_by
+    if sort_flags:
+        params["sort_flags"] = sort_flags
+    return params
+
+
+class SortOrder(StrEnum):
+    ASCENDING = "SORT_ASC"
+    DESCENDING = "SORT_DESC"
+
+
+class SortFlags(StrEnum):
+    SORT_REGULAR = "SORT_REGULAR"
+    SORT_NUMERIC = "SORT_NUMERIC"
+    SORT_STRING = "SORT_STRING"
+    SORT_LOCALE_STRING = "SORT_LOCALE_STRING"
+    SORT_NATURAL = "SORT_NATURAL"
+    SORT_FLAG_CASE = "SORT_FLAG_CASE"
+
+
+@dataclass
+class ClientConfig:
+    """
+    Configuration for the pfSense API client.
+
+    Attributes:
+        host (str): The base URL or IP of the pfSense instance, e.g. "https://192.168.1.1"
+        verify_ssl (bool): Whether to verify SSL certificates.
+        timeout (int): Request timeout in seconds.
+        username (str | None): For JWT-based auth calls.
+        password (str | None): For JWT-based auth calls.
+        api_key (str | None): If using API key-based authentication (the server expects "X-API-Key: <api_key>").
+        jwt_token (str | None): If you already have a JWT token or want to store it after calling `authenticate_jwt()`.
+        pool_connections (int): Number of per-host connection pools to keep.
+        pool_maxsize (int): Maximum number of connections kept open to the host.
+        pool_block (bool): Block when all `pool_maxsize` connections are busy instead of opening throwaway ones.
+        keep_alive (bool): Reuse connections between requests. If False, every request sends "Connection: close".
+        keepalive_expiry (float): Seconds an idle connection is kept before being closed (async client only).
+        json_codec (str): JSON backend for request and response bodies: "auto", "orjson", "msgspec" or "json".
+            "auto" uses the fastest installed backend.
+        cache_ttl (float): Seconds a GET response is served from the client-side cache. 0 (the default) disables
+            the cache for endpoints not listed in `cache_ttls`.
+        cache_maxsize (int): Maximum number of cached GET responses; least recently used entries are evicted.
+        cache_ttls (dict[str, float] | None): Per-endpoint TTL overrides keyed on path prefix,
+            e.g. {"/api/v2/status": 2}.
+        coalesce_requests (bool): Let identical GETs issued concurrently share one round trip and one parsed
+            result. Every caller gets the same model instances, so shared results must not be mutated. Off by
+            default, like the cache.
+        jwt_refresh_margin (float): With username/password JWT auth, re-authenticate this many seconds before
+            the token's `exp` claim.
+        token_cache_path (str | None): File in which JWTs are shared between processes on the same host,
+            e.g. "~/.cache/pyfsense/tokens.json". None disables the on-disk cache.
+        hedge_requests (bool): Send a duplicate of a GET that is slower than `hedge_percentile` of recent
+            latency and use whichever answers first.
+        hedge_percentile (float): Latency percentile after which a GET is hedged.
+        hedge_min_delay (float): Minimum seconds to wait before hedging.
+        adaptive_concurrency (bool): Limit requests in flight to the host with an AIMD limiter that grows while
+            responses are fast and backs off on 5xx, timeouts, slow responses and `Retry-After`.
+        concurrency_limit (int): Starting limit for adaptive concurrency.
+        max_concurrency (int | None): Upper bound for adaptive concurrency. Defaults to `pool_maxsize`.
+        collect_metrics (bool): Record a per-phase timing breakdown of every request in the process-wide
+            `pyfsense_client.metrics.default_registry()`.
+        tracing (bool): Wrap every request in an OpenTelemetry span and propagate the trace context in request
+            headers. Has no effect unless `opentelemetry-api` is installed.
+        cassette_path (str | None): Cassette file to record traffic to or replay it from (see
+            `pyfsense_client.cassette`). None (the default) talks to the host normally.
+        cassette_mode (str): "record" to append every exchange to the cassette, or "replay" to serve responses
+            from it without any network access.
+        cassette_latency (float): On replay, multiplier for the recorded response times: 1.0 reproduces the
+            original latency, 0 replays instantly.
+        alias_index_ttl (float): Seconds the client trusts an alias name -> id mapping it has seen, so that
+            `get_firewall_alias_by_name()` and `update_firewall_alias_by_name()` can skip listing the aliases.
+            Writes made by this client keep the index current, but an alias deleted by another tool within the
+            TTL shifts the ids after it, and a by-name update can then overwrite the wrong alias. Only enable it
+            when this client is the only one deleting aliases. 0 (the default) disables the index.
+    """
+
+    host: str
+    verify_ssl: bool = True
+    timeout: int = 30
+    username: str | None = None
+    password: str | None = None
+    api_key: str | None = None
+    jwt_token: str | None = None
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    keep_alive: bool = True
+    keepalive_expiry: float = 5.0
+    json_codec: str = "auto"
+    cache_ttl: float = 0.0
+    cache_maxsize: int = 256
+    cache_ttls: dict[str, float] | None = None
+    coalesce_requests: bool = False
+    jwt_refresh_margin: float = 60.0
+    token_cache_path: str | None = None
+    hedge_requests: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.05
+    adaptive_concurrency: bool = False
+    concurrency_limit: int = 4
+    max_concurrency: int | None = None
+    collect_metrics: bool = False
+    tracing: bool = False
+    cassette_path: str | None = None
+    cassette_mode: str = "replay"
+    cassette_latency: float = 1.0
+    alias_index_ttl: float = 0.0
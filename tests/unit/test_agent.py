@@ -0,0 +1,162 @@
+import os
+import stat
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from pyfsense_client.agent import Agent, AgentClient, AgentError
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v2 import APIError, FirewallAlias, FirewallAliasCreate, PfSenseV2Client, SortOrder
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "agent.sock")
+
+
+@pytest.fixture
+def fake():
+    with FakePfSense(aliases=3, leases=25, tls=False) as server:
+        yield server
+
+
+@pytest.fixture
+def agent(socket_path):
+    with Agent(socket_path) as running:
+        yield running
+
+
+def test_proxy_returns_the_same_results_as_the_client(fake, agent, socket_path):
+    direct = PfSenseV2Client(fake.v2_config())
+    with AgentClient(fake.v2_config(), socket_path) as proxy:
+        assert proxy.get_firewall_aliases() == direct.get_firewall_aliases()
+        assert proxy.get_dhcp_leases(limit=5, sort_order=SortOrder.DESCENDING) == direct.get_dhcp_leases(
+            limit=5, sort_order=SortOrder.DESCENDING
+        )
+        leases = proxy.iter_dhcp_leases(page_size=10)
+        assert not isinstance(leases, list)
+        assert list(leases) == direct.fetch_all_dhcp_leases(page_size=10)
+
+        created = proxy.create_firewall_alias(FirewallAliasCreate(name="new", type="host", address=["1.1.1.1"]))
+        assert isinstance(created, FirewallAlias) and created.id == 3
+        assert proxy.apply_firewall_changes().data == {"applied": True, "pending_subsystems": []}
+
+
+def test_scripts_with_equal_configs_share_one_warm_client(agent, socket_path):
+    with FakePfSense(tls=False, latency=0.05) as fake:
+        config = fake.v2_config(api_key=None, username="admin", password="pfsense")
+        for _ in range(3):
+            with AgentClient(config, socket_path) as proxy:
+                proxy.get_firewall_apply_status()
+        assert len(agent.clients) == 1
+        assert fake.total_calls("/api/v2/auth/jwt") == 1
+
+        started = time.perf_counter()
+        with AgentClient(config, socket_path) as proxy:
+            proxy.get_firewall_apply_status()
+        assert time.perf_counter() - started < 0.1
+
+        with AgentClient(fake.v2_config(), socket_path) as other:
+            other.get_firewall_apply_status()
+            assert len(other.agent_status()["clients"]) == 2
+
+
+def test_errors_are_reraised_locally(fake, agent, socket_path):
+    proxy = AgentClient(fake.v2_config(), socket_path)
+    with pytest.raises(APIError, match="404"):
+        proxy.get_firewall_alias(99)
+    with pytest.raises(ValueError):
+        proxy.get_firewall_alias("not-an-id")
+    with pytest.raises(TypeError):
+        proxy.get_firewall_alias(1, 2)
+    with pytest.raises(AttributeError):
+        proxy.not_a_method()
+    with pytest.raises(AttributeError):
+        proxy.span
+    with pytest.raises(AttributeError):
+        proxy.batch
+    assert proxy.get_firewall_alias(0).name == "alias_0"
+
+
+def test_agent_refuses_to_close_the_shared_client(fake, agent, socket_path):
+    proxy = AgentClient(fake.v2_config(), socket_path)
+    proxy.get_firewall_apply_status()
+    # AgentClient.close() only drops the connection; a forwarded close is refused by the agent
+    with pytest.raises(AttributeError):
+        proxy._call("close", (), {})
+    proxy.close()
+    assert AgentClient(fake.v2_config(), socket_path).get_firewall_alias(0).name == "alias_0"
+
+
+def test_idle_clients_are_closed(fake, socket_path):
+    with Agent(socket_path, client_idle=0.05) as agent:
+        AgentClient(fake.v2_config(), socket_path).get_firewall_apply_status()
+        assert len(agent.clients) == 1
+        time.sleep(0.1)
+        agent.evict_idle()
+        assert agent.clients == []
+
+
+def test_busy_clients_are_not_evicted(socket_path):
+    with FakePfSense(tls=False, latency=0.3) as fake, Agent(socket_path, client_idle=0.05) as agent:
+        config = fake.v2_config(hedge_requests=True)
+        AgentClient(config, socket_path).get_firewall_apply_status()
+        (client,) = agent.clients
+        client.hedger._pool()
+
+        call = threading.Thread(target=AgentClient(config, socket_path).get_firewall_apply_status)
+        call.start()
+        time.sleep(0.15)
+        agent.evict_idle()
+        assert agent.clients == [client]
+        call.join()
+
+        # Idle time counts from the end of the last call
+        agent.evict_idle()
+        assert agent.clients == [client]
+        time.sleep(0.1)
+        agent.evict_idle()
+        assert agent.clients == []
+        assert client.hedger._executor._shutdown
+
+
+def test_socket_is_private_and_removed_on_stop(socket_path):
+    agent = Agent(socket_path)
+    agent.start()
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    with pytest.raises(AgentError, match="already listening"):
+        Agent(socket_path).start()
+    agent.stop()
+    assert not os.path.exists(socket_path)
+
+
+def test_missing_agent(fake, socket_path):
+    with pytest.raises(AgentError, match="No agent"):
+        AgentClient(fake.v2_config(), socket_path).get_firewall_apply_status()
+
+
+def test_autostart_spawns_a_daemon(fake, socket_path):
+    proxy = AgentClient(fake.v2_config(), socket_path, autostart=True)
+    try:
+        assert proxy.get_firewall_apply_status().status == "ok"
+        pid = proxy.agent_status()["pid"]
+        assert pid != os.getpid()
+    finally:
+        proxy.close()
+        subprocess.run(["kill", str(pid)], check=False)
+    for _ in range(100):
+        if not os.path.exists(socket_path):
+            break
+        time.sleep(0.02)
+    assert not os.path.exists(socket_path)
+
+
+def test_importing_the_proxy_skips_requests():
+    code = "import sys, pyfsense_client.agent; print('requests' in sys.modules, 'pydantic' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert output.split() == ["False", "False"]
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from pyfsense_client.alias_delta import AliasDelta, choose_strategy, compute_alias_delta
+from pyfsense_client.testing import FakePfSense, make_aliases
+from pyfsense_client.v1.client import PfSenseV1Client
+from pyfsense_client.v2 import AsyncPfSenseV2Client, PfSenseV2Client
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+def test_delta_keeps_detail_aligned():
+    delta = compute_alias_delta(
+        ["1.1.1.1", "2.2.2.2", "3.3.3.3"],
+        ["one", "two"],
+        add={"4.4.4.4": "four", "1.1.1.1": "ignored"},
+        remove=["2.2.2.2", "9.9.9.9"],
+    )
+    assert delta.added == {"4.4.4.4": "four"} and delta.removed == ["2.2.2.2"]
+    assert delta.address == ["1.1.1.1", "3.3.3.3", "4.4.4.4"]
+    assert delta.detail == ["one", "", "four"]
+    assert not compute_alias_delta(["1.1.1.1"], [], add=["1.1.1.1"], remove=["2.2.2.2"])
+
+    with pytest.raises(ValueError, match="both added and removed"):
+        compute_alias_delta([], [], add=["1.1.1.1"], remove=["1.1.1.1"])
+
+
+def test_strategy_follows_delta_size():
+    big = [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(100_000)]
+    small_change = compute_alias_delta(big, [], add=["192.0.2.1"])
+    assert choose_strategy(small_change, chunk_size=1000, extra_requests=1) == "entries"
+
+    fresh = [f"172.16.{i // 256}.{i % 256}" for i in range(20_000)]
+    churn = compute_alias_delta(big, [], add=fresh, remove=big[:50_000])
+    assert choose_strategy(churn, chunk_size=1000, extra_requests=1) == "replace"
+
+    small_alias = AliasDelta(added={"1.1.1.1": ""}, address=["1.1.1.1"], detail=[""])
+    assert choose_strategy(small_alias, chunk_size=1000, extra_requests=1) == "replace"
+
+
+def test_v1_small_delta_uses_entry_endpoints():
+    with FakePfSense(aliases=make_aliases(1, addresses=10_000)) as fake:
+        client = PfSenseV1Client(fake.v1_config(alias_cache_ttl=300))
+        doomed = fake.state.aliases[0]["address"][5]
+        result = client.apply_alias_delta("alias_0", add={"192.0.2.1": "new"}, remove=[doomed])
+        assert (result.strategy, result.added, result.removed, result.writes) == ("entries", 1, 1, 3)
+        assert fake.state.applies == 1
+
+        alias = fake.state.aliases[0]
+        assert len(alias["address"]) == len(alias["detail"]) == 10_000
+        assert doomed not in alias["address"]
+        assert alias["detail"][alias["address"].index("192.0.2.1")] == "new"
+
+        # The second call works from the snapshot: no read, and nothing to send
+        fake.reset_calls()
+        assert client.apply_alias_delta("alias_0", add=["192.0.2.1"]).strategy == "none"
+        assert fake.total_calls("/api/v1") == 0
+
+
+def test_v1_large_delta_replaces_alias():
+    with FakePfSense(aliases=make_aliases(1, addresses=200)) as fake:
+        client = PfSenseV1Client(fake.v1_config())
+        assert client.alias_snapshots is None
+        add = [f"192.0.2.{i}" for i in range(150)]
+        remove = fake.state.aliases[0]["address"][:100]
+        result = client.apply_alias_delta("alias_0", add=add, remove=remove, chunk_size=10)
+        assert (result.strategy, result.writes, result.entries) == ("replace", 1, 250)
+        assert fake.total_calls("/api/v1/firewall/alias", "PUT") == 1
+        assert fake.state.aliases[0]["address"][-150:] == add
+        assert len(fake.state.aliases[0]["detail"]) == 250
+
+        with pytest.raises(ValueError, match="No firewall alias named 'missing'"):
+            client.apply_alias_delta("missing", add=["1.1.1.1"])
+
+
+def test_v1_delta_reads_the_alias_by_default():
+    with FakePfSense(aliases=make_aliases(1, addresses=4)) as fake:
+        client = PfSenseV1Client(fake.v1_config())
+        client.apply_alias_delta("alias_0", add=["192.0.2.1"], strategy="replace")
+        # Another client adds an entry after this one wrote the alias
+        fake.state.aliases[0]["address"].append("198.51.100.1")
+        fake.state.aliases[0]["detail"].append("theirs")
+
+        client.apply_alias_delta("alias_0", add=["192.0.2.2"], strategy="replace")
+        assert fake.state.aliases[0]["address"][-3:] == ["192.0.2.1", "198.51.100.1", "192.0.2.2"]
+        assert len(fake.state.aliases[0]["detail"]) == 7
+
+
+def test_v2_delta_reads_the_alias_first():
+    with FakePfSense(aliases=3, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config(alias_index_ttl=300))
+        client.get_firewall_aliases()
+        # Another client adds an entry after the listing
+        fake.state.aliases[1]["address"].append("198.51.100.1")
+        fake.state.aliases[1]["detail"].append("theirs")
+        fake.reset_calls()
+
+        doomed = fake.state.aliases[1]["address"][0]
+        result = client.apply_alias_delta("alias_1", add=["192.0.2.1"], remove=[doomed])
+        assert (result.strategy, result.writes, result.entries) == ("replace", 1, 5)
+        assert fake.total_calls("/api/v2", "GET") == 1 and fake.total_calls("/api/v2", "PATCH") == 1
+        alias = fake.state.aliases[1]
+        assert alias["address"][-2:] == ["198.51.100.1", "192.0.2.1"] and len(alias["detail"]) == 5
+
+
+def test_v2_delta_from_the_index_is_one_patch():
+    with FakePfSense(aliases=3, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config(alias_index_ttl=300))
+        client.get_firewall_aliases()
+        fake.reset_calls()
+
+        doomed = fake.state.aliases[1]["address"][0]
+        result = client.apply_alias_delta("alias_1", add=["192.0.2.1"], remove=[doomed], use_index=True)
+        assert (result.strategy, result.writes, result.entries) == ("replace", 1, 4)
+        assert fake.total_calls("/api/v2") == 1
+
+        # The PATCH response refreshed the index, so a no-op costs nothing
+        fake.reset_calls()
+        assert client.apply_alias_delta("alias_1", remove=[doomed], use_index=True).strategy == "none"
+        assert fake.total_calls("/api/v2") == 0
+
+
+def test_v2_delta_counts_a_retried_patch():
+    with FakePfSense(aliases=3, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config(alias_index_ttl=300))
+        client.get_firewall_aliases()
+        # Another client deletes alias_0, so alias_1's indexed id now holds alias_2
+        del fake.state.aliases[0]
+
+        result = client.apply_alias_delta("alias_1", add=["192.0.2.1"], use_index=True)
+        assert result.writes == fake.total_calls("/api/v2/firewall/alias", "PATCH") == 2
+        assert fake.state.aliases[0]["name"] == "alias_1" and fake.state.aliases[0]["address"][-1] == "192.0.2.1"
+
+
+def test_async_v2_delta():
+    with FakePfSense(aliases=2, tls=False) as fake:
+
+        async def run():
+            async with AsyncPfSenseV2Client(fake.v2_config()) as client:
+                return await client.apply_alias_delta("alias_0", add={"192.0.2.1": "x"})
+
+        assert asyncio.run(run()).added == 1
+        assert fake.state.aliases[0]["detail"][-1] == "x"
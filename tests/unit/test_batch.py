@@ -0,0 +1,100 @@
+import pytest
+
+from pyfsense_client.batch import BatchError, V1_SUBSYSTEMS, Batch
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v1.client import PfSenseV1Client
+from pyfsense_client.v1.models import FirewallAliasCreate as V1FirewallAliasCreate
+from pyfsense_client.v2 import APIError, FirewallAliasCreate, PfSenseV2Client
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+def test_v1_batch_applies_once():
+    with FakePfSense(aliases=40, latency=0.02) as fake:
+        client = PfSenseV1Client(fake.v1_config())
+        with client.batch(parallelism=8) as batch:
+            items = [batch.create_firewall_alias_entry(f"alias_{i}", [f"10.0.0.{i}"]) for i in range(40)]
+            client.create_firewall_alias(
+                V1FirewallAliasCreate(name="direct", type="host", address="1.1.1.1", detail="one")
+            )
+        assert all(item.ok for item in items)
+        assert fake.state.applies == 1
+        assert fake.total_calls("/api/v1/firewall/apply") == 1
+        assert batch.applied.keys() == {"apply_firewall_changes"}
+        assert fake.max_in_flight > 1
+        assert "10.0.0.39" in fake.state.aliases[39]["address"]
+
+
+def test_v1_without_batch_applies_every_write():
+    with FakePfSense(aliases=1) as fake:
+        client = PfSenseV1Client(fake.v1_config())
+        for i in range(3):
+            client.create_firewall_alias_entry("alias_0", f"10.0.0.{i}")
+        assert fake.state.applies == 3
+
+
+def test_v2_batch_reports_failures_per_item():
+    with FakePfSense(tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        with pytest.raises(BatchError) as raised:
+            with client.batch() as batch:
+                good = batch.create_firewall_alias(FirewallAliasCreate(name="a", type="host", address=["1.1.1.1"]))
+                bad = batch.create_firewall_alias(FirewallAliasCreate(name="a", type="host", address=["2.2.2.2"]))
+                batch.apply_firewall_changes()
+        first, second = sorted([good, bad], key=lambda item: item.ok)
+        assert raised.value.failed == [first]
+        assert isinstance(first.error, APIError) and second.result().name == "a"
+        assert fake.total_calls("/api/v2/firewall/apply", "POST") == 1
+
+
+def test_v2_batch_deletes_from_the_highest_id_down():
+    with FakePfSense(aliases=6, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        with client.batch(parallelism=4) as batch:
+            deletes = [batch.delete_firewall_alias(alias_id) for alias_id in (1, 4, 2)]
+            created = batch.create_firewall_alias(FirewallAliasCreate(name="new", type="host"))
+        assert all(item.ok for item in deletes) and created.ok
+        assert [a["name"] for a in fake.state.aliases] == ["alias_0", "alias_3", "alias_5", "new"]
+        assert fake.total_calls("/api/v2/firewall/apply", "POST") == 1
+
+
+def test_held_deletes_are_not_sent_if_the_block_raises():
+    with FakePfSense(aliases=2, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        with pytest.raises(KeyError):
+            with client.batch() as batch:
+                item = batch.delete_firewall_alias(0)
+                raise KeyError("boom")
+        assert isinstance(item.error, RuntimeError)
+        assert len(fake.state.aliases) == 2
+
+
+def test_batch_with_only_reads_does_not_apply():
+    with FakePfSense(aliases=2, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        with client.batch() as batch:
+            aliases = batch.get_firewall_aliases()
+        assert len(aliases.result()) == 2
+        assert not batch.dirty and fake.total_calls("/api/v2/firewall/apply") == 0
+
+
+def test_exception_in_block_skips_apply():
+    with FakePfSense(tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        with pytest.raises(KeyError):
+            with client.batch() as batch:
+                item = batch.create_firewall_alias(FirewallAliasCreate(name="a", type="host"))
+                raise KeyError("boom")
+        assert item.ok
+        assert fake.total_calls("/api/v2/firewall/apply") == 0
+        # The client is usable outside a batch again
+        client.create_firewall_alias(FirewallAliasCreate(name="b", type="host"))
+        assert fake.state.applies == 0
+
+
+def test_batch_misuse():
+    batch = Batch(object(), V1_SUBSYSTEMS)
+    with pytest.raises(RuntimeError):
+        batch.submit("anything")
+    with pytest.raises(ValueError):
+        Batch(object(), V1_SUBSYSTEMS, parallelism=0)
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from pyfsense_client.cache import ResponseCache, make_cache
+from pyfsense_client.v2 import SortOrder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_key_is_independent_of_param_order_and_normalizes_values():
+    a = ResponseCache.make_key("get", "api/v2/status", {"limit": 1, "sort_by": ["ip"], "sort_order": SortOrder.ASCENDING})
+    b = ResponseCache.make_key("GET", "/api/v2/status", {"sort_order": "SORT_ASC", "sort_by": ["ip"], "limit": 1})
+    assert a == b
+    assert hash(a) == hash(b)
+    assert ResponseCache.make_key("GET", "/x", None) == ResponseCache.make_key("GET", "/x", {})
+
+
+def test_get_set_and_expiry(clock):
+    cache = ResponseCache(ttl=10, clock=clock)
+    key = cache.make_key("GET", "/api/v2/firewall/aliases")
+    assert cache.get(key) is None
+    cache.set(key, "value")
+    clock.now = 9.9
+    assert cache.get(key) == "value"
+    clock.now = 10.0
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 0)
+    assert stats.hit_ratio == pytest.approx(1 / 3)
+
+
+def test_per_endpoint_ttls_use_longest_prefix(clock):
+    cache = ResponseCache(ttl=0, ttls={"/api/v2/status": 2, "api/v2/status/dhcp_server/leases": 30}, clock=clock)
+    assert cache.ttl_for("/api/v2/status/dhcp_server/leases") == 30
+    assert cache.ttl_for("/api/v2/status/system") == 2
+    assert cache.ttl_for("/api/v2/firewall/aliases") == 0
+
+    uncached = cache.make_key("GET", "/api/v2/firewall/aliases")
+    cache.set(uncached, "value")
+    assert cache.get(uncached) is None
+
+
+def test_lru_eviction(clock):
+    cache = ResponseCache(ttl=60, maxsize=2, clock=clock)
+    keys = [cache.make_key("GET", f"/api/v1/item{i}") for i in range(3)]
+    cache.set(keys[0], 0)
+    cache.set(keys[1], 1)
+    assert cache.get(keys[0]) == 0  # keys[1] is now least recently used
+    cache.set(keys[2], 2)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0
+    assert cache.stats().evictions == 1
+
+
+@pytest.mark.parametrize(
+    "write_path, cached_path, dropped",
+    [
+        ("/api/v2/firewall/alias", "/api/v2/firewall/aliases", True),
+        ("/api/v2/firewall/aliases", "/api/v2/firewall/alias", True),
+        ("/api/v1/firewall/alias/entry", "/api/v1/firewall/alias", True),
+        ("/api/v1/services/dhcpd/lease", "/api/v1/services/dhcpd/leases", True),
+        ("/api/v2/firewall/rule", "/api/v2/firewall/aliases", False),
+        ("/api/v2/firewall/apply", "/api/v2/firewall/alias", False),
+        ("/api/v1/firewall/alias", "/api/v2/firewall/alias", False),
+    ],
+)
+def test_invalidate_matches_resource(clock, write_path, cached_path, dropped):
+    cache = ResponseCache(ttl=60, clock=clock)
+    cache.set(cache.make_key("GET", cached_path, {"id": 1}), "value")
+    assert cache.invalidate(write_path) == int(dropped)
+    assert len(cache) == int(not dropped)
+
+
+def test_set_drops_values_fetched_before_an_invalidation(clock):
+    cache = ResponseCache(ttl=60, clock=clock)
+    key = cache.make_key("GET", "/api/v2/firewall/aliases")
+    generation = cache.generation()
+    cache.invalidate("/api/v2/firewall/alias")
+    cache.set(key, "stale", generation)
+    assert cache.get(key) is None
+
+    generation = cache.generation()
+    cache.set(key, "fresh", generation)
+    assert cache.get(key) == "fresh"
+    cache.clear()
+    cache.set(key, "stale", generation)
+    assert cache.get(key) is None
+
+
+def test_thread_safety(clock):
+    cache = ResponseCache(ttl=60, maxsize=50, clock=clock)
+
+    def worker(n):
+        for i in range(500):
+            key = cache.make_key("GET", f"/api/v2/item/{(n * i) % 80}")
+            if cache.get(key) is None:
+                cache.set(key, i)
+            if i % 50 == 0:
+                cache.invalidate("/api/v2/item")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 8 * 500
+    assert len(cache) <= 50
+
+
+def test_make_cache_is_opt_in():
+    assert make_cache(0, 256, None) is None
+    assert make_cache(5, 256, None).ttl == 5
+    assert make_cache(0, 256, {"/api/v2/status": 1}).ttl_for("/api/v2/status/system") == 1
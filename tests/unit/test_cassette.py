@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from pyfsense_client.cassette import Cassette, CassetteMiss, Interaction
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v1.client import ClientConfig as V1ClientConfig, PfSenseV1Client
+from pyfsense_client.v2 import AsyncPfSenseV2Client, ClientConfig, FirewallAliasCreate, PfSenseV2Client
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    return str(tmp_path / "traffic.jsonl.gz")
+
+
+def replay_config(path: str, **overrides) -> ClientConfig:
+    return ClientConfig(host="https://replay.invalid", api_key="unused", cassette_path=path, **overrides)
+
+
+def test_record_and_replay_sync(cassette_path):
+    with FakePfSense(aliases=3, leases=25, tls=False, latency=0.05) as fake:
+        client = PfSenseV2Client(fake.v2_config(cassette_path=cassette_path, cassette_mode="record"))
+        recorded_leases = client.fetch_all_dhcp_leases(page_size=10)
+        client.create_firewall_alias(FirewallAliasCreate(name="new", type="host", address=["1.1.1.1"]))
+        recorded_aliases = client.get_firewall_aliases()
+
+    replay = PfSenseV2Client(replay_config(cassette_path, cassette_latency=0))
+    started = time.perf_counter()
+    assert replay.fetch_all_dhcp_leases(page_size=10) == recorded_leases
+    assert replay.create_firewall_alias(FirewallAliasCreate(name="new", type="host", address=["1.1.1.1"])).id == 3
+    assert replay.get_firewall_aliases() == recorded_aliases
+    assert time.perf_counter() - started < 0.05
+
+
+def test_replay_reproduces_latency(cassette_path):
+    with FakePfSense(tls=False, latency=0.1) as fake:
+        PfSenseV2Client(fake.v2_config(cassette_path=cassette_path, cassette_mode="record")).apply_firewall_changes()
+
+    (interaction,) = Cassette.load(cassette_path)
+    assert interaction.method == "POST" and interaction.path == "/api/v2/firewall/apply"
+    assert interaction.elapsed >= 0.1
+
+    started = time.perf_counter()
+    PfSenseV2Client(replay_config(cassette_path)).apply_firewall_changes()
+    assert time.perf_counter() - started >= 0.1
+
+
+def test_replay_matches_body_and_repeats_last_response(cassette_path):
+    cassette = Cassette(cassette_path, "record")
+    for status in (200, 503):
+        cassette.record(Interaction("GET", "/a?x=1", "", status, {}, b"{}", 0.0))
+    cassette.record(Interaction("POST", "/a", "feedbeef", 201, {}, b"\xff\x00", 0.0))
+
+    replay = Cassette(cassette_path)
+    assert [replay.play("GET", "/a?x=1", "").status for _ in range(3)] == [200, 503, 503]
+    assert replay.play("POST", "/a", "feedbeef").body == b"\xff\x00"
+    with pytest.raises(CassetteMiss):
+        replay.play("POST", "/a", "")
+    with pytest.raises(ValueError):
+        Cassette(cassette_path, "rewind")
+
+
+def test_replay_miss_raises(cassette_path):
+    Cassette(cassette_path, "record").record(Interaction("GET", "/other", "", 200, {}, b"{}", 0.0))
+    with pytest.raises(CassetteMiss):
+        PfSenseV2Client(replay_config(cassette_path)).get_firewall_apply_status()
+
+
+def test_async_record_and_replay(cassette_path):
+    async def run(config):
+        async with AsyncPfSenseV2Client(config) as client:
+            return await client.get_firewall_aliases(), await client.get_firewall_apply_status()
+
+    with FakePfSense(aliases=4, tls=False) as fake:
+        recorded = asyncio.run(run(fake.v2_config(cassette_path=cassette_path, cassette_mode="record")))
+    replayed = asyncio.run(run(replay_config(cassette_path, cassette_latency=0)))
+    assert replayed[0] == recorded[0]
+    assert replayed[1].data == recorded[1].data
+
+
+def test_v1_record_and_replay(cassette_path):
+    with FakePfSense(aliases=2) as fake:
+        recorded = PfSenseV1Client(fake.v1_config(cassette_path=cassette_path, cassette_mode="record"))
+        aliases = recorded.get_firewall_alias().data
+
+    config = V1ClientConfig(hostname="replay.invalid", mode="jwt", jwt="unused", cassette_path=cassette_path)
+    assert PfSenseV1Client(config).get_firewall_alias().data == aliases
+
+
+def test_login_body_is_not_digested(cassette_path):
+    with FakePfSense(tls=False) as fake:
+        config = fake.v2_config(
+            api_key=None,
+            username=fake.username,
+            password=fake.password,
+            cassette_path=cassette_path,
+            cassette_mode="record",
+        )
+        recorded = PfSenseV2Client(config).get_firewall_apply_status()
+
+    (login,) = [interaction for interaction in Cassette.load(cassette_path) if interaction.path == "/api/v2/auth/jwt"]
+    assert login.body_digest == ""
+
+    # Replay needs none of the original credentials
+    config = ClientConfig(
+        host="https://replay.invalid",
+        username="someone",
+        password="else",
+        cassette_path=cassette_path,
+        cassette_latency=0,
+    )
+    assert PfSenseV2Client(config).get_firewall_apply_status().data == recorded.data
@@ -0,0 +1,94 @@
+import ipaddress
+import random
+
+import pytest
+
+from pyfsense_client.cidr import aggregate_addresses, aggregate_alias
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v1.models import FirewallAliasCreate as V1FirewallAliasCreate
+from pyfsense_client.v2 import AliasReconciler, FirewallAliasCreate, PfSenseV2Client
+
+
+def stdlib_collapse(entries):
+    networks = [ipaddress.ip_network(entry, strict=False) for entry in entries]
+    collapsed = [
+        *ipaddress.collapse_addresses(n for n in networks if n.version == 4),
+        *ipaddress.collapse_addresses(n for n in networks if n.version == 6),
+    ]
+    return [str(n.network_address) if n.prefixlen == n.max_prefixlen else str(n) for n in collapsed]
+
+
+def test_collapses_overlapping_and_adjacent_networks():
+    address, detail = aggregate_addresses(
+        ["10.0.1.0/24", "10.0.0.7", "10.0.0.0/24", "10.0.0.0/24", "2001:db8::1/128", "2001:db8::/127", "10.9.9.9/32"],
+        ["b", "a", "c", "", "v6", "", "host"],
+        merge_detail="join",
+    )
+    assert address == ["10.0.0.0/23", "10.9.9.9", "2001:db8::/127"]
+    assert detail == ["b; a; c", "host", "v6"]
+
+
+def test_matches_stdlib_on_random_input():
+    rng = random.Random(0)
+    for _ in range(50):
+        entries = [
+            f"10.0.{rng.getrandbits(2)}.{rng.getrandbits(8)}/{rng.randint(22, 32)}"
+            if rng.random() < 0.8
+            else f"2001:db8::{rng.getrandbits(6):x}/{rng.randint(122, 128)}"
+            for _ in range(rng.randint(0, 200))
+        ]
+        assert aggregate_addresses(entries)[0] == stdlib_collapse(entries)
+
+
+def test_detail_follows_the_entries_it_replaces():
+    address = ["192.0.2.128/25", "198.51.100.1", "192.0.2.0/25", "192.0.2.5"]
+    details = ["upper", "single", "lower", "inside"]
+    assert aggregate_addresses(address, details)[1] == ["upper", "single"]
+    assert aggregate_addresses(address, details, merge_detail="drop")[1] == ["", "single"]
+    assert aggregate_addresses(address, details, merge_detail=lambda d: "|".join(d))[1] == [
+        "upper|lower|inside",
+        "single",
+    ]
+    with pytest.raises(ValueError, match="merge_detail"):
+        aggregate_addresses(address, details, merge_detail="last")
+
+
+def test_other_entries_pass_through_once():
+    address, detail = aggregate_addresses(
+        ["host.example.com", "10.0.0.1-10.0.0.9", "10.0.0.300", "1.2.3.4/33", "host.example.com", "1.2.3.4/24"],
+        ["a", "b", "c", "d", "e", "f"],
+    )
+    assert address == ["1.2.3.0/24", "host.example.com", "10.0.0.1-10.0.0.9", "10.0.0.300", "1.2.3.4/33"]
+    assert detail == ["f", "a", "b", "c", "d"]
+
+
+def test_without_collapse_only_duplicates_go():
+    address, _ = aggregate_addresses(["10.0.0.1", "10.0.0.0", "10.0.0.1/32", "10.0.0.0/31"], collapse=False)
+    assert address == ["10.0.0.0/31", "10.0.0.0", "10.0.0.1"]
+
+
+def test_aggregate_alias_by_type():
+    network = FirewallAliasCreate(name="n", type="network", address=["10.0.0.0/25", "10.0.0.128/25"])
+    assert aggregate_alias(network).address == ["10.0.0.0/24"]
+    assert aggregate_alias(network).detail == []
+
+    host = V1FirewallAliasCreate(name="h", type="host", address="10.0.0.1 10.0.0.0 10.0.0.1", detail="x||y||z")
+    aggregated = aggregate_alias(host)
+    assert aggregated.address == ["10.0.0.0", "10.0.0.1"] and aggregated.detail == ["y", "x"]
+
+    port = FirewallAliasCreate(name="p", type="port", address=["80", "80"])
+    assert aggregate_alias(port) is port
+
+
+def test_reconciler_and_bulk_paths_aggregate():
+    desired = [
+        FirewallAliasCreate(name="blocklist", type="network", address=[f"10.0.{i}.0/24" for i in range(256)]),
+    ]
+    with FakePfSense(tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        stats = AliasReconciler(client, aggregate=True).reconcile(desired)
+        assert stats.created == 1 and fake.state.aliases[0]["address"] == ["10.0.0.0/16"]
+
+        replaced = client.replace_all_firewall_aliases(desired, aggregate=True)
+        assert replaced[0].address == ["10.0.0.0/16"]
+        assert AliasReconciler(client, aggregate=True).plan(desired).unchanged == ["blocklist"]
@@ -0,0 +1,67 @@
+import pytest
+import requests_mock
+
+from pyfsense_client.codec import StdlibJSONCodec, get_codec, orjson, msgspec
+from pyfsense_client.v1.client import ClientBase, ClientConfig as V1ClientConfig
+from pyfsense_client.v2 import PfSenseV2Client, ClientConfig, SortOrder
+
+AVAILABLE = ["json"] + [name for name, module in (("orjson", orjson), ("msgspec", msgspec)) if module is not None]
+
+
+@pytest.mark.parametrize("name", AVAILABLE)
+def test_codec_round_trip(name):
+    codec = get_codec(name)
+    payload = {"name": "alias", "order": SortOrder.DESCENDING, "address": ["10.0.0.1"], "nested": {"n": 1.5}}
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == {**payload, "order": "SORT_DESC"}
+
+
+@pytest.mark.parametrize("name", AVAILABLE)
+def test_codec_decode_error_is_value_error(name):
+    with pytest.raises(ValueError):
+        get_codec(name).loads(b"<html>")
+
+
+def test_auto_codec_prefers_fast_backend():
+    expected = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+    assert get_codec().name == expected
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_v2_request_uses_codec():
+    client = PfSenseV2Client(ClientConfig(host="https://example-pfsense", json_codec="json"))
+    assert isinstance(client._codec, StdlibJSONCodec)
+    with requests_mock.Mocker() as m:
+        m.post(
+            "https://example-pfsense/api/v2/firewall/alias",
+            content=b'{"code": 200, "status": "ok", "message": "", "data": {"id": 1}}',
+        )
+        resp = client._request("POST", "/api/v2/firewall/alias", json={"name": "a", "type": "host"})
+    assert resp.data == {"id": 1}
+    assert m.last_request.body == b'{"name":"a","type":"host"}'
+    assert m.last_request.headers["Content-Type"] == "application/json"
+
+
+def test_v1_request_uses_codec_and_decodes_once():
+    config = V1ClientConfig(hostname="test.example.com", mode="jwt", jwt="token", json_codec="json")
+    client = ClientBase(config=config)
+    decoded = []
+    loads = client.codec.loads
+    client.codec.loads = lambda data: decoded.append(data) or loads(data)
+
+    with requests_mock.Mocker() as m:
+        m.put(
+            "https://test.example.com/api/v1/firewall/alias",
+            json={"code": 200, "return": 0, "status": "ok", "message": "", "data": {"id": 1}},
+            headers={"Content-Type": "application/json"},
+        )
+        response = client.call("/api/v1/firewall/alias", method="PUT", payload={"id": "a"})
+
+    assert response.data == {"id": 1}
+    assert m.last_request.json() == {"id": "a"}
+    assert len(decoded) == 1
@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from pyfsense_client.hedging import Hedger, LatencyTracker
+
+
+def warmed_hedger(latency=0.01, **kwargs):
+    hedger = Hedger(percentile=90, min_delay=0.01, min_samples=5, **kwargs)
+    for _ in range(10):
+        hedger.latency.record(latency)
+    return hedger
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(50) == pytest.approx(0.050)
+    assert tracker.percentile(95) == pytest.approx(0.095)
+    assert tracker.percentile(100) == pytest.approx(0.100)
+    tracker.record(1.0)  # the window drops the oldest sample
+    assert len(tracker) == 100
+
+
+def test_no_hedging_until_enough_samples():
+    hedger = Hedger(min_samples=3)
+    assert hedger.delay() is None
+    for _ in range(3):
+        assert hedger.call(lambda: "ok") == "ok"
+    assert hedger.delay() == pytest.approx(hedger.min_delay)
+    assert hedger.stats().hedges_sent == 0
+
+
+def test_fast_call_is_not_hedged():
+    hedger = warmed_hedger()
+    calls = []
+    assert hedger.call(lambda: calls.append(1) or "ok") == "ok"
+    assert calls == [1]
+    stats = hedger.stats()
+    assert (stats.requests, stats.hedges_sent, stats.hedges_won) == (1, 0, 0)
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    hedger = warmed_hedger()
+    release = threading.Event()
+    attempt = itertools.count()
+
+    def fn():
+        if next(attempt) == 0:
+            release.wait(timeout=5)
+            return "primary"
+        return "hedge"
+
+    assert hedger.call(fn) == "hedge"
+    release.set()
+    stats = hedger.stats()
+    assert (stats.requests, stats.hedges_sent, stats.hedges_won) == (1, 1, 1)
+    assert stats.hedge_ratio == 1.0
+
+
+def test_hedge_delay_starts_when_the_primary_runs():
+    hedger = warmed_hedger(max_workers=1)
+    busy = hedger._pool().submit(time.sleep, 0.1)
+    # The primary waits for the only worker far longer than the delay, then answers at once
+    assert hedger.call(lambda: "ok") == "ok"
+    assert busy.done()
+    assert hedger.stats().hedges_sent == 0
+    hedger.close()
+
+
+def test_primary_can_still_win_after_hedge():
+    hedger = warmed_hedger()
+    attempt = itertools.count()
+
+    def fn():
+        if next(attempt) == 0:
+            time.sleep(0.05)
+            return "primary"
+        time.sleep(1)
+        return "hedge"
+
+    assert hedger.call(fn) == "primary"
+    assert hedger.stats().hedges_won == 0
+
+
+def test_failed_attempt_falls_back_to_the_other():
+    hedger = warmed_hedger()
+    attempt = itertools.count()
+
+    def fn():
+        if next(attempt) == 0:
+            time.sleep(0.05)
+            raise RuntimeError("primary failed")
+        time.sleep(0.1)
+        return "hedge"
+
+    assert hedger.call(fn) == "hedge"
+
+
+def test_both_attempts_failing_raises():
+    hedger = warmed_hedger()
+
+    def fn():
+        time.sleep(0.03)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        hedger.call(fn)
+
+
+def test_fast_errors_are_raised_without_hedging():
+    hedger = warmed_hedger(latency=0.5)
+
+    def fn():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        hedger.call(fn)
+    assert hedger.stats().hedges_sent == 0
+
+
+def test_async_hedge_wins_and_loser_is_cancelled():
+    hedger = warmed_hedger()
+    attempt = itertools.count()
+    cancelled = []
+
+    async def fn():
+        if next(attempt) == 0:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "primary"
+        return "hedge"
+
+    async def run():
+        result = await hedger.acall(fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "hedge"
+    assert cancelled == [True]
+    assert hedger.stats().hedges_won == 1
+
+
+def test_async_fast_call_is_not_hedged():
+    hedger = warmed_hedger(latency=0.5)
+
+    async def fn():
+        return "ok"
+
+    assert asyncio.run(hedger.acall(fn)) == "ok"
+    assert hedger.stats().hedges_sent == 0
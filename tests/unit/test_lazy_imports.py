@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("requests", "urllib3", "httpx", "pydantic", "opentelemetry", "orjson")
+
+
+def loaded_after(statement: str, probe: str = "") -> dict:
+    """Run `statement` in a fresh interpreter and report which heavy modules it loaded."""
+    code = f"""
+import json, sys
+{statement}
+result = {{"modules": sorted(m for m in {HEAVY!r} if m in sys.modules)}}
+{probe}
+print(json.dumps(result))
+"""
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_package_import_loads_nothing_heavy():
+    assert loaded_after("import pyfsense_client.v2, pyfsense_client.v1.client")["modules"] == []
+
+
+def test_config_import_is_light():
+    assert loaded_after("from pyfsense_client.v2 import ClientConfig")["modules"] == []
+
+
+def test_async_client_does_not_load_requests():
+    modules = loaded_after("from pyfsense_client.v2 import AsyncPfSenseV2Client")["modules"]
+    assert "httpx" in modules
+    assert "requests" not in modules and "urllib3" not in modules
+
+
+def test_v1_config_skips_mixins_and_requests():
+    result = loaded_after(
+        "from pyfsense_client.v1.client import ClientConfig",
+        "result['mixins'] = [m for m in sys.modules if m.startswith('pyfsense_client.v1.mixins.')]",
+    )
+    assert "requests" not in result["modules"]
+    assert result["mixins"] == []
+
+
+def test_models_build_their_validators_on_first_use():
+    result = loaded_after(
+        "from pyfsense_client.v2 import DHCPLease",
+        "result['complete'] = DHCPLease.__pydantic_complete__",
+    )
+    assert result["complete"] is False
+
+
+@pytest.mark.parametrize(
+    "package",
+    [
+        "pyfsense_client.v2",
+        "pyfsense_client.v2.models",
+        "pyfsense_client.v1.client",
+        "pyfsense_client.v1.mixins",
+        "pyfsense_client.v1.models",
+    ],
+)
+def test_every_export_resolves(package):
+    module = __import__(package, fromlist=["__all__"])
+    for name in module.__all__:
+        assert getattr(module, name) is not None
+    assert set(module.__all__) <= set(dir(module))
+    with pytest.raises(AttributeError):
+        getattr(module, "does_not_exist")
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from pyfsense_client.limiter import AdaptiveLimiter, AsyncAdaptiveLimiter, limiter_for_host, parse_retry_after
+from pyfsense_client.v1.client import ClientConfig as V1ClientConfig, PfSenseV1Client
+from pyfsense_client.v2 import AsyncPfSenseV2Client, ClientConfig, PfSenseV2Client
+
+
+def run_request(limiter, status=200, retry_after=None, key="/api"):
+    with limiter.slot(key) as slot:
+        slot.observe(status, retry_after)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial=10, max_limit=5)
+
+
+def test_additive_increase_on_success():
+    limiter = AdaptiveLimiter(initial=2, max_limit=10)
+    for _ in range(20):
+        run_request(limiter)
+    assert 6 <= limiter.limit <= 10
+    for _ in range(500):
+        run_request(limiter)
+    assert limiter.limit == 10
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_multiplicative_decrease_on_overload(status):
+    limiter = AdaptiveLimiter(initial=16, max_limit=32)
+    run_request(limiter, status=status)
+    assert limiter.limit == 8
+    stats = limiter.stats()
+    assert (stats.overloads, stats.decreases, stats.in_flight) == (1, 1, 0)
+
+
+def test_client_errors_do_not_decrease():
+    limiter = AdaptiveLimiter(initial=8)
+    run_request(limiter, status=404)
+    assert limiter.limit == 8
+
+
+def test_transport_errors_decrease():
+    limiter = AdaptiveLimiter(initial=8)
+    with pytest.raises(TimeoutError):
+        with limiter.slot("/api"):
+            raise TimeoutError
+    assert limiter.limit == 4
+
+
+def test_decreases_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial=16, max_limit=16)
+    slots = [limiter.slot("/api") for _ in range(4)]
+    for slot in slots:
+        slot.__enter__()
+    for slot in slots:
+        slot.observe(503)
+        slot.__exit__(None, None, None)
+    # All four were in flight before the first decrease, so they count as one overload event
+    assert limiter.limit == 8
+    assert limiter.stats().overloads == 4
+
+
+def test_slow_responses_count_as_overload():
+    limiter = AdaptiveLimiter(initial=8, latency_tolerance=3.0)
+    run_request(limiter)  # establishes a near-zero baseline
+    with limiter.slot("/api") as slot:
+        time.sleep(0.02)
+        slot.observe(200)
+    assert limiter.limit == 4
+    # Baselines are per endpoint: a slow endpoint on its own is not overload
+    with limiter.slot("/slow") as slot:
+        time.sleep(0.02)
+        slot.observe(200)
+    assert limiter.limit == 4
+
+
+def test_limit_bounds_concurrency():
+    limiter = AdaptiveLimiter(initial=3, max_limit=3)
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def worker():
+        with limiter.slot("/api") as slot:
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.005)
+            with lock:
+                state["active"] -= 1
+            slot.observe(200)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert state["peak"] == 3
+    assert limiter.stats().in_flight == 0
+
+
+def test_retry_after_pauses_new_requests():
+    limiter = AdaptiveLimiter(initial=4)
+    run_request(limiter, status=503, retry_after="0.1")
+    start = time.monotonic()
+    run_request(limiter)
+    assert time.monotonic() - start >= 0.09
+    assert limiter.stats().retry_after_pauses == 1
+
+
+def test_limiter_for_host_is_shared():
+    a = limiter_for_host("https://limiter-test.invalid", initial=2)
+    b = limiter_for_host("https://limiter-test.invalid", initial=9)
+    assert a is b
+    assert a.limit == 2
+    assert limiter_for_host("https://other-limiter-test.invalid") is not a
+
+
+def test_later_client_with_a_higher_bound_widens_the_shared_limiter(caplog):
+    limiter = limiter_for_host("https://widen-limiter-test.invalid", initial=2, max_limit=8)
+    with caplog.at_level(logging.WARNING, logger="pyfsense_client.limiter"):
+        assert limiter_for_host("https://widen-limiter-test.invalid", initial=2, max_limit=64) is limiter
+    assert limiter.max_limit == 64
+    assert "max_limit 8 and 64" in caplog.text
+
+
+def test_clients_start_within_a_small_pool():
+    config = ClientConfig(host="small-pool-test.invalid", api_key="k", pool_maxsize=2, adaptive_concurrency=True)
+    assert PfSenseV2Client(config).limiter.limit == 2
+    v1 = V1ClientConfig(
+        hostname="small-pool-v1.invalid", mode="jwt", jwt="t", pool_maxsize=2, adaptive_concurrency=True
+    )
+    assert PfSenseV1Client(v1).limiter.limit == 2
+
+
+def test_sync_and_async_clients_share_the_host_limiter():
+    config = ClientConfig(host="shared-limiter-test.invalid", api_key="k", adaptive_concurrency=True)
+
+    async def async_limiter():
+        async with AsyncPfSenseV2Client(config) as client:
+            return client.limiter
+
+    assert asyncio.run(async_limiter()) is PfSenseV2Client(config).limiter
+
+
+def test_release_from_a_thread_wakes_a_coroutine():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    held = limiter.slot("/api")
+    held.__enter__()
+
+    async def wait_for_slot():
+        threading.Timer(0.05, lambda: (held.observe(200), held.__exit__(None, None, None))).start()
+        start = time.monotonic()
+        async with limiter.slot("/api") as slot:
+            slot.observe(200)
+        return time.monotonic() - start
+
+    assert asyncio.run(wait_for_slot()) < 1
+
+
+def test_async_limiter_bounds_concurrency():
+    limiter = AsyncAdaptiveLimiter(initial=2, max_limit=2)
+    state = {"active": 0, "peak": 0}
+
+    async def request():
+        async with limiter.slot("/api") as slot:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.001)
+            state["active"] -= 1
+            slot.observe(200)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(10)))
+
+    asyncio.run(run())
+    assert state["peak"] == 2
+    with pytest.raises(TypeError):
+        limiter.acquire()
+
+
+def test_async_limiter_honors_retry_after():
+    limiter = AsyncAdaptiveLimiter(initial=2)
+
+    async def run():
+        async with limiter.slot("/api") as slot:
+            slot.observe(429, "0.05")
+        start = time.monotonic()
+        async with limiter.slot("/api") as slot:
+            slot.observe(200)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.04
@@ -0,0 +1,171 @@
+import http.server
+import threading
+
+import pytest
+import requests
+
+from pyfsense_client.metrics import Histogram, MetricsRegistry, RequestTiming
+from pyfsense_client.timing import PhaseClock, TimedHTTPAdapter, tracking
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"code": 200, "data": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(3.65)
+
+
+def test_record_aggregates_per_endpoint_and_phase():
+    registry = MetricsRegistry()
+    for status in (200, 200, None):
+        timing = RequestTiming("GET", "/api/v2/status", "https://fw", status=status, response_bytes=100)
+        timing.ttfb, timing.validate, timing.total = 0.02, 0.001, 0.03
+        registry.record(timing)
+
+    assert registry.duration_histogram("get", "/api/v2/status", "https://fw").count == 3
+    assert registry.phase_histogram("GET", "/api/v2/status", "ttfb", "https://fw").count == 3
+    # Phases that were not observed are not counted
+    assert registry.phase_histogram("GET", "/api/v2/status", "connect", "https://fw") is None
+
+    text = registry.to_prometheus()
+    labels = 'host="https://fw",method="GET",endpoint="/api/v2/status"'
+    assert f"pyfsense_request_duration_seconds_count{{{labels}}} 3" in text
+    assert f'pyfsense_request_phase_seconds_bucket{{{labels},phase="ttfb",le="0.025"}} 3' in text
+    assert f'pyfsense_request_phase_seconds_bucket{{{labels},phase="ttfb",le="+Inf"}} 3' in text
+    assert f'pyfsense_requests_total{{{labels},status="200"}} 2' in text
+    assert f'pyfsense_requests_total{{{labels},status="error"}} 1' in text
+    assert f"pyfsense_response_bytes_total{{{labels}}} 300" in text
+    assert "# TYPE pyfsense_request_phase_seconds histogram" in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.record(RequestTiming("GET", '/a"b\\c', status=200))
+    assert 'endpoint="/a\\"b\\\\c"' in registry.to_prometheus()
+
+
+def test_callbacks_receive_timings_and_errors_are_isolated():
+    registry = MetricsRegistry()
+    seen = []
+
+    @registry.subscribe
+    def broken(timing):
+        raise RuntimeError("boom")
+
+    registry.subscribe(seen.append)
+    registry.record(RequestTiming("GET", "/api", status=200))
+    assert [t.endpoint for t in seen] == ["/api"]
+
+    registry.unsubscribe(seen.append)
+    registry.record(RequestTiming("GET", "/api", status=200))
+    assert len(seen) == 1
+
+
+def test_measure_records_errors():
+    registry = MetricsRegistry()
+    seen = []
+    registry.subscribe(seen.append)
+    with pytest.raises(ConnectionError):
+        with registry.measure("post", "/api", request_bytes=12):
+            raise ConnectionError
+    assert seen[0].method == "POST"
+    assert seen[0].error == "ConnectionError"
+    assert seen[0].request_bytes == 12
+    assert seen[0].total > 0
+
+
+def test_observe_rejects_unknown_phase():
+    registry = MetricsRegistry()
+    registry.observe("GET", "/api", "validate", 0.01)
+    assert registry.phase_histogram("GET", "/api", "validate").count == 1
+    with pytest.raises(ValueError):
+        registry.observe("GET", "/api", "parse", 0.01)
+
+
+def test_reset_keeps_subscribers():
+    registry = MetricsRegistry()
+    seen = []
+    registry.subscribe(seen.append)
+    registry.record(RequestTiming("GET", "/api", status=200))
+    registry.reset()
+    assert registry.duration_histogram("GET", "/api") is None
+    registry.record(RequestTiming("GET", "/api", status=200))
+    assert len(seen) == 2
+
+
+def test_timed_adapter_reports_transport_phases(http_server):
+    session = requests.Session()
+    session.mount("http://", TimedHTTPAdapter())
+
+    timings = []
+    for _ in range(2):
+        timing = RequestTiming("POST", "/api")
+        with tracking(PhaseClock()) as clock:
+            session.post(f"{http_server}/api", data=b"{}")
+        clock.apply(timing)
+        timings.append(timing)
+
+    first, second = timings
+    for timing in timings:
+        assert None not in (timing.acquire, timing.send, timing.ttfb, timing.read)
+    # Only the first request opens a connection; the second reuses it
+    assert first.connect is not None and first.connect > 0
+    assert second.connect is None
+
+
+def test_timed_adapter_without_clock(http_server):
+    session = requests.Session()
+    session.mount("http://", TimedHTTPAdapter())
+    assert session.post(f"{http_server}/api", data=b"{}").json() == {"code": 200, "data": []}
+
+
+def test_phase_clock_consumes_httpx_trace_events():
+    import asyncio
+
+    clock = PhaseClock()
+    events = [
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.started",
+        "connection.start_tls.complete",
+        "http11.send_request_headers.started",
+        "http11.send_request_body.complete",
+        "http11.receive_response_headers.complete",
+    ]
+
+    async def replay():
+        for event in events:
+            await clock.httpx_trace(event, {})
+
+    asyncio.run(replay())
+    timing = RequestTiming("GET", "/api")
+    clock.apply(timing)
+    assert None not in (timing.connect, timing.acquire, timing.send, timing.ttfb, timing.read)
@@ -0,0 +1,222 @@
+import asyncio
+import threading
+
+import pytest
+
+from pyfsense_client.pagination import PageShiftError, afetch_all_pages, aiter_pages, fetch_all_pages, iter_pages
+
+
+def make_source(total):
+    calls = []
+
+    def fetch_page(limit, offset):
+        calls.append((limit, offset))
+        return list(range(offset, min(offset + limit, total)))
+
+    return fetch_page, calls
+
+
+def test_iter_pages_yields_every_item():
+    fetch_page, calls = make_source(25)
+    assert list(iter_pages(fetch_page, 10)) == list(range(25))
+    assert calls == [(10, 0), (10, 10), (10, 20)]
+
+
+def test_iter_pages_exact_multiple_fetches_one_empty_page():
+    fetch_page, calls = make_source(20)
+    assert list(iter_pages(fetch_page, 10)) == list(range(20))
+    assert calls == [(10, 0), (10, 10), (10, 20)]
+
+
+def test_iter_pages_starts_at_offset():
+    fetch_page, _ = make_source(12)
+    assert list(iter_pages(fetch_page, 5, offset=7)) == list(range(7, 12))
+
+
+def test_iter_pages_prefetches_next_page_while_current_is_consumed():
+    second_page_requested = threading.Event()
+
+    def fetch_page(limit, offset):
+        if offset == limit:
+            second_page_requested.set()
+        return list(range(offset, offset + limit)) if offset < 2 * limit else []
+
+    pages = iter_pages(fetch_page, 3)
+    assert next(pages) == 0
+    # Page 2 is requested before the caller has finished page 1
+    assert second_page_requested.wait(timeout=5)
+    assert list(pages) == [1, 2, 3, 4, 5]
+
+
+def test_iter_pages_early_close_does_not_block():
+    release = threading.Event()
+
+    def fetch_page(limit, offset):
+        if offset:
+            release.wait(timeout=5)
+        return list(range(offset, offset + limit))
+
+    pages = iter_pages(fetch_page, 2)
+    assert next(pages) == 0
+    pages.close()
+    release.set()
+
+
+def test_iter_pages_propagates_errors():
+    def fetch_page(limit, offset):
+        if offset:
+            raise RuntimeError("boom")
+        return [1, 2]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        list(iter_pages(fetch_page, 2))
+
+
+@pytest.mark.parametrize("page_size", [0, -1])
+def test_iter_pages_rejects_invalid_page_size(page_size):
+    with pytest.raises(ValueError):
+        list(iter_pages(lambda limit, offset: [], page_size))
+
+
+def test_aiter_pages_yields_every_item_with_prefetch():
+    calls = []
+
+    async def fetch_page(limit, offset):
+        calls.append((limit, offset))
+        await asyncio.sleep(0)
+        return list(range(offset, min(offset + limit, 7)))
+
+    async def run():
+        items = []
+        async for item in aiter_pages(fetch_page, 3):
+            if item == 0:
+                # Let the prefetch task start before page 1 has been consumed
+                await asyncio.sleep(0)
+                assert (3, 3) in calls
+            items.append(item)
+        return items
+
+    assert asyncio.run(run()) == list(range(7))
+    assert calls == [(3, 0), (3, 3), (3, 6)]
+
+
+def test_aiter_pages_early_exit_cancels_prefetch():
+
+    async def run():
+        started = asyncio.Event()
+        state = {"cancelled": False}
+
+        async def fetch_page(limit, offset):
+            if offset:
+                started.set()
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    state["cancelled"] = True
+                    raise
+            return list(range(offset, offset + limit))
+
+        pages = aiter_pages(fetch_page, 2)
+        assert await pages.__anext__() == 0
+        await started.wait()
+        await pages.aclose()
+        await asyncio.sleep(0)
+        return state["cancelled"]
+
+    assert asyncio.run(run()) is True
+
+
+@pytest.mark.parametrize("total", [0, 1, 9, 10, 11, 95])
+def test_fetch_all_pages_returns_collection_in_order(total):
+    fetch_page, calls = make_source(total)
+    assert fetch_all_pages(fetch_page, 10, parallelism=3) == list(range(total))
+    # Every window after the first re-reads the previous window's last record
+    assert all(calls[i] == (11, 10 * i - 1) for i in range(1, len(calls)))
+
+
+def test_fetch_all_pages_keeps_parallelism_windows_in_flight():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fetch_page(limit, offset):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        if offset < 30:
+            barrier.wait()
+        with lock:
+            state["active"] -= 1
+        return list(range(offset, min(offset + limit, 100)))
+
+    assert fetch_all_pages(fetch_page, 10, parallelism=4) == list(range(100))
+    assert state["peak"] == 4
+
+
+def test_fetch_all_pages_retries_after_shift():
+    data = list(range(30))
+    attempts = []
+
+    def fetch_page(limit, offset):
+        if offset == 0:
+            attempts.append(1)
+            if len(attempts) == 1:
+                # A record ahead of the later windows is deleted during the first attempt
+                page = data[offset : offset + limit]
+                del data[0]
+                return page
+        return data[offset : offset + limit]
+
+    assert fetch_all_pages(fetch_page, 10, parallelism=1) == list(range(1, 30))
+    assert len(attempts) == 2
+
+
+def test_fetch_all_pages_raises_when_records_keep_shifting():
+    counter = iter(range(1_000_000))
+
+    def fetch_page(limit, offset):
+        return [next(counter) for _ in range(limit)] if offset < 30 else []
+
+    with pytest.raises(PageShiftError):
+        fetch_all_pages(fetch_page, 10, parallelism=2, retries=1)
+
+
+def test_fetch_all_pages_uses_key_for_overlap():
+    def fetch_page(limit, offset):
+        # Records are re-created on every read, but keep their identity
+        return [{"id": i} for i in range(offset, min(offset + limit, 25))]
+
+    result = fetch_all_pages(fetch_page, 10, key=lambda item: item["id"])
+    assert [item["id"] for item in result] == list(range(25))
+
+
+@pytest.mark.parametrize("page_size, parallelism", [(0, 1), (1, 0)])
+def test_fetch_all_pages_rejects_invalid_arguments(page_size, parallelism):
+    with pytest.raises(ValueError):
+        fetch_all_pages(lambda limit, offset: [], page_size, parallelism)
+
+
+def test_afetch_all_pages():
+    async def fetch_page(limit, offset):
+        await asyncio.sleep(0)
+        return list(range(offset, min(offset + limit, 47)))
+
+    assert asyncio.run(afetch_all_pages(fetch_page, 10, parallelism=3)) == list(range(47))
+
+
+def test_afetch_all_pages_ignores_cancelled_leftover_windows():
+    async def fetch_page(limit, offset):
+        if offset:
+            # A window past the end that was cancelled before the last page was seen
+            raise asyncio.CancelledError
+        return list(range(5))
+
+    assert asyncio.run(afetch_all_pages(fetch_page, 10, parallelism=3)) == list(range(5))
+
+
+def test_afetch_all_pages_detects_shift():
+    async def fetch_page(limit, offset):
+        return list(range(offset + 1, offset + 1 + limit)) if offset else list(range(limit))
+
+    with pytest.raises(PageShiftError):
+        asyncio.run(afetch_all_pages(fetch_page, 10, retries=0))
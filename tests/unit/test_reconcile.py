@@ -0,0 +1,101 @@
+import pytest
+
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v2 import AliasReconciler, FirewallAlias, FirewallAliasCreate, PfSenseV2Client
+from pyfsense_client.v2.reconcile import APPLY_FAILED, diff_aliases
+
+
+def alias(id: int, name: str, address: list[str], detail: list[str] | None = None, **fields) -> FirewallAlias:
+    fields.setdefault("type", "host")
+    fields.setdefault("descr", "")
+    return FirewallAlias(id=id, name=name, address=address, detail=detail or [], **fields)
+
+
+def desired(name: str, address: list[str], detail: list[str] | None = None, **fields) -> FirewallAliasCreate:
+    fields.setdefault("type", "host")
+    return FirewallAliasCreate(name=name, address=address, detail=detail or [], **fields)
+
+
+@pytest.fixture
+def fake():
+    with FakePfSense(aliases=6, tls=False) as server:
+        yield server
+
+
+def test_diff_ignores_entry_order_and_missing_descr():
+    current = [alias(0, "a", ["1.1.1.1", "2.2.2.2"], ["one", "two"]), alias(1, "b", ["3.3.3.3"])]
+    plan = diff_aliases(current, [desired("a", ["2.2.2.2", "1.1.1.1"], ["two", "one"]), desired("b", ["3.3.3.3"])])
+    assert not plan
+    assert plan.unchanged == ["a", "b"]
+
+
+def test_diff_finds_creates_updates_and_deletes():
+    current = [alias(0, "keep", ["1.1.1.1"]), alias(1, "change", ["1.1.1.1", "2.2.2.2"]), alias(2, "stale", [])]
+    wanted = [desired("keep", ["1.1.1.1"]), desired("change", ["2.2.2.2", "3.3.3.3"]), desired("new", ["4.4.4.4"])]
+
+    plan = diff_aliases(current, wanted)
+    assert [a.name for a in plan.creates] == ["new"]
+    assert [current.name for current, _ in plan.updates] == ["change"]
+    assert plan.deletes == []
+
+    plan = diff_aliases(current, wanted, prune=True)
+    assert [a.name for a in plan.deletes] == ["stale"]
+    assert plan.format().splitlines() == [
+        "+ create new (host, 1 entries)",
+        "~ update change (address +1 -1)",
+        "- delete stale",
+        "Plan: 1 to create, 1 to update, 1 to delete, 1 unchanged.",
+    ]
+
+
+def test_diff_rejects_duplicate_names():
+    with pytest.raises(ValueError, match="more than once"):
+        diff_aliases([], [desired("a", []), desired("a", [])])
+
+
+def test_reconcile_sends_only_the_changes(fake):
+    client = PfSenseV2Client(fake.v2_config())
+    aliases = client.get_firewall_aliases()
+    wanted = [FirewallAliasCreate(**a.model_dump(exclude={"id"})) for a in aliases[:4]]
+    wanted[1].descr = "changed"
+    wanted.append(desired("new", ["10.0.0.1"]))
+    fake.reset_calls()
+
+    stats = AliasReconciler(client, prune=True).reconcile(wanted)
+    assert (stats.created, stats.updated, stats.deleted, stats.unchanged) == (1, 1, 2, 3)
+    assert stats.applied and not stats.failed
+    assert stats.requests == fake.total_calls("/api/v2/firewall") == 6
+    assert fake.total_calls("/api/v2/firewall/apply", "POST") == 1
+    assert not fake.calls[("PUT", "/api/v2/firewall/aliases")]
+
+    after = {a.name: a for a in client.get_firewall_aliases()}
+    assert sorted(after) == sorted(a.name for a in wanted)
+    assert after["alias_1"].descr == "changed"
+
+    assert not AliasReconciler(client, prune=True).plan(wanted)
+
+
+def test_dry_run_makes_no_writes(fake):
+    client = PfSenseV2Client(fake.v2_config())
+    fake.reset_calls()
+    stats = AliasReconciler(client, prune=True).reconcile([desired("only", ["1.1.1.1"])], dry_run=True)
+    assert len(stats.plan.deletes) == 6 and len(stats.plan.creates) == 1
+    assert stats.requests == 1 and not stats.applied
+    assert fake.total_calls("/api/v2") == 1
+
+
+def test_failed_writes_are_reported_per_alias(fake):
+    client = PfSenseV2Client(fake.v2_config())
+    fake.inject(500, path="/api/v2/firewall/alias", method="POST")
+    stats = AliasReconciler(client).reconcile([desired("new", ["1.1.1.1"]), desired("alias_0", ["9.9.9.9"])])
+    assert list(stats.failed) == ["new"]
+    assert stats.updated == 1 and stats.applied
+
+
+def test_failed_apply_keeps_the_stats(fake):
+    client = PfSenseV2Client(fake.v2_config())
+    fake.inject(500, path="/api/v2/firewall/apply", method="POST")
+    stats = AliasReconciler(client).reconcile([desired("new", ["1.1.1.1"])])
+    assert stats.created == 1 and not stats.applied
+    assert list(stats.failed) == [APPLY_FAILED]
+    assert fake.state.aliases[-1]["name"] == "new"
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyfsense_client.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return object()
+
+    with ThreadPoolExecutor(8) as executor:
+        leader = executor.submit(group.do, "key", fn)
+        assert started.wait(timeout=5)
+        followers = [executor.submit(group.do, "key", fn) for _ in range(7)]
+        while group.stats().shared < 7:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats().calls == 1
+
+
+def test_errors_are_shared_and_not_remembered():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(group.do, "key", failing)
+        assert started.wait(timeout=5)
+        follower = executor.submit(group.do, "key", failing)
+        while group.stats().shared < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+    # Finished calls are forgotten; the next caller runs again
+    assert group.do("key", lambda: 42) == 42
+
+
+def test_different_keys_run_separately():
+    group = SingleFlight()
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("b", lambda: 2) == 2
+    assert group.stats().calls == 2
+
+
+def test_async_concurrent_callers_share_one_call():
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def run():
+        return await asyncio.gather(*(group.do("key", fn) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats().shared == 9
+
+
+def test_async_cancelled_waiter_does_not_cancel_others():
+    group = AsyncSingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(group.do("key", fn))
+        second = asyncio.ensure_future(group.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,94 @@
+import json
+import random
+import tracemalloc
+
+import pytest
+
+from pyfsense_client.streaming import JSONArrayStream, iter_json_array
+
+DOC = {
+    "code": 200,
+    "status": "ok",
+    "message": "unicode é ü ✓",
+    "data": [{"id": i, "text": "x" * (i % 37), "nested": [1, {"close": "]}"}], "n": None} for i in range(300)]
+    + [12345, 1.5e-3, True, "a,]string"],
+    "_links": {"self": ["/api"]},
+}
+
+
+def split(body, cuts):
+    points = sorted(set(cuts))
+    return [body[i:j] for i, j in zip([0] + points, points + [len(body)])]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_random_chunk_boundaries(indent):
+    body = json.dumps(DOC, indent=indent, ensure_ascii=False).encode()
+    rng = random.Random(42)
+    for _ in range(50):
+        chunks = split(body, rng.sample(range(1, len(body)), rng.randint(0, 80)))
+        parser = JSONArrayStream("data")
+        items = [item for chunk in chunks for item in parser.feed(chunk)] + parser.close()
+        assert items == DOC["data"]
+        assert parser.envelope == {k: v for k, v in DOC.items() if k != "data"}
+
+
+def test_byte_at_a_time():
+    body = json.dumps(DOC).encode()
+    assert list(iter_json_array(body[i : i + 1] for i in range(len(body)))) == DOC["data"]
+
+
+def test_items_are_yielded_before_body_ends():
+    parser = JSONArrayStream("data")
+    assert parser.feed(b'{"code": 200, "data": [{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.envelope == {"code": 200}
+    assert parser.in_array
+    assert parser.feed(b": 2}]}") == [{"b": 2}]
+    assert parser.close() == []
+
+
+def test_number_split_across_chunks():
+    assert list(iter_json_array([b'{"data": [12', b"34]}"])) == [1234]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'{"data": [1, 2', b'{"data": [1 2]}', b"[1, 2]", b'{"data": [1]} trailing', b'{"data": [{"a": }]}'],
+)
+def test_malformed_bodies_raise_value_error(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array([body]))
+
+
+def test_missing_or_empty_array():
+    assert list(iter_json_array([b'{"code": 200, "data": []}'])) == []
+    assert list(iter_json_array([b'{"code": 200, "data": null}'])) == []
+
+
+def test_peak_memory_is_flat():
+    """Parsing a ~8 MB body chunk by chunk never holds more than a small window in memory."""
+    record = json.dumps({"ip": "10.0.0.1", "mac": "00:11:22:33:44:55", "hostname": "host", "descr": "x" * 100})
+
+    def body(count):
+        yield b'{"code": 200, "status": "ok", "message": "", "data": ['
+        for i in range(count):
+            yield (record if i == 0 else "," + record).encode()
+        yield b"]}"
+
+    def chunks(count, size=65536):
+        buffer = b""
+        for piece in body(count):
+            buffer += piece
+            if len(buffer) >= size:
+                yield buffer
+                buffer = b""
+        yield buffer
+
+    tracemalloc.start()
+    try:
+        seen = sum(1 for _ in iter_json_array(chunks(50_000)))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert seen == 50_000
+    assert peak < 2 * 1024 * 1024
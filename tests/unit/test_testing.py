@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from pyfsense_client.testing import FakePfSense, Fault, FirewallState, StateError, constant, lognormal, make_leases
+from pyfsense_client.testing.faults import FaultPlan
+from pyfsense_client.v1.client import PfSenseV1Client
+from pyfsense_client.v1.models import FirewallAliasCreate as V1AliasCreate
+from pyfsense_client.v2 import (
+    APIError,
+    AsyncPfSenseV2Client,
+    AuthenticationError,
+    FirewallAliasCreate,
+    FirewallAliasUpdate,
+    PfSenseV2Client,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+@pytest.fixture
+def fake():
+    with FakePfSense(aliases=3, leases=50, tls=False) as server:
+        yield server
+
+
+@pytest.fixture
+def client(fake):
+    return PfSenseV2Client(fake.v2_config(coalesce_requests=False))
+
+
+def new_alias(name: str) -> FirewallAliasCreate:
+    return FirewallAliasCreate(name=name, type="host", descr="", address=["10.1.1.1"], detail=["gw"])
+
+
+def test_v2_alias_crud_and_apply(fake, client):
+    created = client.create_firewall_alias(new_alias("Web"))
+    assert created.id == 3
+    assert client.get_firewall_apply_status().data["pending_subsystems"] == ["firewall"]
+
+    update = FirewallAliasUpdate(id=created.id, name="Web", type="host", address=["10.1.1.2"], detail=["gw2"])
+    assert client.update_firewall_alias(update).address == ["10.1.1.2"]
+    client.apply_firewall_changes()
+    assert client.get_firewall_apply_status().data["applied"] is True
+    assert fake.state.applies == 1
+
+    client.delete_firewall_alias(0)
+    # Alias ids are list positions, so the delete renumbered "Web"
+    assert client.get_firewall_alias(2).name == "Web"
+    with pytest.raises(APIError):
+        client.get_firewall_alias(3)
+
+
+def test_v2_duplicate_name_is_rejected(client):
+    client.create_firewall_alias(new_alias("Dup"))
+    with pytest.raises(APIError):
+        client.create_firewall_alias(new_alias("Dup"))
+
+
+def test_v2_queries_and_pagination(fake, client):
+    assert [a.name for a in client.get_firewall_aliases(query={"name__startswith": "alias_1"})] == ["alias_1"]
+    assert [a.id for a in client.get_firewall_aliases(limit=2, offset=1)] == [1, 2]
+
+    leases = client.fetch_all_dhcp_leases(parallelism=4, page_size=7)
+    assert [str(lease.ip) for lease in leases] == [lease["ip"] for lease in fake.state.leases]
+    assert fake.total_calls("/api/v2/status/dhcp_server/leases") >= 8
+
+    descending = client.get_dhcp_leases(limit=3, sort_by=["hostname"], sort_order="SORT_DESC")
+    assert [lease.hostname for lease in descending] == ["host-9", "host-8", "host-7"]
+
+
+def test_large_lease_table():
+    with FakePfSense(leases=100_000, tls=False) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        leases = client.fetch_all_dhcp_leases(parallelism=4, page_size=10_000)
+    assert len(leases) == 100_000
+    assert len({lease.mac for lease in leases}) == 100_000
+
+
+def test_authentication(fake):
+    with pytest.raises(AuthenticationError):
+        PfSenseV2Client(fake.v2_config(api_key="wrong")).get_firewall_apply_status()
+
+    client = PfSenseV2Client(fake.v2_config(api_key=None, username="admin", password="pfsense"))
+    client.get_firewall_apply_status()
+    assert client.config.jwt_token and client._jwt_expiry > time.time()
+    assert fake.calls[("POST", "/api/v2/auth/jwt")] == 1
+
+    with pytest.raises(AuthenticationError):
+        PfSenseV2Client(fake.v2_config(api_key=None, username="admin", password="wrong")).get_firewall_apply_status()
+
+
+def test_expired_jwt_is_rejected(fake):
+    fake.jwt_ttl = -1
+    client = PfSenseV2Client(fake.v2_config(api_key=None, jwt_token=fake.issue_jwt("admin")))
+    with pytest.raises(AuthenticationError):
+        client.get_firewall_apply_status()
+
+
+def test_fault_injection(fake, client):
+    fake.inject(503, path="/api/v2/firewall/apply", method="GET", times=1, retry_after=2)
+    with pytest.raises(APIError) as excinfo:
+        client.get_firewall_apply_status()
+    assert excinfo.value.response.headers["Retry-After"] == "2"
+    client.get_firewall_apply_status()
+
+    fake.inject(None, path="/api/v2/firewall/aliases")
+    with pytest.raises(requests.ConnectionError):
+        client.get_firewall_aliases()
+    fake.clear_faults()
+    assert len(client.get_firewall_aliases()) == 3
+
+
+def test_fault_plan_probability_is_seeded():
+    def fired(seed):
+        plan = FaultPlan(seed)
+        plan.add(Fault(500, probability=0.5))
+        return [plan.match("GET", "/x") is not None for _ in range(50)]
+
+    assert fired(1) == fired(1)
+    assert 0 < sum(fired(1)) < 50
+
+
+def test_latency_and_workers():
+    with FakePfSense(tls=False, latency=0.05, latencies={"/api/v2/firewall/apply": constant(0)}, workers=1) as fake:
+        client = PfSenseV2Client(fake.v2_config())
+        started = time.perf_counter()
+        client.get_firewall_apply_status()
+        assert time.perf_counter() - started < 0.04
+
+        async def burst():
+            async with AsyncPfSenseV2Client(fake.v2_config(coalesce_requests=False)) as async_client:
+                await asyncio.gather(*(async_client.get_firewall_aliases() for _ in range(4)))
+
+        started = time.perf_counter()
+        asyncio.run(burst())
+        # One worker serializes the four 50 ms requests
+        assert time.perf_counter() - started >= 0.2
+        assert fake.max_in_flight == 1
+
+
+def test_lognormal_median():
+    sample = lognormal(0.02, seed=3)
+    values = sorted(sample() for _ in range(2001))
+    assert 0.018 < values[1000] < 0.022
+
+
+def test_v1_client_shares_state():
+    with FakePfSense(aliases=1) as fake:
+        client = PfSenseV1Client(fake.v1_config())
+        alias = V1AliasCreate(name="Blocked", type="host", address=["1.1.1.1"], detail=["first"], descr="", apply=False)
+        client.create_firewall_alias(alias)
+        client.create_firewall_alias_entry("Blocked", ["2.2.2.2", "3.3.3.3"], apply=False)
+        client.delete_firewall_alias_entry("Blocked", "1.1.1.1", apply=False)
+
+        (row,) = [a for a in client.get_firewall_alias().data if a["name"] == "Blocked"]
+        assert row["address"] == "2.2.2.2 3.3.3.3"
+        assert fake.state.apply_status()["applied"] is False
+
+        v2 = PfSenseV2Client(fake.v2_config())
+        assert v2.get_firewall_alias(1).detail == ["", ""]
+        v2.apply_firewall_changes()
+        assert fake.state.apply_status() == {"applied": True, "pending_subsystems": []}
+
+
+def test_state_keeps_detail_aligned():
+    state = FirewallState([{"name": "a", "type": "host", "address": "1.1.1.1 2.2.2.2", "detail": "one||two"}])
+    state.add_alias_entries("a", ["3.3.3.3"], None)
+    state.remove_alias_entries("a", "1.1.1.1")
+    assert state.get_alias(0)["address"] == ["2.2.2.2", "3.3.3.3"]
+    assert state.get_alias(0)["detail"] == ["two", ""]
+    with pytest.raises(StateError):
+        state.create_alias({"name": "a", "type": "host"})
+    assert make_leases(2) == make_leases(2)
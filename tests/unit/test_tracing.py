@@ -0,0 +1,169 @@
+import asyncio
+
+import httpx
+import pytest
+import requests_mock
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+from opentelemetry.trace import SpanKind, StatusCode  # noqa: E402
+
+from pyfsense_client.tracing import Tracer, make_tracer  # noqa: E402
+from pyfsense_client.v1.client import ClientConfig as V1ClientConfig, PfSenseV1Client  # noqa: E402
+from pyfsense_client.v2 import APIError, AsyncPfSenseV2Client, ClientConfig, PfSenseV2Client  # noqa: E402
+
+ENVELOPE = {"code": 200, "status": "ok", "message": ""}
+ALIAS = {"id": 1, "name": "TestAlias", "type": "host", "descr": "", "address": [], "detail": []}
+
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+
+@pytest.fixture
+def tracer(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return Tracer(provider)
+
+
+@pytest.fixture
+def client(tracer):
+    client = PfSenseV2Client(ClientConfig(host="https://example-pfsense", api_key="key", tracing=True))
+    client.tracer = tracer
+    return client
+
+
+def test_make_tracer_disabled():
+    assert make_tracer(False) is None
+    assert make_tracer(True) is not None
+
+
+def test_tracing_disabled_by_default():
+    client = PfSenseV2Client(ClientConfig(host="https://example-pfsense", api_key="key"))
+    assert client.tracer is None
+    with client.span("noop") as span:
+        assert span is None
+
+
+def test_request_span_and_trace_context_header(client, exporter):
+    with requests_mock.Mocker() as m:
+        m.post("https://example-pfsense/api/v2/firewall/apply", json={**ENVELOPE, "data": {}})
+        client.apply_firewall_changes()
+        traceparent = m.last_request.headers["traceparent"]
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "POST /api/v2/firewall/apply"
+    assert span.kind == SpanKind.CLIENT
+    assert span.attributes["http.request.method"] == "POST"
+    assert span.attributes["url.path"] == "/api/v2/firewall/apply"
+    assert span.attributes["server.address"] == "https://example-pfsense"
+    assert span.attributes["http.response.status_code"] == 200
+    assert span.attributes["http.response.body.size"] > 0
+    assert f"{span.context.span_id:016x}" in traceparent
+
+
+def test_failed_request_marks_span_as_error(client, exporter):
+    with requests_mock.Mocker() as m:
+        m.get("https://example-pfsense/api/v2/firewall/apply", status_code=500, json={**ENVELOPE, "code": 500})
+        with pytest.raises(APIError):
+            client.get_firewall_apply_status()
+
+    (span,) = exporter.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.attributes["http.response.status_code"] == 500
+
+
+def test_composite_operation_gets_parent_span(client, exporter):
+    with requests_mock.Mocker() as m:
+        m.patch("https://example-pfsense/api/v2/firewall/alias", json={**ENVELOPE, "data": ALIAS})
+        m.post("https://example-pfsense/api/v2/firewall/apply", json={**ENVELOPE, "data": {}})
+        with client.span("update-and-apply", alias="TestAlias"):
+            client._request("PATCH", "/api/v2/firewall/alias", json=ALIAS)
+            client.apply_firewall_changes()
+
+    patch, apply, parent = exporter.get_finished_spans()
+    assert parent.name == "update-and-apply"
+    assert parent.attributes["pyfsense.alias"] == "TestAlias"
+    assert patch.parent.span_id == apply.parent.span_id == parent.context.span_id
+
+
+def test_fetch_all_pages_are_children_across_threads(client, exporter):
+    aliases = [{**ALIAS, "id": i, "name": f"a{i}"} for i in range(5)]
+
+    def page(request, context):
+        limit, offset = int(request.qs["limit"][0]), int(request.qs["offset"][0])
+        return {**ENVELOPE, "data": aliases[offset : offset + limit]}
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example-pfsense/api/v2/firewall/aliases", json=page)
+        assert len(client.fetch_all_firewall_aliases(parallelism=3, page_size=2)) == 5
+
+    spans = exporter.get_finished_spans()
+    (parent,) = [span for span in spans if span.name == "fetch_all_firewall_aliases"]
+    pages = [span for span in spans if span is not parent]
+    assert pages and all(span.parent.span_id == parent.context.span_id for span in pages)
+
+
+def test_v1_request_span_and_header(tracer, exporter):
+    config = V1ClientConfig(hostname="test.example.com", mode="jwt", jwt="token", tracing=True)
+    client = PfSenseV1Client(config)
+    client.tracer = tracer
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://test.example.com/api/v1/status/system",
+            json={"status": "ok", "code": 200, "return": 0, "message": "", "data": {}},
+            headers={"Content-Type": "application/json"},
+        )
+        with client.span("status"):
+            client.call("/api/v1/status/system")
+        assert "traceparent" in m.last_request.headers
+
+    request, parent = exporter.get_finished_spans()
+    assert request.name == "GET /api/v1/status/system"
+    assert request.parent.span_id == parent.context.span_id
+
+
+def test_v1_stream_span_and_header(tracer, exporter):
+    config = V1ClientConfig(hostname="test.example.com", mode="jwt", jwt="token", tracing=True)
+    client = PfSenseV1Client(config)
+    client.tracer = tracer
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://test.example.com/api/v1/firewall/states",
+            json={"status": "ok", "code": 200, "return": 0, "message": "", "data": [{"id": 1}]},
+        )
+        assert list(client.stream_firewall_states()) == [{"id": 1}]
+        assert "traceparent" in m.last_request.headers
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "GET /api/v1/firewall/states"
+    assert span.attributes["http.response.status_code"] == 200
+
+
+def test_async_request_spans_share_parent(tracer, exporter):
+    headers = []
+
+    def handler(request):
+        headers.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={**ENVELOPE, "data": {}})
+
+    client = AsyncPfSenseV2Client(ClientConfig(host="https://example-pfsense", api_key="key", tracing=True))
+    client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client.tracer = tracer
+
+    async def run():
+        async with client:
+            with client.span("status-twice"):
+                await asyncio.gather(client.get_firewall_apply_status(), client.apply_firewall_changes())
+
+    asyncio.run(run())
+    spans = exporter.get_finished_spans()
+    parent = spans[-1]
+    assert parent.name == "status-twice"
+    assert all(span.parent.span_id == parent.context.span_id for span in spans[:-1])
+    assert all(headers)
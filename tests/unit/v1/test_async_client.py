@@ -0,0 +1,139 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError, ReadTimeout
+
+from pyfsense_client.metrics import MetricsRegistry
+from pyfsense_client.v1.client import ClientConfig, AsyncPfSenseV1Client, APIResponse
+from pyfsense_client.v1.client.client import CustomHTTPError
+from pyfsense_client.v1.models import FirewallAliasCreate
+
+from ..mocks import get_response_json
+
+
+class TestAsyncPfSenseV1Client(unittest.IsolatedAsyncioTestCase):
+    test_config = {
+        "username": "test_user",
+        "password": "test_pass",
+        "hostname": "test.example.com",
+        "mode": "jwt",
+        "jwt": "test_jwt_token",
+    }
+
+    def make_client(self, handler):
+        client = AsyncPfSenseV1Client(config=ClientConfig(**self.test_config))
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=False)
+        return client
+
+    async def test_mixin_methods_are_awaitable(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, request.url.path, request.headers["Authorization"]))
+            return httpx.Response(200, json=get_response_json())
+
+        async with self.make_client(handler) as client:
+            response = await client.get_system_status()
+
+        self.assertIsInstance(response, APIResponse)
+        self.assertEqual(response.data["cpu_count"], 8)
+        self.assertEqual(seen, [("GET", "/api/v1/status/system", "Bearer test_jwt_token")])
+
+    async def test_validated_mixin_method_sends_payload(self):
+        def handler(request):
+            body = json.loads(request.content)
+            self.assertEqual(request.method, "POST")
+            self.assertEqual(body["name"], "test_alias")
+            self.assertTrue(body["apply"])
+            return httpx.Response(200, json={**get_response_json(), "data": body})
+
+        alias = FirewallAliasCreate(name="test_alias", type="host", address="10.0.0.1", detail="host")
+        async with self.make_client(handler) as client:
+            response = await client.create_firewall_alias(alias)
+        self.assertEqual(response.data["address"], ["10.0.0.1"])
+
+    async def test_api_error_raises_custom_http_error(self):
+        def handler(request):
+            return httpx.Response(
+                404, json={"status": "not found", "code": 404, "return": 1, "message": "Alias not found", "data": []}
+            )
+
+        async with self.make_client(handler) as client:
+            with self.assertRaises(CustomHTTPError) as ctx:
+                await client.delete_firewall_alias(name="missing")
+        self.assertEqual(ctx.exception.api_code, 404)
+        self.assertEqual(ctx.exception.api_message, "Alias not found")
+
+    async def test_non_json_error_raises_http_error(self):
+        async with self.make_client(lambda request: httpx.Response(502, content=b"Bad Gateway")) as client:
+            with self.assertRaises(HTTPError):
+                await client.get_interfaces()
+
+    async def test_transport_errors_raise_requests_exceptions(self):
+        def timeout(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        def refused(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async with self.make_client(timeout) as client:
+            with self.assertRaises(ReadTimeout):
+                await client.apply_firewall_changes()
+        async with self.make_client(refused) as client:
+            with self.assertRaises(RequestsConnectionError):
+                await client.get_interfaces()
+
+    def test_timeout_comes_from_config(self):
+        client = AsyncPfSenseV1Client(config=ClientConfig(**self.test_config))
+        self.assertIsNone(client.session.timeout.read)
+        asyncio.run(client.aclose())
+        client = AsyncPfSenseV1Client(config=ClientConfig(**self.test_config, timeout=120))
+        self.assertEqual(client.session.timeout.read, 120)
+        asyncio.run(client.aclose())
+
+    async def test_stream_is_measured_and_holds_a_limiter_slot(self):
+        states = [{"interface": "wan", "proto": "tcp", "id": i} for i in range(3)]
+        body = json.dumps({"status": "ok", "code": 200, "return": 0, "message": "", "data": states}).encode()
+        config = ClientConfig(
+            **{**self.test_config, "hostname": "astream.example.com"}, collect_metrics=True, adaptive_concurrency=True
+        )
+        client = AsyncPfSenseV1Client(config=config)
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        client.session = httpx.AsyncClient(transport=transport)
+        client.metrics = MetricsRegistry()
+        timings = []
+        client.metrics.subscribe(timings.append)
+
+        async with client:
+            stream = client._stream("/api/v1/firewall/states")
+            self.assertEqual(await anext(stream), states[0])
+            # The slot is held until the body has been read
+            self.assertEqual(client.limiter.stats().in_flight, 1)
+            self.assertEqual([state async for state in stream], states[1:])
+        self.assertEqual(client.limiter.stats().in_flight, 0)
+
+        (timing,) = timings
+        self.assertEqual((timing.method, timing.endpoint, timing.status), ("GET", "/api/v1/firewall/states", 200))
+        self.assertEqual(timing.response_bytes, len(body))
+
+    async def test_concurrent_status_polls(self):
+        def handler(request):
+            return httpx.Response(200, json=get_response_json())
+
+        async with self.make_client(handler) as client:
+            responses = await asyncio.gather(
+                client.get_system_status(),
+                client.get_gateway_status(),
+                client.get_interface_status(),
+                client.get_carp_status(),
+            )
+        self.assertTrue(all(response.code == 200 for response in responses))
+
+    def test_local_mode_uses_basic_auth(self):
+        config = ClientConfig(username="u", password="p", hostname="fw.example.com", port=8443)
+        client = AsyncPfSenseV1Client(config=config)
+        self.assertIsInstance(client.session.auth, httpx.BasicAuth)
+        self.assertEqual(client.get_url("/api/v1/status/system"), "https://fw.example.com:8443/api/v1/status/system")
+        asyncio.run(client.aclose())
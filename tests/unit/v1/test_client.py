@@ -1,14 +1,20 @@
+import threading
 import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
 import json
 import requests_mock
 from requests.exceptions import HTTPError
+from pyfsense_client.metrics import MetricsRegistry
 from pyfsense_client.v1.client import (
     ClientConfig,
     ClientBase,
+    PfSenseV1Client,
     APIResponse,
     load_client_config,
 )
+from pyfsense_client.v1.client.client import CustomHTTPError
 
 
 class TestPfsenseApiClient(unittest.TestCase):
@@ -167,3 +173,162 @@ class TestPfsenseApiClient(unittest.TestCase):
 
             self.assertEqual(response.status_code, 200)
             self.assertEqual(response.text, "Plain text response")
+
+    def test_client_base_pool_settings(self):
+        config = ClientConfig(**self.test_config, pool_connections=2, pool_maxsize=32, pool_block=True)
+        client = ClientBase(config=config)
+        adapter = client.session.get_adapter("https://test.example.com")
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+
+        client = ClientBase(config=ClientConfig(**self.test_config, keep_alive=False))
+        self.assertEqual(client.session.headers["Connection"], "close")
+
+    def test_client_base_shared_across_threads(self):
+        with requests_mock.Mocker() as m:
+            m.get(
+                requests_mock.ANY,
+                json=lambda request, context: {
+                    "code": 200,
+                    "return": 0,
+                    "message": "Success",
+                    "status": "success",
+                    "data": {"path": request.path},
+                },
+                headers={"Content-Type": "application/json"},
+            )
+
+            client = ClientBase(config=ClientConfig(**self.test_config, pool_maxsize=32))
+            with ThreadPoolExecutor(max_workers=32) as pool:
+                responses = list(pool.map(lambda i: client.call(f"/api/{i}"), range(256)))
+
+            self.assertEqual([response.data["path"] for response in responses], [f"/api/{i}" for i in range(256)])
+            self.assertTrue(all(r.headers["Authorization"] == "Bearer test_jwt_token" for r in m.request_history))
+
+    def test_stream_firewall_states(self):
+        states = [{"interface": "wan", "proto": "tcp", "id": i} for i in range(100)]
+        with requests_mock.Mocker() as m:
+            m.get(
+                "https://test.example.com/api/v1/firewall/states",
+                text=json.dumps({"status": "ok", "code": 200, "return": 0, "message": "", "data": states}),
+            )
+            client = PfSenseV1Client(config=ClientConfig(**self.test_config))
+            self.assertEqual(list(client.stream_firewall_states()), states)
+
+    def test_stream_firewall_status_log_api_error(self):
+        with requests_mock.Mocker() as m:
+            m.get(
+                "https://test.example.com/api/v1/status/log/firewall",
+                text=json.dumps({"status": "forbidden", "code": 403, "return": 4, "message": "denied", "data": [1]}),
+            )
+            client = PfSenseV1Client(config=ClientConfig(**self.test_config))
+            with self.assertRaises(CustomHTTPError) as ctx:
+                list(client.stream_firewall_status_log())
+            self.assertEqual(ctx.exception.api_code, 403)
+
+            m.get("https://test.example.com/api/v1/status/log/firewall", status_code=502, text="Bad Gateway")
+            with self.assertRaises(HTTPError):
+                list(client.stream_firewall_status_log())
+
+    def test_stream_is_measured_and_holds_a_limiter_slot(self):
+        states = [{"interface": "wan", "proto": "tcp", "id": i} for i in range(3)]
+        body = json.dumps({"status": "ok", "code": 200, "return": 0, "message": "", "data": states})
+        config = ClientConfig(
+            **{**self.test_config, "hostname": "stream.example.com"}, collect_metrics=True, adaptive_concurrency=True
+        )
+        client = PfSenseV1Client(config=config)
+        client.metrics = MetricsRegistry()
+        timings = []
+        client.metrics.subscribe(timings.append)
+        with requests_mock.Mocker() as m:
+            m.get("https://stream.example.com/api/v1/firewall/states", text=body)
+            stream = client.stream_firewall_states()
+            self.assertEqual(next(stream), states[0])
+            # The slot is held until the body has been read
+            self.assertEqual(client.limiter.stats().in_flight, 1)
+            self.assertEqual(list(stream), states[1:])
+        self.assertEqual(client.limiter.stats().in_flight, 0)
+
+        (timing,) = timings
+        self.assertEqual((timing.method, timing.endpoint, timing.status), ("GET", "/api/v1/firewall/states", 200))
+        self.assertEqual(timing.response_bytes, len(body))
+
+    def test_client_base_caches_get_responses(self):
+        config = ClientConfig(**self.test_config, cache_ttl=60)
+        client = PfSenseV1Client(config=config)
+        envelope = {"status": "ok", "code": 200, "return": 0, "message": "Success"}
+        headers = {"Content-Type": "application/json"}
+        with requests_mock.Mocker() as m:
+            m.get("https://test.example.com/api/v1/firewall/alias", json={**envelope, "data": [{"name": "a"}]}, headers=headers)
+            m.post("https://test.example.com/api/v1/firewall/alias/entry", json={**envelope, "data": {}}, headers=headers)
+
+            self.assertEqual(client.get_firewall_alias().data, [{"name": "a"}])
+            self.assertEqual(client.get_firewall_alias().data, [{"name": "a"}])
+            self.assertEqual(m.call_count, 1)
+
+            client.create_firewall_alias_entry(name="a", address=["10.0.0.1"])
+            client.get_firewall_alias()
+            self.assertEqual(m.call_count, 3)
+
+        stats = client.cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.invalidations), (1, 2, 1))
+
+    def test_client_base_coalesces_identical_gets(self):
+        client = ClientBase(config=ClientConfig(**self.test_config, coalesce_requests=True))
+        release = threading.Event()
+        with requests_mock.Mocker() as m:
+            m.get(
+                "https://test.example.com/api/v1/status/system",
+                json=lambda request, context: release.wait(5) and {"code": 200, "data": {}},
+            )
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                futures = [executor.submit(client._request, "/api/v1/status/system") for _ in range(6)]
+                while client.singleflight.stats().shared < 5:
+                    release.wait(0.001)
+                release.set()
+                responses = [future.result() for future in futures]
+            self.assertEqual(m.call_count, 1)
+        self.assertTrue(all(response is responses[0] for response in responses))
+
+    def test_client_base_hedges_slow_gets(self):
+        config = ClientConfig(**self.test_config, hedge_requests=True, hedge_min_delay=0.01)
+        client = ClientBase(config=config)
+        for _ in range(client.hedger.min_samples):
+            client.hedger.latency.record(0.01)
+        release = threading.Event()
+        attempts = []
+
+        def send(url, method, payload, params):
+            attempts.append(url)
+            if len(attempts) == 1:
+                release.wait(timeout=5)
+                return "slow"
+            return "fast"
+
+        with patch.object(client, "_send", side_effect=send):
+            self.assertEqual(client._request("/api/v1/status/system"), "fast")
+        release.set()
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(client.hedger.stats().hedges_won, 1)
+
+    def test_client_base_records_metrics(self):
+        client = ClientBase(config=ClientConfig(**self.test_config, collect_metrics=True))
+        client.metrics = MetricsRegistry()
+        timings = []
+        client.metrics.subscribe(timings.append)
+        with requests_mock.Mocker() as m:
+            m.get(
+                "https://test.example.com/api/v1/status/system",
+                json={"status": "ok", "code": 200, "return": 0, "message": "", "data": {}},
+                headers={"Content-Type": "application/json"},
+            )
+            client.call("/api/v1/status/system")
+
+        (timing,) = timings
+        self.assertEqual((timing.method, timing.endpoint, timing.status), ("GET", "/api/v1/status/system", 200))
+        self.assertEqual(timing.host, "https://test.example.com")
+        self.assertIsNotNone(timing.decode)
+        self.assertGreater(timing.response_bytes, 0)
+        validate = client.metrics.phase_histogram("GET", "/api/v1/status/system", "validate", timing.host)
+        self.assertEqual(validate.count, 1)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+
+from pyfsense_client.testing import FakePfSense
+from pyfsense_client.v2 import APIError, AsyncPfSenseV2Client, FirewallAlias, FirewallAliasCreate, PfSenseV2Client
+from pyfsense_client.v2.alias_index import AliasIndex
+
+
+def alias(id: int, name: str) -> FirewallAlias:
+    return FirewallAlias(id=id, name=name, type="host", descr="")
+
+
+@pytest.fixture
+def fake():
+    with FakePfSense(aliases=5, tls=False) as server:
+        yield server
+
+
+@pytest.fixture
+def client(fake):
+    return PfSenseV2Client(fake.v2_config(alias_index_ttl=300))
+
+
+def test_index_records_and_invalidates():
+    index = AliasIndex(ttl=60)
+    index.record([alias(0, "a"), alias(1, "b"), alias(2, "c")], complete=True)
+    assert index.lookup("b") == 1
+    assert index.known_missing("zzz") and not index.known_missing("a")
+
+    index.record([alias(1, "renamed")])
+    assert index.lookup("b") is None and index.lookup("renamed") == 1
+
+    index.deleted(1)
+    assert index.lookup("a") == 0
+    assert index.lookup("renamed") is None and index.lookup("c") is None
+    assert not index.known_missing("zzz")
+
+
+def test_index_entries_expire():
+    index = AliasIndex(ttl=0.01)
+    index.record([alias(0, "a")], complete=True)
+    time.sleep(0.02)
+    assert index.lookup("a") is None and not index.known_missing("b")
+
+
+def test_update_by_name_is_one_request_once_indexed(client, fake):
+    client.get_firewall_aliases()
+    fake.reset_calls()
+    updated = client.update_firewall_alias_by_name(
+        "alias_3", FirewallAliasCreate(name="alias_3", type="network", address=["10.0.0.0/8"])
+    )
+    assert updated.id == 3 and updated.address == ["10.0.0.0/8"]
+    assert fake.total_calls("/api/v2") == 1
+
+
+def test_first_lookup_lists_the_aliases_once(client, fake):
+    assert client.get_firewall_alias_by_name("alias_2").id == 2
+    assert client.get_firewall_alias_by_name("alias_4").id == 4
+    assert fake.total_calls("/api/v2/firewall/aliases") == 1
+    assert fake.calls[("GET", "/api/v2/firewall/alias")] == 2
+
+    with pytest.raises(APIError, match="No firewall alias named 'missing'"):
+        client.get_firewall_alias_by_name("missing")
+    assert fake.total_calls("/api/v2/firewall/aliases") == 1
+
+
+def test_writes_keep_the_index_current(client, fake):
+    client.get_firewall_aliases()
+    created = client.create_firewall_alias(FirewallAliasCreate(name="new", type="host"))
+    client.update_firewall_alias_by_name("alias_0", FirewallAliasCreate(name="first", type="host"))
+    client.delete_firewall_alias(1)
+    fake.reset_calls()
+
+    assert client.get_firewall_alias_by_name("first").id == 0
+    assert fake.total_calls("/api/v2/firewall/aliases") == 0
+    # "new" moved from id 5 to 4 when alias_1 was deleted, so it is looked up again
+    assert client.get_firewall_alias_by_name("new").id == created.id - 1
+    assert fake.total_calls("/api/v2/firewall/aliases") == 1
+
+
+def test_stale_index_is_refreshed(client, fake):
+    client.get_firewall_aliases()
+    other = PfSenseV2Client(fake.v2_config(alias_index_ttl=300))
+    other.delete_firewall_alias(0)  # every alias moves down one id behind the index's back
+
+    assert client.get_firewall_alias_by_name("alias_2").id == 1
+    updated = client.update_firewall_alias_by_name(
+        "alias_4", FirewallAliasCreate(name="alias_4", type="host", address=["1.2.3.4"])
+    )
+    assert updated.id == 3 and fake.state.aliases[3]["address"] == ["1.2.3.4"]
+    assert [a["name"] for a in fake.state.aliases] == ["alias_1", "alias_2", "alias_3", "alias_4"]
+
+
+def test_validation_error_is_not_mistaken_for_a_stale_id(client, fake):
+    client.get_firewall_aliases()
+    fake.reset_calls()
+    fake.inject(400, path="/api/v2/firewall/alias", method="PATCH", times=1)
+    with pytest.raises(APIError):
+        client.update_firewall_alias_by_name("alias_1", FirewallAliasCreate(name="alias_1", type="host"))
+    # One PATCH, and one read confirming the id still holds alias_1; no listing and no retry
+    assert fake.calls[("PATCH", "/api/v2/firewall/alias")] == 1
+    assert fake.calls[("GET", "/api/v2/firewall/alias")] == 1
+    assert fake.total_calls("/api/v2/firewall/aliases") == 0
+
+
+def test_index_is_off_by_default(fake):
+    client = PfSenseV2Client(fake.v2_config())
+    assert client.alias_index is None
+    assert client.get_firewall_alias_by_name("alias_1").id == 1
+    assert client.get_firewall_alias_by_name("alias_1").id == 1
+    assert fake.total_calls("/api/v2/firewall/aliases") == 2
+
+
+def test_async_update_by_name(fake):
+    async def run():
+        async with AsyncPfSenseV2Client(fake.v2_config(alias_index_ttl=300)) as client:
+            await client.get_firewall_aliases()
+            fake.reset_calls()
+            updated = await client.update_firewall_alias_by_name(
+                "alias_2", FirewallAliasCreate(name="renamed", type="host")
+            )
+            assert fake.total_calls("/api/v2") == 1
+            return updated, await client.get_firewall_alias_by_name("renamed")
+
+    updated, fetched = asyncio.run(run())
+    assert updated.id == fetched.id == 2
@@ -0,0 +1,326 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from pyfsense_client.metrics import MetricsRegistry
+from pyfsense_client.v2.auth import TokenCache
+from pyfsense_client.v2 import (
+    AsyncPfSenseV2Client,
+    ClientConfig,
+    APIError,
+    AuthenticationError,
+    ValidationError,
+    FirewallAliasCreate,
+)
+
+
+@pytest.fixture
+def client_config():
+    """Fixture for a basic ClientConfig."""
+    return ClientConfig(
+        host="https://example-pfsense",
+        verify_ssl=False,
+        timeout=5,
+        username="admin",
+        password="pfsense",
+        api_key=None,
+        jwt_token=None,
+    )
+
+
+def make_client(config, handler):
+    """Build an AsyncPfSenseV2Client whose session is served by `handler`."""
+    client = AsyncPfSenseV2Client(config)
+    client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers=client._session.headers)
+    return client
+
+
+def ok(data):
+    return httpx.Response(200, json={"code": 200, "status": "ok", "message": "", "data": data})
+
+
+ALIAS = {"id": 1, "name": "TestAlias", "type": "host", "descr": "", "address": ["10.0.0.1"], "detail": []}
+
+
+def test_async_client_initialization(client_config):
+    client_config.api_key = "12345"
+    client = AsyncPfSenseV2Client(client_config)
+    assert client.base_url == "https://example-pfsense"
+    assert client._session.headers["X-API-Key"] == "12345"
+    assert "Authorization" not in client._session.headers
+    asyncio.run(client.aclose())
+
+
+def test_async_get_firewall_aliases(client_config):
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.url.path))
+        return ok([ALIAS])
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await client.get_firewall_aliases()
+
+    aliases = asyncio.run(run())
+    assert seen == [("GET", "/api/v2/firewall/aliases")]
+    assert aliases[0].name == "TestAlias"
+
+
+def test_async_create_firewall_alias_sends_body(client_config):
+    def handler(request):
+        body = json.loads(request.content)
+        assert request.method == "POST"
+        assert body["name"] == "NewAlias"
+        return ok({**ALIAS, "id": 5, "name": "NewAlias"})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await client.create_firewall_alias(FirewallAliasCreate(name="NewAlias", type="host"))
+
+    alias = asyncio.run(run())
+    assert alias.id == 5
+
+
+def test_async_get_dhcp_leases_params(client_config):
+    def handler(request):
+        assert request.url.params["limit"] == "10"
+        assert request.url.params["sort_order"] == "SORT_ASC"
+        return ok(
+            [
+                {
+                    "ip": "192.168.1.10",
+                    "mac": "00:1A:2B:3C:4D:5E",
+                    "hostname": "Device1",
+                    "if": "LAN",
+                    "active_status": "active",
+                    "online_status": "online",
+                }
+            ]
+        )
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await client.get_dhcp_leases(limit=10)
+
+    leases = asyncio.run(run())
+    assert leases[0].interface == "LAN"
+
+
+def test_async_authenticate_jwt(client_config):
+    def handler(request):
+        if request.url.path == "/api/v2/auth/jwt":
+            return ok({"token": "fake-jwt-token"})
+        assert request.headers["Authorization"] == "Bearer fake-jwt-token"
+        return ok({"pending_changes": False})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            token = await client.authenticate_jwt()
+            await client.get_firewall_apply_status()
+            return token
+
+    assert asyncio.run(run()) == "fake-jwt-token"
+    assert client_config.jwt_token == "fake-jwt-token"
+
+
+def test_cancelled_token_cache_wait_does_not_keep_the_lock(client_config, tmp_path):
+    client_config.token_cache_path = str(tmp_path / "tokens.json")
+    holder = TokenCache(client_config.token_cache_path).lock()
+    holder.acquire()
+
+    async def run():
+        async with make_client(client_config, lambda request: ok({"token": "fake-jwt-token"})) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.authenticate_jwt(), timeout=0.1)
+        # The abandoned worker thread gets the lock once it is free, and must hand it straight back
+        holder.release()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    other = TokenCache(client_config.token_cache_path).lock()
+    waiter = threading.Thread(target=other.acquire, daemon=True)
+    waiter.start()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    other.release()
+
+
+@pytest.mark.parametrize(
+    "status, exc_type",
+    [(401, AuthenticationError), (400, ValidationError), (500, APIError)],
+)
+def test_async_error_mapping(client_config, status, exc_type):
+    def handler(request):
+        return httpx.Response(status, json={"code": status, "status": "error", "message": "nope", "data": None})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            await client.get_firewall_apply_status()
+
+    with pytest.raises(exc_type) as excinfo:
+        asyncio.run(run())
+    assert excinfo.value.response.status_code == status
+
+
+def test_async_bad_json(client_config):
+    async def run():
+        async with make_client(client_config, lambda request: httpx.Response(200, content=b"<html>")) as client:
+            await client.get_firewall_apply_status()
+
+    with pytest.raises(APIError) as excinfo:
+        asyncio.run(run())
+    assert "Failed to parse JSON response" in str(excinfo.value)
+
+
+def test_async_concurrent_calls_share_session(client_config):
+    def handler(request):
+        return ok({"id": int(request.url.params["id"]), **{k: v for k, v in ALIAS.items() if k != "id"}})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await asyncio.gather(*(client.get_firewall_alias(i) for i in range(50)))
+
+    aliases = asyncio.run(run())
+    assert [alias.id for alias in aliases] == list(range(50))
+
+
+def test_async_stream_dhcp_leases(client_config):
+    leases = [
+        {"ip": f"10.0.0.{i}", "mac": "m", "hostname": None, "if": "lan", "active_status": "a", "online_status": "o"}
+        for i in range(20)
+    ]
+
+    def handler(request):
+        return ok(leases)
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return [lease.ip async for lease in client.stream_dhcp_leases(chunk_size=32)]
+
+    assert asyncio.run(run()) == [f"10.0.0.{i}" for i in range(20)]
+
+
+def test_async_stream_reauthenticates_on_401(client_config):
+    lease = {"ip": "10.0.0.1", "mac": "m", "hostname": None, "if": "lan", "active_status": "a", "online_status": "o"}
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        if request.url.path == "/api/v2/auth/jwt":
+            return ok({"token": "new-token"})
+        if request.headers.get("Authorization") != "Bearer new-token":
+            return httpx.Response(401, json={"code": 401, "status": "unauthorized", "message": "", "data": None})
+        return ok([lease])
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return [lease.ip async for lease in client.stream_dhcp_leases()]
+
+    assert asyncio.run(run()) == ["10.0.0.1"]
+    assert seen == ["/api/v2/status/dhcp_server/leases", "/api/v2/auth/jwt", "/api/v2/status/dhcp_server/leases"]
+
+
+def test_async_iter_firewall_aliases(client_config):
+    offsets = []
+
+    def handler(request):
+        limit, offset = int(request.url.params["limit"]), int(request.url.params["offset"])
+        offsets.append(offset)
+        return ok([{**ALIAS, "id": i, "name": f"alias_{i}"} for i in range(offset, min(offset + limit, 5))])
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return [alias.id async for alias in client.iter_firewall_aliases(page_size=2)]
+
+    assert asyncio.run(run()) == list(range(5))
+    assert sorted(offsets) == [0, 2, 4]
+
+
+def test_async_fetch_all_firewall_aliases(client_config):
+    def handler(request):
+        limit, offset = int(request.url.params["limit"]), int(request.url.params["offset"])
+        return ok([{**ALIAS, "id": i, "name": f"alias_{i}"} for i in range(offset, min(offset + limit, 11))])
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await client.fetch_all_firewall_aliases(parallelism=3, page_size=2)
+
+    assert [alias.id for alias in asyncio.run(run())] == list(range(11))
+
+
+def test_async_cache(client_config):
+    client_config.cache_ttls = {"/api/v2/firewall/apply": 60}
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return ok({"pending_changes": False})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            await client.get_firewall_apply_status()
+            await client.get_firewall_apply_status()
+            await client.apply_firewall_changes()
+            await client.get_firewall_apply_status()
+            return client.cache.stats()
+
+    stats = asyncio.run(run())
+    assert calls == ["GET", "POST", "GET"]
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_async_identical_gets_coalesced(client_config):
+    client_config.coalesce_requests = True
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return ok([ALIAS])
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            results = await asyncio.gather(*(client.get_firewall_aliases() for _ in range(10)))
+            return results, client.singleflight.stats()
+
+    results, stats = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result[0].name == "TestAlias" for result in results)
+    assert stats.shared == 9
+
+
+def test_async_reauthenticates_once_on_401(client_config):
+    responses = iter([httpx.Response(401, json={"code": 401, "status": "unauthorized", "message": "", "data": None})])
+
+    def handler(request):
+        if request.url.path == "/api/v2/auth/jwt":
+            return ok({"token": "new-token"})
+        return next(responses, None) or ok({"pending_changes": False})
+
+    async def run():
+        async with make_client(client_config, handler) as client:
+            return await client.get_firewall_apply_status()
+
+    assert asyncio.run(run()).data == {"pending_changes": False}
+    assert client_config.jwt_token == "new-token"
+
+
+def test_async_metrics_record_each_request(client_config):
+    client_config.collect_metrics = True
+    client = make_client(client_config, lambda request: ok({"applied": True}))
+    client.metrics = MetricsRegistry()
+    timings = []
+    client.metrics.subscribe(timings.append)
+
+    async def run():
+        async with client:
+            await client.get_firewall_apply_status()
+
+    asyncio.run(run())
+    (timing,) = timings
+    assert (timing.method, timing.endpoint, timing.status) == ("GET", "/api/v2/firewall/apply", 200)
+    assert timing.decode is not None and timing.validate is not None
+    assert timing.response_bytes > 0
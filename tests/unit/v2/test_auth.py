@@ -0,0 +1,174 @@
+import base64
+import json
+import multiprocessing
+import os
+import stat
+import time
+
+import pytest
+import requests_mock
+
+from pyfsense_client.v2 import PfSenseV2Client, ClientConfig, AuthenticationError
+from pyfsense_client.v2.auth import TokenCache, jwt_expiry, token_is_fresh
+
+BASE = "https://example-pfsense"
+ENVELOPE = {"code": 200, "status": "ok", "message": ""}
+
+
+def make_jwt(exp: float | None, sub: str = "admin") -> str:
+    claims = {"sub": sub} if exp is None else {"sub": sub, "exp": int(exp)}
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.signature"
+
+
+@pytest.fixture
+def client_config():
+    return ClientConfig(host=BASE, username="admin", password="pfsense")
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(make_jwt(1_700_000_000)) == 1_700_000_000
+    assert jwt_expiry(make_jwt(None)) is None
+    assert jwt_expiry("not-a-jwt") is None
+    assert jwt_expiry("a.!!!.c") is None
+
+
+def test_token_is_fresh():
+    assert token_is_fresh(make_jwt(time.time() + 600), margin=60)
+    assert not token_is_fresh(make_jwt(time.time() + 30), margin=60)
+    assert token_is_fresh(make_jwt(None), margin=60)
+    assert not token_is_fresh(None, margin=60)
+
+
+def test_token_cache_round_trip(tmp_path):
+    cache = TokenCache(str(tmp_path / "sub" / "tokens.json"))
+    assert cache.get("host|admin") is None
+    expired = make_jwt(time.time() - 10)
+    with cache.lock():
+        cache.set("other|admin", expired)
+        cache.set("host|admin", "token-1")
+    assert cache.get("host|admin") == "token-1"
+    # Expired entries are pruned on the next write
+    assert cache.get("other|admin") is None
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+
+
+def test_token_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "tokens.json"
+    path.write_text("{not json")
+    assert TokenCache(str(path)).get("host|admin") is None
+
+
+def _authenticate_once(path, results):
+    cache = TokenCache(path)
+    with cache.lock():
+        token = cache.get("host|admin")
+        if token is None:
+            time.sleep(0.05)
+            token = f"token-{os.getpid()}"
+            cache.set("host|admin", token)
+    results.put(token)
+
+
+def test_token_cache_lock_serializes_processes(tmp_path):
+    path = str(tmp_path / "tokens.json")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_authenticate_once, args=(path, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=10)
+    tokens = {results.get(timeout=5) for _ in workers}
+    assert len(tokens) == 1
+
+
+def test_refreshes_token_before_expiry(client_config):
+    client_config.jwt_token = make_jwt(time.time() + 30)
+    client_config.jwt_refresh_margin = 60
+    fresh = make_jwt(time.time() + 3600)
+    client = PfSenseV2Client(client_config)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{BASE}/api/v2/auth/jwt", json={**ENVELOPE, "data": {"token": fresh}})
+        m.get(f"{BASE}/api/v2/firewall/apply", json={**ENVELOPE, "data": {"pending_changes": False}})
+        client.get_firewall_apply_status()
+        client.get_firewall_apply_status()
+
+    assert [request.method for request in m.request_history] == ["POST", "GET", "GET"]
+    assert m.request_history[1].headers["Authorization"] == f"Bearer {fresh}"
+    assert client_config.jwt_token == fresh
+
+
+def test_reauthenticates_once_on_401(client_config):
+    client_config.jwt_token = make_jwt(None)
+    client = PfSenseV2Client(client_config)
+    fresh = make_jwt(time.time() + 3600)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{BASE}/api/v2/auth/jwt", json={**ENVELOPE, "data": {"token": fresh}})
+        m.get(
+            f"{BASE}/api/v2/firewall/apply",
+            [
+                {"status_code": 401, "json": {**ENVELOPE, "code": 401, "data": None}},
+                {"json": {**ENVELOPE, "data": {"pending_changes": True}}},
+            ],
+        )
+        assert client.get_firewall_apply_status().data == {"pending_changes": True}
+
+    assert [request.method for request in m.request_history] == ["GET", "POST", "GET"]
+
+
+def test_gives_up_after_one_retry(client_config):
+    client = PfSenseV2Client(client_config)
+    with requests_mock.Mocker() as m:
+        m.post(f"{BASE}/api/v2/auth/jwt", json={**ENVELOPE, "data": {"token": make_jwt(None)}})
+        m.get(f"{BASE}/api/v2/firewall/apply", status_code=401, json={**ENVELOPE, "code": 401})
+        with pytest.raises(AuthenticationError):
+            client.get_firewall_apply_status()
+    assert m.call_count == 3
+
+
+def test_api_key_clients_do_not_reauthenticate(client_config):
+    client_config.api_key = "key"
+    client = PfSenseV2Client(client_config)
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE}/api/v2/firewall/apply", status_code=401, json={**ENVELOPE, "code": 401})
+        with pytest.raises(AuthenticationError):
+            client.get_firewall_apply_status()
+    assert m.call_count == 1
+
+
+def test_token_cache_shared_between_clients(client_config, tmp_path):
+    client_config.token_cache_path = str(tmp_path / "tokens.json")
+    token = make_jwt(time.time() + 3600)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{BASE}/api/v2/auth/jwt", json={**ENVELOPE, "data": {"token": token}})
+        assert PfSenseV2Client(client_config).authenticate_jwt() == token
+        other = PfSenseV2Client(ClientConfig(**{**client_config.__dict__, "jwt_token": None}))
+        assert other.authenticate_jwt() == token
+        assert m.call_count == 1
+
+    # A new client picks the cached token up without any request
+    third = PfSenseV2Client(ClientConfig(**{**client_config.__dict__, "jwt_token": None}))
+    assert third._session.headers["Authorization"] == f"Bearer {token}"
+
+
+def test_rejected_cached_token_is_replaced(client_config, tmp_path):
+    client_config.token_cache_path = str(tmp_path / "tokens.json")
+    revoked, fresh = make_jwt(None, "revoked"), make_jwt(None, "fresh")
+    with TokenCache(client_config.token_cache_path).lock():
+        TokenCache(client_config.token_cache_path).set(f"{BASE}|admin", revoked)
+    client = PfSenseV2Client(client_config)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{BASE}/api/v2/auth/jwt", json={**ENVELOPE, "data": {"token": fresh}})
+        m.get(
+            f"{BASE}/api/v2/firewall/apply",
+            [{"status_code": 401, "json": {**ENVELOPE, "code": 401}}, {"json": {**ENVELOPE, "data": {}}}],
+        )
+        client.get_firewall_apply_status()
+
+    assert m.request_history[0].headers["Authorization"] == f"Bearer {revoked}"
+    assert TokenCache(client_config.token_cache_path).get(f"{BASE}|admin") == fresh
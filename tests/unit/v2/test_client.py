@@ -1,14 +1,20 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import requests
+import requests_mock
 from unittest.mock import patch, MagicMock
 from pydantic import ValidationError as PydanticValidationError
 
+from pyfsense_client.metrics import MetricsRegistry
 from pyfsense_client.v2 import (
     PfSenseV2Client,
     ClientConfig,
     APIError,
     AuthenticationError,
     ValidationError,
+    FirewallAlias,
     FirewallAliasCreate,
     FirewallAliasUpdate,
 )
@@ -71,12 +77,7 @@ def test_handle_response_200(mock_raise_for_status, pf_client):
     # Mock a successful response
     mock_response = MagicMock(spec=requests.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "code": 200,
-        "status": "success",
-        "message": "OK",
-        "data": {"foo": "bar"},
-    }
+    mock_response.content = b'{"code": 200, "status": "success", "message": "OK", "data": {"foo": "bar"}}'
 
     result = pf_client._handle_response(mock_response)
     assert result.code == 200
@@ -123,7 +124,7 @@ def test_handle_response_bad_json(pf_client):
     mock_response = MagicMock(spec=requests.Response)
     mock_response.status_code = 200
     mock_response.raise_for_status = MagicMock()
-    mock_response.json.side_effect = ValueError("No JSON object could be decoded")
+    mock_response.content = b"No JSON object could be decoded"
 
     with pytest.raises(APIError) as excinfo:
         pf_client._handle_response(mock_response)
@@ -140,12 +141,7 @@ def test_request_success(mock_request, pf_client):
     # Mock a response
     mock_response = MagicMock(spec=requests.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "code": 200,
-        "status": "success",
-        "message": "OK",
-        "data": {"foo": "bar"},
-    }
+    mock_response.content = b'{"code": 200, "status": "success", "message": "OK", "data": {"foo": "bar"}}'
     mock_request.return_value = mock_response
 
     resp = pf_client._request("GET", "/test-endpoint")
@@ -155,8 +151,10 @@ def test_request_success(mock_request, pf_client):
         method="GET",
         url="https://example-pfsense/test-endpoint",
         params=None,
-        json=None,
+        data=None,
+        headers=None,
         timeout=pf_client._default_timeout,
+        verify=pf_client.config.verify_ssl,
     )
 
 
@@ -211,6 +209,23 @@ def test_get_firewall_aliases(mock_request, pf_client):
     assert len(aliases) == 1
     assert aliases[0].id == 1
     assert aliases[0].name == "TestAlias"
+    mock_request.assert_called_once_with(
+        "GET", "/api/v2/firewall/aliases", params={"limit": 0, "offset": 0}, data_type=FirewallAlias
+    )
+
+
+@patch.object(PfSenseV2Client, "_request")
+def test_iter_firewall_aliases(mock_request, pf_client):
+    aliases = [FirewallAlias(id=i, name=f"alias_{i}", type="host", descr="", address=[], detail=[]) for i in range(5)]
+
+    def respond(method, endpoint, params=None, data_type=None):
+        assert params["type"] == "host"
+        return MagicMock(data=aliases[params["offset"] : params["offset"] + params["limit"]])
+
+    mock_request.side_effect = respond
+    names = [alias.name for alias in pf_client.iter_firewall_aliases(page_size=2, query={"type": "host"})]
+    assert names == [f"alias_{i}" for i in range(5)]
+    assert [c.kwargs["params"]["offset"] for c in mock_request.call_args_list] == [0, 2, 4]
 
 
 @patch.object(PfSenseV2Client, "_request")
@@ -365,6 +380,7 @@ def test_replace_all_firewall_aliases(mock_request, pf_client):
         "PUT",
         "/api/v2/firewall/aliases",
         json=[alias.model_dump() for alias in aliases_to_create],
+        data_type=FirewallAlias,
     )
 
     assert len(result) == 2
@@ -444,3 +460,202 @@ def test_get_firewall_alias_validation(mock_request, pf_client):
     errors = exc_info.value.errors()
     assert any(err["type"] == "int_parsing" and err["loc"] == ("id",) for err in errors)
     assert any(err["type"] == "list_type" and err["loc"] == ("address",) for err in errors)
+
+
+def test_handle_response_typed_validates_items_from_bytes(pf_client):
+    """With data_type, the envelope and list items are validated in one pass from the raw body."""
+    mock_response = MagicMock(spec=requests.Response)
+    mock_response.status_code = 200
+    mock_response.content = (
+        b'{"code": 200, "status": "ok", "message": "", "data": '
+        b'[{"id": 1, "name": "A", "type": "host", "descr": "", "address": ["10.0.0.1"]}]}'
+    )
+
+    result = pf_client._handle_response(mock_response, FirewallAlias)
+    assert isinstance(result.data[0], FirewallAlias)
+    assert result.data[0].address == ["10.0.0.1"]
+    mock_response.json.assert_not_called()
+
+
+def test_handle_response_typed_keeps_non_list_data(pf_client):
+    mock_response = MagicMock(spec=requests.Response)
+    mock_response.status_code = 200
+    mock_response.content = b'{"code": 200, "status": "ok", "message": "", "data": {"foo": "bar"}}'
+
+    result = pf_client._handle_response(mock_response, FirewallAlias)
+    assert result.data == {"foo": "bar"}
+
+
+def test_handle_response_typed_invalid_item(pf_client):
+    mock_response = MagicMock(spec=requests.Response)
+    mock_response.status_code = 200
+    mock_response.content = b'{"code": 200, "status": "ok", "message": "", "data": [{"id": "x"}]}'
+
+    with pytest.raises(APIError) as excinfo:
+        pf_client._handle_response(mock_response, FirewallAlias)
+    assert "Failed to parse JSON response" in str(excinfo.value)
+
+
+def test_get_responses_cached_and_invalidated_by_writes(client_config):
+    client_config.cache_ttl = 60
+    pf_client = PfSenseV2Client(client_config)
+    alias = {"id": 1, "name": "TestAlias", "type": "host", "descr": "", "address": [], "detail": []}
+    envelope = {"code": 200, "status": "ok", "message": ""}
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example-pfsense/api/v2/firewall/aliases", json={**envelope, "data": [alias]})
+        m.patch("https://example-pfsense/api/v2/firewall/alias", json={**envelope, "data": alias})
+
+        assert pf_client.get_firewall_aliases()[0].name == "TestAlias"
+        assert pf_client.get_firewall_aliases()[0].name == "TestAlias"
+        assert m.call_count == 1
+        # Different params are cached separately
+        pf_client.get_firewall_aliases(limit=5)
+        assert m.call_count == 2
+
+        pf_client.update_firewall_alias(FirewallAliasUpdate(id=1, name="TestAlias", type="host"))
+        pf_client.get_firewall_aliases()
+        assert m.call_count == 4
+
+    stats = pf_client.cache.stats()
+    assert (stats.hits, stats.misses, stats.invalidations) == (1, 3, 2)
+
+
+def test_get_in_flight_during_a_write_is_not_cached(client_config):
+    client_config.cache_ttl = 60
+    pf_client = PfSenseV2Client(client_config)
+    fetching = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def send(method, endpoint, params, json, data_type):
+        sent.append(method)
+        if method == "GET" and len(sent) == 1:
+            fetching.set()
+            release.wait(timeout=5)
+        return MagicMock(data=[])
+
+    with patch.object(pf_client, "_send", side_effect=send):
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(pf_client.get_firewall_aliases)
+            assert fetching.wait(timeout=5)
+            pf_client.delete_firewall_alias(1)
+            release.set()
+            assert future.result() == []
+        # The reply fetched before the delete was not cached, so this GET goes out again
+        assert pf_client.get_firewall_aliases() == []
+
+    assert sent == ["GET", "DELETE", "GET"]
+
+
+def test_cache_disabled_by_default(pf_client):
+    assert pf_client.cache is None
+
+
+def test_identical_concurrent_gets_share_one_request(client_config):
+    client_config.coalesce_requests = True
+    pf_client = PfSenseV2Client(client_config)
+    release = threading.Event()
+    sent = []
+
+    def send(method, endpoint, params, json, data_type):
+        sent.append(params)
+        release.wait(timeout=5)
+        return MagicMock(data=[])
+
+    with patch.object(pf_client, "_send", side_effect=send):
+        with ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(pf_client.get_firewall_aliases) for _ in range(8)]
+            while pf_client.singleflight.stats().shared < 7:
+                release.wait(0.001)
+            release.set()
+            assert all(future.result() == [] for future in futures)
+
+    assert len(sent) == 1
+
+
+def test_coalescing_is_off_by_default(client_config):
+    assert PfSenseV2Client(client_config).singleflight is None
+
+
+def test_hedged_get_uses_first_answer(client_config):
+    client_config.hedge_requests = True
+    client_config.hedge_min_delay = 0.01
+    pf_client = PfSenseV2Client(client_config)
+    for _ in range(pf_client.hedger.min_samples):
+        pf_client.hedger.latency.record(0.01)
+
+    release = threading.Event()
+    attempts = []
+
+    def send(method, endpoint, params, json, data_type):
+        attempts.append(method)
+        if len(attempts) == 1:
+            release.wait(timeout=5)
+            return MagicMock(data={"from": "primary"})
+        return MagicMock(data={"from": "hedge"})
+
+    with patch.object(pf_client, "_send", side_effect=send):
+        assert pf_client.get_firewall_apply_status().data == {"from": "hedge"}
+        release.set()
+        # Writes are never hedged
+        pf_client.apply_firewall_changes()
+
+    assert attempts == ["GET", "GET", "POST"]
+    assert pf_client.hedger.stats().hedges_won == 1
+
+
+def test_adaptive_concurrency_backs_off_on_overload():
+    config = ClientConfig(host="https://limited-pfsense", api_key="key", adaptive_concurrency=True, concurrency_limit=8)
+    pf_client = PfSenseV2Client(config)
+    assert pf_client.limiter.limit == 8
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://limited-pfsense/api/v2/firewall/apply",
+            status_code=503,
+            headers={"Retry-After": "0"},
+            json={"code": 503, "status": "unavailable", "message": "", "data": None},
+        )
+        with pytest.raises(APIError):
+            pf_client.get_firewall_apply_status()
+
+    stats = pf_client.limiter.stats()
+    assert (stats.limit, stats.in_flight, stats.decreases) == (4, 0, 1)
+    # Clients for the same host share one limiter
+    assert PfSenseV2Client(config).limiter is pf_client.limiter
+
+
+def test_metrics_disabled_by_default(pf_client):
+    assert pf_client.metrics is None
+
+
+def test_metrics_record_each_request(client_config):
+    client_config.collect_metrics = True
+    pf_client = PfSenseV2Client(client_config)
+    pf_client.metrics = MetricsRegistry()
+    timings = []
+    pf_client.metrics.subscribe(timings.append)
+    alias = {"id": 1, "name": "TestAlias", "type": "host", "descr": "", "address": [], "detail": []}
+    envelope = {"code": 200, "status": "ok", "message": ""}
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example-pfsense/api/v2/firewall/aliases", json={**envelope, "data": [alias]})
+        m.post("https://example-pfsense/api/v2/firewall/alias", status_code=400, json={**envelope, "code": 400})
+        pf_client.get_firewall_aliases()
+        with pytest.raises(ValidationError):
+            pf_client.create_firewall_alias(FirewallAliasCreate(name="x", type="host", descr="", address=[], detail=[]))
+
+    get, post = timings
+    assert (get.method, get.endpoint, get.host, get.status) == (
+        "GET",
+        "/api/v2/firewall/aliases",
+        "https://example-pfsense",
+        200,
+    )
+    assert get.response_bytes > 0 and get.request_bytes == 0
+    # The typed path decodes and validates in one pass
+    assert get.validate is not None and get.decode is None
+    assert (post.status, post.error) == (400, "ValidationError")
+    assert post.request_bytes > 0
+    assert 'pyfsense_requests_total{host="https://example-pfsense",method="POST"' in pf_client.metrics.to_prometheus()
@@ -1,14 +1,27 @@
+import json
+from collections.abc import Iterator
+
 import pytest
+import requests_mock
 from unittest.mock import patch
 
+from pyfsense_client.metrics import MetricsRegistry
 from pyfsense_client.v2 import (
     PfSenseV2Client,
     ClientConfig,
     SortOrder,
     SortFlags,
+    DHCPLease,
+    APIError,
+    AuthenticationError,
+    PaginationConsistencyError,
 )
 
 
+TOKEN = {"code": 200, "status": "ok", "message": "", "data": {"token": "new-token"}}
+UNAUTHORIZED = {"code": 401, "status": "unauthorized", "message": "", "data": []}
+
+
 @pytest.fixture
 def client_config():
     """Fixture for a basic ClientConfig."""
@@ -106,6 +119,104 @@ def test_get_dhcp_leases_with_params(mock_request, pf_client):
             # Added expected default sort_flags
             "sort_flags": SortFlags.SORT_REGULAR,
         },
+        data_type=DHCPLease,
     )
     assert len(leases) == 1
     assert leases[0].ip == "192.168.1.10"
+
+
+#
+# Tests for streaming DHCP leases
+#
+
+
+def _lease(i):
+    return {
+        "ip": f"192.168.1.{i}",
+        "mac": f"00:1A:2B:3C:4D:{i:02X}",
+        "hostname": f"Device{i}",
+        "if": "LAN",
+        "active_status": "active",
+        "online_status": "online",
+    }
+
+
+def test_stream_dhcp_leases(pf_client):
+    body = json.dumps({"code": 200, "status": "ok", "message": "", "data": [_lease(i) for i in range(50)]})
+    with requests_mock.Mocker() as m:
+        m.get("https://example-pfsense/api/v2/status/dhcp_server/leases", text=body)
+        leases = pf_client.stream_dhcp_leases(limit=50, sort_by=["ip"], chunk_size=64)
+        assert isinstance(leases, Iterator)
+        leases = list(leases)
+
+    assert [lease.hostname for lease in leases] == [f"Device{i}" for i in range(50)]
+    assert all(isinstance(lease, DHCPLease) for lease in leases)
+    assert m.last_request.qs["limit"] == ["50"]
+    assert m.last_request.qs["sort_by"] == ["ip"]
+
+
+def test_stream_dhcp_leases_errors(pf_client):
+    url = "https://example-pfsense/api/v2/status/dhcp_server/leases"
+    with requests_mock.Mocker() as m:
+        m.post("https://example-pfsense/api/v2/auth/jwt", json=TOKEN)
+        m.get(url, status_code=401, json=UNAUTHORIZED)
+        with pytest.raises(AuthenticationError):
+            list(pf_client.stream_dhcp_leases())
+        # Authenticated once and retried, like any other request
+        assert [request.method for request in m.request_history] == ["GET", "POST", "GET"]
+
+        m.get(url, text='{"code": 200, "status": "ok", "message": "", "data": [{"ip": "1.2.3.4"')
+        with pytest.raises(APIError) as excinfo:
+            list(pf_client.stream_dhcp_leases())
+        assert "Failed to parse JSON response" in str(excinfo.value)
+
+
+def test_stream_dhcp_leases_reauthenticates_and_is_measured(client_config):
+    client_config.collect_metrics = True
+    client = PfSenseV2Client(client_config)
+    client.metrics = MetricsRegistry()
+    timings = []
+    client.metrics.subscribe(timings.append)
+    url = "https://example-pfsense/api/v2/status/dhcp_server/leases"
+    body = json.dumps({"code": 200, "status": "ok", "message": "", "data": [_lease(i) for i in range(3)]})
+    with requests_mock.Mocker() as m:
+        m.post("https://example-pfsense/api/v2/auth/jwt", json=TOKEN)
+        m.get(url, [{"status_code": 401, "json": UNAUTHORIZED}, {"text": body}])
+        assert len(list(client.stream_dhcp_leases(chunk_size=32))) == 3
+        assert m.last_request.headers["Authorization"] == "Bearer new-token"
+
+    streamed = [timing for timing in timings if timing.endpoint == "/api/v2/status/dhcp_server/leases"]
+    assert [timing.status for timing in streamed] == [401, 200]
+    assert streamed[1].response_bytes == len(body)
+
+
+@patch.object(PfSenseV2Client, "get_dhcp_leases")
+def test_iter_dhcp_leases(mock_get, pf_client):
+    leases = [DHCPLease.model_validate(_lease(i)) for i in range(7)]
+    mock_get.side_effect = lambda limit, offset, *args: leases[offset : offset + limit]
+
+    result = pf_client.iter_dhcp_leases(page_size=3, sort_by=["ip"])
+    assert isinstance(result, Iterator)
+    assert [lease.hostname for lease in result] == [f"Device{i}" for i in range(7)]
+    mock_get.assert_any_call(3, 3, ["ip"], SortOrder.ASCENDING, SortFlags.SORT_REGULAR)
+    assert [c.args[1] for c in mock_get.call_args_list] == [0, 3, 6]
+
+
+@patch.object(PfSenseV2Client, "get_dhcp_leases")
+def test_fetch_all_dhcp_leases(mock_get, pf_client):
+    leases = [DHCPLease.model_validate(_lease(i)) for i in range(23)]
+    mock_get.side_effect = lambda limit, offset, *args: leases[offset : offset + limit]
+
+    result = pf_client.fetch_all_dhcp_leases(parallelism=3, page_size=5, sort_order=SortOrder.DESCENDING)
+    assert result == leases
+    assert all(c.args[3] == SortOrder.DESCENDING for c in mock_get.call_args_list)
+
+
+@patch.object(PfSenseV2Client, "get_dhcp_leases")
+def test_fetch_all_dhcp_leases_detects_shifted_records(mock_get, pf_client):
+    leases = [DHCPLease.model_validate(_lease(i)) for i in range(20)]
+    # Later windows always see the table as if a lease had been removed from the front
+    mock_get.side_effect = lambda limit, offset, *args: leases[offset + (offset > 0) : offset + limit]
+
+    with pytest.raises(PaginationConsistencyError):
+        pf_client.fetch_all_dhcp_leases(page_size=5)
@@ -0,0 +1,94 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyfsense_client.v2 import PfSenseV2Client, ClientConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer the response so headers and body go out in a single write
+    wbufsize = -1
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        alias_id = int(self.path.rsplit("=", 1)[-1])
+        body = json.dumps(
+            {
+                "code": 200,
+                "status": "ok",
+                "message": "",
+                "data": {"id": alias_id, "name": f"alias{alias_id}", "type": "host", "descr": ""},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.peers = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_pool_settings_are_applied():
+    config = ClientConfig(host="pfsense.local", pool_connections=2, pool_maxsize=32, pool_block=True)
+    client = PfSenseV2Client(config)
+    adapter = client._session.get_adapter("https://pfsense.local")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block is True
+    assert client._session.headers["Connection"] == "keep-alive"
+
+
+def test_keep_alive_disabled_sends_connection_close():
+    client = PfSenseV2Client(ClientConfig(host="pfsense.local", keep_alive=False))
+    assert client._session.headers["Connection"] == "close"
+
+
+def test_shared_client_across_threads(server):
+    """One client shared by 32 threads returns correct results and never exceeds the pool size."""
+    host, port = server.server_address
+    config = ClientConfig(host=f"http://{host}:{port}", pool_maxsize=4, pool_block=True)
+    client = PfSenseV2Client(config)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        aliases = list(pool.map(client.get_firewall_alias, range(400)))
+
+    assert [alias.id for alias in aliases] == list(range(400))
+    assert [alias.name for alias in aliases] == [f"alias{i}" for i in range(400)]
+    assert len(server.peers) <= 4
+
+
+def test_header_swap_is_safe_while_requests_are_in_flight(server):
+    host, port = server.server_address
+    client = PfSenseV2Client(ClientConfig(host=f"http://{host}:{port}", pool_maxsize=8))
+    errors = []
+
+    def worker(i):
+        try:
+            client.get_firewall_alias(i)
+        except Exception as exc:  # pragma: no cover - only hit on failure
+            errors.append(exc)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        for i in range(200):
+            pool.submit(worker, i)
+            client._set_session_header("Authorization", f"Bearer token-{i}")
+
+    assert errors == []
+    assert client._session.headers["Authorization"] == "Bearer token-199"